@@ -132,11 +132,13 @@ from bt2.field_class import _ArrayFieldClassConst
 from bt2.field_class import _StaticArrayFieldClassConst
 from bt2.field_class import _DynamicArrayFieldClassConst
 from bt2.field_class import _DynamicArrayWithLengthFieldFieldClassConst
+from bt2.field_extractor import FieldExtractor
 from bt2.field_path import FieldPathScope
 from bt2.field_path import _IndexFieldPathItem
 from bt2.field_path import _CurrentArrayElementFieldPathItem
 from bt2.field_path import _CurrentOptionContentFieldPathItem
 from bt2.graph import Graph
+from bt2.graph import NativeSinkValueData
 from bt2.integer_range_set import SignedIntegerRange
 from bt2.integer_range_set import UnsignedIntegerRange
 from bt2.integer_range_set import SignedIntegerRangeSet
@@ -169,6 +171,8 @@ from bt2.message import _DiscardedPacketsMessageConst
 from bt2.message_iterator import _UserMessageIterator
 from bt2.mip import get_greatest_operative_mip_version
 from bt2.mip import get_maximal_mip_version
+from bt2.parallel import ParallelTraceCollectionIterator
+from bt2.parallel import parallel_map
 from bt2.plugin import find_plugins_in_path
 from bt2.plugin import find_plugins
 from bt2.plugin import find_plugin
@@ -214,6 +218,7 @@ if (sys.version_info.major, sys.version_info.minor) != (3, 4):
     _del_global_name('event_class')
     _del_global_name('field')
     _del_global_name('field_class')
+    _del_global_name('field_extractor')
     _del_global_name('field_path')
     _del_global_name('graph')
     _del_global_name('integer_range_set')
@@ -224,6 +229,7 @@ if (sys.version_info.major, sys.version_info.minor) != (3, 4):
     _del_global_name('native_bt')
     _del_global_name('object')
     _del_global_name('packet')
+    _del_global_name('parallel')
     _del_global_name('plugin')
     _del_global_name('port')
     _del_global_name('py_plugin')
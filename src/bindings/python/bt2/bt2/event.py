@@ -25,6 +25,87 @@ from bt2 import event_class as bt2_event_class
 from bt2 import packet as bt2_packet
 from bt2 import stream as bt2_stream
 from bt2 import field as bt2_field
+import functools
+
+
+# Event scopes, in _EventConst.__getitem__() lookup order.
+_SCOPE_PAYLOAD = 0
+_SCOPE_SPECIFIC_CONTEXT = 1
+_SCOPE_COMMON_CONTEXT = 2
+_SCOPE_PACKET_CONTEXT = 3
+
+# Value of a scope field cache entry when the scope field is not
+# retrieved yet (`None` means the event has no such scope field).
+_NOT_RETRIEVED = object()
+
+# Event class address -> name lookup table.
+#
+# A name lookup table maps a field name to the `(scope, member index)`
+# pair where _EventConst.__getitem__() finds it.
+_name_lookup_tables = {}
+
+# Trace class address -> list of addresses of its event classes which
+# have an entry in `_name_lookup_tables`.
+#
+# A destruction listener of the trace class removes those entries, as
+# the destroyed event classes' addresses can be reused.
+_name_lookup_table_event_class_addrs = {}
+
+
+def _trace_class_destroyed(trace_class_addr, trace_class):
+    for event_class_addr in _name_lookup_table_event_class_addrs.pop(
+        trace_class_addr, ()
+    ):
+        _name_lookup_tables.pop(event_class_addr, None)
+
+
+def _create_name_lookup_table(event_class):
+    stream_class = event_class.stream_class
+    table = {}
+
+    # Insert the names of the last scopes of the lookup order first so
+    # that the first scopes have precedence.
+    scope_field_classes = (
+        (_SCOPE_PACKET_CONTEXT, stream_class.packet_context_field_class),
+        (_SCOPE_COMMON_CONTEXT, stream_class.event_common_context_field_class),
+        (_SCOPE_SPECIFIC_CONTEXT, event_class.specific_context_field_class),
+        (_SCOPE_PAYLOAD, event_class.payload_field_class),
+    )
+
+    for scope, field_class in scope_field_classes:
+        if field_class is None:
+            continue
+
+        for index, name in enumerate(field_class):
+            table[name] = (scope, index)
+
+    return table
+
+
+def _borrow_name_lookup_table(event_class_ptr, event_class_pycls):
+    event_class_addr = int(event_class_ptr)
+    table = _name_lookup_tables.get(event_class_addr)
+
+    if table is not None:
+        return table
+
+    # The event class is frozen at this point: its field classes won't
+    # change anymore.
+    event_class = event_class_pycls._create_from_ptr_and_get_ref(event_class_ptr)
+    table = _create_name_lookup_table(event_class)
+    trace_class = event_class.stream_class.trace_class
+    event_class_addrs = _name_lookup_table_event_class_addrs.get(trace_class.addr)
+
+    if event_class_addrs is None:
+        event_class_addrs = []
+        _name_lookup_table_event_class_addrs[trace_class.addr] = event_class_addrs
+        trace_class.add_destruction_listener(
+            functools.partial(_trace_class_destroyed, trace_class.addr)
+        )
+
+    event_class_addrs.append(event_class_addr)
+    _name_lookup_tables[event_class_addr] = table
+    return table
 
 
 class _EventConst(object._UniqueObject):
@@ -73,20 +154,26 @@ class _EventConst(object._UniqueObject):
         assert stream_ptr is not None
         return self._stream_pycls._create_from_ptr_and_get_ref(stream_ptr)
 
-    @property
-    def common_context_field(self):
-        field_ptr = self._borrow_common_context_field_ptr(self._ptr)
+    # List of the retrieved scope fields, indexed by scope (see
+    # _scope_field()), or `None` if none is retrieved yet
+    _scope_fields = None
 
-        if field_ptr is None:
-            return
+    def _retrieve_scope_field(self, scope):
+        if scope == _SCOPE_PACKET_CONTEXT:
+            packet = self.packet
 
-        return self._create_field_from_ptr(
-            field_ptr, self._owner_ptr, self._owner_get_ref, self._owner_put_ref
-        )
+            if packet is None:
+                return
 
-    @property
-    def specific_context_field(self):
-        field_ptr = self._borrow_specific_context_field_ptr(self._ptr)
+            return packet.context_field
+
+        if scope == _SCOPE_PAYLOAD:
+            field_ptr = self._borrow_payload_field_ptr(self._ptr)
+        elif scope == _SCOPE_SPECIFIC_CONTEXT:
+            field_ptr = self._borrow_specific_context_field_ptr(self._ptr)
+        else:
+            assert scope == _SCOPE_COMMON_CONTEXT
+            field_ptr = self._borrow_common_context_field_ptr(self._ptr)
 
         if field_ptr is None:
             return
@@ -95,40 +182,60 @@ class _EventConst(object._UniqueObject):
             field_ptr, self._owner_ptr, self._owner_get_ref, self._owner_put_ref
         )
 
-    @property
-    def payload_field(self):
-        field_ptr = self._borrow_payload_field_ptr(self._ptr)
+    # Returns the field of the scope `scope`, or `None` if there's none.
+    #
+    # The scope fields of an event never change: create their wrappers
+    # once.
+    def _scope_field(self, scope):
+        scope_fields = self._scope_fields
 
-        if field_ptr is None:
-            return
+        if scope_fields is None:
+            scope_fields = [_NOT_RETRIEVED] * 4
+            self._scope_fields = scope_fields
 
-        return self._create_field_from_ptr(
-            field_ptr, self._owner_ptr, self._owner_get_ref, self._owner_put_ref
-        )
+        field = scope_fields[scope]
 
-    def __getitem__(self, key):
-        utils._check_str(key)
-        payload_field = self.payload_field
+        if field is _NOT_RETRIEVED:
+            field = self._retrieve_scope_field(scope)
+            scope_fields[scope] = field
 
-        if payload_field is not None and key in payload_field:
-            return payload_field[key]
+        return field
 
-        specific_context_field = self.specific_context_field
+    @property
+    def common_context_field(self):
+        return self._scope_field(_SCOPE_COMMON_CONTEXT)
 
-        if specific_context_field is not None and key in specific_context_field:
-            return specific_context_field[key]
+    @property
+    def specific_context_field(self):
+        return self._scope_field(_SCOPE_SPECIFIC_CONTEXT)
 
-        common_context_field = self.common_context_field
+    @property
+    def payload_field(self):
+        return self._scope_field(_SCOPE_PAYLOAD)
 
-        if common_context_field is not None and key in common_context_field:
-            return common_context_field[key]
+    def __getitem__(self, key):
+        utils._check_str(key)
+        table = _borrow_name_lookup_table(
+            self._borrow_class_ptr(self._ptr), self._event_class_pycls
+        )
+        location = table.get(key)
+
+        if location is None:
+            raise KeyError(key)
 
-        packet_context_field = self.packet.context_field
+        scope_field = self._scope_field(location[0])
 
-        if packet_context_field is not None and key in packet_context_field:
-            return packet_context_field[key]
+        if scope_field is None:
+            # Packet context field of an event without a packet
+            raise KeyError(key)
 
-        raise KeyError(key)
+        field_ptr = scope_field._borrow_member_field_ptr_by_index(
+            scope_field._ptr, location[1]
+        )
+        assert field_ptr is not None
+        return scope_field._create_field_from_ptr(
+            field_ptr, self._owner_ptr, self._owner_get_ref, self._owner_put_ref
+        )
 
 
 class _Event(_EventConst):
@@ -26,6 +26,7 @@ import collections.abc
 import functools
 import numbers
 import math
+import array
 
 
 def _create_field_from_ptr_template(
@@ -800,6 +801,22 @@ class _VariantField(_VariantFieldConst, _ContainerField, _Field):
     value = property(fset=_set_value)
 
 
+# `array` type codes of integers, with their size in bits, from the
+# smallest to the largest.
+_SIGNED_INT_TYPECODES = [(tc, array.array(tc).itemsize * 8) for tc in 'bhiq']
+_UNSIGNED_INT_TYPECODES = [(tc, array.array(tc).itemsize * 8) for tc in 'BHIQ']
+
+
+# Returns the `array` type code of the smallest integer type which can
+# contain the values of `size`-bit integers.
+def _int_typecode(size, is_signed):
+    typecodes = _SIGNED_INT_TYPECODES if is_signed else _UNSIGNED_INT_TYPECODES
+
+    for typecode, typecode_size in typecodes:
+        if typecode_size >= size:
+            return typecode
+
+
 class _ArrayFieldConst(_ContainerFieldConst, _FieldConst, collections.abc.Sequence):
     _borrow_element_field_ptr_by_index = staticmethod(
         native_bt.field_array_borrow_element_field_by_index_const
@@ -832,6 +849,52 @@ class _ArrayFieldConst(_ContainerFieldConst, _FieldConst, collections.abc.Sequen
     def insert(self, index, value):
         raise NotImplementedError
 
+    # Returns the `array` type code of the element values, or raises
+    # `TypeError` if the elements are not boolean, bit array, integer
+    # or real fields.
+    def _elem_typecode(self):
+        elem_fc = self.cls.element_field_class
+
+        if isinstance(elem_fc, bt2_field_class._BoolFieldClassConst):
+            return 'B'
+        elif isinstance(elem_fc, bt2_field_class._BitArrayFieldClassConst):
+            return _int_typecode(elem_fc.length, False)
+        elif isinstance(elem_fc, bt2_field_class._SignedIntegerFieldClassConst):
+            return _int_typecode(elem_fc.field_value_range, True)
+        elif isinstance(elem_fc, bt2_field_class._UnsignedIntegerFieldClassConst):
+            return _int_typecode(elem_fc.field_value_range, False)
+        elif isinstance(elem_fc, bt2_field_class._SinglePrecisionRealFieldClassConst):
+            return 'f'
+        elif isinstance(elem_fc, bt2_field_class._DoublePrecisionRealFieldClassConst):
+            return 'd'
+
+        raise TypeError(
+            'cannot access the elements of an array field of {} objects in bulk'.format(
+                elem_fc.__class__.__name__
+            )
+        )
+
+    # Returns the values of the elements as an `array.array` object of
+    # which the type code is the smallest type which can contain them
+    # (see _elem_typecode()).
+    #
+    # Boolean elements become 0 or 1.
+    def to_array(self):
+        typecode = self._elem_typecode()
+        values = array.array(
+            typecode, bytes(array.array(typecode).itemsize * len(self))
+        )
+        native_bt.bt2_field_array_get_values(self._ptr, values)
+        return values
+
+    # Returns the values of the elements as they're laid out in memory
+    # in the array returned by to_array().
+    #
+    # For an array field of 8-bit unsigned integer fields, each byte is
+    # the value of an element.
+    def to_bytes(self):
+        return self.to_array().tobytes()
+
     def _spec_eq(self, other):
         if not isinstance(other, collections.abc.Sequence):
             return False
@@ -868,6 +931,22 @@ class _ArrayField(
         # the appropriate exception
         field.value = value
 
+    # Sets the values of the elements from the items of `buffer`, an
+    # object which supports the buffer protocol (`bytes`, `bytearray`,
+    # `array.array`, `memoryview`, and the like), in one native call.
+    #
+    # The elements must be boolean, bit array, integer or real fields.
+    # The buffer items must be integers or booleans, or also reals if
+    # the elements are real fields.
+    #
+    # For a dynamic array field, this sets the length of the field to
+    # the number of buffer items. For a static array field, the buffer
+    # must have as many items as the field has elements.
+    def from_buffer(self, buffer):
+        # raises if the elements are not supported
+        self._elem_typecode()
+        native_bt.bt2_field_array_set_values(self._ptr, buffer)
+
 
 class _StaticArrayFieldConst(_ArrayFieldConst, _FieldConst):
     _NAME = 'Const static array'
@@ -0,0 +1,205 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 EfficiOS, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+from bt2 import native_bt, utils
+from bt2 import event_class as bt2_event_class
+from bt2 import field_class as bt2_field_class
+from bt2 import field_path as bt2_field_path
+import array
+
+
+# Root scope names accepted as the first component of a field path.
+_SCOPE_NAME_TO_SCOPE = {
+    'packet_context': bt2_field_path.FieldPathScope.PACKET_CONTEXT,
+    'common_context': bt2_field_path.FieldPathScope.EVENT_COMMON_CONTEXT,
+    'specific_context': bt2_field_path.FieldPathScope.EVENT_SPECIFIC_CONTEXT,
+    'payload': bt2_field_path.FieldPathScope.EVENT_PAYLOAD,
+}
+
+
+# `array` type codes of the supported scalar field classes, in order of
+# precedence (enumeration field classes are integer field classes).
+_FIELD_CLASS_TYPE_TO_TYPECODE = (
+    (bt2_field_class._UnsignedIntegerFieldClassConst, 'Q'),
+    (bt2_field_class._SignedIntegerFieldClassConst, 'q'),
+    (bt2_field_class._RealFieldClassConst, 'd'),
+    (bt2_field_class._BoolFieldClassConst, 'B'),
+    (bt2_field_class._BitArrayFieldClassConst, 'Q'),
+)
+
+
+def _scope_root_field_class(event_class, scope):
+    if scope == bt2_field_path.FieldPathScope.EVENT_PAYLOAD:
+        return event_class.payload_field_class
+    elif scope == bt2_field_path.FieldPathScope.EVENT_SPECIFIC_CONTEXT:
+        return event_class.specific_context_field_class
+    elif scope == bt2_field_path.FieldPathScope.EVENT_COMMON_CONTEXT:
+        return event_class.stream_class.event_common_context_field_class
+    else:
+        assert scope == bt2_field_path.FieldPathScope.PACKET_CONTEXT
+        return event_class.stream_class.packet_context_field_class
+
+
+# Extracts the values of scalar fields of the event messages of a given
+# event class in bulk.
+#
+# The field paths, given as strings like `payload/cpu_id` or
+# `common_context/vtid`, are resolved once against the event class when
+# the extractor is created. Then, extract() copies the values of those
+# fields from a batch of messages directly into `array.array` objects,
+# without creating a Python object for each event or field.
+#
+# The first component of a field path is the root scope name, one of
+# `packet_context`, `common_context`, `specific_context` and `payload`.
+# The other components are structure member names. The targeted field
+# must be a boolean, bit array, integer (including enumeration), or
+# real field.
+class FieldExtractor:
+    def __init__(self, event_class, paths):
+        utils._check_type(event_class, bt2_event_class._EventClassConst)
+
+        if isinstance(paths, str):
+            paths = [paths]
+
+        paths = list(paths)
+
+        if len(paths) == 0:
+            raise ValueError('expecting at least one field path')
+
+        self._event_class = event_class
+        self._paths = []
+        self._native_paths = []
+        self._typecodes = []
+
+        for path in paths:
+            utils._check_str(path)
+            native_path, typecode = self._compile_path(event_class, path)
+            self._paths.append(path)
+            self._native_paths.append(native_path)
+            self._typecodes.append(typecode)
+
+        self._native_paths = tuple(self._native_paths)
+
+    @staticmethod
+    def _compile_path(event_class, path):
+        names = path.split('/')
+
+        if len(names) < 2:
+            raise ValueError(
+                "invalid field path '{}': expecting a root scope name and at least one member name".format(
+                    path
+                )
+            )
+
+        scope = _SCOPE_NAME_TO_SCOPE.get(names[0])
+
+        if scope is None:
+            raise ValueError(
+                "invalid field path '{}': unknown root scope '{}'".format(
+                    path, names[0]
+                )
+            )
+
+        fc = _scope_root_field_class(event_class, scope)
+
+        if fc is None:
+            raise ValueError(
+                "invalid field path '{}': event class has no {} field class".format(
+                    path, names[0].replace('_', ' ')
+                )
+            )
+
+        native_path = [scope]
+
+        for name in names[1:]:
+            if not isinstance(fc, bt2_field_class._StructureFieldClassConst):
+                raise ValueError(
+                    "invalid field path '{}': '{}' is not a member of a structure field class".format(
+                        path, name
+                    )
+                )
+
+            for index, member_name in enumerate(fc):
+                if member_name == name:
+                    native_path.append(index)
+                    break
+            else:
+                raise ValueError(
+                    "invalid field path '{}': no member named '{}'".format(path, name)
+                )
+
+            fc = fc[name].field_class
+
+        for fc_type, typecode in _FIELD_CLASS_TYPE_TO_TYPECODE:
+            if isinstance(fc, fc_type):
+                return tuple(native_path), typecode
+
+        raise ValueError(
+            "invalid field path '{}': field class '{}' is not a scalar field class".format(
+                path, fc.__class__.__name__
+            )
+        )
+
+    @property
+    def event_class(self):
+        return self._event_class
+
+    @property
+    def paths(self):
+        return list(self._paths)
+
+    @property
+    def typecodes(self):
+        return list(self._typecodes)
+
+    # Extracts the field values of the event messages of `msgs` having
+    # this extractor's event class, skipping any other message.
+    #
+    # Returns a dictionary which maps each field path to an
+    # `array.array` object containing the field values, in message
+    # order. All the arrays have the same length: the number of
+    # extracted event messages.
+    #
+    # When `columns` is not `None`, it's an existing result of this
+    # method to which to append the field values instead of creating
+    # new arrays.
+    def extract(self, msgs, columns=None):
+        msg_ptrs = [msg._ptr for msg in msgs]
+        new_columns = tuple(
+            array.array(typecode, bytes(array.array(typecode).itemsize * len(msg_ptrs)))
+            for typecode in self._typecodes
+        )
+        count = native_bt.bt2_field_extract_scalars(
+            msg_ptrs, self._event_class._ptr, self._native_paths, new_columns
+        )
+
+        for column in new_columns:
+            del column[count:]
+
+        if columns is None:
+            return dict(zip(self._paths, new_columns))
+
+        for path, column in zip(self._paths, new_columns):
+            columns[path].extend(column)
+
+        return columns
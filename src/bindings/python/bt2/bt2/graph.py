@@ -27,6 +27,7 @@ from bt2 import component as bt2_component
 import functools
 from bt2 import port as bt2_port
 from bt2 import logging as bt2_logging
+from bt2 import value as bt2_value
 import bt2
 
 
@@ -40,6 +41,24 @@ def _graph_port_added_listener_from_native(
     user_listener(component, port)
 
 
+# Value object to pass as the initialization method data of a native
+# sink component which expects one (for example, `sink.utils.aggregator`
+# fills a map value with its results).
+#
+# Pass an instance as the `obj` parameter of Graph.add_component(): the
+# component receives `value` itself, not a Python object. A bare value
+# object is refused as the `obj` of a native component, as native
+# components which don't expect a value object would misinterpret it.
+class NativeSinkValueData:
+    def __init__(self, value):
+        utils._check_type(value, bt2_value._Value)
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+
 class Graph(object._SharedObject):
     _get_ref = staticmethod(native_bt.graph_get_ref)
     _put_ref = staticmethod(native_bt.graph_put_ref)
@@ -105,7 +124,19 @@ class Graph(object._SharedObject):
         base_cc_ptr = component_class._bt_component_class_ptr()
 
         if obj is not None and not native_bt.bt2_is_python_component_class(base_cc_ptr):
-            raise ValueError('cannot pass a Python object to a non-Python component')
+            # A native sink component which expects it can receive a
+            # value object as its initialization method data, for
+            # example to fill it with results (see
+            # `sink.utils.aggregator`).
+            if cc_type != native_bt.COMPONENT_CLASS_TYPE_SINK or not isinstance(
+                obj, NativeSinkValueData
+            ):
+                raise ValueError(
+                    'cannot pass a Python object to a non-Python component'
+                )
+
+            add_fn = native_bt.bt2_graph_add_sink_component_with_value_data
+            obj = obj.value._ptr
 
         if params is not None and not isinstance(params, (dict, bt2.MapValue)):
             raise TypeError("'params' parameter is not a 'dict' or a 'bt2.MapValue'.")
@@ -69,13 +69,23 @@ class _EventMessageConst(_MessageConst, _MessageWithDefaultClockSnapshot):
         self._check_has_default_clock_class(self.event.stream.cls.default_clock_class)
         return self._get_default_clock_snapshot(self._borrow_default_clock_snapshot)
 
+    # Wrapper of this message's event, created once by the `event`
+    # property as the event of an event message never changes.
+    _event = None
+
     @property
     def event(self):
-        event_ptr = self._borrow_event(self._ptr)
-        assert event_ptr is not None
-        return self._event_pycls._create_from_ptr_and_get_ref(
-            event_ptr, self._ptr, self._get_ref, self._put_ref
-        )
+        event = self._event
+
+        if event is None:
+            event_ptr = self._borrow_event(self._ptr)
+            assert event_ptr is not None
+            event = self._event_pycls._create_from_ptr_and_get_ref(
+                event_ptr, self._ptr, self._get_ref, self._put_ref
+            )
+            self._event = event
+
+        return event
 
 
 class _EventMessage(_EventMessageConst, _Message):
@@ -28,6 +28,7 @@ from bt2 import event_class as bt2_event_class
 from bt2 import packet as bt2_packet
 from bt2 import port as bt2_port
 from bt2 import clock_class as bt2_clock_class
+from bt2 import field_class as bt2_field_class
 import bt2
 
 
@@ -65,6 +66,31 @@ class _UserComponentInputPortMessageIterator(object._SharedObject, _MessageItera
 
         return bt2_message._create_from_ptr(msg_ptr)
 
+    # Return a list of all the messages of the current native message
+    # array which were not returned yet, advancing the native message
+    # iterator first if they were all returned.
+    #
+    # This makes it possible to consume a whole batch of messages with a
+    # single call instead of calling next() for each message.
+    def _next_msgs(self):
+        if len(self._current_msgs) == self._at:
+            status, msgs = native_bt.bt2_self_component_port_input_get_msg_range(
+                self._ptr
+            )
+            utils._handle_func_status(
+                status, 'unexpected error: cannot advance the message iterator'
+            )
+            self._current_msgs = msgs
+            self._at = 0
+
+        msgs = [
+            bt2_message._create_from_ptr(self._current_msgs[i])
+            for i in range(self._at, len(self._current_msgs))
+        ]
+        self._current_msgs = []
+        self._at = 0
+        return msgs
+
     def can_seek_beginning(self):
         (
             status,
@@ -157,6 +183,11 @@ class _UserMessageIterator(_MessageIterator):
         # to do in __del__().
         self = super().__new__(cls)
         self._bt_ptr = ptr
+
+        # messages which __next__() returned, but which were not
+        # given to the native side yet
+        self._bt_pending_msgs = ()
+        self._bt_pending_msgs_at = 0
         return self
 
     def _bt_init_from_native(self, config_ptr, self_output_port_ptr):
@@ -192,26 +223,72 @@ class _UserMessageIterator(_MessageIterator):
     def _user_finalize(self):
         pass
 
+    # The user's __next__() method returns either a single message or a
+    # list/tuple of messages. In the latter case, the native message
+    # iterator gets as many of them as its message array can contain at
+    # each call, so that a user message iterator can avoid a
+    # native-to-Python call per message. An empty list/tuple is
+    # equivalent to raising `bt2.TryAgain`.
     def __next__(self):
         raise bt2.Stop
 
-    def _bt_next_from_native(self):
-        # this can raise anything: it's catched by the native part
-        try:
-            msg = next(self)
-        except StopIteration:
-            raise bt2.Stop
-        except Exception:
-            raise
-
-        utils._check_type(msg, bt2_message._MessageConst)
-
+    @staticmethod
+    def _bt_msg_addr_for_native(msg):
         # The reference we return will be given to the message array.
         # However, the `msg` Python object may stay alive, if the user has kept
         # a reference to it.  Acquire a new reference to account for that.
         msg._get_ref(msg._ptr)
         return int(msg._ptr)
 
+    # Returns either the address of a single message or a list of at
+    # most `capacity` message addresses.
+    def _bt_next_from_native(self, capacity):
+        # this can raise anything: it's catched by the native part
+        if self._bt_pending_msgs_at == len(self._bt_pending_msgs):
+            try:
+                msgs = next(self)
+            except StopIteration:
+                raise bt2.Stop
+            except Exception:
+                raise
+
+            if not isinstance(msgs, (list, tuple)):
+                utils._check_type(msgs, bt2_message._MessageConst)
+                return self._bt_msg_addr_for_native(msgs)
+
+            if len(msgs) == 0:
+                raise bt2.TryAgain
+
+            # check all the messages before giving any of them
+            for msg in msgs:
+                utils._check_type(msg, bt2_message._MessageConst)
+
+            # keep a snapshot: the user may reuse its list once
+            # __next__() returns, while messages are still pending
+            self._bt_pending_msgs = tuple(msgs)
+            self._bt_pending_msgs_at = 0
+
+        begin = self._bt_pending_msgs_at
+        end = min(begin + capacity, len(self._bt_pending_msgs))
+        addrs = [
+            self._bt_msg_addr_for_native(msg)
+            for msg in self._bt_pending_msgs[begin:end]
+        ]
+
+        if end == len(self._bt_pending_msgs):
+            # all given: don't keep them alive
+            self._bt_pending_msgs = ()
+            self._bt_pending_msgs_at = 0
+        else:
+            self._bt_pending_msgs_at = end
+
+        return addrs
+
+    def _bt_forget_pending_msgs(self):
+        # Forget about pending messages, they won't be valid after seeking.
+        self._bt_pending_msgs = ()
+        self._bt_pending_msgs_at = 0
+
     def _bt_can_seek_beginning_from_native(self):
         # Here, we mimic the behavior of the C API:
         #
@@ -227,6 +304,7 @@ class _UserMessageIterator(_MessageIterator):
             return hasattr(self, '_user_seek_beginning')
 
     def _bt_seek_beginning_from_native(self):
+        self._bt_forget_pending_msgs()
         self._user_seek_beginning()
 
     def _bt_can_seek_ns_from_origin_from_native(self, ns_from_origin):
@@ -247,6 +325,7 @@ class _UserMessageIterator(_MessageIterator):
             return hasattr(self, '_user_seek_ns_from_origin')
 
     def _bt_seek_ns_from_origin_from_native(self, ns_from_origin):
+        self._bt_forget_pending_msgs()
         self._user_seek_ns_from_origin(ns_from_origin)
 
     def _create_input_port_message_iterator(self, input_port):
@@ -307,6 +386,9 @@ class _UserMessageIterator(_MessageIterator):
 
         return bt2_message._EventMessage(ptr)
 
+    def _create_event_message_builder(self, event_class, parent):
+        return _EventMessageBuilder(self, event_class, parent)
+
     def _create_message_iterator_inactivity_message(self, clock_class, clock_snapshot):
         utils._check_type(clock_class, bt2_clock_class._ClockClass)
         ptr = native_bt.message_message_iterator_inactivity_create(
@@ -471,3 +553,115 @@ class _UserMessageIterator(_MessageIterator):
             msg._count = count
 
         return msg
+
+
+# Supported field classes of the payload members of the event messages
+# which an `_EventMessageBuilder` creates.
+_EVENT_MESSAGE_BUILDER_MEMBER_FIELD_CLASS_TYPES = (
+    bt2_field_class._BoolFieldClassConst,
+    bt2_field_class._BitArrayFieldClassConst,
+    bt2_field_class._IntegerFieldClassConst,
+    bt2_field_class._RealFieldClassConst,
+    bt2_field_class._StringFieldClassConst,
+)
+
+
+# Creates event messages of a given event class within a given stream or
+# packet, setting their payload fields from rows of values.
+#
+# The event class, the parent and the payload field class are checked
+# once, when _UserMessageIterator._create_event_message_builder() creates
+# the builder. Then create() and create_many() create and fill the event
+# messages with a single native call, without creating a Python field
+# object for each member.
+#
+# The payload field class of the event class, if any, may only contain
+# boolean, bit array, integer (including enumeration), real and string
+# field classes. A row contains the payload member values, in member
+# order: `bool` objects for boolean members, `int` objects for bit array
+# and integer members, `float` or `int` objects for real members, and
+# `str` objects for string members.
+class _EventMessageBuilder:
+    def __init__(self, msg_iter, event_class, parent):
+        utils._check_type(event_class, bt2_event_class._EventClass)
+
+        if event_class.stream_class.supports_packets:
+            utils._check_type(parent, bt2_packet._Packet)
+            self._stream_ptr = None
+            self._packet_ptr = parent._ptr
+        else:
+            utils._check_type(parent, bt2_stream._Stream)
+            self._stream_ptr = parent._ptr
+            self._packet_ptr = None
+
+        payload_fc = event_class.payload_field_class
+
+        if payload_fc is not None:
+            for member in payload_fc.values():
+                if not isinstance(
+                    member.field_class, _EVENT_MESSAGE_BUILDER_MEMBER_FIELD_CLASS_TYPES
+                ):
+                    raise ValueError(
+                        "unsupported field class for payload member '{}': {}".format(
+                            member.name, member.field_class.__class__.__name__
+                        )
+                    )
+
+        self._msg_iter = msg_iter
+        self._event_class = event_class
+        self._parent = parent
+        self._has_default_clock_class = (
+            event_class.stream_class.default_clock_class is not None
+        )
+
+    @property
+    def event_class(self):
+        return self._event_class
+
+    @property
+    def parent(self):
+        return self._parent
+
+    # Creates a single event message of which the payload member values
+    # are `values`.
+    def create(self, values, default_clock_snapshot=None):
+        if default_clock_snapshot is not None:
+            default_clock_snapshot = [default_clock_snapshot]
+
+        return self.create_many([values], default_clock_snapshot)[0]
+
+    # Creates one event message for each row of `rows`, in order.
+    #
+    # `default_clock_snapshots` contains one default clock snapshot value
+    # per row if the stream class has a default clock class.
+    def create_many(self, rows, default_clock_snapshots=None):
+        rows = [tuple(row) for row in rows]
+
+        if default_clock_snapshots is not None:
+            if not self._has_default_clock_class:
+                raise ValueError(
+                    'event messages in this stream must not have a default clock snapshot'
+                )
+
+            default_clock_snapshots = list(default_clock_snapshots)
+
+            if len(default_clock_snapshots) != len(rows):
+                raise ValueError(
+                    'expecting {} default clock snapshots, got {}'.format(
+                        len(rows), len(default_clock_snapshots)
+                    )
+                )
+        elif self._has_default_clock_class:
+            raise ValueError(
+                'event messages in this stream must have a default clock snapshot'
+            )
+
+        ptrs = native_bt.bt2_message_event_create_many(
+            self._msg_iter._bt_ptr,
+            self._event_class._ptr,
+            self._stream_ptr,
+            self._packet_ptr,
+            rows,
+            default_clock_snapshots,
+        )
+        return [bt2_message._EventMessage(ptr) for ptr in ptrs]
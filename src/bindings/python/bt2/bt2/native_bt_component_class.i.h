@@ -1311,19 +1311,35 @@ component_class_message_iterator_next(
 
 	BT_ASSERT_DBG(py_message_iter);
 	py_method_result = PyObject_CallMethod(py_message_iter,
-		"_bt_next_from_native", NULL);
+		"_bt_next_from_native", "(K)", (unsigned long long) capacity);
 	if (!py_method_result) {
 		status = py_exc_to_status_message_iterator_clear(message_iterator);
 		goto end;
 	}
 
 	/*
-	 * The returned object, on success, is an integer object
-	 * (PyLong) containing the address of a native message
-	 * object (which is now ours).
+	 * The returned object, on success, is either an integer object
+	 * (PyLong) containing the address of a native message object
+	 * (which is now ours), or a non-empty list of at most
+	 * `capacity` such integer objects.
 	 */
-	msgs[0] = PyLong_AsVoidPtr(py_method_result);
-	*count = 1;
+	if (PyList_Check(py_method_result)) {
+		Py_ssize_t i;
+		Py_ssize_t len = PyList_GET_SIZE(py_method_result);
+
+		BT_ASSERT_DBG(len > 0);
+		BT_ASSERT_DBG((uint64_t) len <= capacity);
+
+		for (i = 0; i < len; i++) {
+			msgs[i] = PyLong_AsVoidPtr(
+				PyList_GET_ITEM(py_method_result, i));
+		}
+
+		*count = (uint64_t) len;
+	} else {
+		msgs[0] = PyLong_AsVoidPtr(py_method_result);
+		*count = 1;
+	}
 
 	/* Overflow errors should never happen. */
 	BT_ASSERT_DBG(!PyErr_Occurred());
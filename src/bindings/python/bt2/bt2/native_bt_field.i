@@ -27,3 +27,14 @@
 
 %include <babeltrace2/trace-ir/field-const.h>
 %include <babeltrace2/trace-ir/field.h>
+
+%{
+#include "native_bt_field.i.h"
+%}
+
+PyObject *bt_bt2_field_extract_scalars(PyObject *py_msg_ptrs,
+		const bt_event_class *event_class, PyObject *py_field_paths,
+		PyObject *py_columns);
+PyObject *bt_bt2_field_array_get_values(const bt_field *field,
+		PyObject *py_buf);
+PyObject *bt_bt2_field_array_set_values(bt_field *field, PyObject *py_buf);
@@ -0,0 +1,736 @@
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2020 EfficiOS, Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+ * THE SOFTWARE.
+ */
+
+
+#include "common/common.h"
+
+/*
+ * Compiled field path of a scalar field to extract: root scope and
+ * indexes of the structure members to follow from the root field.
+ */
+struct scalar_field_path {
+	bt_field_path_scope scope;
+	uint64_t *indexes;
+	uint64_t index_count;
+};
+
+static
+const bt_field *borrow_event_scope_field(const bt_event *event,
+		bt_field_path_scope scope)
+{
+	const bt_field *field = NULL;
+
+	switch (scope) {
+	case BT_FIELD_PATH_SCOPE_PACKET_CONTEXT:
+	{
+		const bt_packet *packet = bt_event_borrow_packet_const(event);
+
+		if (packet) {
+			field = bt_packet_borrow_context_field_const(packet);
+		}
+
+		break;
+	}
+	case BT_FIELD_PATH_SCOPE_EVENT_COMMON_CONTEXT:
+		field = bt_event_borrow_common_context_field_const(event);
+		break;
+	case BT_FIELD_PATH_SCOPE_EVENT_SPECIFIC_CONTEXT:
+		field = bt_event_borrow_specific_context_field_const(event);
+		break;
+	case BT_FIELD_PATH_SCOPE_EVENT_PAYLOAD:
+		field = bt_event_borrow_payload_field_const(event);
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	return field;
+}
+
+/*
+ * Writes the value of the scalar field `field` as the item at index
+ * `index` of the buffer `view`.
+ */
+static
+void write_scalar_field_value(const bt_field *field, Py_buffer *view,
+		uint64_t index)
+{
+	bt_field_class_type type = bt_field_get_class_type(field);
+
+	if (bt_field_class_type_is(type, BT_FIELD_CLASS_TYPE_UNSIGNED_INTEGER)) {
+		BT_ASSERT_DBG(view->itemsize == sizeof(uint64_t));
+		((uint64_t *) view->buf)[index] =
+			bt_field_integer_unsigned_get_value(field);
+	} else if (bt_field_class_type_is(type,
+			BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+		BT_ASSERT_DBG(view->itemsize == sizeof(int64_t));
+		((int64_t *) view->buf)[index] =
+			bt_field_integer_signed_get_value(field);
+	} else if (type == BT_FIELD_CLASS_TYPE_SINGLE_PRECISION_REAL) {
+		BT_ASSERT_DBG(view->itemsize == sizeof(double));
+		((double *) view->buf)[index] =
+			(double) bt_field_real_single_precision_get_value(field);
+	} else if (type == BT_FIELD_CLASS_TYPE_DOUBLE_PRECISION_REAL) {
+		BT_ASSERT_DBG(view->itemsize == sizeof(double));
+		((double *) view->buf)[index] =
+			bt_field_real_double_precision_get_value(field);
+	} else if (type == BT_FIELD_CLASS_TYPE_BOOL) {
+		BT_ASSERT_DBG(view->itemsize == sizeof(uint8_t));
+		((uint8_t *) view->buf)[index] =
+			bt_field_bool_get_value(field) ? 1 : 0;
+	} else if (type == BT_FIELD_CLASS_TYPE_BIT_ARRAY) {
+		BT_ASSERT_DBG(view->itemsize == sizeof(uint64_t));
+		((uint64_t *) view->buf)[index] =
+			bt_field_bit_array_get_value_as_integer(field);
+	} else {
+		bt_common_abort();
+	}
+}
+
+/*
+ * Extracts the values of scalar fields from the event messages of
+ * `py_msg_ptrs` of which the event class is `event_class`.
+ *
+ * `py_msg_ptrs` is a list of message SWIG pointers. Messages which
+ * are not event messages or of which the event class is not
+ * `event_class` are skipped.
+ *
+ * `py_field_paths` is a tuple of field paths. Each field path is a
+ * tuple of which the first item is a root scope (`bt_field_path_scope`)
+ * and the remaining items are the indexes of the structure members to
+ * follow to reach the scalar field. Those field paths must be valid
+ * for `event_class`: this function does not validate them.
+ *
+ * `py_columns` is a tuple of writable buffers (one for each field
+ * path) containing at least as many items as `py_msg_ptrs`. The value
+ * of the field of the Nth extracted event message is written as the
+ * Nth item of the buffer. The item size of a buffer must be 1 for a
+ * boolean field and 8 for any other field.
+ *
+ * Returns the number of extracted event messages, or `NULL` with a
+ * Python exception set on error.
+ */
+static
+PyObject *bt_bt2_field_extract_scalars(PyObject *py_msg_ptrs,
+		const bt_event_class *event_class, PyObject *py_field_paths,
+		PyObject *py_columns)
+{
+	PyObject *py_count = NULL;
+	struct scalar_field_path *field_paths = NULL;
+	Py_buffer *views = NULL;
+	Py_ssize_t msg_count;
+	Py_ssize_t col_count;
+	Py_ssize_t acquired_view_count = 0;
+	Py_ssize_t i;
+	uint64_t count = 0;
+
+	BT_ASSERT(PyList_Check(py_msg_ptrs));
+	BT_ASSERT(PyTuple_Check(py_field_paths));
+	BT_ASSERT(PyTuple_Check(py_columns));
+	msg_count = PyList_GET_SIZE(py_msg_ptrs);
+	col_count = PyTuple_GET_SIZE(py_field_paths);
+	BT_ASSERT(col_count > 0);
+	BT_ASSERT(PyTuple_GET_SIZE(py_columns) == col_count);
+	field_paths = g_new0(struct scalar_field_path, col_count);
+	views = g_new0(Py_buffer, col_count);
+
+	if (!field_paths || !views) {
+		PyErr_NoMemory();
+		goto end;
+	}
+
+	/* Compile field paths and acquire buffers */
+	for (i = 0; i < col_count; i++) {
+		PyObject *py_field_path = PyTuple_GET_ITEM(py_field_paths, i);
+		struct scalar_field_path *field_path = &field_paths[i];
+		Py_ssize_t item_count;
+		Py_ssize_t j;
+
+		BT_ASSERT(PyTuple_Check(py_field_path));
+		item_count = PyTuple_GET_SIZE(py_field_path);
+		BT_ASSERT(item_count >= 2);
+		field_path->scope = (bt_field_path_scope) PyLong_AsLong(
+			PyTuple_GET_ITEM(py_field_path, 0));
+		field_path->index_count = item_count - 1;
+		field_path->indexes = g_new(uint64_t, field_path->index_count);
+		if (!field_path->indexes) {
+			PyErr_NoMemory();
+			goto end;
+		}
+
+		for (j = 1; j < item_count; j++) {
+			field_path->indexes[j - 1] = PyLong_AsUnsignedLongLong(
+				PyTuple_GET_ITEM(py_field_path, j));
+		}
+
+		if (PyErr_Occurred()) {
+			goto end;
+		}
+
+		if (PyObject_GetBuffer(PyTuple_GET_ITEM(py_columns, i),
+				&views[i], PyBUF_WRITABLE) != 0) {
+			goto end;
+		}
+
+		acquired_view_count++;
+
+		if (views[i].len / views[i].itemsize < msg_count) {
+			PyErr_SetString(PyExc_ValueError,
+				"Buffer is too small to contain all the extracted values.");
+			goto end;
+		}
+	}
+
+	/* Extract values */
+	for (i = 0; i < msg_count; i++) {
+		const bt_message *msg;
+		const bt_event *event;
+		Py_ssize_t j;
+		int ret;
+
+		ret = SWIG_ConvertPtr(PyList_GET_ITEM(py_msg_ptrs, i),
+			(void **) &msg, SWIGTYPE_p_bt_message, 0);
+		if (!SWIG_IsOK(ret)) {
+			PyErr_SetString(PyExc_TypeError,
+				"Expecting a message SWIG pointer.");
+			goto end;
+		}
+
+		if (bt_message_get_type(msg) != BT_MESSAGE_TYPE_EVENT) {
+			continue;
+		}
+
+		event = bt_message_event_borrow_event_const(msg);
+		if (bt_event_borrow_class_const(event) != event_class) {
+			continue;
+		}
+
+		for (j = 0; j < col_count; j++) {
+			const struct scalar_field_path *field_path = &field_paths[j];
+			const bt_field *field;
+			uint64_t k;
+
+			field = borrow_event_scope_field(event, field_path->scope);
+			BT_ASSERT_DBG(field);
+
+			for (k = 0; k < field_path->index_count; k++) {
+				field = bt_field_structure_borrow_member_field_by_index_const(
+					field, field_path->indexes[k]);
+				BT_ASSERT_DBG(field);
+			}
+
+			write_scalar_field_value(field, &views[j], count);
+		}
+
+		count++;
+	}
+
+	py_count = PyLong_FromUnsignedLongLong(count);
+
+end:
+	for (i = 0; i < acquired_view_count; i++) {
+		PyBuffer_Release(&views[i]);
+	}
+
+	if (field_paths) {
+		for (i = 0; i < col_count; i++) {
+			g_free(field_paths[i].indexes);
+		}
+	}
+
+	g_free(field_paths);
+	g_free(views);
+	return py_count;
+}
+
+/*
+ * Value of an element of an array field, or of an item of a buffer,
+ * depending on its kind (see buffer_item_kind()).
+ */
+union array_item {
+	int64_t s;
+	uint64_t u;
+	double d;
+};
+
+/*
+ * Returns the kind of the buffer items of which the format (see the
+ * `struct` module) is `code`: `s` (signed integer), `u` (unsigned
+ * integer or boolean), or `d` (real), or 0 if it's not supported.
+ */
+static
+char buffer_item_kind(char code)
+{
+	switch (code) {
+	case 'b':
+	case 'h':
+	case 'i':
+	case 'l':
+	case 'q':
+	case 'n':
+		return 's';
+	case 'B':
+	case 'H':
+	case 'I':
+	case 'L':
+	case 'Q':
+	case 'N':
+	case '?':
+		return 'u';
+	case 'f':
+	case 'd':
+		return 'd';
+	default:
+		return 0;
+	}
+}
+
+static
+char buffer_view_item_code(const Py_buffer *view)
+{
+	const char *format = view->format ? view->format : "B";
+
+	/* Native size and alignment is the default */
+	if (format[0] == '@') {
+		format++;
+	}
+
+	if (format[0] == '\0' || format[1] != '\0') {
+		return 0;
+	}
+
+	return format[0];
+}
+
+static
+union array_item read_buffer_item(const void *buf, char code, Py_ssize_t index)
+{
+	union array_item item;
+
+	switch (code) {
+	case 'b':
+		item.s = ((const signed char *) buf)[index];
+		break;
+	case 'h':
+		item.s = ((const short *) buf)[index];
+		break;
+	case 'i':
+		item.s = ((const int *) buf)[index];
+		break;
+	case 'l':
+		item.s = ((const long *) buf)[index];
+		break;
+	case 'q':
+		item.s = ((const long long *) buf)[index];
+		break;
+	case 'n':
+		item.s = ((const Py_ssize_t *) buf)[index];
+		break;
+	case 'B':
+		item.u = ((const unsigned char *) buf)[index];
+		break;
+	case 'H':
+		item.u = ((const unsigned short *) buf)[index];
+		break;
+	case 'I':
+		item.u = ((const unsigned int *) buf)[index];
+		break;
+	case 'L':
+		item.u = ((const unsigned long *) buf)[index];
+		break;
+	case 'Q':
+		item.u = ((const unsigned long long *) buf)[index];
+		break;
+	case 'N':
+		item.u = ((const size_t *) buf)[index];
+		break;
+	case '?':
+		item.u = ((const bool *) buf)[index];
+		break;
+	case 'f':
+		item.d = ((const float *) buf)[index];
+		break;
+	case 'd':
+		item.d = ((const double *) buf)[index];
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	return item;
+}
+
+static
+void write_buffer_item(void *buf, char code, Py_ssize_t index,
+		union array_item item)
+{
+	switch (code) {
+	case 'b':
+		((signed char *) buf)[index] = (signed char) item.s;
+		break;
+	case 'h':
+		((short *) buf)[index] = (short) item.s;
+		break;
+	case 'i':
+		((int *) buf)[index] = (int) item.s;
+		break;
+	case 'l':
+		((long *) buf)[index] = (long) item.s;
+		break;
+	case 'q':
+		((long long *) buf)[index] = (long long) item.s;
+		break;
+	case 'n':
+		((Py_ssize_t *) buf)[index] = (Py_ssize_t) item.s;
+		break;
+	case 'B':
+		((unsigned char *) buf)[index] = (unsigned char) item.u;
+		break;
+	case 'H':
+		((unsigned short *) buf)[index] = (unsigned short) item.u;
+		break;
+	case 'I':
+		((unsigned int *) buf)[index] = (unsigned int) item.u;
+		break;
+	case 'L':
+		((unsigned long *) buf)[index] = (unsigned long) item.u;
+		break;
+	case 'Q':
+		((unsigned long long *) buf)[index] = (unsigned long long) item.u;
+		break;
+	case 'N':
+		((size_t *) buf)[index] = (size_t) item.u;
+		break;
+	case '?':
+		((bool *) buf)[index] = item.u != 0;
+		break;
+	case 'f':
+		((float *) buf)[index] = (float) item.d;
+		break;
+	case 'd':
+		((double *) buf)[index] = item.d;
+		break;
+	default:
+		bt_common_abort();
+	}
+}
+
+/*
+ * Returns the kind (see buffer_item_kind()) of the element fields of
+ * the array field class `array_fc`, or 0 if they're not boolean, bit
+ * array, integer or real fields.
+ */
+static
+char array_field_class_element_kind(const bt_field_class *array_fc)
+{
+	bt_field_class_type type = bt_field_class_get_type(
+		bt_field_class_array_borrow_element_field_class_const(
+			array_fc));
+
+	if (bt_field_class_type_is(type, BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+		return 's';
+	} else if (bt_field_class_type_is(type,
+				BT_FIELD_CLASS_TYPE_UNSIGNED_INTEGER) ||
+			type == BT_FIELD_CLASS_TYPE_BIT_ARRAY ||
+			type == BT_FIELD_CLASS_TYPE_BOOL) {
+		return 'u';
+	} else if (bt_field_class_type_is(type, BT_FIELD_CLASS_TYPE_REAL)) {
+		return 'd';
+	}
+
+	return 0;
+}
+
+/*
+ * Copies the values of the elements of the array field `field` to the
+ * buffer `py_buf`, which must have the same number of items.
+ *
+ * Returns `None` on success, or `NULL` with a Python exception set on
+ * error.
+ */
+static
+PyObject *bt_bt2_field_array_get_values(const bt_field *field,
+		PyObject *py_buf)
+{
+	PyObject *py_ret = NULL;
+	Py_buffer view;
+	bt_field_class_type elem_type;
+	uint64_t length;
+	uint64_t i;
+	char code;
+
+	if (PyObject_GetBuffer(py_buf, &view,
+			PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | PyBUF_WRITABLE) != 0) {
+		goto end;
+	}
+
+	code = buffer_view_item_code(&view);
+	length = bt_field_array_get_length(field);
+	elem_type = bt_field_class_get_type(
+		bt_field_class_array_borrow_element_field_class_const(
+			bt_field_borrow_class_const(field)));
+
+	if (buffer_item_kind(code) == 0 ||
+			array_field_class_element_kind(
+				bt_field_borrow_class_const(field)) == 0) {
+		PyErr_SetString(PyExc_TypeError,
+			"Unsupported buffer or array element type.");
+		goto release;
+	}
+
+	if ((uint64_t) (view.len / view.itemsize) != length) {
+		PyErr_SetString(PyExc_ValueError,
+			"Buffer and array field lengths don't match.");
+		goto release;
+	}
+
+	for (i = 0; i < length; i++) {
+		const bt_field *elem_field =
+			bt_field_array_borrow_element_field_by_index_const(
+				field, i);
+		union array_item item;
+		char elem_kind;
+
+		if (bt_field_class_type_is(elem_type,
+				BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+			item.s = bt_field_integer_signed_get_value(elem_field);
+			elem_kind = 's';
+		} else if (bt_field_class_type_is(elem_type,
+				BT_FIELD_CLASS_TYPE_UNSIGNED_INTEGER)) {
+			item.u = bt_field_integer_unsigned_get_value(elem_field);
+			elem_kind = 'u';
+		} else if (elem_type == BT_FIELD_CLASS_TYPE_BIT_ARRAY) {
+			item.u = bt_field_bit_array_get_value_as_integer(
+				elem_field);
+			elem_kind = 'u';
+		} else if (elem_type == BT_FIELD_CLASS_TYPE_BOOL) {
+			item.u = bt_field_bool_get_value(elem_field) ? 1 : 0;
+			elem_kind = 'u';
+		} else if (elem_type == BT_FIELD_CLASS_TYPE_SINGLE_PRECISION_REAL) {
+			item.d = bt_field_real_single_precision_get_value(
+				elem_field);
+			elem_kind = 'd';
+		} else {
+			BT_ASSERT_DBG(elem_type ==
+				BT_FIELD_CLASS_TYPE_DOUBLE_PRECISION_REAL);
+			item.d = bt_field_real_double_precision_get_value(
+				elem_field);
+			elem_kind = 'd';
+		}
+
+		/* Convert an integer to a real buffer item if needed */
+		if (buffer_item_kind(code) == 'd' && elem_kind == 's') {
+			item.d = (double) item.s;
+		} else if (buffer_item_kind(code) == 'd' && elem_kind == 'u') {
+			item.d = (double) item.u;
+		}
+
+		write_buffer_item(view.buf, code, (Py_ssize_t) i, item);
+	}
+
+	py_ret = Py_None;
+	Py_INCREF(py_ret);
+
+release:
+	PyBuffer_Release(&view);
+
+end:
+	return py_ret;
+}
+
+/*
+ * Sets the values of the elements of the array field `field` from the
+ * items of the buffer `py_buf`.
+ *
+ * If `field` is a dynamic array field, this function sets its length to
+ * the number of buffer items. Otherwise, the buffer must have as many
+ * items as `field` has elements.
+ *
+ * The buffer items must be integers or booleans for boolean, bit array
+ * and integer element fields, and any supported number for real
+ * element fields. An integer item which is outside the valid range of
+ * an integer element field is an error.
+ *
+ * This function checks all the buffer items before it modifies
+ * `field`: on error, `field` is unchanged.
+ *
+ * Returns `None` on success, or `NULL` with a Python exception set on
+ * error.
+ */
+static
+PyObject *bt_bt2_field_array_set_values(bt_field *field, PyObject *py_buf)
+{
+	PyObject *py_ret = NULL;
+	Py_buffer view;
+	const bt_field_class *elem_fc;
+	bt_field_class_type elem_type;
+	uint64_t length;
+	uint64_t buf_length;
+	uint64_t upper = 0;
+	int64_t lower = 0;
+	uint64_t i;
+	char code;
+	char kind;
+	char elem_kind;
+
+	if (PyObject_GetBuffer(py_buf, &view,
+			PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0) {
+		goto end;
+	}
+
+	code = buffer_view_item_code(&view);
+	kind = buffer_item_kind(code);
+	elem_kind = array_field_class_element_kind(
+		bt_field_borrow_class_const(field));
+	elem_fc = bt_field_class_array_borrow_element_field_class_const(
+		bt_field_borrow_class_const(field));
+	elem_type = bt_field_class_get_type(elem_fc);
+	length = bt_field_array_get_length(field);
+
+	if (kind == 0) {
+		PyErr_Format(PyExc_TypeError,
+			"Unsupported buffer item format '%s'.",
+			view.format ? view.format : "B");
+		goto release;
+	}
+
+	if (elem_kind == 0) {
+		PyErr_SetString(PyExc_TypeError,
+			"Unsupported array element type.");
+		goto release;
+	}
+
+	if (kind == 'd' && elem_kind != 'd') {
+		PyErr_SetString(PyExc_TypeError,
+			"Cannot set integral array elements from real buffer items.");
+		goto release;
+	}
+
+	buf_length = (uint64_t) (view.len / view.itemsize);
+
+	if (!bt_field_class_type_is(bt_field_get_class_type(field),
+			BT_FIELD_CLASS_TYPE_DYNAMIC_ARRAY) &&
+			buf_length != length) {
+		PyErr_Format(PyExc_ValueError,
+			"Buffer and array field lengths don't match: "
+			"buffer-length=%llu, array-field-length=%llu.",
+			(unsigned long long) buf_length,
+			(unsigned long long) length);
+		goto release;
+	}
+
+	if (bt_field_class_type_is(elem_type, BT_FIELD_CLASS_TYPE_INTEGER)) {
+		uint64_t size = bt_field_class_integer_get_field_value_range(
+			elem_fc);
+
+		if (elem_kind == 's') {
+			upper = (UINT64_C(1) << (size - 1)) - 1;
+			lower = -(int64_t) upper - 1;
+		} else {
+			upper = size == 64 ? UINT64_MAX :
+				(UINT64_C(1) << size) - 1;
+		}
+
+		/*
+		 * Check all the buffer items before modifying the field
+		 * so that an error leaves it as is.
+		 */
+		for (i = 0; i < buf_length; i++) {
+			union array_item item = read_buffer_item(view.buf,
+				code, (Py_ssize_t) i);
+
+			if (elem_kind == 's') {
+				if ((kind == 's' && (item.s < lower ||
+						item.s > (int64_t) upper)) ||
+						(kind == 'u' && item.u > upper)) {
+					goto out_of_range;
+				}
+			} else if ((kind == 's' && (item.s < 0 ||
+					(uint64_t) item.s > upper)) ||
+					(kind == 'u' && item.u > upper)) {
+				goto out_of_range;
+			}
+		}
+	}
+
+	if (buf_length != length) {
+		length = buf_length;
+
+		if (bt_field_array_dynamic_set_length(field, length) !=
+				BT_FIELD_DYNAMIC_ARRAY_SET_LENGTH_STATUS_OK) {
+			PyErr_NoMemory();
+			goto release;
+		}
+	}
+
+	for (i = 0; i < length; i++) {
+		bt_field *elem_field =
+			bt_field_array_borrow_element_field_by_index(field, i);
+		union array_item item = read_buffer_item(view.buf, code,
+			(Py_ssize_t) i);
+
+		if (elem_kind == 'd') {
+			if (kind == 's') {
+				item.d = (double) item.s;
+			} else if (kind == 'u') {
+				item.d = (double) item.u;
+			}
+
+			if (elem_type == BT_FIELD_CLASS_TYPE_SINGLE_PRECISION_REAL) {
+				bt_field_real_single_precision_set_value(
+					elem_field, (float) item.d);
+			} else {
+				bt_field_real_double_precision_set_value(
+					elem_field, item.d);
+			}
+		} else if (elem_type == BT_FIELD_CLASS_TYPE_BOOL) {
+			bt_field_bool_set_value(elem_field,
+				item.u != 0 ? BT_TRUE : BT_FALSE);
+		} else if (elem_type == BT_FIELD_CLASS_TYPE_BIT_ARRAY) {
+			bt_field_bit_array_set_value_as_integer(elem_field,
+				item.u);
+		} else if (elem_kind == 's') {
+			bt_field_integer_signed_set_value(elem_field,
+				kind == 's' ? item.s : (int64_t) item.u);
+		} else {
+			bt_field_integer_unsigned_set_value(elem_field,
+				kind == 's' ? (uint64_t) item.s : item.u);
+		}
+	}
+
+	py_ret = Py_None;
+	Py_INCREF(py_ret);
+	goto release;
+
+out_of_range:
+	PyErr_Format(PyExc_ValueError,
+		"Buffer item is outside the valid range of the array element fields: "
+		"index=%llu.", (unsigned long long) i);
+
+release:
+	PyBuffer_Release(&view);
+
+end:
+	return py_ret;
+}
@@ -136,3 +136,11 @@ bt_bt2_graph_add_sink_component(
 		const char *name, const bt_value *params,
 		PyObject *obj, bt_logging_level log_level,
 		const bt_component_sink **component);
+
+bt_graph_add_component_status
+bt_bt2_graph_add_sink_component_with_value_data(
+		bt_graph *graph,
+		const bt_component_class_sink *component_class,
+		const char *name, const bt_value *params,
+		bt_value *data, bt_logging_level log_level,
+		const bt_component_sink **component);
@@ -275,3 +275,21 @@ bt_bt2_graph_add_sink_component(
 		component_class, name, params, obj == Py_None ? NULL : obj,
 		log_level, component);
 }
+
+/*
+ * Adds a (native) sink component, passing a value object as its
+ * initialization method data. The component may fill `data`, for
+ * example with results, which the caller reads afterwards.
+ */
+static
+bt_graph_add_component_status
+bt_bt2_graph_add_sink_component_with_value_data(
+		bt_graph *graph,
+		const bt_component_class_sink *component_class,
+		const char *name, const bt_value *params,
+		bt_value *data, bt_logging_level log_level,
+		const bt_component_sink **component)
+{
+	return bt_graph_add_sink_component_with_initialize_method_data(graph,
+		component_class, name, params, data, log_level, component);
+}
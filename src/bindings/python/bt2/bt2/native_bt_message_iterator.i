@@ -66,3 +66,8 @@ PyObject *bt_bt2_get_user_component_from_user_msg_iter(
 		bt_self_message_iterator *self_message_iterator);
 PyObject *bt_bt2_self_component_port_input_get_msg_range(
 		bt_self_component_port_input_message_iterator *iter);
+PyObject *bt_bt2_message_event_create_many(
+		bt_self_message_iterator *self_msg_iter,
+		const bt_event_class *event_class, const bt_stream *stream,
+		const bt_packet *packet, PyObject *py_rows,
+		PyObject *py_default_clock_snapshots);
@@ -134,3 +134,317 @@ static PyObject *bt_bt2_self_component_port_input_get_msg_range(
 		&messages, &message_count);
 	return get_msg_range_common(status, messages, message_count);
 }
+
+/* Payload member of the event messages which bt_bt2_message_event_create_many() creates */
+struct event_payload_member {
+	bt_field_class_type type;
+
+	/* Valid range of an integer member */
+	int64_t lower;
+	uint64_t upper;
+};
+
+static
+int set_event_payload_member_field(bt_field *field,
+		const struct event_payload_member *member, PyObject *py_value)
+{
+	int ret = 0;
+
+	if (bt_field_class_type_is(member->type,
+			BT_FIELD_CLASS_TYPE_UNSIGNED_INTEGER)) {
+		unsigned long long value;
+
+		if (!PyLong_Check(py_value)) {
+			PyErr_SetString(PyExc_TypeError,
+				"expecting an integral number object");
+			goto error;
+		}
+
+		value = PyLong_AsUnsignedLongLong(py_value);
+		if (PyErr_Occurred() || value > member->upper) {
+			PyErr_Clear();
+			PyErr_Format(PyExc_ValueError,
+				"Value %R is outside valid range [0, %llu]",
+				py_value, (unsigned long long) member->upper);
+			goto error;
+		}
+
+		bt_field_integer_unsigned_set_value(field, value);
+	} else if (bt_field_class_type_is(member->type,
+			BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+		long long value;
+
+		if (!PyLong_Check(py_value)) {
+			PyErr_SetString(PyExc_TypeError,
+				"expecting an integral number object");
+			goto error;
+		}
+
+		value = PyLong_AsLongLong(py_value);
+		if (PyErr_Occurred() || value < member->lower ||
+				value > (long long) member->upper) {
+			PyErr_Clear();
+			PyErr_Format(PyExc_ValueError,
+				"Value %R is outside valid range [%lld, %lld]",
+				py_value, (long long) member->lower,
+				(long long) member->upper);
+			goto error;
+		}
+
+		bt_field_integer_signed_set_value(field, value);
+	} else if (member->type == BT_FIELD_CLASS_TYPE_SINGLE_PRECISION_REAL ||
+			member->type == BT_FIELD_CLASS_TYPE_DOUBLE_PRECISION_REAL) {
+		double value;
+
+		if (!PyFloat_Check(py_value) && !PyLong_Check(py_value)) {
+			PyErr_SetString(PyExc_TypeError,
+				"expecting a real number object");
+			goto error;
+		}
+
+		value = PyFloat_AsDouble(py_value);
+		if (PyErr_Occurred()) {
+			goto error;
+		}
+
+		if (member->type == BT_FIELD_CLASS_TYPE_SINGLE_PRECISION_REAL) {
+			bt_field_real_single_precision_set_value(field,
+				(float) value);
+		} else {
+			bt_field_real_double_precision_set_value(field, value);
+		}
+	} else if (member->type == BT_FIELD_CLASS_TYPE_BOOL) {
+		if (!PyBool_Check(py_value)) {
+			PyErr_Format(PyExc_TypeError,
+				"'%s' object is not a 'bool' object",
+				Py_TYPE(py_value)->tp_name);
+			goto error;
+		}
+
+		bt_field_bool_set_value(field,
+			py_value == Py_True ? BT_TRUE : BT_FALSE);
+	} else if (member->type == BT_FIELD_CLASS_TYPE_BIT_ARRAY) {
+		unsigned long long value;
+
+		if (!PyLong_Check(py_value)) {
+			PyErr_SetString(PyExc_TypeError,
+				"expecting an integral number object");
+			goto error;
+		}
+
+		value = PyLong_AsUnsignedLongLong(py_value);
+		if (PyErr_Occurred()) {
+			goto error;
+		}
+
+		bt_field_bit_array_set_value_as_integer(field, value);
+	} else if (member->type == BT_FIELD_CLASS_TYPE_STRING) {
+		const char *value;
+
+		if (!PyUnicode_Check(py_value)) {
+			PyErr_Format(PyExc_TypeError,
+				"'%s' is not a 'str' object",
+				Py_TYPE(py_value)->tp_name);
+			goto error;
+		}
+
+		value = PyUnicode_AsUTF8(py_value);
+		if (!value) {
+			goto error;
+		}
+
+		if (bt_field_string_set_value(field, value) !=
+				BT_FIELD_STRING_SET_VALUE_STATUS_OK) {
+			PyErr_NoMemory();
+			goto error;
+		}
+	} else {
+		bt_common_abort();
+	}
+
+	goto end;
+
+error:
+	ret = -1;
+
+end:
+	return ret;
+}
+
+/*
+ * Creates one event message of the event class `event_class`, within
+ * `packet` if it's not `NULL`, or within `stream` otherwise, for each
+ * row of `py_rows`, a list of tuples.
+ *
+ * The values of a row are the values of the payload structure field
+ * members, in order. The payload structure field class of
+ * `event_class` must only contain boolean, bit array, integer
+ * (including enumeration), real and string field classes.
+ *
+ * `py_default_clock_snapshots` is either `None` or a list of default
+ * clock snapshot values having the length of `py_rows`.
+ *
+ * Returns a list of new message references (SWIG pointers) on success,
+ * or `NULL` with a Python exception set on error.
+ */
+static
+PyObject *bt_bt2_message_event_create_many(
+		bt_self_message_iterator *self_msg_iter,
+		const bt_event_class *event_class, const bt_stream *stream,
+		const bt_packet *packet, PyObject *py_rows,
+		PyObject *py_default_clock_snapshots)
+{
+	PyObject *py_msgs = NULL;
+	struct event_payload_member *members = NULL;
+	const bt_field_class *payload_fc;
+	uint64_t member_count = 0;
+	Py_ssize_t row_count;
+	Py_ssize_t i;
+
+	BT_ASSERT(PyList_Check(py_rows));
+	BT_ASSERT(py_default_clock_snapshots == Py_None ||
+		(PyList_Check(py_default_clock_snapshots) &&
+		 PyList_GET_SIZE(py_default_clock_snapshots) ==
+			PyList_GET_SIZE(py_rows)));
+	payload_fc = bt_event_class_borrow_payload_field_class_const(
+		event_class);
+	if (payload_fc) {
+		uint64_t j;
+
+		member_count = bt_field_class_structure_get_member_count(
+			payload_fc);
+
+		/* One more so as to never allocate zero members */
+		members = g_new0(struct event_payload_member, member_count + 1);
+		if (!members) {
+			PyErr_NoMemory();
+			goto error;
+		}
+
+		for (j = 0; j < member_count; j++) {
+			const bt_field_class *member_fc =
+				bt_field_class_structure_member_borrow_field_class_const(
+					bt_field_class_structure_borrow_member_by_index_const(
+						payload_fc, j));
+			struct event_payload_member *member = &members[j];
+
+			member->type = bt_field_class_get_type(member_fc);
+
+			if (bt_field_class_type_is(member->type,
+					BT_FIELD_CLASS_TYPE_INTEGER)) {
+				uint64_t size =
+					bt_field_class_integer_get_field_value_range(
+						member_fc);
+
+				if (bt_field_class_type_is(member->type,
+						BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+					member->upper = (UINT64_C(1) << (size - 1)) - 1;
+					member->lower = -(int64_t) member->upper - 1;
+				} else {
+					member->upper = size == 64 ? UINT64_MAX :
+						(UINT64_C(1) << size) - 1;
+				}
+			}
+		}
+	}
+
+	row_count = PyList_GET_SIZE(py_rows);
+	py_msgs = PyList_New(row_count);
+	if (!py_msgs) {
+		goto error;
+	}
+
+	for (i = 0; i < row_count; i++) {
+		PyObject *py_row = PyList_GET_ITEM(py_rows, i);
+		PyObject *py_msg;
+		bt_message *msg;
+		uint64_t j;
+
+		BT_ASSERT_DBG(PyTuple_Check(py_row));
+
+		if ((uint64_t) PyTuple_GET_SIZE(py_row) != member_count) {
+			PyErr_Format(PyExc_ValueError,
+				"expecting %llu values, got %zd",
+				(unsigned long long) member_count,
+				PyTuple_GET_SIZE(py_row));
+			goto error;
+		}
+
+		if (py_default_clock_snapshots != Py_None) {
+			unsigned long long cs = PyLong_AsUnsignedLongLong(
+				PyList_GET_ITEM(py_default_clock_snapshots, i));
+
+			if (PyErr_Occurred()) {
+				goto error;
+			}
+
+			msg = packet ?
+				bt_message_event_create_with_packet_and_default_clock_snapshot(
+					self_msg_iter, event_class, packet, cs) :
+				bt_message_event_create_with_default_clock_snapshot(
+					self_msg_iter, event_class, stream, cs);
+		} else {
+			msg = packet ?
+				bt_message_event_create_with_packet(
+					self_msg_iter, event_class, packet) :
+				bt_message_event_create(
+					self_msg_iter, event_class, stream);
+		}
+
+		if (!msg) {
+			PyErr_NoMemory();
+			goto error;
+		}
+
+		py_msg = SWIG_NewPointerObj(SWIG_as_voidptr(msg),
+			SWIGTYPE_p_bt_message, 0);
+		if (!py_msg) {
+			bt_message_put_ref(msg);
+			goto error;
+		}
+
+		/* The list owns the message reference from now on */
+		PyList_SET_ITEM(py_msgs, i, py_msg);
+
+		if (member_count > 0) {
+			bt_field *payload_field = bt_event_borrow_payload_field(
+				bt_message_event_borrow_event(msg));
+
+			for (j = 0; j < member_count; j++) {
+				if (set_event_payload_member_field(
+						bt_field_structure_borrow_member_field_by_index(
+							payload_field, j),
+						&members[j],
+						PyTuple_GET_ITEM(py_row, j))) {
+					goto error;
+				}
+			}
+		}
+	}
+
+	goto end;
+
+error:
+	if (py_msgs) {
+		/* Put the messages created so far */
+		for (i = 0; i < PyList_GET_SIZE(py_msgs); i++) {
+			PyObject *py_msg = PyList_GET_ITEM(py_msgs, i);
+			bt_message *msg;
+
+			if (!py_msg) {
+				break;
+			}
+
+			if (SWIG_IsOK(SWIG_ConvertPtr(py_msg, (void **) &msg,
+					SWIGTYPE_p_bt_message, 0))) {
+				bt_message_put_ref(msg);
+			}
+		}
+
+		Py_CLEAR(py_msgs);
+	}
+
+end:
+	g_free(members);
+	return py_msgs;
+}
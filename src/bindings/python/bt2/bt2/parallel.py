@@ -0,0 +1,706 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 EfficiOS, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+from bt2 import utils
+from bt2 import clock_snapshot as bt2_clock_snapshot
+from bt2 import message as bt2_message
+from bt2 import query_executor as bt2_query_executor
+from bt2 import trace_collection_message_iterator as bt2_tcmi
+from bt2 import value as bt2_value
+import bt2
+import collections.abc
+import fractions
+import functools
+import heapq
+import multiprocessing
+import os
+import traceback
+
+
+# Convert a value object to the equivalent Python object so that it
+# can be sent to another process.
+def _value_to_py(value):
+    if value is None:
+        return
+
+    if isinstance(value, bt2_value._BoolValueConst):
+        return bool(value)
+    elif isinstance(value, bt2_value._IntegerValueConst):
+        return int(value)
+    elif isinstance(value, bt2_value._RealValueConst):
+        return float(value)
+    elif isinstance(value, bt2_value._StringValueConst):
+        return str(value)
+    elif isinstance(value, bt2_value._ArrayValueConst):
+        return [_value_to_py(elem) for elem in value]
+    else:
+        assert isinstance(value, bt2_value._MapValueConst)
+        return {str(k): _value_to_py(v) for k, v in value.items()}
+
+
+# Picklable description of an automatic source component specification.
+_AutoSourceDescr = collections.namedtuple(
+    '_AutoSourceDescr', ['input', 'params', 'has_obj', 'obj', 'logging_level']
+)
+
+
+def _auto_source_descr_from_input(input):
+    if type(input) is str:
+        return _AutoSourceDescr(input, None, False, None, None)
+
+    if type(input) is not bt2_tcmi.AutoSourceComponentSpec:
+        raise TypeError(
+            '"{}" object is not a string or an AutoSourceComponentSpec'.format(
+                type(input)
+            )
+        )
+
+    has_obj = input.obj is not bt2_tcmi.AutoSourceComponentSpec._no_obj
+    return _AutoSourceDescr(
+        input.input,
+        _value_to_py(input.params),
+        has_obj,
+        input.obj if has_obj else None,
+        input.logging_level,
+    )
+
+
+def _auto_source_comp_spec_from_descr(descr):
+    kwargs = {'params': descr.params, 'logging_level': descr.logging_level}
+
+    if descr.has_obj:
+        kwargs['obj'] = descr.obj
+
+    return bt2_tcmi.AutoSourceComponentSpec(descr.input, **kwargs)
+
+
+# Picklable description of a source component which the automatic
+# source discovery mechanism found.
+_SourceComponentDescr = collections.namedtuple(
+    '_SourceComponentDescr',
+    ['plugin_name', 'class_name', 'params', 'obj', 'logging_level'],
+)
+
+
+# Return the descriptions of the source components which the automatic
+# source discovery mechanism finds for the inputs described by `descrs`.
+def _discover_source_component_descrs(descrs):
+    specs = [_auto_source_comp_spec_from_descr(descr) for descr in descrs]
+    return [
+        _SourceComponentDescr(
+            comp.plugin_name,
+            comp.class_name,
+            _value_to_py(comp.params),
+            comp.obj,
+            comp.logging_level,
+        )
+        for comp in bt2_tcmi._auto_discover_source_components(specs, None)
+    ]
+
+
+def _comp_spec_from_descr(descr):
+    return bt2_tcmi.ComponentSpec.from_named_plugin_and_component_class(
+        descr.plugin_name,
+        descr.class_name,
+        params=descr.params,
+        obj=descr.obj,
+        logging_level=descr.logging_level,
+    )
+
+
+# Return the time of a message, in nanoseconds from origin, or `None`
+# if it has no known time.
+def _msg_ns_from_origin(msg):
+    try:
+        if isinstance(msg, bt2_message._DiscardedMessageConst):
+            cs = msg.beginning_default_clock_snapshot
+        else:
+            cs = msg.default_clock_snapshot
+    except ValueError:
+        # no default clock class or no default clock snapshots
+        return
+
+    if type(cs) is bt2_clock_snapshot._UnknownClockSnapshot:
+        return
+
+    return cs.ns_from_origin
+
+
+_MIN_NS_FROM_ORIGIN = -(2 ** 63)
+
+
+# The muxing key functions below return sort keys which order messages
+# having the same time exactly like common_muxing_compare_messages()
+# (`src/plugins/common/muxing/muxing.c`), which `flt.utils.muxer` uses
+# to break ties.
+def _present_first_key(value):
+    if value is None:
+        return (1,)
+
+    return (0, value)
+
+
+def _absent_first_key(value):
+    if value is None:
+        return (0,)
+
+    return (1, value)
+
+
+def _uuid_key(uuid):
+    if uuid is None:
+        return (1,)
+
+    return (0, uuid.bytes)
+
+
+# Weights of the message types: when two messages having the same time
+# belong to the same stream, the one having the greatest weight comes
+# first.
+_MSG_TYPE_WEIGHTS = {
+    bt2_message._StreamBeginningMessageConst: 7,
+    bt2_message._PacketBeginningMessageConst: 6,
+    bt2_message._EventMessageConst: 5,
+    bt2_message._DiscardedEventsMessageConst: 4,
+    bt2_message._PacketEndMessageConst: 3,
+    bt2_message._MessageIteratorInactivityMessageConst: 2,
+    bt2_message._DiscardedPacketsMessageConst: 1,
+    bt2_message._StreamEndMessageConst: 0,
+}
+
+# Trace UUID, trace name, stream class ID, and stream ID parts of the
+# muxing key of a message which has no stream: such a message comes
+# after any message having a stream.
+_NO_STREAM_MUXING_KEY_PREFIX = ((2,), (2,), (1,), (1,))
+
+
+# Return the muxing key prefix (trace UUID, trace name, stream class ID,
+# and stream ID) of the messages of `stream`, and the muxing key part
+# which compares `stream` to another stream having the same IDs.
+def _stream_muxing_key_parts(stream):
+    trace = stream.trace
+    stream_class = stream.cls
+    prefix = (
+        _uuid_key(trace.uuid),
+        _present_first_key(trace.name),
+        (0, stream_class.id),
+        (0, stream.id),
+    )
+    stream_key = (
+        _absent_first_key(stream.name),
+        _absent_first_key(stream_class.name),
+        stream_class.assigns_automatic_event_class_id,
+        stream_class.assigns_automatic_stream_id,
+        stream_class.supports_discarded_events,
+        stream_class.discarded_events_have_default_clock_snapshots,
+        stream_class.supports_packets,
+    )
+
+    if stream_class.supports_packets:
+        stream_key += (
+            stream_class.packets_have_beginning_default_clock_snapshot,
+            stream_class.packets_have_end_default_clock_snapshot,
+            stream_class.supports_discarded_packets,
+            stream_class.discarded_packets_have_default_clock_snapshots,
+        )
+
+    return prefix, stream_key
+
+
+def _event_class_muxing_key(event_class):
+    return (
+        event_class.id,
+        _absent_first_key(event_class.name),
+        _present_first_key(event_class.log_level),
+        _absent_first_key(event_class.emf_uri),
+    )
+
+
+def _clock_snapshot_muxing_key(cs):
+    clock_class = cs.clock_class
+    return (
+        cs.value,
+        _uuid_key(clock_class.uuid),
+        _present_first_key(clock_class.name),
+        -clock_class.frequency,
+        -clock_class.precision,
+    )
+
+
+# Maker of the muxing keys of the messages of a message iterator.
+#
+# It caches the muxing key parts of the streams and event classes of
+# the messages, forgetting the ones of a stream when it gets its stream
+# end message.
+class _MuxingKeyMaker:
+    def __init__(self):
+        # stream address -> (prefix, stream key, event class keys)
+        self._stream_parts = {}
+
+    def _get_stream_parts(self, stream):
+        addr = stream.addr
+        parts = self._stream_parts.get(addr)
+
+        if parts is None:
+            prefix, stream_key = _stream_muxing_key_parts(stream)
+            parts = (prefix, stream_key, {})
+            self._stream_parts[addr] = parts
+
+        return parts
+
+    def key(self, msg):
+        msg_type = type(msg)
+        neg_weight = -_MSG_TYPE_WEIGHTS[msg_type]
+
+        if msg_type is bt2_message._EventMessageConst:
+            event = msg.event
+            prefix, stream_key, event_class_keys = self._get_stream_parts(event.stream)
+            event_class = event.cls
+            event_class_key = event_class_keys.get(event_class.addr)
+
+            if event_class_key is None:
+                event_class_key = _event_class_muxing_key(event_class)
+                event_class_keys[event_class.addr] = event_class_key
+
+            return prefix + (neg_weight, event_class_key, stream_key)
+
+        if msg_type is bt2_message._MessageIteratorInactivityMessageConst:
+            return _NO_STREAM_MUXING_KEY_PREFIX + (
+                neg_weight,
+                _clock_snapshot_muxing_key(msg.default_clock_snapshot),
+            )
+
+        if msg_type in (
+            bt2_message._PacketBeginningMessageConst,
+            bt2_message._PacketEndMessageConst,
+        ):
+            stream = msg.packet.stream
+        else:
+            stream = msg.stream
+
+        prefix, stream_key, _ = self._get_stream_parts(stream)
+        key = prefix + (neg_weight, stream_key)
+
+        if msg_type is bt2_message._DiscardedEventsMessageConst:
+            have_cs = stream.cls.discarded_events_have_default_clock_snapshots
+        elif msg_type is bt2_message._DiscardedPacketsMessageConst:
+            have_cs = stream.cls.discarded_packets_have_default_clock_snapshots
+        else:
+            if msg_type is bt2_message._StreamEndMessageConst:
+                del self._stream_parts[stream.addr]
+
+            return key
+
+        if have_cs:
+            key += (
+                _clock_snapshot_muxing_key(msg.beginning_default_clock_snapshot),
+                _clock_snapshot_muxing_key(msg.end_default_clock_snapshot),
+            )
+
+        return key + (_present_first_key(msg.count),)
+
+
+# Entry point of a worker process of `ParallelTraceCollectionIterator`.
+#
+# Iterates the messages of a trace collection message iterator built
+# from the source components described by `comp_descrs` and puts
+# `(ns, key, seq, record)` tuples in chunks of `chunk_size` in `queue`,
+# where `record` is the result of `fn(msg)`, `ns` is the time of the
+# message, `key` is its muxing key (see `_MuxingKeyMaker`), and `seq` is
+# the message's index.
+#
+# The time of a message without a time is the one of the last message
+# having a time: this is the time which `flt.utils.muxer` uses for such
+# a message, as it always returns it before any message having a
+# greater time.
+#
+# When `fn(msg)` returns `None`, the worker usually doesn't send
+# anything for `msg`. However, if `msg` would come after the next
+# message when comparing their times and muxing keys, then `msg` holds
+# back the next message during the merge: in this case, the worker
+# sends a `(ns, key, seq, None)` tuple for `msg` so that the merge
+# yields the records in the same order as if it had all the messages.
+def _parallel_trace_collection_worker(
+    queue, comp_descrs, fn, begin, end, stream_intersection_mode, chunk_size
+):
+    try:
+        specs = [_comp_spec_from_descr(descr) for descr in comp_descrs]
+        msg_iter = bt2_tcmi.TraceCollectionMessageIterator(
+            specs,
+            stream_intersection_mode=stream_intersection_mode,
+            begin=begin,
+            end=end,
+        )
+        key_maker = _MuxingKeyMaker()
+        last_ns = _MIN_NS_FROM_ORIGIN
+        seq = 0
+        chunk = []
+
+        # entry of the last message for which `fn` returned `None`, if
+        # it's not decided yet whether or not to send it
+        dropped_entry = None
+
+        for msgs in msg_iter.iter_batches():
+            for msg in msgs:
+                ns = _msg_ns_from_origin(msg)
+
+                if ns is not None:
+                    last_ns = ns
+
+                key = key_maker.key(msg)
+
+                if dropped_entry is not None:
+                    if (dropped_entry[0], dropped_entry[1]) > (last_ns, key):
+                        chunk.append(dropped_entry)
+
+                    dropped_entry = None
+
+                record = fn(msg)
+
+                if record is None:
+                    dropped_entry = (last_ns, key, seq, None)
+                else:
+                    chunk.append((last_ns, key, seq, record))
+
+                seq += 1
+
+                if len(chunk) >= chunk_size:
+                    queue.put(('chunk', chunk))
+                    chunk = []
+
+        if len(chunk) > 0:
+            queue.put(('chunk', chunk))
+
+        queue.put(('end', None))
+    except Exception:
+        queue.put(('error', traceback.format_exc()))
+
+
+# Iterator of records created from the messages of a trace collection,
+# decoding the traces in parallel in worker processes.
+#
+# `inputs` is a list of inputs (strings or `AutoSourceComponentSpec`
+# objects). This iterator finds their source components with the
+# automatic source discovery mechanism (for example, one component per
+# trace of a directory containing many traces) and distributes those
+# components among `jobs` worker processes (the number of processors by
+# default). Each worker process iterates the messages of its own
+# `TraceCollectionMessageIterator`, calls `fn(msg)` for each message,
+# and sends back, in chunks of `chunk_size`, the results which are not
+# `None`, with the message time and muxing key. This iterator merges
+# the record sequences of all the workers and yields the records in
+# the exact order in which `TraceCollectionMessageIterator` would yield
+# the messages, as `flt.utils.muxer` breaks ties between messages having
+# the same time by comparing their properties (trace, stream, message
+# type, and so on), not by their origin.
+#
+# Messages cannot cross process boundaries: `fn` must be a picklable
+# callable (for example, a module-level function) returning picklable
+# objects. Each worker uses the default plugin set.
+class ParallelTraceCollectionIterator(collections.abc.Iterator):
+    def __init__(
+        self,
+        inputs,
+        fn,
+        jobs=None,
+        stream_intersection_mode=False,
+        begin=None,
+        end=None,
+        chunk_size=4096,
+        mp_context=None,
+    ):
+        if not callable(fn):
+            raise TypeError("'fn' parameter is not callable")
+
+        utils._check_bool(stream_intersection_mode)
+
+        # validate `begin` and `end` early
+        bt2_tcmi._get_ns(begin)
+        bt2_tcmi._get_ns(end)
+
+        if type(inputs) in (str, bt2_tcmi.AutoSourceComponentSpec):
+            inputs = [inputs]
+
+        descrs = [_auto_source_descr_from_input(input) for input in inputs]
+
+        if len(descrs) == 0:
+            raise ValueError('expecting at least one input')
+
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+
+        utils._check_uint64(jobs)
+
+        if jobs == 0:
+            raise ValueError('number of jobs must be greater than 0')
+
+        utils._check_uint64(chunk_size)
+
+        if chunk_size == 0:
+            raise ValueError('chunk size must be greater than 0')
+
+        comp_descrs = _discover_source_component_descrs(descrs)
+
+        if mp_context is None:
+            # Forking a process which already uses the library (loaded
+            # plugins, threads) is not safe.
+            mp_context = multiprocessing.get_context('spawn')
+
+        worker_count = min(jobs, len(comp_descrs))
+        self._queues = []
+        self._processes = []
+
+        for index in range(worker_count):
+            # bounded queue: a worker cannot get too far ahead of the
+            # merge
+            queue = mp_context.Queue(maxsize=8)
+            process = mp_context.Process(
+                target=_parallel_trace_collection_worker,
+                args=(
+                    queue,
+                    comp_descrs[index::worker_count],
+                    fn,
+                    begin,
+                    end,
+                    stream_intersection_mode,
+                    chunk_size,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._queues.append(queue)
+            self._processes.append(process)
+
+        merged_entries = heapq.merge(
+            *[self._worker_entries(index) for index in range(worker_count)]
+        )
+        self._records = (entry[4] for entry in merged_entries if entry[4] is not None)
+
+    # Yields `(ns, key, index, seq, record)` tuples: when the times and
+    # muxing keys of two entries are equal, the entry of the worker
+    # having the lowest index comes first (`flt.utils.muxer` cannot
+    # deterministically order such messages either).
+    def _worker_entries(self, index):
+        queue = self._queues[index]
+
+        while True:
+            kind, payload = queue.get()
+
+            if kind == 'chunk':
+                for ns, key, seq, record in payload:
+                    yield ns, key, index, seq, record
+            elif kind == 'error':
+                raise RuntimeError(
+                    'worker process #{} failed:\n{}'.format(index, payload)
+                )
+            else:
+                assert kind == 'end'
+                return
+
+    def __next__(self):
+        try:
+            return next(self._records)
+        except Exception:
+            # end of iteration or worker failure: stop all the workers
+            self.close()
+            raise
+
+    def close(self):
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+
+            process.join()
+
+        for queue in self._queues:
+            queue.close()
+
+        self._processes = []
+        self._queues = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+# Return the `(begin, end)` time range, in nanoseconds from origin,
+# covering all the streams of the source components which the inputs
+# described by `descrs` produce.
+#
+# Return `(None, None)` if there's no stream or if a source component
+# class doesn't support the `babeltrace.trace-infos` query: the time
+# range of its streams is unknown then.
+def _trace_collection_range_ns(descrs):
+    specs = [_auto_source_comp_spec_from_descr(descr) for descr in descrs]
+    comp_specs = bt2_tcmi._auto_discover_source_component_specs(specs, None)
+    begin_ns = None
+    end_ns = None
+
+    for comp_spec in comp_specs:
+        query_exec = bt2_query_executor.QueryExecutor(
+            comp_spec.component_class, 'babeltrace.trace-infos', comp_spec.params
+        )
+
+        try:
+            trace_infos = query_exec.query()
+        except bt2.UnknownObject:
+            return None, None
+
+        for trace_info in trace_infos:
+            for stream_info in trace_info['stream-infos']:
+                stream_begin_ns = int(stream_info['range-ns']['begin'])
+                stream_end_ns = int(stream_info['range-ns']['end'])
+
+                if begin_ns is None or stream_begin_ns < begin_ns:
+                    begin_ns = stream_begin_ns
+
+                if end_ns is None or stream_end_ns > end_ns:
+                    end_ns = stream_end_ns
+
+    return begin_ns, end_ns
+
+
+# Split the time range [`begin_ns`, `end_ns`] into at most `count`
+# contiguous and non-overlapping ranges of (almost) equal lengths.
+def _split_range_ns(begin_ns, end_ns, count):
+    length = end_ns - begin_ns + 1
+    count = min(count, length)
+    ranges = []
+
+    for index in range(count):
+        shard_begin_ns = begin_ns + length * index // count
+        shard_end_ns = begin_ns + length * (index + 1) // count - 1
+        ranges.append((shard_begin_ns, shard_end_ns))
+
+    return ranges
+
+
+def _ns_to_exact_s(ns):
+    if ns is None:
+        return
+
+    return fractions.Fraction(ns, 1000000000)
+
+
+# Entry point of a worker process of parallel_map(): return the result
+# of `fn()` called with a trace collection message iterator, built from
+# `descrs`, which only yields the messages of the time range
+# [`begin_ns`, `end_ns`].
+def _parallel_map_worker(descrs, fn, begin_ns, end_ns):
+    specs = [_auto_source_comp_spec_from_descr(descr) for descr in descrs]
+    msg_iter = bt2_tcmi.TraceCollectionMessageIterator(
+        specs, begin=_ns_to_exact_s(begin_ns), end=_ns_to_exact_s(end_ns)
+    )
+    return fn(msg_iter)
+
+
+# Map/reduce over the time range of a trace collection.
+#
+# This function splits the time range of the trace collection made of
+# `inputs` (strings or `AutoSourceComponentSpec` objects), as found with
+# the `babeltrace.trace-infos` query, into `shards` contiguous time
+# ranges (the number of processors by default). Then, for each time
+# range, it calls `fn()` in a worker process with a
+# `TraceCollectionMessageIterator` which only yields the messages of
+# this time range (using the random access capability of the source
+# components, through `flt.utils.trimmer`). At most `jobs` worker
+# processes (the number of shards by default) run at the same time.
+#
+# If a source component class doesn't support the
+# `babeltrace.trace-infos` query, this function calls `fn()` once, in a
+# single worker process, with a message iterator which yields all the
+# messages of the trace collection.
+#
+# `fn` and `reducer` must be picklable callables (for example,
+# module-level functions) and the results of `fn` must be picklable.
+#
+# Without `reducer`, this function returns the list of the results of
+# `fn`, in time order. Otherwise, it returns the result of reducing this
+# list with `reducer` (see functools.reduce()).
+#
+# As a trimmer emits the stream beginning/end and packet beginning/end
+# messages required to make its output valid, `fn` can receive such
+# messages in more than one shard; time-stamped messages such as event
+# messages, however, belong to a single shard.
+def parallel_map(inputs, fn, reducer=None, shards=None, jobs=None, mp_context=None):
+    if not callable(fn):
+        raise TypeError("'fn' parameter is not callable")
+
+    if reducer is not None and not callable(reducer):
+        raise TypeError("'reducer' parameter is not callable")
+
+    if type(inputs) in (str, bt2_tcmi.AutoSourceComponentSpec):
+        inputs = [inputs]
+
+    descrs = [_auto_source_descr_from_input(input) for input in inputs]
+
+    if len(descrs) == 0:
+        raise ValueError('expecting at least one input')
+
+    if shards is None:
+        shards = os.cpu_count() or 1
+
+    utils._check_uint64(shards)
+
+    if shards == 0:
+        raise ValueError('number of shards must be greater than 0')
+
+    if jobs is not None:
+        utils._check_uint64(jobs)
+
+        if jobs == 0:
+            raise ValueError('number of jobs must be greater than 0')
+
+    begin_ns, end_ns = _trace_collection_range_ns(descrs)
+
+    if begin_ns is None:
+        # no streams or unknown time range: a single shard covering
+        # everything
+        ranges = [(None, None)]
+    else:
+        ranges = _split_range_ns(begin_ns, end_ns, shards)
+
+    if mp_context is None:
+        # Forking a process which already uses the library (loaded
+        # plugins, threads) is not safe.
+        mp_context = multiprocessing.get_context('spawn')
+
+    if jobs is None:
+        jobs = len(ranges)
+
+    with mp_context.Pool(min(jobs, len(ranges))) as pool:
+        results = pool.starmap(
+            _parallel_map_worker,
+            [
+                (descrs, fn, shard_begin_ns, shard_end_ns)
+                for shard_begin_ns, shard_end_ns in ranges
+            ],
+            chunksize=1,
+        )
+
+    if reducer is None:
+        return results
+
+    return functools.reduce(reducer, results)
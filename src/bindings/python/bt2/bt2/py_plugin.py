@@ -20,14 +20,49 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-from bt2 import utils
+from bt2 import native_bt, utils
 from bt2 import component as bt2_component
 import sys
+import bt2
 
 
 # Python plugin path to `_PluginInfo` (cache)
 _plugin_infos = {}
 
+# Python plugin path to loaded module (cache)
+_plugin_modules = {}
+
+# Name of the top-level variable of a plugin module which declares its
+# plugin without having to execute the module.
+#
+# Its value must be a literal dictionary:
+#
+#     bt_plugin_manifest = {
+#         'name': 'my_plugin',
+#         'description': 'My plugin.',            # optional
+#         'author': 'Me',                         # optional
+#         'license': 'MIT',                       # optional
+#         'version': (1, 2, 3),                   # optional
+#         'component_classes': [
+#             {
+#                 'type': 'source',               # or 'filter', 'sink'
+#                 'name': 'MySource',
+#                 'description': 'My source.',    # optional
+#                 'help': 'Long help text.',      # optional
+#
+#                 # optional: querying any other object raises
+#                 # `bt2.UnknownObject`; if missing, any object
+#                 'query_objects': ['some-object'],
+#             },
+#         ],
+#     }
+#
+# The plugin module is only imported when a component of one of those
+# classes is created or when one of them is queried. Then its decorated
+# user component classes (see plugin_component_class()) must have the
+# declared types and names; bt2.register_plugin() is not needed.
+_PLUGIN_MANIFEST_ATTR_NAME = 'bt_plugin_manifest'
+
 
 def plugin_component_class(component_class):
     if not issubclass(component_class, bt2_component._UserComponent):
@@ -103,19 +138,95 @@ class _PluginInfo:
         self.comp_class_addrs = None
 
 
-# called by the BT plugin system
-def _try_load_plugin_module(path):
-    if path in _plugin_infos:
-        # do not load module and create plugin info twice for this path
-        return _plugin_infos[path]
+_COMP_CLS_BASES = {
+    'source': bt2_component._UserSourceComponent,
+    'filter': bt2_component._UserFilterComponent,
+    'sink': bt2_component._UserSinkComponent,
+}
+
+_NATIVE_COMP_CLS_CREATE_FUNCS = {
+    'source': native_bt.bt2_component_class_source_create,
+    'filter': native_bt.bt2_component_class_filter_create,
+    'sink': native_bt.bt2_component_class_sink_create,
+}
+
+
+# Stand-in for a user component class which the manifest of a plugin
+# declares.
+#
+# The native component class calls the methods of this object instead of
+# the ones of a user component class. Those methods import the plugin
+# module, if not already done, and forward the call to the actual user
+# component class.
+class _LazyUserComponentClass:
+    def __init__(self, path, comp_cls_type, name, description, help, query_objects):
+        self._path = path
+        self._comp_cls_type = comp_cls_type
+        self._name = name
+        self._query_objects = query_objects
+        self._user_comp_cls = None
+        cc_ptr = _NATIVE_COMP_CLS_CREATE_FUNCS[comp_cls_type](
+            self, name, description, help
+        )
+
+        if cc_ptr is None:
+            raise bt2._MemoryError("cannot create component class '{}'".format(name))
+
+        self._bt_cc_ptr = cc_ptr
+
+    @property
+    def addr(self):
+        return int(self._bt_cc_ptr)
+
+    def _get_user_comp_cls(self):
+        if self._user_comp_cls is not None:
+            return self._user_comp_cls
+
+        mod = _load_plugin_module(self._path)
+        base = _COMP_CLS_BASES[self._comp_cls_type]
+
+        for comp_cls in _get_user_comp_classes(mod):
+            if issubclass(comp_cls, base) and comp_cls.name == self._name:
+                self._user_comp_cls = comp_cls
+                return comp_cls
+
+        raise RuntimeError(
+            "cannot find {} component class '{}', which the plugin manifest declares, in module '{}'".format(
+                self._comp_cls_type, self._name, self._path
+            )
+        )
+
+    def _bt_init_from_native(self, comp_ptr, params_ptr, obj):
+        # this can raise, but the native side checks the exception
+        return self._get_user_comp_cls()._bt_init_from_native(comp_ptr, params_ptr, obj)
+
+    def _bt_get_supported_mip_versions_from_native(self, params_ptr, obj, log_level):
+        # this can raise, but the native side checks the exception
+        return self._get_user_comp_cls()._bt_get_supported_mip_versions_from_native(
+            params_ptr, obj, log_level
+        )
+
+    def _bt_query_from_native(
+        self, priv_query_exec_ptr, object_name, params_ptr, method_obj
+    ):
+        # no need to import the module for an object which the
+        # manifest does not declare
+        if self._query_objects is not None and object_name not in self._query_objects:
+            raise bt2.UnknownObject
+
+        # this can raise, but the native side checks the exception
+        return self._get_user_comp_cls()._bt_query_from_native(
+            priv_query_exec_ptr, object_name, params_ptr, method_obj
+        )
+
+
+def _load_plugin_module(path):
+    if path in _plugin_modules:
+        return _plugin_modules[path]
 
     import importlib.machinery
-    import inspect
     import hashlib
 
-    if path is None:
-        raise TypeError('missing path')
-
     # In order to load the module uniquely from its path, even from
     # different files which have the same basename, we hash the path
     # and prefix with `bt_plugin_`. This is its key in sys.modules.
@@ -125,14 +236,13 @@ def _try_load_plugin_module(path):
     assert module_name not in sys.modules
     # try loading the module: any raised exception is catched by the caller
     mod = importlib.machinery.SourceFileLoader(module_name, path).load_module()
+    _plugin_modules[path] = mod
+    return mod
 
-    # we have the module: look for its plugin info first
-    if not hasattr(mod, '_bt_plugin_info'):
-        raise RuntimeError("missing '_bt_plugin_info' module attribute")
 
-    plugin_info = mod._bt_plugin_info
+def _get_user_comp_classes(mod):
+    import inspect
 
-    # search for user component classes
     def is_user_comp_class(obj):
         if not inspect.isclass(obj):
             return False
@@ -142,7 +252,129 @@ def _try_load_plugin_module(path):
 
         return True
 
-    comp_class_entries = inspect.getmembers(mod, is_user_comp_class)
-    plugin_info.comp_class_addrs = [entry[1].addr for entry in comp_class_entries]
+    return [entry[1] for entry in inspect.getmembers(mod, is_user_comp_class)]
+
+
+# Returns the value of the top-level `bt_plugin_manifest` assignment of
+# the Python module `path`, without executing it, or `None` if there's
+# no such assignment.
+def _read_plugin_manifest(path):
+    import ast
+
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+
+        target = node.targets[0]
+
+        if isinstance(target, ast.Name) and target.id == _PLUGIN_MANIFEST_ATTR_NAME:
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                raise ValueError(
+                    "'{}' is not a literal in module '{}'".format(
+                        _PLUGIN_MANIFEST_ATTR_NAME, path
+                    )
+                )
+
+
+def _plugin_info_from_manifest(path, manifest):
+    utils._check_type(manifest, dict)
+    plugin_info = _PluginInfo(
+        manifest.get('name'),
+        manifest.get('description'),
+        manifest.get('author'),
+        manifest.get('license'),
+        manifest.get('version'),
+    )
+    utils._check_str(plugin_info.name)
+
+    for attr in ('description', 'author', 'license'):
+        if getattr(plugin_info, attr) is not None:
+            utils._check_str(getattr(plugin_info, attr))
+
+    if not _validate_version(plugin_info.version):
+        raise ValueError(
+            'wrong version: expecting a tuple: (major, minor, patch) or (major, minor, patch, extra)'
+        )
+
+    comp_classes = manifest.get('component_classes', [])
+    utils._check_type(comp_classes, list)
+    plugin_info.lazy_comp_classes = []
+
+    for comp_cls_entry in comp_classes:
+        utils._check_type(comp_cls_entry, dict)
+        comp_cls_type = comp_cls_entry.get('type')
+
+        if comp_cls_type not in _COMP_CLS_BASES:
+            raise ValueError(
+                "invalid component class type in plugin manifest: {}".format(
+                    repr(comp_cls_type)
+                )
+            )
+
+        name = comp_cls_entry.get('name')
+        utils._check_str(name)
+        description = comp_cls_entry.get('description')
+        help = comp_cls_entry.get('help')
+        query_objects = comp_cls_entry.get('query_objects')
+
+        if description is not None:
+            utils._check_str(description)
+
+        if help is not None:
+            utils._check_str(help)
+
+        if query_objects is not None:
+            utils._check_type(query_objects, list)
+
+            for object_name in query_objects:
+                utils._check_str(object_name)
+
+        plugin_info.lazy_comp_classes.append(
+            _LazyUserComponentClass(
+                path, comp_cls_type, name, description, help, query_objects
+            )
+        )
+
+    plugin_info.comp_class_addrs = [
+        lazy_comp_cls.addr for lazy_comp_cls in plugin_info.lazy_comp_classes
+    ]
+    return plugin_info
+
+
+# called by the BT plugin system
+def _try_load_plugin_module(path):
+    if path in _plugin_infos:
+        # do not load module and create plugin info twice for this path
+        return _plugin_infos[path]
+
+    if path is None:
+        raise TypeError('missing path')
+
+    # if the module declares a manifest, do not load it now: its
+    # component classes load it when they're instantiated or queried
+    manifest = _read_plugin_manifest(path)
+
+    if manifest is not None:
+        plugin_info = _plugin_info_from_manifest(path, manifest)
+        _plugin_infos[path] = plugin_info
+        return plugin_info
+
+    mod = _load_plugin_module(path)
+
+    # we have the module: look for its plugin info first
+    if not hasattr(mod, '_bt_plugin_info'):
+        raise RuntimeError("missing '_bt_plugin_info' module attribute")
+
+    plugin_info = mod._bt_plugin_info
+
+    # search for user component classes
+    plugin_info.comp_class_addrs = [
+        comp_cls.addr for comp_cls in _get_user_comp_classes(mod)
+    ]
     _plugin_infos[path] = plugin_info
     return plugin_info
@@ -29,7 +29,9 @@ from bt2 import component as bt2_component
 from bt2 import value as bt2_value
 from bt2 import plugin as bt2_plugin
 import datetime
+import fractions
 from collections import namedtuple
+import collections
 import numbers
 
 
@@ -139,9 +141,17 @@ class AutoSourceComponentSpec(_BaseComponentSpec):
         return self._input
 
 
-def _auto_discover_source_component_specs(auto_source_comp_specs, plugin_set):
-    # Transform a list of `AutoSourceComponentSpec` in a list of `ComponentSpec`
-    # using the automatic source discovery mechanism.
+# Source component which the automatic source discovery mechanism found.
+_DiscoveredSourceComponent = namedtuple(
+    '_DiscoveredSourceComponent',
+    ['plugin_name', 'class_name', 'params', 'obj', 'logging_level'],
+)
+
+
+def _auto_discover_source_components(auto_source_comp_specs, plugin_set):
+    # Transform a list of `AutoSourceComponentSpec` in a list of
+    # `_DiscoveredSourceComponent` using the automatic source discovery
+    # mechanism.
     inputs = bt2.ArrayValue([spec.input for spec in auto_source_comp_specs])
 
     if plugin_set is None:
@@ -164,7 +174,7 @@ def _auto_discover_source_component_specs(auto_source_comp_specs, plugin_set):
     status = res['status']
     utils._handle_func_status(status, 'cannot auto-discover source components')
 
-    comp_specs = []
+    comps = []
     comp_specs_raw = res['results']
     assert type(comp_specs_raw) == bt2.ArrayValue
 
@@ -215,13 +225,9 @@ def _auto_discover_source_component_specs(auto_source_comp_specs, plugin_set):
 
         params['inputs'] = comp_inputs
 
-        comp_specs.append(
-            ComponentSpec.from_named_plugin_and_component_class(
-                plugin_name,
-                class_name,
-                params=params,
-                obj=obj,
-                logging_level=logging_level,
+        comps.append(
+            _DiscoveredSourceComponent(
+                plugin_name, class_name, params, obj, logging_level
             )
         )
 
@@ -236,7 +242,22 @@ def _auto_discover_source_component_specs(auto_source_comp_specs, plugin_set):
         )
         raise RuntimeError(msg)
 
-    return comp_specs
+    return comps
+
+
+def _auto_discover_source_component_specs(auto_source_comp_specs, plugin_set):
+    # Transform a list of `AutoSourceComponentSpec` in a list of `ComponentSpec`
+    # using the automatic source discovery mechanism.
+    return [
+        ComponentSpec.from_named_plugin_and_component_class(
+            comp.plugin_name,
+            comp.class_name,
+            params=comp.params,
+            obj=comp.obj,
+            logging_level=comp.logging_level,
+        )
+        for comp in _auto_discover_source_components(auto_source_comp_specs, plugin_set)
+    ]
 
 
 # datetime.datetime or integral to nanoseconds
@@ -244,7 +265,11 @@ def _get_ns(obj):
     if obj is None:
         return
 
-    if isinstance(obj, numbers.Real):
+    if isinstance(obj, numbers.Rational):
+        # consider that it's already in seconds; exact conversion for
+        # `int` and `fractions.Fraction` objects
+        return int(fractions.Fraction(obj) * 1000000000)
+    elif isinstance(obj, numbers.Real):
         # consider that it's already in seconds
         s = obj
     elif isinstance(obj, datetime.datetime):
@@ -259,9 +284,9 @@ def _get_ns(obj):
 
 
 class _TraceCollectionMessageIteratorProxySink(bt2_component._UserSinkComponent):
-    def __init__(self, config, params, msg_list):
-        assert type(msg_list) is list
-        self._msg_list = msg_list
+    def __init__(self, config, params, msg_queue):
+        assert type(msg_queue) is collections.deque
+        self._msg_queue = msg_queue
         self._add_input_port('in')
 
     def _user_graph_is_configured(self):
@@ -270,8 +295,12 @@ class _TraceCollectionMessageIteratorProxySink(bt2_component._UserSinkComponent)
         )
 
     def _user_consume(self):
-        assert self._msg_list[0] is None
-        self._msg_list[0] = next(self._msg_iter)
+        # Move the whole message batch of the upstream message iterator
+        # to the shared queue so that the trace collection message
+        # iterator only needs to run the graph once per batch instead
+        # of once per message.
+        assert len(self._msg_queue) == 0
+        self._msg_queue.extend(self._msg_iter._next_msgs())
 
 
 class TraceCollectionMessageIterator(bt2_message_iterator._MessageIterator):
@@ -288,7 +317,7 @@ class TraceCollectionMessageIterator(bt2_message_iterator._MessageIterator):
         self._stream_intersection_mode = stream_intersection_mode
         self._begin_ns = _get_ns(begin)
         self._end_ns = _get_ns(end)
-        self._msg_list = [None]
+        self._msg_queue = collections.deque()
 
         # If a single item is provided, convert to a list.
         if type(source_component_specs) in (
@@ -396,13 +425,43 @@ class TraceCollectionMessageIterator(bt2_message_iterator._MessageIterator):
                     '"{}" object is not a ComponentSpec'.format(type(comp_spec))
                 )
 
+    def _fill_msg_queue(self):
+        if len(self._msg_queue) == 0:
+            self._graph.run_once()
+            assert len(self._msg_queue) > 0
+
     def __next__(self):
-        assert self._msg_list[0] is None
-        self._graph.run_once()
-        msg = self._msg_list[0]
-        assert msg is not None
-        self._msg_list[0] = None
-        return msg
+        self._fill_msg_queue()
+        return self._msg_queue.popleft()
+
+    # Generator of lists of messages.
+    #
+    # Each yielded list contains the next messages of this iterator, as
+    # returned by the upstream message iterator in a single batch, up to
+    # `max_messages` messages if it's not `None`.
+    #
+    # It's possible to mix calls to next() and iterations of the
+    # generator: they share the same message queue.
+    def iter_batches(self, max_messages=None):
+        if max_messages is not None:
+            utils._check_uint64(max_messages)
+
+            if max_messages == 0:
+                raise ValueError('maximum number of messages must be greater than 0')
+
+        while True:
+            try:
+                self._fill_msg_queue()
+            except StopIteration:
+                return
+
+            if max_messages is None or len(self._msg_queue) <= max_messages:
+                msgs = list(self._msg_queue)
+                self._msg_queue.clear()
+            else:
+                msgs = [self._msg_queue.popleft() for _ in range(max_messages)]
+
+            yield msgs
 
     def _create_stream_intersection_trimmer(self, component, port):
         key = (component.addr, port.name)
@@ -591,10 +650,10 @@ class TraceCollectionMessageIterator(bt2_message_iterator._MessageIterator):
 
                 self._connect_src_comp_port(comp_and_spec.comp, out_port)
 
-        # Add the proxy sink, passing our message list to share consumed
+        # Add the proxy sink, passing our message queue to share consumed
         # messages with this trace collection message iterator.
         sink = self._graph.add_component(
-            _TraceCollectionMessageIteratorProxySink, 'proxy-sink', obj=self._msg_list
+            _TraceCollectionMessageIteratorProxySink, 'proxy-sink', obj=self._msg_queue
         )
         sink_in_port = sink.input_ports['in']
 
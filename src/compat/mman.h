@@ -56,6 +56,19 @@ int bt_munmap(void *addr, size_t length);
  */
 size_t bt_mmap_get_offset_align_size(int log_level);
 
+#define BT_MADV_NORMAL		0
+#define BT_MADV_SEQUENTIAL	1
+#define BT_MADV_WILLNEED	2
+
+/*
+ * Access pattern hints are not supported on Windows: this is a no-op.
+ */
+static inline
+int bt_madvise(void *addr, size_t length, int advice)
+{
+	return 0;
+}
+
 #else /* __MINGW32__ */
 
 #include <sys/mman.h>
@@ -83,6 +96,23 @@ size_t bt_mmap_get_offset_align_size(int log_level)
 {
 	return bt_common_get_page_size(log_level);
 }
+
+#define BT_MADV_NORMAL		POSIX_MADV_NORMAL
+#define BT_MADV_SEQUENTIAL	POSIX_MADV_SEQUENTIAL
+#define BT_MADV_WILLNEED	POSIX_MADV_WILLNEED
+
+/*
+ * Give the kernel a hint about the expected access pattern of the
+ * memory range starting at `addr` (page-aligned) of length `length`.
+ *
+ * Returns 0 on success, or an error number on error. Failing to give
+ * a hint is never fatal.
+ */
+static inline
+int bt_madvise(void *addr, size_t length, int advice)
+{
+	return posix_madvise(addr, length, advice);
+}
 #endif /* __MINGW32__ */
 
 #ifndef MAP_ANONYMOUS
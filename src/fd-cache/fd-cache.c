@@ -108,6 +108,7 @@ int bt_fd_cache_init(struct bt_fd_cache *fdc, int log_level)
 	int ret = 0;
 
 	fdc->log_level = log_level;
+	g_mutex_init(&fdc->lock);
 	fdc->cache = g_hash_table_new_full(file_key_hash, file_key_equal,
 		file_key_destroy, (GDestroyNotify) fd_cache_handle_internal_destroy);
 	if (!fdc->cache) {
@@ -129,6 +130,7 @@ void bt_fd_cache_fini(struct bt_fd_cache *fdc)
 	 */
 	BT_ASSERT(g_hash_table_size(fdc->cache) == 0);
 	g_hash_table_destroy(fdc->cache);
+	g_mutex_clear(&fdc->lock);
 
 end:
 	return;
@@ -163,6 +165,7 @@ struct bt_fd_cache_handle *bt_fd_cache_get_handle(struct bt_fd_cache *fdc,
 	fk.dev = statbuf.st_dev;
 	fk.ino = statbuf.st_ino;
 
+	g_mutex_lock(&fdc->lock);
 	fd_internal = g_hash_table_lookup(fdc->cache, &fk);
 	if (!fd_internal) {
 		struct file_key *file_key;
@@ -196,9 +199,12 @@ struct bt_fd_cache_handle *bt_fd_cache_get_handle(struct bt_fd_cache *fdc,
 	}
 
 	fd_internal->ref_count++;
+	g_mutex_unlock(&fdc->lock);
 	goto end;
 
 error:
+	g_mutex_unlock(&fdc->lock);
+
 	/*
 	 * Close file descriptor if it was open() and we are currently on error
 	 * path.
@@ -229,6 +235,7 @@ void bt_fd_cache_put_handle(struct bt_fd_cache *fdc,
 
 	fd_internal = (struct fd_handle_internal *) handle;
 
+	g_mutex_lock(&fdc->lock);
 	BT_ASSERT(fd_internal->ref_count > 0);
 
 	if (fd_internal->ref_count > 1) {
@@ -246,6 +253,8 @@ void bt_fd_cache_put_handle(struct bt_fd_cache *fdc,
 		BT_ASSERT(ret);
 	}
 
+	g_mutex_unlock(&fdc->lock);
+
 end:
 	return;
 }
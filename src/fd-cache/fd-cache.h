@@ -28,6 +28,8 @@
  * SOFTWARE.
  */
 
+#include <glib.h>
+
 #include "common/macros.h"
 
 struct bt_fd_cache_handle {
@@ -37,6 +39,11 @@ struct bt_fd_cache_handle {
 struct bt_fd_cache {
 	int log_level;
 	GHashTable *cache;
+	/*
+	 * Protects `cache`: handles can be taken and released from
+	 * several threads.
+	 */
+	GMutex lock;
 };
 
 static inline
@@ -0,0 +1,579 @@
+/*
+ * Copyright (c) 2020 EfficiOS Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+#define BT_LOG_TAG "LIB/PLUGIN-CACHE"
+#include "lib/logging.h"
+
+#include "common/assert.h"
+#include "common/macros.h"
+#include "compat/compiler.h"
+#include "lib/graph/component-class.h"
+#include <glib.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <sys/stat.h>
+#include <pthread.h>
+
+#include "plugin.h"
+#include "plugin-cache.h"
+
+#define MANIFEST_PATH_ENV_VAR		"LIBBABELTRACE2_PLUGIN_MANIFEST_PATH"
+#define DISABLE_CACHE_ENV_VAR		"LIBBABELTRACE2_DISABLE_PLUGIN_CACHE"
+#define MANIFEST_MTIME_KEY		"mtime"
+#define MANIFEST_SIZE_KEY		"size"
+#define MANIFEST_PLUGINS_KEY		"plugins"
+#define MANIFEST_COMP_CLASSES_KEY	"component-classes"
+
+/* Status of a searched directory or of a plugin file when it was cached */
+struct cache_stamp {
+	gchar *path;
+
+	/* False if `path` didn't exist */
+	bool exists;
+
+	time_t mtime;
+	off_t size;
+};
+
+struct cache_entry {
+	/* Array of `struct cache_stamp` */
+	GArray *stamps;
+
+	/* Wall clock time at which the search started */
+	time_t search_time;
+
+	/* Owned by this */
+	const struct bt_plugin_set *plugin_set;
+};
+
+/*
+ * The cache entries are never destroyed at exit: putting the last
+ * reference of a Python plugin after the Python interpreter is
+ * finalized is not safe.
+ */
+static struct {
+	pthread_mutex_t lock;
+
+	/* `gchar *` (owned) -> `struct cache_entry *` (owned) */
+	GHashTable *entries;
+
+	/* -1 until the environment variable is checked */
+	int enabled;
+} plugin_cache = {
+	.lock = PTHREAD_MUTEX_INITIALIZER,
+	.enabled = -1,
+};
+
+struct bt_plugin_manifest {
+	gchar *path;
+	GKeyFile *key_file;
+
+	/* True if `key_file` was modified since it was loaded */
+	bool modified;
+};
+
+static
+void destroy_cache_entry(struct cache_entry *entry)
+{
+	if (!entry) {
+		goto end;
+	}
+
+	if (entry->stamps) {
+		guint i;
+
+		for (i = 0; i < entry->stamps->len; i++) {
+			g_free(g_array_index(entry->stamps,
+				struct cache_stamp, i).path);
+		}
+
+		g_array_free(entry->stamps, TRUE);
+	}
+
+	bt_object_put_ref(entry->plugin_set);
+	g_free(entry);
+
+end:
+	return;
+}
+
+/*
+ * Returns whether or not the plugin cache is enabled, creating its
+ * hash table on the first call if it is.
+ *
+ * Call with `plugin_cache.lock` held.
+ */
+static
+bool plugin_cache_is_enabled(void)
+{
+	if (plugin_cache.enabled < 0) {
+		const char *var = getenv(DISABLE_CACHE_ENV_VAR);
+
+		if (var && strcmp(var, "1") == 0) {
+			BT_LOGI("Plugin cache is disabled because the `%s` "
+				"environment variable is set to `1`.",
+				DISABLE_CACHE_ENV_VAR);
+			plugin_cache.enabled = 0;
+			goto end;
+		}
+
+		plugin_cache.entries = g_hash_table_new_full(g_str_hash,
+			g_str_equal, g_free, (GDestroyNotify) destroy_cache_entry);
+		if (!plugin_cache.entries) {
+			BT_LOGE_STR("Failed to allocate a GHashTable.");
+			plugin_cache.enabled = 0;
+			goto end;
+		}
+
+		plugin_cache.enabled = 1;
+	}
+
+end:
+	return plugin_cache.enabled == 1;
+}
+
+static
+void init_stamp(struct cache_stamp *stamp, const char *path)
+{
+	struct stat st;
+
+	stamp->path = g_strdup(path);
+
+	if (stat(path, &st) == 0) {
+		stamp->exists = true;
+		stamp->mtime = st.st_mtime;
+		stamp->size = st.st_size;
+	} else {
+		stamp->exists = false;
+		stamp->mtime = 0;
+		stamp->size = 0;
+	}
+}
+
+/*
+ * Returns whether or not `entry` still describes the current content
+ * of its directories and plugin files.
+ *
+ * A stamp taken after the search doesn't tell whether or not its file
+ * was modified during the search, so an entry having a file which was
+ * modified after the search started, or during the same second, is
+ * never valid.
+ */
+static
+bool cache_entry_is_valid(const struct cache_entry *entry)
+{
+	bool is_valid = false;
+	guint i;
+
+	for (i = 0; i < entry->stamps->len; i++) {
+		const struct cache_stamp *stamp = &g_array_index(
+			entry->stamps, struct cache_stamp, i);
+		struct cache_stamp cur_stamp;
+		bool same;
+
+		init_stamp(&cur_stamp, stamp->path);
+		same = cur_stamp.exists == stamp->exists &&
+			cur_stamp.mtime == stamp->mtime &&
+			cur_stamp.size == stamp->size;
+		g_free(cur_stamp.path);
+
+		if (!same) {
+			BT_LOGD("Plugin cache entry is stale: path=\"%s\"",
+				stamp->path);
+			goto end;
+		}
+
+		if (stamp->exists && stamp->mtime >= entry->search_time) {
+			BT_LOGD("Plugin cache entry is possibly stale: "
+				"path=\"%s\"", stamp->path);
+			goto end;
+		}
+	}
+
+	is_valid = true;
+
+end:
+	return is_valid;
+}
+
+BT_HIDDEN
+const struct bt_plugin_set *bt_plugin_cache_get(const char *key)
+{
+	const struct bt_plugin_set *plugin_set = NULL;
+	struct cache_entry *entry;
+
+	BT_ASSERT(key);
+	pthread_mutex_lock(&plugin_cache.lock);
+
+	if (!plugin_cache_is_enabled()) {
+		goto end;
+	}
+
+	entry = g_hash_table_lookup(plugin_cache.entries, key);
+	if (!entry) {
+		BT_LOGD("Plugin cache miss: key=\"%s\"", key);
+		goto end;
+	}
+
+	if (!cache_entry_is_valid(entry)) {
+		g_hash_table_remove(plugin_cache.entries, key);
+		goto end;
+	}
+
+	plugin_set = entry->plugin_set;
+	bt_object_get_ref_no_null_check(plugin_set);
+	BT_LOGI("Plugin cache hit: key=\"%s\", count=%u", key,
+		plugin_set->plugins->len);
+
+end:
+	pthread_mutex_unlock(&plugin_cache.lock);
+	return plugin_set;
+}
+
+BT_HIDDEN
+void bt_plugin_cache_put(const char *key, const GPtrArray *dirs,
+		const struct bt_plugin_set *plugin_set, time_t search_time)
+{
+	struct cache_entry *entry = NULL;
+	guint i;
+
+	BT_ASSERT(key);
+	BT_ASSERT(dirs);
+	BT_ASSERT(plugin_set);
+	pthread_mutex_lock(&plugin_cache.lock);
+
+	if (!plugin_cache_is_enabled()) {
+		goto end;
+	}
+
+	entry = g_new0(struct cache_entry, 1);
+	if (!entry) {
+		BT_LOGE_STR("Failed to allocate one plugin cache entry.");
+		goto end;
+	}
+
+	entry->search_time = search_time;
+	entry->stamps = g_array_new(FALSE, TRUE, sizeof(struct cache_stamp));
+	if (!entry->stamps) {
+		BT_LOGE_STR("Failed to allocate a GArray.");
+		goto end;
+	}
+
+	for (i = 0; i < dirs->len; i++) {
+		const GString *dir = dirs->pdata[i];
+		struct cache_stamp stamp;
+
+		init_stamp(&stamp, dir->str);
+		g_array_append_val(entry->stamps, stamp);
+	}
+
+	for (i = 0; i < plugin_set->plugins->len; i++) {
+		const struct bt_plugin *plugin = plugin_set->plugins->pdata[i];
+		struct cache_stamp stamp;
+
+		if (!plugin->info.path_set) {
+			/* Built-in plugin */
+			continue;
+		}
+
+		init_stamp(&stamp, plugin->info.path->str);
+		g_array_append_val(entry->stamps, stamp);
+	}
+
+	entry->plugin_set = plugin_set;
+	bt_object_get_ref_no_null_check(entry->plugin_set);
+	g_hash_table_insert(plugin_cache.entries, g_strdup(key), entry);
+	BT_LOGI("Cached plugin set: key=\"%s\", count=%u", key,
+		plugin_set->plugins->len);
+	entry = NULL;
+
+end:
+	destroy_cache_entry(entry);
+	pthread_mutex_unlock(&plugin_cache.lock);
+}
+
+/*
+ * Returns whether or not `path` can be the name of a group of a
+ * `GKeyFile`.
+ */
+static
+bool path_is_valid_manifest_group(const char *path)
+{
+	const char *ch;
+	bool is_valid = false;
+
+	for (ch = path; *ch != '\0'; ch++) {
+		if (*ch == '[' || *ch == ']' || (unsigned char) *ch < 0x20) {
+			BT_LOGD("Cannot use file path as plugin manifest group: "
+				"path=\"%s\"", path);
+			goto end;
+		}
+	}
+
+	is_valid = ch != path;
+
+end:
+	return is_valid;
+}
+
+BT_HIDDEN
+struct bt_plugin_manifest *bt_plugin_manifest_load(void)
+{
+	struct bt_plugin_manifest *manifest = NULL;
+	const char *path = getenv(MANIFEST_PATH_ENV_VAR);
+	GError *error = NULL;
+
+	if (!path || strlen(path) == 0) {
+		goto end;
+	}
+
+	manifest = g_new0(struct bt_plugin_manifest, 1);
+	if (!manifest) {
+		BT_LOGE_STR("Failed to allocate one plugin manifest.");
+		goto end;
+	}
+
+	manifest->path = g_strdup(path);
+	manifest->key_file = g_key_file_new();
+	if (!manifest->path || !manifest->key_file) {
+		BT_LOGE_STR("Failed to allocate plugin manifest members.");
+		goto error;
+	}
+
+	if (!g_key_file_load_from_file(manifest->key_file, path,
+			G_KEY_FILE_NONE, &error)) {
+		/* Start with an empty manifest */
+		BT_LOGI("Cannot load plugin manifest: starting with an "
+			"empty manifest: path=\"%s\", msg=\"%s\"",
+			path, error->message);
+		g_key_file_free(manifest->key_file);
+		manifest->key_file = g_key_file_new();
+		if (!manifest->key_file) {
+			BT_LOGE_STR("Failed to allocate a GKeyFile.");
+			goto error;
+		}
+
+		goto end;
+	}
+
+	BT_LOGI("Loaded plugin manifest: path=\"%s\"", path);
+	goto end;
+
+error:
+	bt_plugin_manifest_save_and_destroy(manifest);
+	manifest = NULL;
+
+end:
+	if (error) {
+		g_error_free(error);
+	}
+
+	return manifest;
+}
+
+BT_HIDDEN
+bool bt_plugin_manifest_file_can_contain_plugin(
+		struct bt_plugin_manifest *manifest, const char *path,
+		const struct stat *st, const char *plugin_name)
+{
+	bool can_contain = true;
+	gchar **plugin_names = NULL;
+	gchar **name;
+	GError *error = NULL;
+
+	BT_ASSERT(manifest);
+	BT_ASSERT(path);
+	BT_ASSERT(st);
+	BT_ASSERT(plugin_name);
+
+	if (!path_is_valid_manifest_group(path) ||
+			!g_key_file_has_group(manifest->key_file, path)) {
+		goto end;
+	}
+
+	if (g_key_file_get_int64(manifest->key_file, path,
+			MANIFEST_MTIME_KEY, &error) != (gint64) st->st_mtime ||
+			error) {
+		goto end;
+	}
+
+	if (g_key_file_get_int64(manifest->key_file, path,
+			MANIFEST_SIZE_KEY, &error) != (gint64) st->st_size ||
+			error) {
+		goto end;
+	}
+
+	plugin_names = g_key_file_get_string_list(manifest->key_file, path,
+		MANIFEST_PLUGINS_KEY, NULL, &error);
+	if (!plugin_names) {
+		goto end;
+	}
+
+	for (name = plugin_names; *name; name++) {
+		if (strcmp(*name, plugin_name) == 0) {
+			goto end;
+		}
+	}
+
+	BT_LOGI("Plugin manifest indicates that the file does not contain "
+		"the plugin: path=\"%s\", plugin-name=\"%s\"",
+		path, plugin_name);
+	can_contain = false;
+
+end:
+	if (error) {
+		g_error_free(error);
+	}
+
+	g_strfreev(plugin_names);
+	return can_contain;
+}
+
+static
+void append_comp_class_names(GPtrArray *names, const char *type_str,
+		const char *plugin_name, const GPtrArray *comp_classes)
+{
+	guint i;
+
+	for (i = 0; i < comp_classes->len; i++) {
+		const struct bt_component_class *comp_cls =
+			comp_classes->pdata[i];
+
+		g_ptr_array_add(names, g_strdup_printf("%s.%s.%s",
+			type_str, plugin_name, comp_cls->name->str));
+	}
+}
+
+BT_HIDDEN
+void bt_plugin_manifest_set_file_plugins(struct bt_plugin_manifest *manifest,
+		const char *path, const struct stat *st,
+		const struct bt_plugin_set *plugin_set)
+{
+	GPtrArray *plugin_names = NULL;
+	GPtrArray *comp_class_names = NULL;
+	guint i;
+
+	BT_ASSERT(manifest);
+	BT_ASSERT(path);
+	BT_ASSERT(st);
+
+	if (!path_is_valid_manifest_group(path)) {
+		goto end;
+	}
+
+	plugin_names = g_ptr_array_new_with_free_func(g_free);
+	comp_class_names = g_ptr_array_new_with_free_func(g_free);
+	if (!plugin_names || !comp_class_names) {
+		BT_LOGE_STR("Failed to allocate a GPtrArray.");
+		goto end;
+	}
+
+	for (i = 0; plugin_set && i < plugin_set->plugins->len; i++) {
+		const struct bt_plugin *plugin = plugin_set->plugins->pdata[i];
+		const char *plugin_name = plugin->info.name->str;
+
+		g_ptr_array_add(plugin_names, g_strdup(plugin_name));
+		append_comp_class_names(comp_class_names, "source",
+			plugin_name, plugin->src_comp_classes);
+		append_comp_class_names(comp_class_names, "filter",
+			plugin_name, plugin->flt_comp_classes);
+		append_comp_class_names(comp_class_names, "sink",
+			plugin_name, plugin->sink_comp_classes);
+	}
+
+	/* Null-terminate for g_key_file_set_string_list() */
+	g_ptr_array_add(plugin_names, NULL);
+	g_ptr_array_add(comp_class_names, NULL);
+	g_key_file_remove_group(manifest->key_file, path, NULL);
+	g_key_file_set_int64(manifest->key_file, path, MANIFEST_MTIME_KEY,
+		(gint64) st->st_mtime);
+	g_key_file_set_int64(manifest->key_file, path, MANIFEST_SIZE_KEY,
+		(gint64) st->st_size);
+	g_key_file_set_string_list(manifest->key_file, path,
+		MANIFEST_PLUGINS_KEY,
+		(const gchar * const *) plugin_names->pdata,
+		plugin_names->len - 1);
+	g_key_file_set_string_list(manifest->key_file, path,
+		MANIFEST_COMP_CLASSES_KEY,
+		(const gchar * const *) comp_class_names->pdata,
+		comp_class_names->len - 1);
+	manifest->modified = true;
+	BT_LOGD("Updated plugin manifest entry: path=\"%s\", plugin-count=%u",
+		path, plugin_names->len - 1);
+
+end:
+	if (plugin_names) {
+		g_ptr_array_free(plugin_names, TRUE);
+	}
+
+	if (comp_class_names) {
+		g_ptr_array_free(comp_class_names, TRUE);
+	}
+}
+
+BT_HIDDEN
+void bt_plugin_manifest_save_and_destroy(struct bt_plugin_manifest *manifest)
+{
+	gchar *data = NULL;
+	gsize data_len;
+	GError *error = NULL;
+
+	if (!manifest) {
+		goto end;
+	}
+
+	if (!manifest->modified) {
+		goto destroy;
+	}
+
+	BT_ASSERT(manifest->key_file);
+	data = g_key_file_to_data(manifest->key_file, &data_len, NULL);
+	if (!data) {
+		BT_LOGE_STR("Failed to serialize the plugin manifest.");
+		goto destroy;
+	}
+
+	if (!g_file_set_contents(manifest->path, data, data_len, &error)) {
+		BT_LOGW("Cannot write plugin manifest: path=\"%s\", msg=\"%s\"",
+			manifest->path, error->message);
+		g_error_free(error);
+		goto destroy;
+	}
+
+	BT_LOGI("Wrote plugin manifest: path=\"%s\"", manifest->path);
+
+destroy:
+	g_free(data);
+
+	if (manifest->key_file) {
+		g_key_file_free(manifest->key_file);
+	}
+
+	g_free(manifest->path);
+	g_free(manifest);
+
+end:
+	return;
+}
@@ -0,0 +1,124 @@
+#ifndef BABELTRACE_PLUGIN_PLUGIN_CACHE_INTERNAL_H
+#define BABELTRACE_PLUGIN_PLUGIN_CACHE_INTERNAL_H
+
+/*
+ * Copyright (c) 2020 EfficiOS Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+#include <glib.h>
+#include <stdbool.h>
+#include <sys/stat.h>
+#include <time.h>
+#include "common/macros.h"
+
+struct bt_plugin_set;
+
+/*
+ * Process-wide cache of the plugin sets which bt_plugin_find_all() and
+ * bt_plugin_find() create from the standard directories.
+ *
+ * A cache entry is identified by a key string which the caller builds
+ * from its search parameters. It remains valid as long as the
+ * modification times and sizes of the searched directories and of the
+ * files of its plugins don't change.
+ *
+ * Setting the `LIBBABELTRACE2_DISABLE_PLUGIN_CACHE` environment
+ * variable to `1` disables the cache.
+ */
+
+/*
+ * Returns a new reference to the cached plugin set for `key`, or `NULL`
+ * if there's no such valid entry.
+ *
+ * The returned plugin set can be empty.
+ */
+BT_HIDDEN
+const struct bt_plugin_set *bt_plugin_cache_get(const char *key);
+
+/*
+ * Caches `plugin_set` (possibly empty), which a search which started at
+ * `search_time` (see time()) found within the directories `dirs` (array
+ * of `GString *`), for `key`, replacing any existing entry.
+ */
+BT_HIDDEN
+void bt_plugin_cache_put(const char *key, const GPtrArray *dirs,
+		const struct bt_plugin_set *plugin_set, time_t search_time);
+
+/*
+ * Persistent manifest of the plugins which the files of plugin
+ * directories contain, used by bt_plugin_find() to avoid loading the
+ * files which cannot contain the requested plugin.
+ *
+ * The manifest is a key file (see `GKeyFile`) at the path which the
+ * `LIBBABELTRACE2_PLUGIN_MANIFEST_PATH` environment variable contains,
+ * with one group per file path:
+ *
+ *     [/usr/lib/babeltrace2/plugins/babeltrace-plugin-ctf.so]
+ *     mtime=1583272823
+ *     size=1843216
+ *     plugins=ctf;
+ *     component-classes=source.ctf.fs;sink.ctf.fs;source.ctf.lttng-live;
+ *
+ * An entry is stale, and ignored, when the modification time or the
+ * size of its file changed.
+ */
+struct bt_plugin_manifest;
+
+/*
+ * Loads the manifest.
+ *
+ * Returns `NULL` if the `LIBBABELTRACE2_PLUGIN_MANIFEST_PATH`
+ * environment variable is not set. A missing or invalid manifest file
+ * is considered empty.
+ */
+BT_HIDDEN
+struct bt_plugin_manifest *bt_plugin_manifest_load(void);
+
+/*
+ * Returns whether or not the file `path`, having the status `st`, can
+ * contain a plugin named `plugin_name`, that is, if the manifest has no
+ * up-to-date entry for this file or if its entry contains this plugin.
+ */
+BT_HIDDEN
+bool bt_plugin_manifest_file_can_contain_plugin(
+		struct bt_plugin_manifest *manifest, const char *path,
+		const struct stat *st, const char *plugin_name);
+
+/*
+ * Records that the file `path`, having the status `st`, contains the
+ * plugins of `plugin_set`, or none if it's `NULL`.
+ */
+BT_HIDDEN
+void bt_plugin_manifest_set_file_plugins(struct bt_plugin_manifest *manifest,
+		const char *path, const struct stat *st,
+		const struct bt_plugin_set *plugin_set);
+
+/*
+ * Writes the manifest file if bt_plugin_manifest_set_file_plugins()
+ * modified it and destroys `manifest`.
+ *
+ * Failing to write the manifest file is not an error: the next search
+ * simply loads the files again.
+ */
+BT_HIDDEN
+void bt_plugin_manifest_save_and_destroy(struct bt_plugin_manifest *manifest);
+
+#endif /* BABELTRACE_PLUGIN_PLUGIN_CACHE_INTERNAL_H */
@@ -45,9 +45,11 @@
 #include <sys/stat.h>
 #include <ftw.h>
 #include <pthread.h>
+#include <time.h>
 
 #include "plugin.h"
 #include "plugin-so.h"
+#include "plugin-cache.h"
 #include "lib/func-status.h"
 
 #define PYTHON_PLUGIN_PROVIDER_FILENAME	"babeltrace2-python-plugin-provider." G_MODULE_SUFFIX
@@ -273,38 +275,17 @@ void destroy_gstring(void *data)
 	g_string_free(data, TRUE);
 }
 
-enum bt_plugin_find_all_status bt_plugin_find_all(bt_bool find_in_std_env_var,
-		bt_bool find_in_user_dir, bt_bool find_in_sys_dir,
-		bt_bool find_in_static, bt_bool fail_on_load_error,
-		const struct bt_plugin_set **plugin_set_out)
+/*
+ * Appends the standard directories in which to find plugins, in search
+ * order, to `dirs` (array of `GString *`).
+ */
+static
+int append_std_plugin_dirs(GPtrArray *dirs, bt_bool find_in_std_env_var,
+		bt_bool find_in_user_dir, bt_bool find_in_sys_dir)
 {
 	char *home_plugin_dir = NULL;
-	const struct bt_plugin_set *plugin_set = NULL;
-	GPtrArray *dirs = NULL;
 	int ret;
 	int status = BT_FUNC_STATUS_OK;
-	uint64_t dir_i, plugin_i;
-
-	BT_ASSERT_PRE_NO_ERROR();
-	BT_ASSERT_PRE_NON_NULL(plugin_set_out, "Plugin set (output)");
-	BT_LOGI("Finding all plugins in standard directories and built-in plugins: "
-		"find-in-std-env-var=%d, find-in-user-dir=%d, "
-		"find-in-sys-dir=%d, find-in-static=%d",
-		find_in_std_env_var, find_in_user_dir, find_in_sys_dir,
-		find_in_static);
-	dirs = g_ptr_array_new_with_free_func((GDestroyNotify) destroy_gstring);
-	if (!dirs) {
-		BT_LIB_LOGE_APPEND_CAUSE("Failed to allocate a GPtrArray.");
-		status = BT_FUNC_STATUS_MEMORY_ERROR;
-		goto end;
-	}
-
-	*plugin_set_out = bt_plugin_set_create();
-	if (!*plugin_set_out) {
-		BT_LIB_LOGE_APPEND_CAUSE("Cannot create empty plugin set.");
-		status = BT_FUNC_STATUS_MEMORY_ERROR;
-		goto end;
-	}
 
 	/*
 	 * Search order is:
@@ -368,6 +349,107 @@ enum bt_plugin_find_all_status bt_plugin_find_all(bt_bool find_in_std_env_var,
 		}
 	}
 
+end:
+	free(home_plugin_dir);
+	return status;
+}
+
+/*
+ * Creates the plugin cache key (see `plugin-cache.h`) of a search in
+ * the directories `dirs` (array of `GString *`).
+ *
+ * `plugin_name` is `NULL` for bt_plugin_find_all().
+ */
+static
+gchar *create_plugin_cache_key(const char *plugin_name, const GPtrArray *dirs,
+		bt_bool find_in_static, bt_bool fail_on_load_error)
+{
+	GString *key = g_string_new(NULL);
+	guint i;
+
+	if (!key) {
+		BT_LIB_LOGE_APPEND_CAUSE("Failed to allocate a GString.");
+		goto end;
+	}
+
+	if (plugin_name) {
+		g_string_append_printf(key, "find:%s", plugin_name);
+	} else {
+		g_string_append(key, "find-all");
+	}
+
+	g_string_append_printf(key, ";static=%d;fail-on-load-error=%d",
+		(int) find_in_static, (int) fail_on_load_error);
+
+	/* Prefix each path with its length: paths can contain anything */
+	for (i = 0; i < dirs->len; i++) {
+		const GString *dir = dirs->pdata[i];
+
+		g_string_append_printf(key, ";dir=%zu:%s", dir->len, dir->str);
+	}
+
+end:
+	return key ? g_string_free(key, FALSE) : NULL;
+}
+
+enum bt_plugin_find_all_status bt_plugin_find_all(bt_bool find_in_std_env_var,
+		bt_bool find_in_user_dir, bt_bool find_in_sys_dir,
+		bt_bool find_in_static, bt_bool fail_on_load_error,
+		const struct bt_plugin_set **plugin_set_out)
+{
+	const struct bt_plugin_set *plugin_set = NULL;
+	GPtrArray *dirs = NULL;
+	gchar *cache_key = NULL;
+	bool from_cache = false;
+	time_t search_time = 0;
+	int status = BT_FUNC_STATUS_OK;
+	uint64_t dir_i, plugin_i;
+
+	BT_ASSERT_PRE_NO_ERROR();
+	BT_ASSERT_PRE_NON_NULL(plugin_set_out, "Plugin set (output)");
+	BT_LOGI("Finding all plugins in standard directories and built-in plugins: "
+		"find-in-std-env-var=%d, find-in-user-dir=%d, "
+		"find-in-sys-dir=%d, find-in-static=%d",
+		find_in_std_env_var, find_in_user_dir, find_in_sys_dir,
+		find_in_static);
+	*plugin_set_out = NULL;
+	dirs = g_ptr_array_new_with_free_func((GDestroyNotify) destroy_gstring);
+	if (!dirs) {
+		BT_LIB_LOGE_APPEND_CAUSE("Failed to allocate a GPtrArray.");
+		status = BT_FUNC_STATUS_MEMORY_ERROR;
+		goto end;
+	}
+
+	status = append_std_plugin_dirs(dirs, find_in_std_env_var,
+		find_in_user_dir, find_in_sys_dir);
+	if (status < 0) {
+		/* append_std_plugin_dirs() logs errors */
+		goto end;
+	}
+
+	cache_key = create_plugin_cache_key(NULL, dirs, find_in_static,
+		fail_on_load_error);
+	if (!cache_key) {
+		/* create_plugin_cache_key() logs errors */
+		status = BT_FUNC_STATUS_MEMORY_ERROR;
+		goto end;
+	}
+
+	*plugin_set_out = bt_plugin_cache_get(cache_key);
+	if (*plugin_set_out) {
+		from_cache = true;
+		goto end;
+	}
+
+	search_time = time(NULL);
+
+	*plugin_set_out = bt_plugin_set_create();
+	if (!*plugin_set_out) {
+		BT_LIB_LOGE_APPEND_CAUSE("Cannot create empty plugin set.");
+		status = BT_FUNC_STATUS_MEMORY_ERROR;
+		goto end;
+	}
+
 	for (dir_i = 0; dir_i < dirs->len; dir_i++) {
 		GString *dir = dirs->pdata[dir_i];
 
@@ -434,18 +516,19 @@ enum bt_plugin_find_all_status bt_plugin_find_all(bt_bool find_in_std_env_var,
 	}
 
 end:
-	free(home_plugin_dir);
 	bt_object_put_ref(plugin_set);
 
-	if (dirs) {
-		g_ptr_array_free(dirs, TRUE);
-	}
-
 	if (status < 0) {
 		BT_OBJECT_PUT_REF_AND_RESET(*plugin_set_out);
 	} else {
 		BT_ASSERT(*plugin_set_out);
 
+		if (!from_cache) {
+			/* Also cache an empty plugin set */
+			bt_plugin_cache_put(cache_key, dirs, *plugin_set_out,
+				search_time);
+		}
+
 		if ((*plugin_set_out)->plugins->len > 0) {
 			BT_LOGI("Found plugins in standard directories and built-in plugins: "
 				"count=%u", (*plugin_set_out)->plugins->len);
@@ -457,6 +540,237 @@ end:
 		}
 	}
 
+	if (dirs) {
+		g_ptr_array_free(dirs, TRUE);
+	}
+
+	g_free(cache_key);
+	return status;
+}
+
+static
+const struct bt_plugin *borrow_plugin_by_name(
+		const struct bt_plugin_set *plugin_set, const char *plugin_name)
+{
+	const struct bt_plugin *plugin = NULL;
+	uint64_t i;
+
+	for (i = 0; i < plugin_set->plugins->len; i++) {
+		const struct bt_plugin *candidate =
+			plugin_set->plugins->pdata[i];
+
+		if (strcmp(candidate->info.name->str, plugin_name) == 0) {
+			plugin = candidate;
+			break;
+		}
+	}
+
+	return plugin;
+}
+
+/*
+ * Finds the plugin named `plugin_name` in the files of the directory
+ * `dir_path` (non-recursively), skipping the files which, according to
+ * `manifest`, cannot contain it, and recording the plugins of the files
+ * it loads in `manifest`.
+ */
+static
+int find_plugin_in_dir_with_manifest(const char *dir_path,
+		const char *plugin_name, bt_bool fail_on_load_error,
+		struct bt_plugin_manifest *manifest,
+		const struct bt_plugin **plugin_out)
+{
+	GDir *dir;
+	const char *name;
+	gchar *file_path = NULL;
+	const struct bt_plugin_set *plugin_set = NULL;
+	int status = BT_FUNC_STATUS_NOT_FOUND;
+
+	dir = g_dir_open(dir_path, 0, NULL);
+	if (!dir) {
+		BT_LOGI("Cannot open directory: continuing: path=\"%s\"",
+			dir_path);
+		goto end;
+	}
+
+	while ((name = g_dir_read_name(dir))) {
+		const struct bt_plugin *plugin;
+		struct stat st;
+
+		g_free(file_path);
+		file_path = g_build_filename(dir_path, name, NULL);
+
+		if (name[0] == '.') {
+			/* Skip hidden files */
+			BT_LOGI("Skipping hidden file: path=\"%s\"", file_path);
+			continue;
+		}
+
+		/*
+		 * Like nftw_append_all_from_dir(), only consider regular
+		 * files, without following symbolic links.
+		 */
+		if (lstat(file_path, &st) != 0 || !S_ISREG(st.st_mode)) {
+			continue;
+		}
+
+		if (!bt_plugin_manifest_file_can_contain_plugin(manifest,
+				file_path, &st, plugin_name)) {
+			continue;
+		}
+
+		BT_OBJECT_PUT_REF_AND_RESET(plugin_set);
+
+		/* bt_plugin_find_all_from_file() logs details/errors */
+		status = bt_plugin_find_all_from_file(file_path,
+			fail_on_load_error, &plugin_set);
+		if (status < 0) {
+			BT_ASSERT(!plugin_set);
+			goto end;
+		}
+
+		bt_plugin_manifest_set_file_plugins(manifest, file_path, &st,
+			plugin_set);
+
+		if (status == BT_FUNC_STATUS_OK) {
+			plugin = borrow_plugin_by_name(plugin_set, plugin_name);
+			if (plugin) {
+				*plugin_out = plugin;
+				bt_object_get_ref_no_null_check(*plugin_out);
+				goto end;
+			}
+		}
+
+		status = BT_FUNC_STATUS_NOT_FOUND;
+	}
+
+end:
+	if (dir) {
+		g_dir_close(dir);
+	}
+
+	g_free(file_path);
+	bt_object_put_ref(plugin_set);
+	return status;
+}
+
+/*
+ * Finds the plugin named `plugin_name` like bt_plugin_find_all() would
+ * find it, but only loading the files which, according to `manifest`,
+ * can contain it, and stopping at the first match.
+ */
+static
+int find_plugin_with_manifest(const char *plugin_name,
+		bt_bool find_in_std_env_var, bt_bool find_in_user_dir,
+		bt_bool find_in_sys_dir, bt_bool find_in_static,
+		bt_bool fail_on_load_error, struct bt_plugin_manifest *manifest,
+		const struct bt_plugin **plugin_out)
+{
+	const struct bt_plugin_set *plugin_set = NULL;
+	struct bt_plugin_set *cached_plugin_set = NULL;
+	GPtrArray *dirs = NULL;
+	gchar *cache_key = NULL;
+	const struct bt_plugin *plugin;
+	time_t search_time;
+	int status;
+	guint dir_i;
+
+	*plugin_out = NULL;
+	dirs = g_ptr_array_new_with_free_func((GDestroyNotify) destroy_gstring);
+	if (!dirs) {
+		BT_LIB_LOGE_APPEND_CAUSE("Failed to allocate a GPtrArray.");
+		status = BT_FUNC_STATUS_MEMORY_ERROR;
+		goto end;
+	}
+
+	status = append_std_plugin_dirs(dirs, find_in_std_env_var,
+		find_in_user_dir, find_in_sys_dir);
+	if (status < 0) {
+		/* append_std_plugin_dirs() logs errors */
+		goto end;
+	}
+
+	cache_key = create_plugin_cache_key(plugin_name, dirs, find_in_static,
+		fail_on_load_error);
+	if (!cache_key) {
+		/* create_plugin_cache_key() logs errors */
+		status = BT_FUNC_STATUS_MEMORY_ERROR;
+		goto end;
+	}
+
+	/* A cached plugin set contains the found plugin, if any */
+	plugin_set = bt_plugin_cache_get(cache_key);
+	if (plugin_set) {
+		status = plugin_set->plugins->len > 0 ?
+			BT_FUNC_STATUS_OK : BT_FUNC_STATUS_NOT_FOUND;
+		if (status == BT_FUNC_STATUS_OK) {
+			*plugin_out = plugin_set->plugins->pdata[0];
+			bt_object_get_ref_no_null_check(*plugin_out);
+		}
+
+		goto end;
+	}
+
+	search_time = time(NULL);
+	status = BT_FUNC_STATUS_NOT_FOUND;
+
+	for (dir_i = 0; dir_i < dirs->len; dir_i++) {
+		GString *dir = dirs->pdata[dir_i];
+
+		status = find_plugin_in_dir_with_manifest(dir->str, plugin_name,
+			fail_on_load_error, manifest, plugin_out);
+		if (status != BT_FUNC_STATUS_NOT_FOUND) {
+			goto cache;
+		}
+	}
+
+	if (find_in_static) {
+		status = bt_plugin_find_all_from_static(fail_on_load_error,
+			&plugin_set);
+		if (status < 0) {
+			BT_ASSERT(!plugin_set);
+			goto end;
+		} else if (status == BT_FUNC_STATUS_OK) {
+			plugin = borrow_plugin_by_name(plugin_set, plugin_name);
+			if (plugin) {
+				*plugin_out = plugin;
+				bt_object_get_ref_no_null_check(*plugin_out);
+				goto cache;
+			}
+		}
+
+		status = BT_FUNC_STATUS_NOT_FOUND;
+	}
+
+cache:
+	if (status < 0) {
+		goto end;
+	}
+
+	cached_plugin_set = bt_plugin_set_create();
+	if (!cached_plugin_set) {
+		BT_LIB_LOGE_APPEND_CAUSE("Cannot create empty plugin set.");
+		status = BT_FUNC_STATUS_MEMORY_ERROR;
+		BT_OBJECT_PUT_REF_AND_RESET(*plugin_out);
+		goto end;
+	}
+
+	if (status == BT_FUNC_STATUS_OK) {
+		bt_plugin_set_add_plugin(cached_plugin_set,
+			(void *) *plugin_out);
+	}
+
+	bt_plugin_cache_put(cache_key, dirs, cached_plugin_set, search_time);
+
+end:
+	bt_object_put_ref(plugin_set);
+	bt_object_put_ref(cached_plugin_set);
+
+	if (dirs) {
+		g_ptr_array_free(dirs, TRUE);
+	}
+
+	g_free(cache_key);
 	return status;
 }
 
@@ -467,7 +781,7 @@ enum bt_plugin_find_status bt_plugin_find(const char *plugin_name,
 {
 	enum bt_plugin_find_status status;
 	const struct bt_plugin_set *plugin_set = NULL;
-	uint64_t i;
+	struct bt_plugin_manifest *manifest = NULL;
 
 	BT_ASSERT_PRE_NO_ERROR();
 	BT_ASSERT_PRE_NON_NULL(plugin_name, "Name");
@@ -477,6 +791,16 @@ enum bt_plugin_find_status bt_plugin_find(const char *plugin_name,
 		"find-in-sys-dir=%d, find-in-static=%d",
 		plugin_name, find_in_std_env_var, find_in_user_dir,
 		find_in_sys_dir, find_in_static);
+	manifest = bt_plugin_manifest_load();
+	if (manifest) {
+		/* find_plugin_with_manifest() logs errors */
+		status = find_plugin_with_manifest(plugin_name,
+			find_in_std_env_var, find_in_user_dir, find_in_sys_dir,
+			find_in_static, fail_on_load_error, manifest,
+			plugin_out);
+		goto end;
+	}
+
 	status = (enum bt_plugin_find_status) bt_plugin_find_all(find_in_std_env_var, find_in_user_dir,
 		find_in_sys_dir, find_in_static, fail_on_load_error,
 		&plugin_set);
@@ -486,15 +810,10 @@ enum bt_plugin_find_status bt_plugin_find(const char *plugin_name,
 	}
 
 	BT_ASSERT(plugin_set);
-
-	for (i = 0; i < plugin_set->plugins->len; i++) {
-		const struct bt_plugin *plugin = plugin_set->plugins->pdata[i];
-
-		if (strcmp(plugin->info.name->str, plugin_name) == 0) {
-			*plugin_out = plugin;
-			bt_object_get_ref_no_null_check(*plugin_out);
-			goto end;
-		}
+	*plugin_out = borrow_plugin_by_name(plugin_set, plugin_name);
+	if (*plugin_out) {
+		bt_object_get_ref_no_null_check(*plugin_out);
+		goto end;
 	}
 
 	status = BT_FUNC_STATUS_NOT_FOUND;
@@ -510,6 +829,7 @@ end:
 	}
 
 	bt_plugin_set_put_ref(plugin_set);
+	bt_plugin_manifest_save_and_destroy(manifest);
 
 	return status;
 }
@@ -133,6 +133,28 @@ struct ctf_msg_iter {
 	 */
 	bool dry_run;
 
+	/*
+	 * Star globbing patterns (weak array of `const char *`) of the
+	 * names of the event classes of which to create event messages,
+	 * or `NULL` to create event messages for all the event records.
+	 */
+	const GPtrArray *event_class_name_patterns;
+
+	/*
+	 * Event classes of which the event records are skipped (weak
+	 * `struct ctf_event_class *` to `GINT_TO_POINTER(1)`) or not
+	 * (`GINT_TO_POINTER(0)`), to avoid matching the names of the event
+	 * classes against `event_class_name_patterns` for each event
+	 * record. Owned by this.
+	 */
+	GHashTable *skipped_event_classes;
+
+	/*
+	 * True if the current event record is decoded, but without
+	 * creating an event message nor setting any trace IR field.
+	 */
+	bool skip_event;
+
 	/*
 	 * Current dynamic scope field pointer.
 	 *
@@ -260,6 +282,18 @@ struct ctf_msg_iter {
 	bt_self_component *self_comp;
 };
 
+/*
+ * Returns whether or not the message iterator must not create or set
+ * trace IR fields: either it's in dry run mode, or it's decoding an
+ * event record which it skips (see
+ * ctf_msg_iter_set_event_class_name_filter()).
+ */
+static inline
+bool skip_ir_fields(struct ctf_msg_iter *msg_it)
+{
+	return msg_it->dry_run || msg_it->skip_event;
+}
+
 static inline
 const char *state_string(enum state state)
 {
@@ -1155,6 +1189,7 @@ enum ctf_msg_iter_status read_event_header_begin_state(struct ctf_msg_iter *msg_
 	/* Reset the position of the last event header */
 	msg_it->buf.last_eh_at = msg_it->buf.at;
 	msg_it->cur_event_class_id = -1;
+	msg_it->skip_event = false;
 
 	/* Check if we have some content left */
 	if (msg_it->cur_exp_packet_content_size >= 0) {
@@ -1234,6 +1269,49 @@ enum ctf_msg_iter_status read_event_header_continue_state(
 		STATE_AFTER_EVENT_HEADER);
 }
 
+/*
+ * Returns whether or not the event records of the event class `ec` are
+ * skipped because its name doesn't match any of the event class name
+ * patterns of `msg_it`.
+ */
+static
+bool event_class_is_skipped(struct ctf_msg_iter *msg_it,
+		struct ctf_event_class *ec)
+{
+	gpointer skipped;
+	guint i;
+
+	BT_ASSERT_DBG(msg_it->event_class_name_patterns);
+	BT_ASSERT_DBG(msg_it->skipped_event_classes);
+
+	if (G_LIKELY(g_hash_table_lookup_extended(
+			msg_it->skipped_event_classes, ec, NULL, &skipped))) {
+		goto end;
+	}
+
+	skipped = GINT_TO_POINTER(1);
+
+	for (i = 0; i < msg_it->event_class_name_patterns->len; i++) {
+		const char *pattern = g_ptr_array_index(
+			msg_it->event_class_name_patterns, i);
+
+		if (bt_common_star_glob_match(pattern, SIZE_MAX,
+				ec->name->str, ec->name->len)) {
+			skipped = GINT_TO_POINTER(0);
+			break;
+		}
+	}
+
+	BT_COMP_LOGD("Event class name filter: "
+		"msg-it-addr=%p, event-class-addr=%p, "
+		"event-class-name=\"%s\", skipped=%d",
+		msg_it, ec, ec->name->str, GPOINTER_TO_INT(skipped));
+	g_hash_table_insert(msg_it->skipped_event_classes, ec, skipped);
+
+end:
+	return GPOINTER_TO_INT(skipped);
+}
+
 static inline
 enum ctf_msg_iter_status set_current_event_class(struct ctf_msg_iter *msg_it)
 {
@@ -1274,6 +1352,12 @@ enum ctf_msg_iter_status set_current_event_class(struct ctf_msg_iter *msg_it)
 	}
 
 	msg_it->meta.ec = new_event_class;
+
+	if (G_UNLIKELY(msg_it->event_class_name_patterns)) {
+		msg_it->skip_event = event_class_is_skipped(msg_it,
+			new_event_class);
+	}
+
 	BT_COMP_LOGD("Set current event class: "
 		"msg-it-addr=%p, event-class-addr=%p, "
 		"event-class-id=%" PRId64 ", "
@@ -1345,7 +1429,7 @@ enum ctf_msg_iter_status after_event_header_state(
 		goto end;
 	}
 
-	if (G_UNLIKELY(msg_it->dry_run)) {
+	if (G_UNLIKELY(skip_ir_fields(msg_it))) {
 		goto next_state;
 	}
 
@@ -1379,7 +1463,7 @@ enum ctf_msg_iter_status read_event_common_context_begin_state(
 		goto end;
 	}
 
-	if (event_common_context_fc->in_ir && !msg_it->dry_run) {
+	if (event_common_context_fc->in_ir && !skip_ir_fields(msg_it)) {
 		BT_ASSERT_DBG(!msg_it->dscopes.event_common_context);
 		msg_it->dscopes.event_common_context =
 			bt_event_borrow_common_context_field(
@@ -1434,7 +1518,7 @@ enum ctf_msg_iter_status read_event_spec_context_begin_state(
 		goto end;
 	}
 
-	if (event_spec_context_fc->in_ir && !msg_it->dry_run) {
+	if (event_spec_context_fc->in_ir && !skip_ir_fields(msg_it)) {
 		BT_ASSERT_DBG(!msg_it->dscopes.event_spec_context);
 		msg_it->dscopes.event_spec_context =
 			bt_event_borrow_specific_context_field(
@@ -1492,7 +1576,7 @@ enum ctf_msg_iter_status read_event_payload_begin_state(
 		goto end;
 	}
 
-	if (event_payload_fc->in_ir && !msg_it->dry_run) {
+	if (event_payload_fc->in_ir && !skip_ir_fields(msg_it)) {
 		BT_ASSERT_DBG(!msg_it->dscopes.event_payload);
 		msg_it->dscopes.event_payload =
 			bt_event_borrow_payload_field(
@@ -1817,6 +1901,7 @@ void ctf_msg_iter_reset(struct ctf_msg_iter *msg_it)
 	msg_it->prev_packet_snapshots.beginning_clock = UINT64_C(-1);
 	msg_it->prev_packet_snapshots.end_clock = UINT64_C(-1);
 	msg_it->emit_stream_beginning_message = true;
+	msg_it->skip_event = false;
 }
 
 static
@@ -1976,7 +2061,7 @@ update_def_clock:
 			(uint64_t) int_fc->storing_index) = value;
 	}
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2012,7 +2097,7 @@ enum bt_bfcr_status bfcr_unsigned_int_char_cb(uint64_t value,
 	BT_ASSERT_DBG(!int_fc->mapped_clock_class);
 	BT_ASSERT_DBG(int_fc->storing_index < 0);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2065,7 +2150,7 @@ enum bt_bfcr_status bfcr_signed_int_cb(int64_t value,
 			(uint64_t) int_fc->storing_index) = (uint64_t) value;
 	}
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2095,7 +2180,7 @@ enum bt_bfcr_status bfcr_floating_point_cb(double value,
 		"fc-type=%d, fc-in-ir=%d, value=%f",
 		msg_it, msg_it->bfcr, fc, fc->type, fc->in_ir, value);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2128,7 +2213,7 @@ enum bt_bfcr_status bfcr_string_begin_cb(
 		"fc-type=%d, fc-in-ir=%d",
 		msg_it, msg_it->bfcr, fc, fc->type, fc->in_ir);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2166,7 +2251,7 @@ enum bt_bfcr_status bfcr_string_cb(const char *value,
 		msg_it, msg_it->bfcr, fc, fc->type, fc->in_ir,
 		len);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2199,7 +2284,7 @@ enum bt_bfcr_status bfcr_string_end_cb(
 		"fc-type=%d, fc-in-ir=%d",
 		msg_it, msg_it->bfcr, fc, fc->type, fc->in_ir);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2225,7 +2310,7 @@ enum bt_bfcr_status bfcr_compound_begin_cb(
 		"fc-type=%d, fc-in-ir=%d",
 		msg_it, msg_it->bfcr, fc, fc->type, fc->in_ir);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2276,7 +2361,7 @@ enum bt_bfcr_status bfcr_compound_end_cb(
 		"fc-type=%d, fc-in-ir=%d",
 		msg_it, msg_it->bfcr, fc, fc->type, fc->in_ir);
 
-	if (G_UNLIKELY(!fc->in_ir || msg_it->dry_run)) {
+	if (G_UNLIKELY(!fc->in_ir || skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2326,7 +2411,7 @@ int64_t bfcr_get_sequence_length_cb(struct ctf_field_class *fc, void *data)
 	length = (uint64_t) g_array_index(msg_it->stored_values, uint64_t,
 		seq_fc->stored_length_index);
 
-	if (G_UNLIKELY(msg_it->dry_run)){
+	if (G_UNLIKELY(skip_ir_fields(msg_it))) {
 		goto end;
 	}
 
@@ -2420,7 +2505,7 @@ struct ctf_field_class *bfcr_borrow_variant_selected_field_class_cb(
 	selected_option = ctf_field_class_variant_borrow_option_by_index(
 		var_fc, (uint64_t) option_index);
 
-	if (selected_option->fc->in_ir && !msg_it->dry_run) {
+	if (selected_option->fc->in_ir && !skip_ir_fields(msg_it)) {
 		bt_field *var_field = stack_top(msg_it->stack)->base;
 
 		ret = bt_field_variant_select_option_by_index(
@@ -2845,6 +2930,10 @@ void ctf_msg_iter_destroy(struct ctf_msg_iter *msg_it)
 		g_array_free(msg_it->stored_values, TRUE);
 	}
 
+	if (msg_it->skipped_event_classes) {
+		g_hash_table_destroy(msg_it->skipped_event_classes);
+	}
+
 	g_free(msg_it);
 }
 
@@ -2873,6 +2962,11 @@ enum ctf_msg_iter_status ctf_msg_iter_get_next_message(
 
 		switch (msg_it->state) {
 		case STATE_EMIT_MSG_EVENT:
+			if (G_UNLIKELY(msg_it->skip_event)) {
+				/* No event message for this event record */
+				break;
+			}
+
 			BT_ASSERT_DBG(msg_it->event_msg);
 
 			/*
@@ -3170,3 +3264,23 @@ void ctf_msg_iter_set_dry_run(struct ctf_msg_iter *msg_it,
 {
 	msg_it->dry_run = val;
 }
+
+BT_HIDDEN
+void ctf_msg_iter_set_event_class_name_filter(struct ctf_msg_iter *msg_it,
+		const GPtrArray *patterns)
+{
+	BT_ASSERT(msg_it);
+
+	if (msg_it->skipped_event_classes) {
+		g_hash_table_destroy(msg_it->skipped_event_classes);
+		msg_it->skipped_event_classes = NULL;
+	}
+
+	msg_it->event_class_name_patterns = patterns;
+
+	if (patterns) {
+		msg_it->skipped_event_classes = g_hash_table_new(g_direct_hash,
+			g_direct_equal);
+		BT_ASSERT(msg_it->skipped_event_classes);
+	}
+}
@@ -333,6 +333,23 @@ BT_HIDDEN
 void ctf_msg_iter_set_dry_run(struct ctf_msg_iter *msg_it,
 		bool val);
 
+/*
+ * Only creates event messages for the event records of which the event
+ * class name matches at least one of the star globbing patterns
+ * `patterns` (array of normalized `const char *`, see
+ * bt_common_normalize_star_glob_pattern()).
+ *
+ * The message iterator still decodes the other event records to find
+ * where they end, but without creating any event message or trace IR
+ * field.
+ *
+ * `patterns` must exist as long as `msg_it` exists. Pass `NULL` to
+ * create event messages for all the event records.
+ */
+BT_HIDDEN
+void ctf_msg_iter_set_event_class_name_filter(struct ctf_msg_iter *msg_it,
+		const GPtrArray *patterns);
+
 static inline
 const char *ctf_msg_iter_medium_status_string(
 		enum ctf_msg_iter_medium_status status)
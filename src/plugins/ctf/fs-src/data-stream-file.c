@@ -36,6 +36,7 @@
 #include "compat/mman.h"
 #include "compat/endian.h"
 #include <babeltrace2/babeltrace.h>
+#include "common/align.h"
 #include "common/common.h"
 #include "file.h"
 #include "metadata.h"
@@ -88,6 +89,8 @@ enum ctf_msg_iter_medium_status ds_file_munmap(
 	}
 
 	ds_file->mmap_addr = NULL;
+	ds_file->mmap_len = 0;
+	ds_file->request_offset_in_mapping = 0;
 
 	status = CTF_MSG_ITER_MEDIUM_STATUS_OK;
 end:
@@ -159,12 +162,120 @@ enum ctf_msg_iter_medium_status ds_file_mmap(
 		goto end;
 	}
 
+	if (ds_file->mmap_config.advise) {
+		int advise_ret = bt_madvise(ds_file->mmap_addr,
+			ds_file->mmap_len, BT_MADV_SEQUENTIAL);
+
+		if (advise_ret) {
+			BT_COMP_LOGD("Cannot give sequential access hint for memory mapping: "
+				"address=%p, size=%zu, error=%d",
+				ds_file->mmap_addr, ds_file->mmap_len,
+				advise_ret);
+		}
+	}
+
 	status = CTF_MSG_ITER_MEDIUM_STATUS_OK;
 
 end:
 	return status;
 }
 
+/*
+ * Like ds_file_mmap(), but with the `CTF_FS_MMAP_MODE_PACKET` mode,
+ * ensure that the whole packet described by `index_entry` is in the
+ * mapping, growing the mapping window if needed.
+ *
+ * This avoids remapping the file while decoding a packet.
+ */
+static
+enum ctf_msg_iter_medium_status ds_file_mmap_packet(
+		struct ctf_fs_ds_file *ds_file,
+		const struct ctf_fs_ds_index_entry *index_entry)
+{
+	enum ctf_msg_iter_medium_status status;
+	off_t packet_offset = index_entry->offset;
+	off_t packet_end = index_entry->offset + index_entry->packet_size;
+
+	if (ds_file->mmap_config.mode != CTF_FS_MMAP_MODE_PACKET) {
+		goto map;
+	}
+
+	if (ds_file->mmap_addr && offset_ist_mapped(ds_file, packet_offset) &&
+			packet_end <= ds_file->mmap_offset_in_file +
+				(off_t) ds_file->mmap_len) {
+		goto map;
+	}
+
+	if (index_entry->packet_size < SIZE_MAX / 2) {
+		size_t offset_align =
+			bt_mmap_get_offset_align_size(ds_file->log_level);
+		size_t window_len = ALIGN((size_t) (packet_offset % offset_align) +
+			(size_t) index_entry->packet_size, offset_align);
+
+		if (window_len > ds_file->mmap_max_len) {
+			ds_file->mmap_max_len = window_len;
+		}
+	}
+
+	/* Force a new mapping starting at the packet's beginning. */
+	status = ds_file_munmap(ds_file);
+	if (status != CTF_MSG_ITER_MEDIUM_STATUS_OK) {
+		goto end;
+	}
+
+map:
+	status = ds_file_mmap(ds_file, packet_offset);
+
+end:
+	return status;
+}
+
+/*
+ * Hint the kernel that we're about to read the packet described by
+ * `index_entry`, if it's part of the current mapping of `ds_file`.
+ */
+static
+void ds_file_prefetch_packet(struct ctf_fs_ds_file *ds_file,
+		const struct ctf_fs_ds_index_entry *index_entry)
+{
+	size_t offset_align;
+	off_t mapping_end;
+	off_t range_begin, range_end;
+	int ret;
+	bt_self_component *self_comp = ds_file->self_comp;
+	bt_logging_level log_level = ds_file->log_level;
+
+	if (!ds_file->mmap_config.advise || !ds_file->mmap_addr) {
+		goto end;
+	}
+
+	mapping_end = ds_file->mmap_offset_in_file + ds_file->mmap_len;
+	range_begin = MAX((off_t) index_entry->offset, ds_file->mmap_offset_in_file);
+	range_end = MIN((off_t) (index_entry->offset + index_entry->packet_size),
+		mapping_end);
+	if (range_begin >= range_end) {
+		goto end;
+	}
+
+	/* The hinted range must start on a page boundary. */
+	offset_align = bt_mmap_get_offset_align_size(log_level);
+	range_begin = ds_file->mmap_offset_in_file +
+		ALIGN_FLOOR((size_t) (range_begin - ds_file->mmap_offset_in_file),
+			offset_align);
+	ret = bt_madvise((uint8_t *) ds_file->mmap_addr +
+			(range_begin - ds_file->mmap_offset_in_file),
+		range_end - range_begin, BT_MADV_WILLNEED);
+	if (ret) {
+		BT_COMP_LOGD("Cannot give prefetch hint for packet: "
+			"file-path=\"%s\", offset=%" PRIu64 ", size=%" PRIu64 ", "
+			"error=%d", ds_file->file->path->str,
+			index_entry->offset, index_entry->packet_size, ret);
+	}
+
+end:
+	return;
+}
+
 /*
  * Change the mapping of the file to read the region that follows the current
  * mapping.
@@ -392,7 +503,7 @@ enum ctf_msg_iter_medium_status ctf_fs_ds_group_medops_set_file(
 	 * Ensure the right portion of the file will be returned on the next
 	 * request_bytes call.
 	 */
-	status = ds_file_mmap(data->file, index_entry->offset);
+	status = ds_file_mmap_packet(data->file, index_entry);
 	if (status != CTF_MSG_ITER_MEDIUM_STATUS_OK) {
 		goto end;
 	}
@@ -433,6 +544,23 @@ enum ctf_msg_iter_medium_status medop_group_switch_packet(void *void_data)
 
 	data->next_index_entry_index++;
 
+	/*
+	 * Prefetch the packet we're about to read as well as the next one,
+	 * if it's in the same data stream file.
+	 */
+	ds_file_prefetch_packet(data->file, index_entry);
+
+	if (data->next_index_entry_index <
+			data->ds_file_group->index->entries->len) {
+		struct ctf_fs_ds_index_entry *next_index_entry =
+			g_ptr_array_index(data->ds_file_group->index->entries,
+				data->next_index_entry_index);
+
+		if (strcmp(next_index_entry->path, index_entry->path) == 0) {
+			ds_file_prefetch_packet(data->file, next_index_entry);
+		}
+	}
+
 	status = CTF_MSG_ITER_MEDIUM_STATUS_OK;
 end:
 	return status;
@@ -918,6 +1046,335 @@ error:
 	goto end;
 }
 
+/*
+ * Packet index cache file format.
+ *
+ * All the fields are little-endian. The header is followed by
+ * `entry_count` entries.
+ *
+ * The cache file of a given data stream file is only valid if its
+ * `file_size` and `file_mtime_ns` fields match the current size and last
+ * modification time (nanoseconds since Epoch) of the data stream file:
+ * a data stream file which is rewritten within the same second with the
+ * same size is detected on platforms which provide the nanosecond part
+ * of the modification time.
+ *
+ * The cache only contains raw clock values: nanoseconds from origin are
+ * computed again when loading the cache so that a cache file remains
+ * valid whatever the clock class offset parameters of the component.
+ */
+#define CTF_FS_INDEX_CACHE_MAGIC	UINT32_C(0xb7c1dc0e)
+#define CTF_FS_INDEX_CACHE_VERSION	UINT32_C(2)
+#define CTF_FS_INDEX_CACHE_SUFFIX	".bt2-idx"
+
+struct ctf_fs_index_cache_file_hdr {
+	uint32_t magic;
+	uint32_t version;
+	uint64_t file_size;
+	int64_t file_mtime_ns;
+	uint64_t entry_count;
+} __attribute__((__packed__));
+
+struct ctf_fs_index_cache_entry {
+	uint64_t offset;
+	uint64_t packet_size;
+	uint64_t timestamp_begin;
+	uint64_t timestamp_end;
+	uint64_t packet_seq_num;
+} __attribute__((__packed__));
+
+/*
+ * Returns the path of the packet index cache file of `ds_file` within
+ * `index_cache_dir`.
+ *
+ * The cache file name is a digest of the absolute path of the data
+ * stream file so that a single cache directory can serve many traces.
+ *
+ * The result must be freed using g_free().
+ */
+static
+gchar *index_cache_file_path(struct ctf_fs_ds_file *ds_file,
+		const char *index_cache_dir)
+{
+	gchar *digest;
+	gchar *basename;
+	gchar *path;
+
+	digest = g_compute_checksum_for_string(G_CHECKSUM_SHA256,
+		ds_file->file->path->str, -1);
+	basename = g_strconcat(digest, CTF_FS_INDEX_CACHE_SUFFIX, NULL);
+	path = g_build_filename(index_cache_dir, basename, NULL);
+	g_free(basename);
+	g_free(digest);
+	return path;
+}
+
+static
+struct ctf_fs_ds_index *build_index_from_cache_file(
+		struct ctf_fs_ds_file *ds_file,
+		struct ctf_fs_ds_file_info *file_info,
+		struct ctf_msg_iter *msg_iter,
+		const char *index_cache_dir)
+{
+	int ret;
+	gchar *cache_file_path = NULL;
+	GMappedFile *mapped_file = NULL;
+	gsize filesize;
+	const char *mmap_begin;
+	const struct ctf_fs_index_cache_file_hdr *header;
+	const struct ctf_fs_index_cache_entry *file_entries;
+	struct ctf_fs_ds_index *index = NULL;
+	struct ctf_fs_ds_index_entry *index_entry = NULL;
+	struct ctf_stream_class *sc;
+	struct ctf_msg_iter_packet_properties props;
+	uint64_t expected_offset = 0;
+	uint64_t entry_count;
+	uint64_t i;
+	bt_self_component *self_comp = ds_file->self_comp;
+	bt_logging_level log_level = ds_file->log_level;
+
+	cache_file_path = index_cache_file_path(ds_file, index_cache_dir);
+	mapped_file = g_mapped_file_new(cache_file_path, FALSE, NULL);
+	if (!mapped_file) {
+		BT_COMP_LOGD("No packet index cache file for stream file: "
+			"stream-file-path=\"%s\", cache-file-path=\"%s\"",
+			ds_file->file->path->str, cache_file_path);
+		goto error;
+	}
+
+	BT_COMP_LOGI("Building index from cache file of stream file %s: "
+		"cache-file-path=\"%s\"", ds_file->file->path->str,
+		cache_file_path);
+	filesize = g_mapped_file_get_length(mapped_file);
+	if (filesize < sizeof(*header)) {
+		BT_COMP_LOGW("Invalid packet index cache file: "
+			"file size (%zu bytes) < header size (%zu bytes)",
+			filesize, sizeof(*header));
+		goto error;
+	}
+
+	mmap_begin = g_mapped_file_get_contents(mapped_file);
+	header = (const struct ctf_fs_index_cache_file_hdr *) mmap_begin;
+	if (le32toh(header->magic) != CTF_FS_INDEX_CACHE_MAGIC ||
+			le32toh(header->version) != CTF_FS_INDEX_CACHE_VERSION) {
+		BT_COMP_LOGW_STR("Invalid packet index cache file: "
+			"unknown magic number or version.");
+		goto error;
+	}
+
+	if (le64toh(header->file_size) != (uint64_t) ds_file->file->size ||
+			(int64_t) le64toh(header->file_mtime_ns) !=
+				ds_file->file->mtime_ns) {
+		BT_COMP_LOGI("Stale packet index cache file: "
+			"cached-file-size=%" PRIu64 ", file-size=%jd, "
+			"cached-file-mtime-ns=%" PRId64 ", file-mtime-ns=%" PRId64,
+			le64toh(header->file_size),
+			(intmax_t) ds_file->file->size,
+			(int64_t) le64toh(header->file_mtime_ns),
+			ds_file->file->mtime_ns);
+		goto error;
+	}
+
+	entry_count = le64toh(header->entry_count);
+	if ((filesize - sizeof(*header)) / sizeof(*file_entries) !=
+			entry_count ||
+			(filesize - sizeof(*header)) % sizeof(*file_entries)) {
+		BT_COMP_LOGW("Invalid packet index cache file: "
+			"unexpected file size: file-size=%zu, entry-count=%" PRIu64,
+			filesize, entry_count);
+		goto error;
+	}
+
+	ret = ctf_msg_iter_get_packet_properties(msg_iter, &props);
+	if (ret) {
+		BT_COMP_LOGI_STR("Cannot read first packet's header and context fields.");
+		goto error;
+	}
+
+	sc = ctf_trace_class_borrow_stream_class_by_id(ds_file->metadata->tc,
+		props.stream_class_id);
+	BT_ASSERT(sc);
+
+	index = ctf_fs_ds_index_create(ds_file->log_level, ds_file->self_comp);
+	if (!index) {
+		goto error;
+	}
+
+	file_entries = (const struct ctf_fs_index_cache_entry *)
+		(mmap_begin + sizeof(*header));
+
+	for (i = 0; i < entry_count; i++) {
+		const struct ctf_fs_index_cache_entry *file_entry =
+			&file_entries[i];
+
+		index_entry = ctf_fs_ds_index_entry_create(
+			ds_file->self_comp, ds_file->log_level);
+		if (!index_entry) {
+			BT_COMP_LOGE_APPEND_CAUSE(ds_file->self_comp,
+				"Failed to create a ctf_fs_ds_index_entry.");
+			goto error;
+		}
+
+		/* Set path to stream file. */
+		index_entry->path = file_info->path->str;
+		index_entry->offset = le64toh(file_entry->offset);
+		index_entry->packet_size = le64toh(file_entry->packet_size);
+		index_entry->packet_seq_num = le64toh(file_entry->packet_seq_num);
+
+		/* Packets must be contiguous and cover the whole file. */
+		if (index_entry->offset != expected_offset ||
+				index_entry->packet_size == 0) {
+			BT_COMP_LOGW("Invalid packet index cache file: "
+				"unexpected packet offset or size: "
+				"expected-offset=%" PRIu64 ", offset=%" PRIu64 ", "
+				"packet-size=%" PRIu64, expected_offset,
+				index_entry->offset, index_entry->packet_size);
+			goto error;
+		}
+
+		expected_offset += index_entry->packet_size;
+		index_entry->timestamp_begin = le64toh(file_entry->timestamp_begin);
+		index_entry->timestamp_end = le64toh(file_entry->timestamp_end);
+		index_entry->timestamp_begin_ns = UINT64_C(-1);
+		index_entry->timestamp_end_ns = UINT64_C(-1);
+
+		/* Convert the packet's bound to nanoseconds since Epoch. */
+		if (index_entry->timestamp_begin != UINT64_C(-1)) {
+			BT_ASSERT(sc->default_clock_class);
+			ret = convert_cycles_to_ns(sc->default_clock_class,
+				index_entry->timestamp_begin,
+				&index_entry->timestamp_begin_ns);
+			if (ret) {
+				BT_COMP_LOGI_STR("Failed to convert raw timestamp to nanoseconds since Epoch.");
+				goto error;
+			}
+		}
+
+		if (index_entry->timestamp_end != UINT64_C(-1)) {
+			BT_ASSERT(sc->default_clock_class);
+			ret = convert_cycles_to_ns(sc->default_clock_class,
+				index_entry->timestamp_end,
+				&index_entry->timestamp_end_ns);
+			if (ret) {
+				BT_COMP_LOGI_STR("Failed to convert raw timestamp to nanoseconds since Epoch.");
+				goto error;
+			}
+		}
+
+		/* Give ownership of `index_entry` to `index->entries`. */
+		g_ptr_array_add(index->entries, index_entry);
+		index_entry = NULL;
+	}
+
+	if (expected_offset != (uint64_t) ds_file->file->size) {
+		BT_COMP_LOGW("Invalid packet index cache file; indexed size != stream file size: "
+			"file-size=%jd, total-packets-size=%" PRIu64,
+			(intmax_t) ds_file->file->size, expected_offset);
+		goto error;
+	}
+
+	goto end;
+
+error:
+	ctf_fs_ds_index_destroy(index);
+	g_free(index_entry);
+	index = NULL;
+
+end:
+	g_free(cache_file_path);
+	if (mapped_file) {
+		g_mapped_file_unref(mapped_file);
+	}
+
+	return index;
+}
+
+/*
+ * Saves `index`, the packet index of `ds_file`, to a cache file in
+ * `index_cache_dir`.
+ *
+ * Failing to save the cache file is not an error: the next index build
+ * simply scans the data stream file again.
+ */
+static
+void save_index_to_cache_file(struct ctf_fs_ds_file *ds_file,
+		struct ctf_fs_ds_index *index, const char *index_cache_dir)
+{
+	gchar *cache_file_path = NULL;
+	GByteArray *contents = NULL;
+	GError *gerror = NULL;
+	struct ctf_fs_index_cache_file_hdr header;
+	guint i;
+	bt_self_component *self_comp = ds_file->self_comp;
+	bt_logging_level log_level = ds_file->log_level;
+
+	if (g_mkdir_with_parents(index_cache_dir, 0755)) {
+		BT_COMP_LOGW_ERRNO("Cannot create packet index cache directory",
+			": path=\"%s\"", index_cache_dir);
+		goto end;
+	}
+
+	contents = g_byte_array_sized_new(sizeof(header) +
+		index->entries->len * sizeof(struct ctf_fs_index_cache_entry));
+	if (!contents) {
+		BT_COMP_LOGW_STR("Failed to allocate packet index cache contents.");
+		goto end;
+	}
+
+	header.magic = htole32(CTF_FS_INDEX_CACHE_MAGIC);
+	header.version = htole32(CTF_FS_INDEX_CACHE_VERSION);
+	header.file_size = htole64((uint64_t) ds_file->file->size);
+	header.file_mtime_ns = htole64(ds_file->file->mtime_ns);
+	header.entry_count = htole64((uint64_t) index->entries->len);
+	g_byte_array_append(contents, (const guint8 *) &header,
+		sizeof(header));
+
+	for (i = 0; i < index->entries->len; i++) {
+		const struct ctf_fs_ds_index_entry *index_entry =
+			g_ptr_array_index(index->entries, i);
+		struct ctf_fs_index_cache_entry file_entry;
+
+		file_entry.offset = htole64(index_entry->offset);
+		file_entry.packet_size = htole64(index_entry->packet_size);
+		file_entry.timestamp_begin =
+			htole64(index_entry->timestamp_begin);
+		file_entry.timestamp_end = htole64(index_entry->timestamp_end);
+		file_entry.packet_seq_num =
+			htole64(index_entry->packet_seq_num);
+		g_byte_array_append(contents, (const guint8 *) &file_entry,
+			sizeof(file_entry));
+	}
+
+	/*
+	 * g_file_set_contents() writes to a temporary file and then
+	 * renames it, so that concurrent readers never see a partial
+	 * cache file.
+	 */
+	cache_file_path = index_cache_file_path(ds_file, index_cache_dir);
+	if (!g_file_set_contents(cache_file_path, (const gchar *) contents->data,
+			contents->len, &gerror)) {
+		BT_COMP_LOGW("Cannot write packet index cache file: "
+			"path=\"%s\", error=\"%s\"", cache_file_path,
+			gerror->message);
+		goto end;
+	}
+
+	BT_COMP_LOGI("Saved packet index cache file of stream file %s: "
+		"cache-file-path=\"%s\", entry-count=%u",
+		ds_file->file->path->str, cache_file_path, index->entries->len);
+
+end:
+	if (gerror) {
+		g_error_free(gerror);
+	}
+
+	if (contents) {
+		g_byte_array_free(contents, TRUE);
+	}
+
+	g_free(cache_file_path);
+}
+
 BT_HIDDEN
 struct ctf_fs_ds_file *ctf_fs_ds_file_create(
 		struct ctf_fs_trace *ctf_fs_trace,
@@ -950,8 +1407,28 @@ struct ctf_fs_ds_file *ctf_fs_ds_file_create(
 		goto error;
 	}
 
+	ds_file->mmap_config = ctf_fs_trace->mmap_config;
 	ds_file->mmap_max_len = offset_align * 2048;
 
+	if (ds_file->mmap_config.window_size > 0) {
+		ds_file->mmap_max_len = ALIGN((size_t) MIN(
+			ds_file->mmap_config.window_size,
+			(uint64_t) (SIZE_MAX / 2)), offset_align);
+	}
+
+	if (ds_file->mmap_config.mode == CTF_FS_MMAP_MODE_WHOLE_FILE) {
+		if (sizeof(size_t) >= sizeof(uint64_t)) {
+			ds_file->mmap_max_len = MAX(ds_file->mmap_max_len,
+				ALIGN((size_t) ds_file->file->size, offset_align));
+		} else {
+			BT_COMP_LOG_CUR_LVL(BT_LOG_INFO, log_level,
+				ds_file->self_comp,
+				"Cannot map whole data stream file with a 32-bit address space; "
+				"falling back to fixed-size windows: path=\"%s\"",
+				path);
+		}
+	}
+
 	goto end;
 
 error:
@@ -967,7 +1444,8 @@ BT_HIDDEN
 struct ctf_fs_ds_index *ctf_fs_ds_file_build_index(
 		struct ctf_fs_ds_file *ds_file,
 		struct ctf_fs_ds_file_info *file_info,
-		struct ctf_msg_iter *msg_iter)
+		struct ctf_msg_iter *msg_iter,
+		const char *index_cache_dir)
 {
 	struct ctf_fs_ds_index *index;
 	bt_self_component *self_comp = ds_file->self_comp;
@@ -978,9 +1456,21 @@ struct ctf_fs_ds_index *ctf_fs_ds_file_build_index(
 		goto end;
 	}
 
+	if (index_cache_dir) {
+		index = build_index_from_cache_file(ds_file, file_info,
+			msg_iter, index_cache_dir);
+		if (index) {
+			goto end;
+		}
+	}
+
 	BT_COMP_LOGI("Failed to build index from .index file; "
 		"falling back to stream indexing.");
 	index = build_index_from_stream_file(ds_file, file_info, msg_iter);
+	if (index && index_cache_dir) {
+		save_index_to_cache_file(ds_file, index, index_cache_dir);
+	}
+
 end:
 	return index;
 }
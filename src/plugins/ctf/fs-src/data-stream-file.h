@@ -49,6 +49,39 @@ struct ctf_fs_ds_file_info {
 
 struct ctf_fs_metadata;
 
+enum ctf_fs_mmap_mode {
+	/* Map fixed-size windows of the data stream file. */
+	CTF_FS_MMAP_MODE_FIXED,
+
+	/*
+	 * Map the whole data stream file at once. Falls back to
+	 * `CTF_FS_MMAP_MODE_FIXED` on hosts with a 32-bit address space.
+	 */
+	CTF_FS_MMAP_MODE_WHOLE_FILE,
+
+	/*
+	 * Map windows which are large enough to contain whole packets,
+	 * as described by the packet index of the data stream file.
+	 */
+	CTF_FS_MMAP_MODE_PACKET,
+};
+
+struct ctf_fs_mmap_config {
+	enum ctf_fs_mmap_mode mode;
+
+	/*
+	 * Size of the windows to map, in bytes, or 0 to use the default
+	 * size.
+	 */
+	uint64_t window_size;
+
+	/*
+	 * Whether or not to give the kernel access pattern hints
+	 * (sequential access, prefetching of the packets to read).
+	 */
+	bool advise;
+};
+
 struct ctf_fs_ds_file {
 	bt_logging_level log_level;
 
@@ -67,6 +100,8 @@ struct ctf_fs_ds_file {
 	/* Owned by this */
 	bt_stream *stream;
 
+	struct ctf_fs_mmap_config mmap_config;
+
 	void *mmap_addr;
 
 	/*
@@ -98,11 +133,19 @@ struct ctf_fs_ds_file *ctf_fs_ds_file_create(
 BT_HIDDEN
 void ctf_fs_ds_file_destroy(struct ctf_fs_ds_file *stream);
 
+/*
+ * Build the packet index of `ds_file`.
+ *
+ * If `index_cache_dir` is not NULL, try to load the index from a cache
+ * file in this directory before scanning the whole data stream file,
+ * and save the index resulting from such a scan to this directory.
+ */
 BT_HIDDEN
 struct ctf_fs_ds_index *ctf_fs_ds_file_build_index(
 		struct ctf_fs_ds_file *ds_file,
 		struct ctf_fs_ds_file_info *ds_file_info,
-		struct ctf_msg_iter *msg_iter);
+		struct ctf_msg_iter *msg_iter,
+		const char *index_cache_dir);
 
 BT_HIDDEN
 struct ctf_fs_ds_index *ctf_fs_ds_index_create(bt_logging_level log_level,
@@ -25,6 +25,7 @@
 #define BT_LOG_TAG "PLUGIN/SRC.CTF.FS/FILE"
 #include "logging/comp-logging.h"
 
+#include <stdint.h>
 #include <stdio.h>
 #include <sys/types.h>
 #include <sys/stat.h>
@@ -109,6 +110,12 @@ int ctf_fs_file_open(struct ctf_fs_file *file, const char *mode)
 	}
 
 	file->size = stat.st_size;
+	file->mtime_ns = (int64_t) stat.st_mtime * INT64_C(1000000000);
+#if defined(HAVE_STRUCT_STAT_ST_MTIM_TV_NSEC)
+	file->mtime_ns += (int64_t) stat.st_mtim.tv_nsec;
+#elif defined(HAVE_STRUCT_STAT_ST_MTIMESPEC_TV_NSEC)
+	file->mtime_ns += (int64_t) stat.st_mtimespec.tv_nsec;
+#endif
 	BT_COMP_LOGI("File is %jd bytes", (intmax_t) file->size);
 	goto end;
 
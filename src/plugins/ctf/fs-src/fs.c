@@ -265,6 +265,9 @@ bt_component_class_message_iterator_initialize_method_status ctf_fs_iterator_ini
 		goto error;
 	}
 
+	ctf_msg_iter_set_event_class_name_filter(msg_iter_data->msg_iter,
+		port_data->ctf_fs->event_class_name_patterns);
+
 	/*
 	 * This iterator can seek forward if its stream class has a default
 	 * clock class.
@@ -311,6 +314,7 @@ void ctf_fs_trace_destroy(struct ctf_fs_trace *ctf_fs_trace)
 		g_free(ctf_fs_trace->metadata);
 	}
 
+	g_free(ctf_fs_trace->index_cache_dir);
 	g_free(ctf_fs_trace);
 }
 
@@ -327,6 +331,11 @@ void ctf_fs_destroy(struct ctf_fs_component *ctf_fs)
 		g_ptr_array_free(ctf_fs->port_data, TRUE);
 	}
 
+	if (ctf_fs->event_class_name_patterns) {
+		g_ptr_array_free(ctf_fs->event_class_name_patterns, TRUE);
+	}
+
+	g_free(ctf_fs->index_cache_dir);
 	g_free(ctf_fs);
 }
 
@@ -799,7 +808,8 @@ int add_ds_file_to_ds_file_group(struct ctf_fs_trace *ctf_fs_trace,
 		goto error;
 	}
 
-	index = ctf_fs_ds_file_build_index(ds_file, ds_file_info, msg_iter);
+	index = ctf_fs_ds_file_build_index(ds_file, ds_file_info, msg_iter,
+		ctf_fs_trace->index_cache_dir);
 	if (!index) {
 		BT_COMP_OR_COMP_CLASS_LOGE_APPEND_CAUSE(
 			self_comp, self_comp_class,
@@ -1055,6 +1065,8 @@ struct ctf_fs_trace *ctf_fs_trace_create(
 		bt_self_component_class *self_comp_class,
 		const char *path, const char *name,
 		struct ctf_fs_metadata_config *metadata_config,
+		const struct ctf_fs_mmap_config *mmap_config,
+		const char *index_cache_dir,
 		bt_logging_level log_level)
 {
 	struct ctf_fs_trace *ctf_fs_trace;
@@ -1076,6 +1088,9 @@ struct ctf_fs_trace *ctf_fs_trace_create(
 		goto error;
 	}
 
+	ctf_fs_trace->mmap_config = *mmap_config;
+	ctf_fs_trace->index_cache_dir = g_strdup(index_cache_dir);
+
 	ctf_fs_trace->metadata = g_new0(struct ctf_fs_metadata, 1);
 	if (!ctf_fs_trace->metadata) {
 		goto error;
@@ -1200,7 +1215,8 @@ int ctf_fs_component_create_ctf_fs_trace_one_path(
 	}
 
 	ctf_fs_trace = ctf_fs_trace_create(self_comp, self_comp_class, norm_path->str,
-		trace_name, &ctf_fs->metadata_config, log_level);
+		trace_name, &ctf_fs->metadata_config, &ctf_fs->mmap_config,
+		ctf_fs->index_cache_dir, log_level);
 	if (!ctf_fs_trace) {
 		BT_COMP_OR_COMP_CLASS_LOGE_APPEND_CAUSE(self_comp, self_comp_class,
 			"Cannot create trace for `%s`.",
@@ -2314,6 +2330,12 @@ static const struct bt_param_validation_value_descr inputs_elem_descr = {
 	.type = BT_VALUE_TYPE_STRING,
 };
 
+static const struct bt_param_validation_value_descr event_class_names_elem_descr = {
+	.type = BT_VALUE_TYPE_STRING,
+};
+
+static const char *mmap_mode_choices[] = { "fixed", "whole-file", "packet", NULL };
+
 static const struct bt_param_validation_map_value_entry_descr fs_params_entries_descr[] = {
 	{ "inputs", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_MANDATORY, {
 		BT_VALUE_TYPE_ARRAY,
@@ -2327,6 +2349,20 @@ static const struct bt_param_validation_map_value_entry_descr fs_params_entries_
 	{ "clock-class-offset-s", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_SIGNED_INTEGER } },
 	{ "clock-class-offset-ns", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_SIGNED_INTEGER } },
 	{ "force-clock-class-origin-unix-epoch", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_BOOL } },
+	{ "index-cache-dir", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_STRING } },
+	{ "mmap-mode", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { BT_VALUE_TYPE_STRING, .string = {
+		.choices = mmap_mode_choices,
+	} } },
+	{ "mmap-window-size", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_UNSIGNED_INTEGER } },
+	{ "mmap-advise", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_BOOL } },
+	{ "event-class-names", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, {
+		BT_VALUE_TYPE_ARRAY,
+		.array = {
+			.min_length = 0,
+			.max_length = BT_PARAM_VALIDATION_INFINITE,
+			.element_type = &event_class_names_elem_descr,
+		}
+	}},
 	BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_END
 };
 
@@ -2379,6 +2415,76 @@ bool read_src_fs_parameters(const bt_value *params,
 			bt_value_bool_get(value);
 	}
 
+	/* index-cache-dir parameter */
+	value = bt_value_map_borrow_entry_value_const(params,
+		"index-cache-dir");
+	if (value) {
+		g_free(ctf_fs->index_cache_dir);
+		ctf_fs->index_cache_dir = g_strdup(bt_value_string_get(value));
+	}
+
+	/* mmap-mode parameter */
+	value = bt_value_map_borrow_entry_value_const(params, "mmap-mode");
+	if (value) {
+		const char *mmap_mode = bt_value_string_get(value);
+
+		if (strcmp(mmap_mode, "fixed") == 0) {
+			ctf_fs->mmap_config.mode = CTF_FS_MMAP_MODE_FIXED;
+		} else if (strcmp(mmap_mode, "whole-file") == 0) {
+			ctf_fs->mmap_config.mode = CTF_FS_MMAP_MODE_WHOLE_FILE;
+		} else {
+			BT_ASSERT(strcmp(mmap_mode, "packet") == 0);
+			ctf_fs->mmap_config.mode = CTF_FS_MMAP_MODE_PACKET;
+		}
+	}
+
+	/* mmap-window-size parameter */
+	value = bt_value_map_borrow_entry_value_const(params,
+		"mmap-window-size");
+	if (value) {
+		ctf_fs->mmap_config.window_size =
+			bt_value_integer_unsigned_get(value);
+		if (ctf_fs->mmap_config.window_size == 0) {
+			BT_COMP_OR_COMP_CLASS_LOGE_APPEND_CAUSE(self_comp,
+				self_comp_class,
+				"`mmap-window-size` parameter must be greater than 0.");
+			ret = false;
+			goto end;
+		}
+	}
+
+	/* mmap-advise parameter */
+	value = bt_value_map_borrow_entry_value_const(params, "mmap-advise");
+	if (value) {
+		ctf_fs->mmap_config.advise = bt_value_bool_get(value);
+	}
+
+	/* event-class-names parameter */
+	value = bt_value_map_borrow_entry_value_const(params,
+		"event-class-names");
+	if (value) {
+		uint64_t i;
+
+		if (ctf_fs->event_class_name_patterns) {
+			g_ptr_array_free(ctf_fs->event_class_name_patterns,
+				TRUE);
+		}
+
+		ctf_fs->event_class_name_patterns =
+			g_ptr_array_new_with_free_func(g_free);
+		BT_ASSERT(ctf_fs->event_class_name_patterns);
+
+		for (i = 0; i < bt_value_array_get_length(value); i++) {
+			gchar *pattern = g_strdup(bt_value_string_get(
+				bt_value_array_borrow_element_by_index_const(
+					value, i)));
+
+			bt_common_normalize_star_glob_pattern(pattern);
+			g_ptr_array_add(ctf_fs->event_class_name_patterns,
+				pattern);
+		}
+	}
+
 	/* trace-name parameter */
 	*trace_name = bt_value_map_borrow_entry_value_const(params, "trace-name");
 
@@ -51,6 +51,12 @@ struct ctf_fs_file {
 	FILE *fp;
 
 	off_t size;
+
+	/*
+	 * Last modification time (nanoseconds since Epoch; the
+	 * nanosecond part is 0 if the platform doesn't provide it)
+	 */
+	int64_t mtime_ns;
 };
 
 struct ctf_fs_metadata {
@@ -79,6 +85,21 @@ struct ctf_fs_component {
 	struct ctf_fs_trace *trace;
 
 	struct ctf_fs_metadata_config metadata_config;
+
+	struct ctf_fs_mmap_config mmap_config;
+
+	/*
+	 * Directory in which to load and save packet index caches, or
+	 * NULL if the index cache is disabled. Owned by this.
+	 */
+	gchar *index_cache_dir;
+
+	/*
+	 * Array of normalized star globbing patterns (`gchar *`, owned
+	 * by this) of the names of the event classes of which to emit
+	 * event messages, or NULL to emit all the event messages.
+	 */
+	GPtrArray *event_class_name_patterns;
 };
 
 struct ctf_fs_trace {
@@ -106,6 +127,15 @@ struct ctf_fs_trace {
 
 	/* Next automatic stream ID when not provided by packet header */
 	uint64_t next_stream_id;
+
+	/* Memory mapping policy of the data stream files */
+	struct ctf_fs_mmap_config mmap_config;
+
+	/*
+	 * Directory in which to load and save packet index caches, or
+	 * NULL if the index cache is disabled. Owned by this.
+	 */
+	gchar *index_cache_dir;
 };
 
 struct ctf_fs_ds_index_entry {
@@ -280,6 +310,12 @@ void ctf_fs_destroy(struct ctf_fs_component *ctf_fs);
  *    present, are recorded in the `ctf_fs` structure.
  *  - The optional `trace-name` parameter is returned in `*trace_name` if
  *    present, else `*trace_name` is set to NULL.
+ *  - The optional `index-cache-dir` parameter, if present, is recorded in
+ *    the `ctf_fs` structure.
+ *  - The optional `mmap-mode`, `mmap-window-size`, and `mmap-advise`
+ *    parameters, if present, are recorded in the `ctf_fs` structure.
+ *  - The optional `event-class-names` parameter, if present, is
+ *    recorded in the `ctf_fs` structure.
  *
  * `self_comp` and `self_comp_class` are used for logging, only one of them
  * should be set.
@@ -74,6 +74,27 @@ enum ctf_msg_iter_medium_status medop_request_bytes(
 
 	read_len = MIN(request_sz, stream->buflen);
 	read_len = MIN(read_len, len_left);
+
+	if (stream->prefetched_len > 0) {
+		if (stream->offset >= stream->prefetched_offset &&
+				stream->offset < stream->prefetched_offset +
+					stream->prefetched_len) {
+			/* Data received ahead of time: no round trip. */
+			uint64_t prefetched_pos =
+				stream->offset - stream->prefetched_offset;
+
+			recv_len = MIN(read_len,
+				stream->prefetched_len - prefetched_pos);
+			*buffer_addr = stream->buf + prefetched_pos;
+			*buffer_sz = recv_len;
+			stream->offset += recv_len;
+			goto end;
+		}
+
+		/* The request below overwrites `stream->buf`. */
+		stream->prefetched_len = 0;
+	}
+
 	status = lttng_live_get_stream_bytes(live_msg_iter,
 			stream, stream->buf, stream->offset,
 			read_len, &recv_len);
@@ -55,12 +55,24 @@
 #define URL_PARAM			    "url"
 #define INPUTS_PARAM			    "inputs"
 #define SESS_NOT_FOUND_ACTION_PARAM	    "session-not-found-action"
+#define MAX_PIPELINED_REQUESTS_PARAM	    "max-pipelined-requests"
 #define SESS_NOT_FOUND_ACTION_CONTINUE_STR  "continue"
 #define SESS_NOT_FOUND_ACTION_FAIL_STR	    "fail"
 #define SESS_NOT_FOUND_ACTION_END_STR	    "end"
 
+/*
+ * Interval between the first two `GET_NEXT_INDEX` commands for an idle
+ * stream, and maximum interval when the live timer period of its
+ * session is unknown.
+ */
+#define IDLE_POLL_INITIAL_INTERVAL_US	    1000
+#define IDLE_POLL_DEFAULT_MAX_INTERVAL_US   1000000
+
 #define print_dbg(fmt, ...)	BT_COMP_LOGD(fmt, ## __VA_ARGS__)
 
+BT_HIDDEN
+struct lttng_live_polling_stats lttng_live_global_polling_stats;
+
 static
 const char *lttng_live_iterator_status_string(
 		enum lttng_live_iterator_status status)
@@ -228,7 +240,7 @@ end:
 BT_HIDDEN
 int lttng_live_add_session(struct lttng_live_msg_iter *lttng_live_msg_iter,
 		uint64_t session_id, const char *hostname,
-		const char *session_name)
+		const char *session_name, uint64_t live_timer_us)
 {
 	int ret = 0;
 	struct lttng_live_session *session;
@@ -236,8 +248,9 @@ int lttng_live_add_session(struct lttng_live_msg_iter *lttng_live_msg_iter,
 	bt_self_component *self_comp = lttng_live_msg_iter->self_comp;
 
 	BT_COMP_LOGD("Adding live session: "
-		"session-id=%" PRIu64 ", hostname=\"%s\" session-name=\"%s\"",
-		session_id, hostname, session_name);
+		"session-id=%" PRIu64 ", hostname=\"%s\" session-name=\"%s\", "
+		"live-timer-us=%" PRIu64,
+		session_id, hostname, session_name, live_timer_us);
 
 	session = g_new0(struct lttng_live_session, 1);
 	if (!session) {
@@ -249,6 +262,7 @@ int lttng_live_add_session(struct lttng_live_msg_iter *lttng_live_msg_iter,
 	session->log_level = lttng_live_msg_iter->log_level;
 	session->self_comp = lttng_live_msg_iter->self_comp;
 	session->id = session_id;
+	session->live_timer_us = live_timer_us;
 	session->traces = g_ptr_array_new_with_free_func(
 		(GDestroyNotify) lttng_live_destroy_trace);
 	BT_ASSERT(session->traces);
@@ -315,10 +329,25 @@ end:
 static
 void lttng_live_msg_iter_destroy(struct lttng_live_msg_iter *lttng_live_msg_iter)
 {
+	bt_logging_level log_level;
+	bt_self_component *self_comp;
+
 	if (!lttng_live_msg_iter) {
 		goto end;
 	}
 
+	log_level = lttng_live_msg_iter->log_level;
+	self_comp = lttng_live_msg_iter->self_comp;
+	BT_COMP_LOGI("Relay daemon polling statistics: "
+		"index-requests=%" PRIu64 ", index-round-trips=%" PRIu64 ", "
+		"idle-replies=%" PRIu64 ", skipped-polls=%" PRIu64 ", "
+		"new-streams-requests=%" PRIu64,
+		lttng_live_msg_iter->polling_stats.index_requests,
+		lttng_live_msg_iter->polling_stats.index_round_trips,
+		lttng_live_msg_iter->polling_stats.idle_replies,
+		lttng_live_msg_iter->polling_stats.skipped_polls,
+		lttng_live_msg_iter->polling_stats.new_streams_requests);
+
 	if (lttng_live_msg_iter->sessions) {
 		g_ptr_array_free(lttng_live_msg_iter->sessions, TRUE);
 	}
@@ -351,6 +380,44 @@ void lttng_live_msg_iter_finalize(bt_self_message_iterator *self_msg_iter)
 	lttng_live_msg_iter_destroy(lttng_live_msg_iter);
 }
 
+BT_HIDDEN
+void lttng_live_stream_iterator_back_off(
+		struct lttng_live_stream_iterator *stream)
+{
+	struct lttng_live_session *session = stream->trace->session;
+	uint64_t max_interval_us = session->live_timer_us;
+
+	/*
+	 * The consumer daemon flushes the buffers of a live session once
+	 * per live timer period: polling an idle stream more often than
+	 * this is mostly useless.
+	 */
+	if (max_interval_us == 0) {
+		max_interval_us = IDLE_POLL_DEFAULT_MAX_INTERVAL_US;
+	}
+
+	if (stream->idle_poll_interval_us == 0) {
+		stream->idle_poll_interval_us = IDLE_POLL_INITIAL_INTERVAL_US;
+	} else {
+		stream->idle_poll_interval_us *= 2;
+	}
+
+	stream->idle_poll_interval_us = MIN(stream->idle_poll_interval_us,
+		max_interval_us);
+	stream->next_idle_poll_time_us = g_get_monotonic_time() +
+		(int64_t) stream->idle_poll_interval_us;
+	LTTNG_LIVE_POLLING_STATS_ADD(session->lttng_live_msg_iter,
+		idle_replies, 1);
+}
+
+BT_HIDDEN
+void lttng_live_stream_iterator_reset_back_off(
+		struct lttng_live_stream_iterator *stream)
+{
+	stream->idle_poll_interval_us = 0;
+	stream->next_idle_poll_time_us = 0;
+}
+
 static
 enum lttng_live_iterator_status lttng_live_iterator_next_check_stream_state(
 		struct lttng_live_stream_iterator *lttng_live_stream)
@@ -408,6 +475,18 @@ enum lttng_live_iterator_status lttng_live_iterator_next_handle_one_no_data_stre
 			lttng_live_stream->state != LTTNG_LIVE_STREAM_QUIESCENT_NO_DATA) {
 		goto end;
 	}
+	if (!lttng_live_stream->has_prefetched_index &&
+			g_get_monotonic_time() <
+				lttng_live_stream->next_idle_poll_time_us) {
+		/*
+		 * The relay daemon had nothing new for this stream
+		 * recently: wait a bit more before asking again.
+		 */
+		LTTNG_LIVE_POLLING_STATS_ADD(lttng_live_msg_iter,
+			skipped_polls, 1);
+		ret = LTTNG_LIVE_ITERATOR_STATUS_AGAIN;
+		goto end;
+	}
 	ret = lttng_live_get_next_index(lttng_live_msg_iter, lttng_live_stream,
 		&index);
 	if (ret != LTTNG_LIVE_ITERATOR_STATUS_OK) {
@@ -420,9 +499,12 @@ enum lttng_live_iterator_status lttng_live_iterator_next_handle_one_no_data_stre
 
 		if (orig_state == LTTNG_LIVE_STREAM_QUIESCENT_NO_DATA &&
 				last_inact_ts == curr_inact_ts) {
+			lttng_live_stream_iterator_back_off(lttng_live_stream);
 			ret = LTTNG_LIVE_ITERATOR_STATUS_AGAIN;
 			LTTNG_LIVE_LOGD_STREAM_ITER(lttng_live_stream);
 		} else {
+			lttng_live_stream_iterator_reset_back_off(
+				lttng_live_stream);
 			ret = LTTNG_LIVE_ITERATOR_STATUS_CONTINUE;
 		}
 		goto end;
@@ -1828,6 +1910,77 @@ end:
 	return status;
 }
 
+static
+bt_component_class_query_method_status lttng_live_query_polling_stats(
+		const bt_value **user_result,
+		bt_self_component_class *self_comp_class,
+		bt_logging_level log_level)
+{
+	bt_component_class_query_method_status status =
+		BT_COMPONENT_CLASS_QUERY_METHOD_STATUS_OK;
+	bt_value_map_insert_entry_status insert_status;
+	struct lttng_live_polling_stats *stats =
+		&lttng_live_global_polling_stats;
+	bt_value *result;
+
+	/*
+	 * Message iterators of this process can update the counters
+	 * concurrently: read each one atomically.
+	 */
+	result = bt_value_map_create();
+	if (!result) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"index-requests",
+		__atomic_load_n(&stats->index_requests, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"index-round-trips",
+		__atomic_load_n(&stats->index_round_trips, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"idle-replies",
+		__atomic_load_n(&stats->idle_replies, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"skipped-polls",
+		__atomic_load_n(&stats->skipped_polls, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"new-streams-requests",
+		__atomic_load_n(&stats->new_streams_requests, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	*user_result = result;
+	result = NULL;
+	goto end;
+
+memory_error:
+	BT_COMP_CLASS_LOGE_APPEND_CAUSE(self_comp_class,
+		"Failed to create the `polling-stats` query result.");
+	status = BT_COMPONENT_CLASS_QUERY_METHOD_STATUS_MEMORY_ERROR;
+
+end:
+	BT_VALUE_PUT_REF_AND_RESET(result);
+	return status;
+}
+
 BT_HIDDEN
 bt_component_class_query_method_status lttng_live_query(
 		bt_self_component_class_source *comp_class,
@@ -1851,6 +2004,9 @@ bt_component_class_query_method_status lttng_live_query(
 	} else if (strcmp(object, "babeltrace.support-info") == 0) {
 		status = lttng_live_query_support_info(params, result,
 			self_comp_class, log_level);
+	} else if (strcmp(object, "polling-stats") == 0) {
+		status = lttng_live_query_polling_stats(result,
+			self_comp_class, log_level);
 	} else {
 		BT_COMP_LOGI("Unknown query object `%s`", object);
 		status = BT_COMPONENT_CLASS_QUERY_METHOD_STATUS_UNKNOWN_OBJECT;
@@ -1923,6 +2079,7 @@ static struct bt_param_validation_map_value_entry_descr params_descr[] = {
 	{ SESS_NOT_FOUND_ACTION_PARAM, BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { BT_VALUE_TYPE_STRING, .string = {
 		.choices = sess_not_found_action_choices,
 	} } },
+	{ MAX_PIPELINED_REQUESTS_PARAM, BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_UNSIGNED_INTEGER } },
 	BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_END
 };
 
@@ -1989,6 +2146,22 @@ bt_component_class_initialize_method_status lttng_live_component_create(
 			SESSION_NOT_FOUND_ACTION_CONTINUE;
 	}
 
+	value = bt_value_map_borrow_entry_value_const(params,
+		MAX_PIPELINED_REQUESTS_PARAM);
+	if (value) {
+		lttng_live->params.max_pipelined_requests =
+			bt_value_integer_unsigned_get(value);
+		if (lttng_live->params.max_pipelined_requests == 0) {
+			BT_COMP_LOGE_APPEND_CAUSE(self_comp,
+				"`%s` parameter must be greater than 0.",
+				MAX_PIPELINED_REQUESTS_PARAM);
+			status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_ERROR;
+			goto error;
+		}
+	} else {
+		lttng_live->params.max_pipelined_requests = 1;
+	}
+
 	status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_OK;
 	goto end;
 
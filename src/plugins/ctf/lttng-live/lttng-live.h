@@ -39,6 +39,7 @@
 #include "common/macros.h"
 #include "../common/metadata/decoder.h"
 #include "../common/msg-iter/msg-iter.h"
+#include "lttng-viewer-abi.h"
 #include "viewer-connection.h"
 
 struct lttng_live_component;
@@ -119,6 +120,33 @@ struct lttng_live_stream_iterator {
 	uint8_t *buf;
 	size_t buflen;
 
+	/*
+	 * Reply to a `GET_NEXT_INDEX` command which was sent ahead of
+	 * time for this stream, along with the commands of other streams
+	 * (see lttng_live_get_next_index()), and which is not handled yet.
+	 */
+	struct lttng_viewer_index prefetched_index;
+	bool has_prefetched_index;
+
+	/*
+	 * Offset within the data stream and length of the packet data
+	 * which was requested ahead of time and received in `buf`.
+	 * `prefetched_len` is 0 if `buf` contains no such data.
+	 */
+	uint64_t prefetched_offset;
+	uint64_t prefetched_len;
+
+	/*
+	 * Current interval between two `GET_NEXT_INDEX` commands for
+	 * this stream while the relay daemon has nothing new for it, and
+	 * monotonic time (g_get_monotonic_time()) before which not to
+	 * send the next one (see lttng_live_stream_iterator_back_off()).
+	 *
+	 * Both are 0 when the last reply had something new.
+	 */
+	uint64_t idle_poll_interval_us;
+	int64_t next_idle_poll_time_us;
+
 	/* Owned by this. */
 	GString *name;
 
@@ -197,6 +225,9 @@ struct lttng_live_session {
 
 	uint64_t id;
 
+	/* Live timer period of the tracing session (microseconds) */
+	uint64_t live_timer_us;
+
 	/* Array of pointers to struct lttng_live_trace. */
 	GPtrArray *traces;
 
@@ -224,6 +255,13 @@ struct lttng_live_component {
 	struct {
 		GString *url;
 		enum session_not_found_action sess_not_found_act;
+
+		/*
+		 * Maximum number of `GET_NEXT_INDEX` or `GET_PACKET`
+		 * commands to send to the relay daemon before receiving
+		 * their replies (1: strict request/response).
+		 */
+		uint64_t max_pipelined_requests;
 	} params;
 
 	size_t max_query_size;
@@ -235,6 +273,48 @@ struct lttng_live_component {
 	bool has_msg_iter;
 };
 
+/*
+ * Relay daemon polling counters.
+ *
+ * Each message iterator has its own counters, logged when it's
+ * finalized. The process-wide totals, returned by the `polling-stats`
+ * query, are updated at the same time (see
+ * LTTNG_LIVE_POLLING_STATS_ADD()).
+ */
+struct lttng_live_polling_stats {
+	/* `GET_NEXT_INDEX` commands sent */
+	uint64_t index_requests;
+
+	/* Round trips which those commands needed */
+	uint64_t index_round_trips;
+
+	/* Replies with nothing new (retry or same inactivity) */
+	uint64_t idle_replies;
+
+	/* `GET_NEXT_INDEX` commands not sent because of back-off */
+	uint64_t skipped_polls;
+
+	/* `GET_NEW_STREAMS` commands sent */
+	uint64_t new_streams_requests;
+};
+
+/* Totals of all the message iterators of the process */
+BT_HIDDEN
+extern struct lttng_live_polling_stats lttng_live_global_polling_stats;
+
+/*
+ * Adds `_count` to the counter `_counter` of the message iterator
+ * `_msg_iter` and to the process-wide total, which the `polling-stats`
+ * query can read at any time.
+ */
+#define LTTNG_LIVE_POLLING_STATS_ADD(_msg_iter, _counter, _count)	\
+	do {								\
+		(_msg_iter)->polling_stats._counter += (_count);	\
+		(void) __atomic_fetch_add(				\
+			&lttng_live_global_polling_stats._counter,	\
+			(uint64_t) (_count), __ATOMIC_RELAXED);		\
+	} while (0)
+
 struct lttng_live_msg_iter {
 	bt_logging_level log_level;
 	bt_self_component *self_comp;
@@ -259,6 +339,8 @@ struct lttng_live_msg_iter {
 
 	/* True if the iterator was interrupted. */
 	bool was_interrupted;
+
+	struct lttng_live_polling_stats polling_stats;
 };
 
 enum lttng_live_iterator_status {
@@ -323,7 +405,22 @@ struct lttng_live_trace *lttng_live_session_borrow_or_create_trace_by_id(
 int lttng_live_add_session(struct lttng_live_msg_iter *lttng_live_msg_iter,
 		uint64_t session_id,
 		const char *hostname,
-		const char *session_name);
+		const char *session_name,
+		uint64_t live_timer_us);
+
+/*
+ * Makes the next `GET_NEXT_INDEX` command for `stream` wait, as the
+ * relay daemon just replied that it has nothing new for it.
+ */
+void lttng_live_stream_iterator_back_off(
+		struct lttng_live_stream_iterator *stream);
+
+/*
+ * Makes the next `GET_NEXT_INDEX` command for `stream` be sent as soon
+ * as needed.
+ */
+void lttng_live_stream_iterator_reset_back_off(
+		struct lttng_live_stream_iterator *stream);
 
 /*
  * lttng_live_get_one_metadata_packet() asks the Relay Daemon for new metadata.
@@ -924,7 +924,8 @@ enum lttng_live_viewer_status lttng_live_query_session_ids(
 
 			if (lttng_live_add_session(lttng_live_msg_iter, session_id,
 					lsession.hostname,
-					lsession.session_name)) {
+					lsession.session_name,
+					be32toh(lsession.live_timer))) {
 				BT_COMP_LOGE_APPEND_CAUSE(self_comp,
 					"Failed to add live session");
 				status = LTTNG_LIVE_VIEWER_STATUS_ERROR;
@@ -1390,6 +1391,283 @@ void lttng_live_need_new_streams(struct lttng_live_msg_iter *lttng_live_msg_iter
 	}
 }
 
+/*
+ * Returns whether or not the next index entry of `stream` can be
+ * requested at the monotonic time `now` along with the one of another
+ * stream.
+ *
+ * A stream of which the back-off interval (see
+ * lttng_live_stream_iterator_back_off()) didn't expire yet can't: the
+ * relay daemon would most probably have nothing new for it, and the
+ * reply would double its back-off interval again. However, a stream of
+ * which the back-off interval expires within its last sixteenth can,
+ * so that streams which became idle together keep being polled in the
+ * same round trip.
+ */
+static
+bool stream_can_prefetch_next_index(struct lttng_live_stream_iterator *stream,
+		int64_t now)
+{
+	if (stream->has_prefetched_index || stream->has_stream_hung_up ||
+			(stream->state != LTTNG_LIVE_STREAM_ACTIVE_NO_DATA &&
+			 stream->state != LTTNG_LIVE_STREAM_QUIESCENT_NO_DATA)) {
+		return false;
+	}
+
+	return now + (int64_t) (stream->idle_poll_interval_us / 16) >=
+		stream->next_idle_poll_time_us;
+}
+
+/*
+ * Requests the packet data of the streams of `streams` of which the
+ * prefetched index entry is available, sending all the `GET_PACKET`
+ * commands before receiving their replies.
+ *
+ * Only the first `buflen` bytes of each packet are requested. A reply
+ * other than _OK is ignored: the data will simply be requested again
+ * when needed, and the relay daemon will give the same reply.
+ */
+static
+enum lttng_live_viewer_status prefetch_packet_data(
+		struct live_viewer_connection *viewer_connection,
+		GPtrArray *streams)
+{
+	enum lttng_live_viewer_status viewer_status;
+	bt_self_component *self_comp = viewer_connection->self_comp;
+	const size_t cmd_buf_len = sizeof(struct lttng_viewer_cmd) +
+		sizeof(struct lttng_viewer_get_packet);
+	GPtrArray *data_streams = g_ptr_array_new();
+	char *cmd_buf = g_malloc(cmd_buf_len * streams->len);
+	guint i;
+
+	for (i = 0; i < streams->len; i++) {
+		struct lttng_live_stream_iterator *stream =
+			g_ptr_array_index(streams, i);
+		struct lttng_viewer_index *index = &stream->prefetched_index;
+		char *stream_cmd_buf = cmd_buf + data_streams->len * cmd_buf_len;
+		struct lttng_viewer_cmd cmd;
+		struct lttng_viewer_get_packet rq;
+
+		stream->prefetched_len = 0;
+
+		if (be32toh(index->status) != LTTNG_VIEWER_INDEX_OK ||
+				be32toh(index->flags) != 0 ||
+				be64toh(index->packet_size) == 0) {
+			continue;
+		}
+
+		stream->prefetched_offset = be64toh(index->offset);
+
+		cmd.cmd = htobe32(LTTNG_VIEWER_GET_PACKET);
+		cmd.data_size = htobe64((uint64_t) sizeof(rq));
+		cmd.cmd_version = htobe32(0);
+
+		memset(&rq, 0, sizeof(rq));
+		rq.stream_id = htobe64(stream->viewer_stream_id);
+		rq.offset = index->offset;
+		rq.len = htobe32(MIN(be64toh(index->packet_size) / CHAR_BIT,
+			stream->buflen));
+
+		memcpy(stream_cmd_buf, &cmd, sizeof(cmd));
+		memcpy(stream_cmd_buf + sizeof(cmd), &rq, sizeof(rq));
+		g_ptr_array_add(data_streams, stream);
+	}
+
+	if (data_streams->len == 0) {
+		viewer_status = LTTNG_LIVE_VIEWER_STATUS_OK;
+		goto end;
+	}
+
+	BT_COMP_LOGD("Requesting packet data of %u streams ahead of time",
+		data_streams->len);
+
+	viewer_status = lttng_live_send(viewer_connection, cmd_buf,
+		cmd_buf_len * data_streams->len);
+	if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
+		viewer_handle_send_status(self_comp, NULL,
+			viewer_status, "get data packet commands");
+		goto end;
+	}
+
+	for (i = 0; i < data_streams->len; i++) {
+		struct lttng_live_stream_iterator *stream =
+			g_ptr_array_index(data_streams, i);
+		struct lttng_viewer_trace_packet rp;
+		uint32_t len;
+
+		viewer_status = lttng_live_recv(viewer_connection, &rp,
+			sizeof(rp));
+		if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
+			viewer_handle_recv_status(self_comp, NULL,
+				viewer_status, "get data packet reply");
+			goto end;
+		}
+
+		if (be32toh(rp.status) != LTTNG_VIEWER_GET_PACKET_OK) {
+			BT_COMP_LOGD("Ignoring get_data_packet response received ahead of time: "
+				"stream-id=%" PRIu64 ", status=%" PRIu32,
+				stream->viewer_stream_id, be32toh(rp.status));
+			continue;
+		}
+
+		len = be32toh(rp.len);
+		if (len > stream->buflen) {
+			BT_COMP_LOGE_APPEND_CAUSE(self_comp,
+				"Received get_data_packet response with more data than requested: "
+				"stream-id=%" PRIu64 ", len=%" PRIu32,
+				stream->viewer_stream_id, len);
+			viewer_status = LTTNG_LIVE_VIEWER_STATUS_ERROR;
+			goto end;
+		}
+
+		viewer_status = lttng_live_recv(viewer_connection, stream->buf,
+			len);
+		if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
+			viewer_handle_recv_status(self_comp, NULL,
+				viewer_status, "get data packet");
+			goto end;
+		}
+
+		stream->prefetched_len = len;
+	}
+
+end:
+	g_free(cmd_buf);
+	g_ptr_array_free(data_streams, TRUE);
+	return viewer_status;
+}
+
+/*
+ * Requests the next index entry of `stream` and of other streams of the
+ * same session which need one, sending all the `GET_NEXT_INDEX`
+ * commands before receiving their replies:
+ *
+ * * If `stream` is idle (the relay daemon had nothing new for it the
+ *   last time), all the other idle streams of which the back-off
+ *   interval expired, whatever `max-pipelined-requests`, so that idle
+ *   sessions cost a single round trip per poll instead of one per
+ *   stream.
+ *
+ * * Up to `max-pipelined-requests` - 1 other streams.
+ *
+ * If `max-pipelined-requests` is greater than 1, this function then
+ * requests the first packet data of those streams the same way.
+ *
+ * The replies are kept in the stream iterators and handled by
+ * lttng_live_get_next_index() as if they were just received, so that
+ * a single round trip to the relay daemon serves many streams.
+ */
+static
+enum lttng_live_viewer_status prefetch_next_indexes(
+		struct lttng_live_msg_iter *lttng_live_msg_iter,
+		struct lttng_live_stream_iterator *stream)
+{
+	enum lttng_live_viewer_status viewer_status;
+	struct live_viewer_connection *viewer_connection =
+		lttng_live_msg_iter->viewer_connection;
+	bt_self_component *self_comp = viewer_connection->self_comp;
+	struct lttng_live_session *session = stream->trace->session;
+	uint64_t max_pipelined_requests =
+		lttng_live_msg_iter->lttng_live_comp->params.max_pipelined_requests;
+	const bool is_idle_poll = stream->idle_poll_interval_us != 0;
+	const int64_t now = g_get_monotonic_time();
+	const size_t cmd_buf_len = sizeof(struct lttng_viewer_cmd) +
+		sizeof(struct lttng_viewer_get_next_index);
+	GPtrArray *streams = g_ptr_array_new();
+	uint64_t pipelined_requests = 1;
+	char *cmd_buf = NULL;
+	guint trace_idx, stream_idx, i;
+
+	g_ptr_array_add(streams, stream);
+
+	for (trace_idx = 0; trace_idx < session->traces->len; trace_idx++) {
+		struct lttng_live_trace *trace =
+			g_ptr_array_index(session->traces, trace_idx);
+
+		for (stream_idx = 0; stream_idx < trace->stream_iterators->len;
+				stream_idx++) {
+			struct lttng_live_stream_iterator *other_stream =
+				g_ptr_array_index(trace->stream_iterators,
+					stream_idx);
+
+			if (other_stream == stream ||
+					!stream_can_prefetch_next_index(
+						other_stream, now)) {
+				continue;
+			}
+
+			if (is_idle_poll &&
+					other_stream->idle_poll_interval_us != 0) {
+				g_ptr_array_add(streams, other_stream);
+			} else if (pipelined_requests < max_pipelined_requests) {
+				g_ptr_array_add(streams, other_stream);
+				pipelined_requests++;
+			}
+		}
+	}
+
+	BT_COMP_LOGD("Requesting next index of %u streams: "
+		"first-stream-id=%" PRIu64, streams->len,
+		stream->viewer_stream_id);
+
+	cmd_buf = g_malloc(cmd_buf_len * streams->len);
+
+	for (i = 0; i < streams->len; i++) {
+		struct lttng_live_stream_iterator *req_stream =
+			g_ptr_array_index(streams, i);
+		struct lttng_viewer_cmd cmd;
+		struct lttng_viewer_get_next_index rq;
+
+		cmd.cmd = htobe32(LTTNG_VIEWER_GET_NEXT_INDEX);
+		cmd.data_size = htobe64((uint64_t) sizeof(rq));
+		cmd.cmd_version = htobe32(0);
+
+		memset(&rq, 0, sizeof(rq));
+		rq.stream_id = htobe64(req_stream->viewer_stream_id);
+
+		memcpy(cmd_buf + i * cmd_buf_len, &cmd, sizeof(cmd));
+		memcpy(cmd_buf + i * cmd_buf_len + sizeof(cmd), &rq, sizeof(rq));
+	}
+
+	viewer_status = lttng_live_send(viewer_connection, cmd_buf,
+		cmd_buf_len * streams->len);
+	if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
+		viewer_handle_send_status(self_comp, NULL,
+			viewer_status, "get next index commands");
+		goto end;
+	}
+
+	LTTNG_LIVE_POLLING_STATS_ADD(lttng_live_msg_iter, index_requests,
+		streams->len);
+	LTTNG_LIVE_POLLING_STATS_ADD(lttng_live_msg_iter, index_round_trips, 1);
+
+	for (i = 0; i < streams->len; i++) {
+		struct lttng_live_stream_iterator *req_stream =
+			g_ptr_array_index(streams, i);
+
+		viewer_status = lttng_live_recv(viewer_connection,
+			&req_stream->prefetched_index,
+			sizeof(req_stream->prefetched_index));
+		if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
+			viewer_handle_recv_status(self_comp, NULL,
+				viewer_status, "get next index reply");
+			goto end;
+		}
+
+		req_stream->has_prefetched_index = true;
+	}
+
+	if (max_pipelined_requests > 1) {
+		viewer_status = prefetch_packet_data(viewer_connection,
+			streams);
+	}
+
+end:
+	g_free(cmd_buf);
+	g_ptr_array_free(streams, TRUE);
+	return viewer_status;
+}
+
 BT_HIDDEN
 enum lttng_live_iterator_status lttng_live_get_next_index(
 		struct lttng_live_msg_iter *lttng_live_msg_iter,
@@ -1409,6 +1687,28 @@ enum lttng_live_iterator_status lttng_live_get_next_index(
 	char cmd_buf[cmd_buf_len];
 	uint32_t flags, rp_status;
 
+	if (!stream->has_prefetched_index &&
+			(lttng_live_msg_iter->lttng_live_comp->params.max_pipelined_requests > 1 ||
+			 stream->idle_poll_interval_us != 0)) {
+		viewer_status = prefetch_next_indexes(lttng_live_msg_iter,
+			stream);
+		if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
+			goto error;
+		}
+
+		BT_ASSERT(stream->has_prefetched_index);
+	}
+
+	if (stream->has_prefetched_index) {
+		BT_COMP_LOGD("Using next index received ahead of time for stream: "
+			"stream-id=%"PRIu64, stream->viewer_stream_id);
+		rp = stream->prefetched_index;
+		stream->has_prefetched_index = false;
+		goto handle_reply;
+	}
+
+	stream->prefetched_len = 0;
+
 	BT_COMP_LOGD("Requesting next index for stream: "
 		"stream-id=%"PRIu64, stream->viewer_stream_id);
 
@@ -1434,6 +1734,9 @@ enum lttng_live_iterator_status lttng_live_get_next_index(
 		goto error;
 	}
 
+	LTTNG_LIVE_POLLING_STATS_ADD(lttng_live_msg_iter, index_requests, 1);
+	LTTNG_LIVE_POLLING_STATS_ADD(lttng_live_msg_iter, index_round_trips, 1);
+
 	viewer_status = lttng_live_recv(viewer_connection, &rp, sizeof(rp));
 	if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
 		viewer_handle_recv_status(self_comp, NULL,
@@ -1441,6 +1744,8 @@ enum lttng_live_iterator_status lttng_live_get_next_index(
 		goto error;
 	}
 
+handle_reply:
+
 	flags = be32toh(rp.flags);
 	rp_status = be32toh(rp.status);
 
@@ -1479,6 +1784,7 @@ enum lttng_live_iterator_status lttng_live_get_next_index(
 		}
 
 		stream->state = LTTNG_LIVE_STREAM_ACTIVE_DATA;
+		lttng_live_stream_iterator_reset_back_off(stream);
 
 		if (flags & LTTNG_VIEWER_FLAG_NEW_METADATA) {
 			BT_COMP_LOGD("Received get_next_index response: new metadata needed");
@@ -1495,6 +1801,7 @@ enum lttng_live_iterator_status lttng_live_get_next_index(
 		BT_COMP_LOGD("Received get_next_index response: retry");
 		memset(index, 0, sizeof(struct packet_index));
 		stream->state = LTTNG_LIVE_STREAM_ACTIVE_NO_DATA;
+		lttng_live_stream_iterator_back_off(stream);
 		status = LTTNG_LIVE_ITERATOR_STATUS_AGAIN;
 		goto end;
 	case LTTNG_VIEWER_INDEX_HUP:
@@ -1695,6 +2002,9 @@ enum lttng_live_iterator_status lttng_live_session_get_new_streams(
 		goto end;
 	}
 
+	LTTNG_LIVE_POLLING_STATS_ADD(lttng_live_msg_iter, new_streams_requests,
+		1);
+
 	viewer_status = lttng_live_recv(viewer_connection, &rp, sizeof(rp));
 	if (viewer_status != LTTNG_LIVE_VIEWER_STATUS_OK) {
 		viewer_handle_recv_status(self_comp, NULL,
@@ -61,6 +61,166 @@
 #define ADDR_STR_LEN 20
 #define BUILD_ID_NOTE_NAME "GNU"
 
+struct bin_info_elf_sym {
+	uint64_t addr;
+	/* Index of the symbol within its symbol table */
+	size_t index;
+	/* Offset of the symbol's name within the string table */
+	size_t name_offset;
+};
+
+struct bin_info_elf_symtab {
+	/* Index of the string table section of the symbol names */
+	size_t strtab_index;
+	/*
+	 * Function symbols (struct bin_info_elf_sym), sorted by address;
+	 * only the first symbol of a given address is kept.
+	 */
+	GArray *syms;
+};
+
+struct bin_info_cu_range {
+	/* Address range of a CU: [low, high) */
+	uint64_t low;
+	uint64_t high;
+	/* Greatest `high` of this range and of all the ranges before it */
+	uint64_t max_high;
+	/* Index of the CU within `cus` */
+	guint cu_index;
+};
+
+struct bin_info_cu_index {
+	/* All the CUs (struct bt_dwarf_cu), in DWARF order */
+	GArray *cus;
+	/* Ranges of the CUs (struct bin_info_cu_range), sorted by `low` */
+	GArray *ranges;
+	/* Indexes (guint) within `cus` of the CUs without address ranges */
+	GArray *unranged_cus;
+};
+
+static
+void bin_info_elf_symtab_destroy(struct bin_info_elf_symtab *symtab)
+{
+	if (!symtab) {
+		return;
+	}
+
+	if (symtab->syms) {
+		g_array_free(symtab->syms, TRUE);
+	}
+
+	g_free(symtab);
+}
+
+static
+void bin_info_cu_index_destroy(struct bin_info_cu_index *cu_index)
+{
+	if (!cu_index) {
+		return;
+	}
+
+	if (cu_index->cus) {
+		g_array_free(cu_index->cus, TRUE);
+	}
+
+	if (cu_index->ranges) {
+		g_array_free(cu_index->ranges, TRUE);
+	}
+
+	if (cu_index->unranged_cus) {
+		g_array_free(cu_index->unranged_cus, TRUE);
+	}
+
+	g_free(cu_index);
+}
+
+enum bin_info_load_task_state {
+	BIN_INFO_LOAD_TASK_STATE_PENDING,
+	BIN_INFO_LOAD_TASK_STATE_RUNNING,
+	BIN_INFO_LOAD_TASK_STATE_DONE,
+	BIN_INFO_LOAD_TASK_STATE_CANCELLED,
+};
+
+struct bin_info_load_task {
+	/*
+	 * Owned by the bin_info and by the loader (pending array or
+	 * thread pool queue).
+	 */
+	gint ref_count;
+
+	/* Protects `state` and `bin` */
+	GMutex lock;
+
+	/* Signaled when `state` becomes `BIN_INFO_LOAD_TASK_STATE_DONE` */
+	GCond done_cond;
+
+	enum bin_info_load_task_state state;
+
+	/* Weak; `NULL` once cancelled */
+	struct bin_info *bin;
+};
+
+struct bin_info_loader {
+	bt_logging_level log_level;
+
+	/* Used for logging; can be `NULL` */
+	bt_self_component *self_comp;
+
+	/* Tasks are pushed to this pool by bin_info_loader_flush() */
+	GThreadPool *pool;
+
+	/* Tasks to push on the next flush (struct bin_info_load_task *) */
+	GPtrArray *pending_tasks;
+};
+
+static
+void bin_info_load_task_put(struct bin_info_load_task *task)
+{
+	if (!task) {
+		return;
+	}
+
+	if (g_atomic_int_dec_and_test(&task->ref_count)) {
+		g_mutex_clear(&task->lock);
+		g_cond_clear(&task->done_cond);
+		g_free(task);
+	}
+}
+
+/**
+ * Make sure that no worker thread accesses a given bin_info instance
+ * anymore: wait for its background loading to finish if it's running,
+ * or cancel it if it's not started yet.
+ *
+ * Call this before accessing the lazily loaded members of `bin`.
+ *
+ * @param bin	bin_info instance
+ */
+static
+void bin_info_finish_load(struct bin_info *bin)
+{
+	struct bin_info_load_task *task = bin->load_task;
+
+	if (!task) {
+		return;
+	}
+
+	g_mutex_lock(&task->lock);
+
+	if (task->state == BIN_INFO_LOAD_TASK_STATE_PENDING) {
+		task->state = BIN_INFO_LOAD_TASK_STATE_CANCELLED;
+		task->bin = NULL;
+	}
+
+	while (task->state == BIN_INFO_LOAD_TASK_STATE_RUNNING) {
+		g_cond_wait(&task->done_cond, &task->lock);
+	}
+
+	g_mutex_unlock(&task->lock);
+	bin->load_task = NULL;
+	bin_info_load_task_put(task);
+}
+
 BT_HIDDEN
 int bin_info_init(bt_logging_level log_level, bt_self_component *self_comp)
 {
@@ -137,6 +297,13 @@ void bin_info_destroy(struct bin_info *bin)
 		return;
 	}
 
+	bin_info_finish_load(bin);
+
+	if (bin->elf_symtabs) {
+		g_ptr_array_free(bin->elf_symtabs, TRUE);
+	}
+
+	bin_info_cu_index_destroy(bin->cu_index);
 	dwarf_end(bin->dwarf_info);
 
 	g_free(bin->debug_info_dir);
@@ -377,6 +544,8 @@ int bin_info_set_build_id(struct bin_info *bin, uint8_t *build_id,
 		goto error;
 	}
 
+	bin_info_finish_load(bin);
+
 	/* Free any previously set build id. */
 	g_free(bin->build_id);
 
@@ -421,6 +590,8 @@ int bin_info_set_debug_link(struct bin_info *bin, const char *filename,
 		goto error;
 	}
 
+	bin_info_finish_load(bin);
+
 	bin->dbg_link_filename = g_strdup(filename);
 	if (!bin->dbg_link_filename) {
 		goto error;
@@ -792,49 +963,49 @@ error:
 	return -1;
 }
 
+static
+gint compare_elf_syms(gconstpointer a, gconstpointer b)
+{
+	const struct bin_info_elf_sym *sym_a = a;
+	const struct bin_info_elf_sym *sym_b = b;
+
+	if (sym_a->addr != sym_b->addr) {
+		return sym_a->addr < sym_b->addr ? -1 : 1;
+	}
+
+	if (sym_a->index != sym_b->index) {
+		return sym_a->index < sym_b->index ? -1 : 1;
+	}
+
+	return 0;
+}
+
 /**
- * Try to find the symbol closest to an address within a given ELF
- * section.
- *
- * Only function symbols are taken into account. The symbol's address
- * must precede `addr`. A symbol with a closer address might exist
- * after `addr` but is irrelevant because it cannot encompass `addr`.
+ * Create the sorted function symbol index of a given ELF symbol
+ * table section.
  *
- * On success, if found, the out parameters `sym` and `shdr` are
- * set. On failure or if none are found, they remain unchanged.
+ * On success, the out parameter `symtab` is set, or remains unchanged
+ * if `scn` is not a symbol table or has no function symbols.
  *
- * @param scn		ELF section in which to look for the address
- * @param addr		Virtual memory address for which to find the
- *			nearest function symbol
- * @param sym		Out parameter, the nearest function symbol
- * @param shdr		Out parameter, the section header for scn
+ * @param scn		ELF section to index
+ * @param symtab	Out parameter, the symbol table index
  * @returns		0 on success, -1 on failure
  */
 static
-int bin_info_get_nearest_symbol_from_section(Elf_Scn *scn, uint64_t addr,
-		GElf_Sym **sym, GElf_Shdr **shdr)
+int bin_info_elf_symtab_create(Elf_Scn *scn,
+		struct bin_info_elf_symtab **symtab)
 {
-	int i;
-	size_t symbol_count;
+	size_t i, symbol_count, kept_count;
 	Elf_Data *data = NULL;
-	GElf_Shdr *_shdr = NULL;
-	GElf_Sym *nearest_sym = NULL;
+	GElf_Shdr shdr;
+	struct bin_info_elf_sym *syms;
+	struct bin_info_elf_symtab *_symtab = NULL;
 
-	if (!scn || !sym || !shdr) {
+	if (!gelf_getshdr(scn, &shdr)) {
 		goto error;
 	}
 
-	_shdr = g_new0(GElf_Shdr, 1);
-	if (!_shdr) {
-		goto error;
-	}
-
-	_shdr = gelf_getshdr(scn, _shdr);
-	if (!_shdr) {
-		goto error;
-	}
-
-	if (_shdr->sh_type != SHT_SYMTAB) {
+	if (shdr.sh_type != SHT_SYMTAB) {
 		/*
 		 * We are only interested in symbol table (symtab)
 		 * sections, skip this one.
@@ -847,51 +1018,157 @@ int bin_info_get_nearest_symbol_from_section(Elf_Scn *scn, uint64_t addr,
 		goto error;
 	}
 
-	symbol_count = _shdr->sh_size / _shdr->sh_entsize;
+	_symtab = g_new0(struct bin_info_elf_symtab, 1);
+	if (!_symtab) {
+		goto error;
+	}
+
+	_symtab->strtab_index = shdr.sh_link;
+	_symtab->syms = g_array_new(FALSE, FALSE,
+		sizeof(struct bin_info_elf_sym));
+	if (!_symtab->syms) {
+		goto error;
+	}
+
+	symbol_count = shdr.sh_size / shdr.sh_entsize;
 
 	for (i = 0; i < symbol_count; ++i) {
-		GElf_Sym *cur_sym = NULL;
+		GElf_Sym cur_sym;
+		struct bin_info_elf_sym sym;
 
-		cur_sym = g_new0(GElf_Sym, 1);
-		if (!cur_sym) {
-			goto error;
-		}
-		cur_sym = gelf_getsym(data, i, cur_sym);
-		if (!cur_sym) {
+		if (!gelf_getsym(data, i, &cur_sym)) {
 			goto error;
 		}
-		if (GELF_ST_TYPE(cur_sym->st_info) != STT_FUNC) {
+
+		if (GELF_ST_TYPE(cur_sym.st_info) != STT_FUNC) {
 			/* We're only interested in the functions. */
-			g_free(cur_sym);
 			continue;
 		}
 
-		if (cur_sym->st_value <= addr &&
-				(!nearest_sym ||
-				cur_sym->st_value > nearest_sym->st_value)) {
-			g_free(nearest_sym);
-			nearest_sym = cur_sym;
-		} else {
-			g_free(cur_sym);
+		sym.addr = cur_sym.st_value;
+		sym.index = i;
+		sym.name_offset = cur_sym.st_name;
+		g_array_append_val(_symtab->syms, sym);
+	}
+
+	if (_symtab->syms->len == 0) {
+		bin_info_elf_symtab_destroy(_symtab);
+		_symtab = NULL;
+		goto end;
+	}
+
+	g_array_sort(_symtab->syms, compare_elf_syms);
+
+	/*
+	 * Keep the first symbol of each address, in symbol table
+	 * order, like a linear search would.
+	 */
+	syms = (struct bin_info_elf_sym *) _symtab->syms->data;
+	kept_count = 1;
+
+	for (i = 1; i < _symtab->syms->len; i++) {
+		if (syms[i].addr != syms[kept_count - 1].addr) {
+			syms[kept_count] = syms[i];
+			kept_count++;
 		}
 	}
 
+	g_array_set_size(_symtab->syms, kept_count);
+
 end:
-	if (nearest_sym) {
-		*sym = nearest_sym;
-		*shdr = _shdr;
-	} else {
-		g_free(_shdr);
+	*symtab = _symtab;
+	return 0;
+
+error:
+	bin_info_elf_symtab_destroy(_symtab);
+	return -1;
+}
+
+/**
+ * Index the function symbols of all the ELF symbol tables of a given
+ * executable.
+ *
+ * @param bin	bin_info instance
+ * @returns	0 on success, -1 on failure
+ */
+static
+int bin_info_set_elf_symtabs(struct bin_info *bin)
+{
+	Elf_Scn *scn = NULL;
+	GPtrArray *elf_symtabs;
+
+	elf_symtabs = g_ptr_array_new_with_free_func(
+		(GDestroyNotify) bin_info_elf_symtab_destroy);
+	if (!elf_symtabs) {
+		goto error;
+	}
+
+	scn = elf_nextscn(bin->elf_file, scn);
+	if (!scn) {
+		goto error;
 	}
 
+	while (scn) {
+		struct bin_info_elf_symtab *symtab = NULL;
+
+		if (bin_info_elf_symtab_create(scn, &symtab)) {
+			goto error;
+		}
+
+		if (symtab) {
+			g_ptr_array_add(elf_symtabs, symtab);
+		}
+
+		scn = elf_nextscn(bin->elf_file, scn);
+	}
+
+	bin->elf_symtabs = elf_symtabs;
 	return 0;
 
 error:
-	g_free(nearest_sym);
-	g_free(_shdr);
+	if (elf_symtabs) {
+		g_ptr_array_free(elf_symtabs, TRUE);
+	}
+
 	return -1;
 }
 
+/**
+ * Find the symbol closest to an address within an indexed ELF symbol
+ * table.
+ *
+ * The symbol's address must precede `addr`. A symbol with a closer
+ * address might exist after `addr` but is irrelevant because it cannot
+ * encompass `addr`.
+ *
+ * @param symtab	Symbol table index in which to look for the address
+ * @param addr		Virtual memory address for which to find the
+ *			nearest function symbol
+ * @returns		The nearest function symbol, or NULL if none
+ */
+static
+const struct bin_info_elf_sym *bin_info_elf_symtab_find_nearest(
+		const struct bin_info_elf_symtab *symtab, uint64_t addr)
+{
+	const struct bin_info_elf_sym *syms =
+		(const struct bin_info_elf_sym *) symtab->syms->data;
+	guint low = 0;
+	guint high = symtab->syms->len;
+
+	/* Find the first symbol of which the address is after `addr` */
+	while (low < high) {
+		guint mid = low + (high - low) / 2;
+
+		if (syms[mid].addr <= addr) {
+			low = mid + 1;
+		} else {
+			high = mid;
+		}
+	}
+
+	return low == 0 ? NULL : &syms[low - 1];
+}
+
 /**
  * Get the name of the function containing a given address within an
  * executable using ELF symbols.
@@ -914,16 +1191,10 @@ static
 int bin_info_lookup_elf_function_name(struct bin_info *bin, uint64_t addr,
 		char **func_name)
 {
-	/*
-	 * TODO (possible optimisation): if an ELF has no symtab
-	 * section, it has been stripped. Therefore, it would be wise
-	 * to store a flag indicating the stripped status after the
-	 * first iteration to prevent subsequent ones.
-	 */
 	int ret = 0;
-	Elf_Scn *scn = NULL;
-	GElf_Sym *sym = NULL;
-	GElf_Shdr *shdr = NULL;
+	guint i;
+	const struct bin_info_elf_symtab *symtab = NULL;
+	const struct bin_info_elf_sym *sym = NULL;
 	char *sym_name = NULL;
 
 	/* Set ELF file if it hasn't been accessed yet. */
@@ -935,43 +1206,37 @@ int bin_info_lookup_elf_function_name(struct bin_info *bin, uint64_t addr,
 		}
 	}
 
-	scn = elf_nextscn(bin->elf_file, scn);
-	if (!scn) {
-		goto error;
-	}
-
-	while (scn && !sym) {
-		ret = bin_info_get_nearest_symbol_from_section(
-				scn, addr, &sym, &shdr);
+	/* Index the ELF symbols if it hasn't been done yet. */
+	if (!bin->elf_symtabs) {
+		ret = bin_info_set_elf_symtabs(bin);
 		if (ret) {
 			goto error;
 		}
+	}
 
-		scn = elf_nextscn(bin->elf_file, scn);
+	for (i = 0; i < bin->elf_symtabs->len && !sym; i++) {
+		symtab = g_ptr_array_index(bin->elf_symtabs, i);
+		sym = bin_info_elf_symtab_find_nearest(symtab, addr);
 	}
 
 	if (sym) {
-		sym_name = elf_strptr(bin->elf_file, shdr->sh_link,
-				sym->st_name);
+		sym_name = elf_strptr(bin->elf_file, symtab->strtab_index,
+				sym->name_offset);
 		if (!sym_name) {
 			goto error;
 		}
 
-		ret = bin_info_append_offset_str(sym_name, sym->st_value, addr,
+		ret = bin_info_append_offset_str(sym_name, sym->addr, addr,
 						func_name);
 		if (ret) {
 			goto error;
 		}
 	}
 
-	g_free(shdr);
-	g_free(sym);
 	return 0;
 
 error:
-	g_free(shdr);
-	g_free(sym);
-	return ret;
+	return -1;
 }
 
 /**
@@ -1055,6 +1320,219 @@ error:
 	return -1;
 }
 
+static
+gint compare_cu_ranges(gconstpointer a, gconstpointer b)
+{
+	const struct bin_info_cu_range *range_a = a;
+	const struct bin_info_cu_range *range_b = b;
+
+	if (range_a->low != range_b->low) {
+		return range_a->low < range_b->low ? -1 : 1;
+	}
+
+	if (range_a->cu_index != range_b->cu_index) {
+		return range_a->cu_index < range_b->cu_index ? -1 : 1;
+	}
+
+	return 0;
+}
+
+static
+gint compare_guints(gconstpointer a, gconstpointer b)
+{
+	const guint *uint_a = a;
+	const guint *uint_b = b;
+
+	if (*uint_a != *uint_b) {
+		return *uint_a < *uint_b ? -1 : 1;
+	}
+
+	return 0;
+}
+
+/**
+ * Index the address ranges of all the compile units (CUs) of the DWARF
+ * info of a given executable.
+ *
+ * @param bin	bin_info instance
+ * @returns	0 on success, -1 on failure
+ */
+static
+int bin_info_set_cu_index(struct bin_info *bin)
+{
+	guint i;
+	uint64_t max_high = 0;
+	struct bt_dwarf_cu *cu = NULL;
+	struct bt_dwarf_die *die = NULL;
+	struct bin_info_cu_index *cu_index = NULL;
+
+	cu_index = g_new0(struct bin_info_cu_index, 1);
+	if (!cu_index) {
+		goto error;
+	}
+
+	cu_index->cus = g_array_new(FALSE, FALSE, sizeof(struct bt_dwarf_cu));
+	cu_index->ranges = g_array_new(FALSE, FALSE,
+		sizeof(struct bin_info_cu_range));
+	cu_index->unranged_cus = g_array_new(FALSE, FALSE, sizeof(guint));
+	if (!cu_index->cus || !cu_index->ranges || !cu_index->unranged_cus) {
+		goto error;
+	}
+
+	cu = bt_dwarf_cu_create(bin->dwarf_info);
+	if (!cu) {
+		goto error;
+	}
+
+	while (bt_dwarf_cu_next(cu) == 0) {
+		guint cu_i = cu_index->cus->len;
+		guint range_count = cu_index->ranges->len;
+		ptrdiff_t offset = 0;
+		Dwarf_Addr base, start, end;
+
+		g_array_append_val(cu_index->cus, *cu);
+
+		die = bt_dwarf_die_create(cu);
+		if (!die) {
+			goto error;
+		}
+
+		while ((offset = dwarf_ranges(die->dwarf_die, offset, &base,
+				&start, &end)) > 0) {
+			struct bin_info_cu_range range;
+
+			if (start >= end) {
+				continue;
+			}
+
+			range.low = start;
+			range.high = end;
+			range.max_high = 0;
+			range.cu_index = cu_i;
+			g_array_append_val(cu_index->ranges, range);
+		}
+
+		if (offset < 0) {
+			/*
+			 * Invalid ranges: forget the ones of this CU so
+			 * that it's always searched.
+			 */
+			g_array_set_size(cu_index->ranges, range_count);
+		}
+
+		if (cu_index->ranges->len == range_count) {
+			g_array_append_val(cu_index->unranged_cus, cu_i);
+		}
+
+		bt_dwarf_die_destroy(die);
+		die = NULL;
+	}
+
+	g_array_sort(cu_index->ranges, compare_cu_ranges);
+
+	for (i = 0; i < cu_index->ranges->len; i++) {
+		struct bin_info_cu_range *range = &g_array_index(
+			cu_index->ranges, struct bin_info_cu_range, i);
+
+		max_high = MAX(max_high, range->high);
+		range->max_high = max_high;
+	}
+
+	bt_dwarf_cu_destroy(cu);
+	bin->cu_index = cu_index;
+	return 0;
+
+error:
+	bt_dwarf_die_destroy(die);
+	bt_dwarf_cu_destroy(cu);
+	bin_info_cu_index_destroy(cu_index);
+	return -1;
+}
+
+/**
+ * Get the CUs of the DWARF info of a given executable which may
+ * contain a given address, that is, the CUs of which an address range
+ * contains it and the CUs without address ranges.
+ *
+ * @param bin	bin_info instance
+ * @param addr	Virtual memory address, relative to the base address
+ *		for PIC
+ * @returns	Array of indexes (guint) within `bin->cu_index->cus`,
+ *		in DWARF order, or NULL on failure
+ */
+static
+GArray *bin_info_get_cu_candidates(struct bin_info *bin, uint64_t addr)
+{
+	GArray *candidates = NULL;
+	const struct bin_info_cu_range *ranges;
+	guint low, high, i, kept_count;
+	guint *cu_indexes;
+
+	/* Index the CUs if it hasn't been done yet. */
+	if (!bin->cu_index) {
+		if (bin_info_set_cu_index(bin)) {
+			goto error;
+		}
+	}
+
+	candidates = g_array_new(FALSE, FALSE, sizeof(guint));
+	if (!candidates) {
+		goto error;
+	}
+
+	/* Find the first range of which the low address is after `addr` */
+	ranges = (const struct bin_info_cu_range *) bin->cu_index->ranges->data;
+	low = 0;
+	high = bin->cu_index->ranges->len;
+
+	while (low < high) {
+		guint mid = low + (high - low) / 2;
+
+		if (ranges[mid].low <= addr) {
+			low = mid + 1;
+		} else {
+			high = mid;
+		}
+	}
+
+	/*
+	 * Walk the preceding ranges backwards until none of them can
+	 * reach `addr` anymore.
+	 */
+	for (i = low; i > 0 && ranges[i - 1].max_high > addr; i--) {
+		if (ranges[i - 1].high > addr) {
+			g_array_append_val(candidates, ranges[i - 1].cu_index);
+		}
+	}
+
+	g_array_append_vals(candidates, bin->cu_index->unranged_cus->data,
+		bin->cu_index->unranged_cus->len);
+
+	if (candidates->len == 0) {
+		goto end;
+	}
+
+	/* Restore the DWARF order and remove duplicates */
+	g_array_sort(candidates, compare_guints);
+	cu_indexes = (guint *) candidates->data;
+	kept_count = 1;
+
+	for (i = 1; i < candidates->len; i++) {
+		if (cu_indexes[i] != cu_indexes[kept_count - 1]) {
+			cu_indexes[kept_count] = cu_indexes[i];
+			kept_count++;
+		}
+	}
+
+	g_array_set_size(candidates, kept_count);
+
+end:
+	return candidates;
+
+error:
+	return NULL;
+}
+
 /**
  * Get the name of the function containing a given address within an
  * executable using DWARF debug info.
@@ -1074,19 +1552,24 @@ int bin_info_lookup_dwarf_function_name(struct bin_info *bin, uint64_t addr,
 		char **func_name)
 {
 	int ret = 0;
+	guint i;
 	char *_func_name = NULL;
-	struct bt_dwarf_cu *cu = NULL;
+	GArray *cu_candidates = NULL;
 
 	if (!bin || !func_name) {
 		goto error;
 	}
 
-	cu = bt_dwarf_cu_create(bin->dwarf_info);
-	if (!cu) {
+	cu_candidates = bin_info_get_cu_candidates(bin, addr);
+	if (!cu_candidates) {
 		goto error;
 	}
 
-	while (bt_dwarf_cu_next(cu) == 0) {
+	for (i = 0; i < cu_candidates->len; i++) {
+		struct bt_dwarf_cu *cu = &g_array_index(bin->cu_index->cus,
+			struct bt_dwarf_cu,
+			g_array_index(cu_candidates, guint, i));
+
 		ret = bin_info_lookup_cu_function_name(cu, addr, &_func_name);
 		if (ret) {
 			goto error;
@@ -1103,11 +1586,14 @@ int bin_info_lookup_dwarf_function_name(struct bin_info *bin, uint64_t addr,
 		goto error;
 	}
 
-	bt_dwarf_cu_destroy(cu);
+	g_array_free(cu_candidates, TRUE);
 	return 0;
 
 error:
-	bt_dwarf_cu_destroy(cu);
+	if (cu_candidates) {
+		g_array_free(cu_candidates, TRUE);
+	}
+
 	return -1;
 }
 
@@ -1122,6 +1608,8 @@ int bin_info_lookup_function_name(struct bin_info *bin,
 		goto error;
 	}
 
+	bin_info_finish_load(bin);
+
 	/*
 	 * If the bin_info has a build id but it does not match the build id
 	 * that was found on the file system, return an error.
@@ -1530,13 +2018,16 @@ BT_HIDDEN
 int bin_info_lookup_source_location(struct bin_info *bin, uint64_t addr,
 		struct source_location **src_loc)
 {
-	struct bt_dwarf_cu *cu = NULL;
+	guint i;
+	GArray *cu_candidates = NULL;
 	struct source_location *_src_loc = NULL;
 
 	if (!bin || !src_loc) {
 		goto error;
 	}
 
+	bin_info_finish_load(bin);
+
 	/*
 	 * If the bin_info has a build id but it does not match the build id
 	 * that was found on the file system, return an error.
@@ -1570,12 +2061,15 @@ int bin_info_lookup_source_location(struct bin_info *bin, uint64_t addr,
 		addr -= bin->low_addr;
 	}
 
-	cu = bt_dwarf_cu_create(bin->dwarf_info);
-	if (!cu) {
+	cu_candidates = bin_info_get_cu_candidates(bin, addr);
+	if (!cu_candidates) {
 		goto error;
 	}
 
-	while (bt_dwarf_cu_next(cu) == 0) {
+	for (i = 0; i < cu_candidates->len; i++) {
+		struct bt_dwarf_cu *cu = &g_array_index(bin->cu_index->cus,
+			struct bt_dwarf_cu,
+			g_array_index(cu_candidates, guint, i));
 		int ret;
 
 		ret = bin_info_lookup_cu_src_loc(cu, addr, &_src_loc);
@@ -1588,7 +2082,7 @@ int bin_info_lookup_source_location(struct bin_info *bin, uint64_t addr,
 		}
 	}
 
-	bt_dwarf_cu_destroy(cu);
+	g_array_free(cu_candidates, TRUE);
 	if (_src_loc) {
 		*src_loc = _src_loc;
 	}
@@ -1597,6 +2091,217 @@ int bin_info_lookup_source_location(struct bin_info *bin, uint64_t addr,
 
 error:
 	source_location_destroy(_src_loc);
-	bt_dwarf_cu_destroy(cu);
+	if (cu_candidates) {
+		g_array_free(cu_candidates, TRUE);
+	}
+
 	return -1;
 }
+
+/**
+ * Load and index what the lookup functions need for a given bin_info
+ * instance.
+ *
+ * Failures are not reported: the lookup functions try again or fall
+ * back to ELF symbols, as if this wasn't called.
+ *
+ * @param bin	bin_info instance
+ */
+static
+void bin_info_load(struct bin_info *bin)
+{
+	if (bin->build_id && !bin->file_build_id_matches) {
+		goto end;
+	}
+
+	/* Same as bin_info_lookup_function_name() */
+	if (!bin->dwarf_info && !bin->is_elf_only) {
+		if (bin_info_set_dwarf_info(bin)) {
+			bin->is_elf_only = true;
+		}
+	}
+
+	if (bin->is_elf_only) {
+		if (!bin->elf_file && bin_info_set_elf_file(bin)) {
+			goto end;
+		}
+
+		if (!bin->elf_symtabs) {
+			(void) bin_info_set_elf_symtabs(bin);
+		}
+	} else if (!bin->cu_index) {
+		(void) bin_info_set_cu_index(bin);
+	}
+
+end:
+	return;
+}
+
+static
+void bin_info_load_task_run(gpointer data,
+		__attribute__((unused)) gpointer user_data)
+{
+	struct bin_info_load_task *task = data;
+	struct bin_info *bin;
+
+	g_mutex_lock(&task->lock);
+
+	if (task->state == BIN_INFO_LOAD_TASK_STATE_CANCELLED) {
+		g_mutex_unlock(&task->lock);
+		goto end;
+	}
+
+	BT_ASSERT(task->state == BIN_INFO_LOAD_TASK_STATE_PENDING);
+	task->state = BIN_INFO_LOAD_TASK_STATE_RUNNING;
+	bin = task->bin;
+	g_mutex_unlock(&task->lock);
+
+	/* The owner of `bin` waits for this before accessing it again */
+	bin_info_load(bin);
+
+	g_mutex_lock(&task->lock);
+	task->state = BIN_INFO_LOAD_TASK_STATE_DONE;
+	g_cond_broadcast(&task->done_cond);
+	g_mutex_unlock(&task->lock);
+
+end:
+	bin_info_load_task_put(task);
+}
+
+BT_HIDDEN
+struct bin_info_loader *bin_info_loader_create(unsigned int thread_count,
+		bt_logging_level log_level, bt_self_component *self_comp)
+{
+	struct bin_info_loader *loader;
+	GError *error = NULL;
+
+	BT_ASSERT(thread_count > 0);
+
+	loader = g_new0(struct bin_info_loader, 1);
+	if (!loader) {
+		goto error;
+	}
+
+	loader->log_level = log_level;
+	loader->self_comp = self_comp;
+	loader->pending_tasks = g_ptr_array_new();
+	if (!loader->pending_tasks) {
+		goto error;
+	}
+
+	loader->pool = g_thread_pool_new(bin_info_load_task_run, NULL,
+		thread_count, FALSE, &error);
+	if (!loader->pool) {
+		BT_COMP_LOG_CUR_LVL(BT_LOG_ERROR, log_level, self_comp,
+			"Cannot create thread pool: %s",
+			error ? error->message : "unknown error");
+		goto error;
+	}
+
+	goto end;
+
+error:
+	bin_info_loader_destroy(loader);
+	loader = NULL;
+
+end:
+	if (error) {
+		g_error_free(error);
+	}
+
+	return loader;
+}
+
+BT_HIDDEN
+void bin_info_loader_destroy(struct bin_info_loader *loader)
+{
+	if (!loader) {
+		return;
+	}
+
+	if (loader->pending_tasks) {
+		guint i;
+
+		for (i = 0; i < loader->pending_tasks->len; i++) {
+			bin_info_load_task_put(
+				g_ptr_array_index(loader->pending_tasks, i));
+		}
+
+		g_ptr_array_free(loader->pending_tasks, TRUE);
+	}
+
+	if (loader->pool) {
+		/*
+		 * Let the workers release the remaining (cancelled)
+		 * tasks of the queue.
+		 */
+		g_thread_pool_free(loader->pool, FALSE, TRUE);
+	}
+
+	g_free(loader);
+}
+
+BT_HIDDEN
+int bin_info_loader_add(struct bin_info_loader *loader, struct bin_info *bin)
+{
+	struct bin_info_load_task *task;
+	int ret = 0;
+
+	BT_ASSERT(loader);
+	BT_ASSERT(bin);
+
+	/* A task which was not started yet is replaced */
+	bin_info_finish_load(bin);
+
+	task = g_new0(struct bin_info_load_task, 1);
+	if (!task) {
+		ret = -1;
+		goto end;
+	}
+
+	/* One reference for `bin`, one for `loader` */
+	task->ref_count = 2;
+	g_mutex_init(&task->lock);
+	g_cond_init(&task->done_cond);
+	task->state = BIN_INFO_LOAD_TASK_STATE_PENDING;
+	task->bin = bin;
+	bin->load_task = task;
+	g_ptr_array_add(loader->pending_tasks, task);
+
+end:
+	return ret;
+}
+
+BT_HIDDEN
+void bin_info_loader_flush(struct bin_info_loader *loader)
+{
+	guint i;
+
+	BT_ASSERT(loader);
+
+	for (i = 0; i < loader->pending_tasks->len; i++) {
+		struct bin_info_load_task *task =
+			g_ptr_array_index(loader->pending_tasks, i);
+		GError *error = NULL;
+
+		/* The reference of the pending array moves to the pool */
+		if (!g_thread_pool_push(loader->pool, task, &error)) {
+			BT_COMP_LOG_CUR_LVL(BT_LOG_WARNING, loader->log_level,
+				loader->self_comp,
+				"Cannot push bin_info loading task: %s",
+				error ? error->message : "unknown error");
+			g_clear_error(&error);
+
+			/* The owner of the bin_info loads it on demand */
+			g_mutex_lock(&task->lock);
+			if (task->state == BIN_INFO_LOAD_TASK_STATE_PENDING) {
+				task->state = BIN_INFO_LOAD_TASK_STATE_CANCELLED;
+				task->bin = NULL;
+			}
+			g_mutex_unlock(&task->lock);
+			bin_info_load_task_put(task);
+		}
+	}
+
+	g_ptr_array_set_size(loader->pending_tasks, 0);
+}
@@ -32,6 +32,7 @@
 #include <stdbool.h>
 #include <gelf.h>
 #include <elfutils/libdw.h>
+#include <glib.h>
 #include "common/macros.h"
 #include "fd-cache/fd-cache.h"
 
@@ -41,6 +42,10 @@
 #define BUILD_ID_SUFFIX ".debug"
 #define BUILD_ID_PREFIX_DIR_LEN 2
 
+struct bin_info_cu_index;
+struct bin_info_load_task;
+struct bin_info_loader;
+
 struct bin_info {
 	bt_logging_level log_level;
 
@@ -72,16 +77,28 @@ struct bin_info {
 	/* Configuration. */
 	gchar *debug_info_dir;
 	/* Denotes whether the executable is position independent code. */
-	bool is_pic:1;
+	bool is_pic;
 	/* Denotes whether the build id in the trace matches to one on disk. */
-	bool file_build_id_matches:1;
+	bool file_build_id_matches;
 	/*
 	 * Denotes whether the executable only has ELF symbols and no
 	 * DWARF info.
 	 */
-	bool is_elf_only:1;
+	bool is_elf_only;
 	/* Weak ref. Owned by the iterator. */
 	struct bt_fd_cache *fd_cache;
+	/*
+	 * Function symbols of each ELF symbol table, sorted by address
+	 * (struct bin_info_elf_symtab *); built on the first ELF lookup.
+	 */
+	GPtrArray *elf_symtabs;
+	/* Address ranges of the DWARF CUs; built on the first DWARF lookup. */
+	struct bin_info_cu_index *cu_index;
+	/*
+	 * Background loading task (see bin_info_loader_add()); `NULL`
+	 * if none.
+	 */
+	struct bin_info_load_task *load_task;
 };
 
 struct source_location {
@@ -237,6 +254,57 @@ int bin_info_lookup_source_location(struct bin_info *bin, uint64_t addr,
 BT_HIDDEN
 int bin_info_get_bin_loc(struct bin_info *bin, uint64_t addr, char **bin_loc);
 
+/**
+ * Create a loader which loads and indexes the ELF and DWARF info of
+ * bin_info instances with a pool of `thread_count` worker threads.
+ *
+ * @param thread_count	Number of worker threads (greater than 0)
+ * @returns		Pointer to the new loader on success,
+ *			NULL on failure.
+ */
+BT_HIDDEN
+struct bin_info_loader *bin_info_loader_create(unsigned int thread_count,
+		bt_logging_level log_level, bt_self_component *self_comp);
+
+/**
+ * Destroy the given loader, waiting for its worker threads to finish.
+ *
+ * The bin_info instances which were added to `loader` must be
+ * destroyed first.
+ *
+ * @param loader	loader instance to destroy
+ */
+BT_HIDDEN
+void bin_info_loader_destroy(struct bin_info_loader *loader);
+
+/**
+ * Schedule the loading of the ELF and DWARF info of a given bin_info
+ * instance.
+ *
+ * The loading starts on the next call to bin_info_loader_flush().
+ * Until then, the bin_info instance can still be modified, for example
+ * with bin_info_set_debug_link().
+ *
+ * All the bin_info functions wait for the background loading to
+ * finish, or cancel it if it's not started yet, before accessing the
+ * instance.
+ *
+ * @param loader	loader instance
+ * @param bin		bin_info instance to load
+ * @returns		0 on success, -1 on failure
+ */
+BT_HIDDEN
+int bin_info_loader_add(struct bin_info_loader *loader, struct bin_info *bin);
+
+/**
+ * Start loading the bin_info instances which were added to `loader`
+ * since the last call.
+ *
+ * @param loader	loader instance
+ */
+BT_HIDDEN
+void bin_info_loader_flush(struct bin_info_loader *loader);
+
 /**
  * Destroy the given source_location instance
  *
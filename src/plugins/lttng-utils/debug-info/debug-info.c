@@ -32,6 +32,7 @@
 #include "logging/comp-logging.h"
 
 #include <stdbool.h>
+#include <string.h>
 
 #include <glib.h>
 
@@ -41,6 +42,7 @@
 
 #include "bin-info.h"
 #include "debug-info.h"
+#include "symbol-cache.h"
 #include "trace-ir-data-copy.h"
 #include "trace-ir-mapping.h"
 #include "trace-ir-metadata-copy.h"
@@ -48,6 +50,7 @@
 #include "plugins/common/param-validation/param-validation.h"
 
 #define DEFAULT_DEBUG_INFO_FIELD_NAME	"debug_info"
+#define DEFAULT_IP_CACHE_MAX_ENTRIES	65536
 #define LTTNG_UST_STATEDUMP_PREFIX	"lttng_ust"
 #define VPID_FIELD_NAME			"vpid"
 #define IP_FIELD_NAME			"ip"
@@ -59,6 +62,33 @@
 #define MEMSZ_FIELD_NAME		"memsz"
 #define PATH_FIELD_NAME			"path"
 
+struct ip_cache_stats {
+	uint64_t hits;
+	uint64_t misses;
+	uint64_t evictions;
+};
+
+/*
+ * Statistics of all the components of this class within the process,
+ * returned by the `ip-cache-stats` query.
+ *
+ * The components update them as they use their IP caches (see
+ * IP_CACHE_STATS_INC()), so that the query returns live values.
+ */
+static struct ip_cache_stats global_ip_cache_stats;
+
+/*
+ * Increments the counter `_counter` of the `struct debug_info` object
+ * `_debug_info` and the process-wide one.
+ */
+#define IP_CACHE_STATS_INC(_debug_info, _counter)			\
+	do {								\
+		(_debug_info)->ip_cache_stats._counter++;		\
+		(void) __atomic_fetch_add(				\
+			&global_ip_cache_stats._counter, 1,		\
+			__ATOMIC_RELAXED);				\
+	} while (0)
+
 struct debug_info_component {
 	bt_logging_level log_level;
 	bt_self_component *self_comp;
@@ -66,6 +96,15 @@ struct debug_info_component {
 	gchar *arg_debug_info_field_name;
 	gchar *arg_target_prefix;
 	bt_bool arg_full_path;
+	bt_bool arg_pass_through_unenriched_traces;
+	uint64_t arg_ip_cache_max_entries;
+	uint64_t arg_loader_thread_count;
+
+	/* Owned by this; `NULL` if `symbol-cache-dir` is not specified */
+	struct symbol_cache *symbol_cache;
+
+	/* Statistics of the destroyed `struct debug_info` objects */
+	struct ip_cache_stats ip_cache_stats;
 };
 
 struct debug_info_msg_iter {
@@ -80,6 +119,9 @@ struct debug_info_msg_iter {
 	GHashTable *debug_info_map;
 
 	struct bt_fd_cache fd_cache;
+
+	/* `NULL` if `loader-thread-count` is 0 */
+	struct bin_info_loader *bin_info_loader;
 };
 
 struct debug_info_source {
@@ -101,6 +143,14 @@ struct debug_info_source {
 	 * relative (+0x4321).
 	 */
 	gchar *bin_loc;
+
+	/* Weak: table containing this entry, and its key */
+	struct proc_debug_info_sources *proc_dbg_info_src;
+	uint64_t ip;
+
+	/* Weak: LRU queue of the debug_info, and link of this entry within it */
+	GQueue *lru;
+	GList *lru_link;
 };
 
 struct proc_debug_info_sources {
@@ -137,8 +187,27 @@ struct debug_info {
 	GQuark q_lib_load;
 	GQuark q_lib_unload;
 	struct bt_fd_cache *fd_cache; /* Weak ref. Owned by the iterator. */
+	/* Weak ref. Owned by the iterator; `NULL` if disabled. */
+	struct bin_info_loader *bin_info_loader;
+
+	/*
+	 * All the entries of the `ip_to_debug_info_src` tables of
+	 * `vpid_to_proc_dbg_info_src` (struct debug_info_source *), the
+	 * most recently used first; owned by debug_info.
+	 */
+	GQueue *ip_cache_lru;
+	struct ip_cache_stats ip_cache_stats;
 };
 
+static
+void ip_cache_stats_add(struct ip_cache_stats *dst,
+		const struct ip_cache_stats *src)
+{
+	dst->hits += src->hits;
+	dst->misses += src->misses;
+	dst->evictions += src->evictions;
+}
+
 static
 int debug_info_init(struct debug_info *info)
 {
@@ -164,6 +233,11 @@ void debug_info_source_destroy(struct debug_info_source *debug_info_src)
 		return;
 	}
 
+	if (debug_info_src->lru_link) {
+		g_queue_delete_link(debug_info_src->lru,
+			debug_info_src->lru_link);
+	}
+
 	g_free(debug_info_src->func);
 	g_free(debug_info_src->line_no);
 	g_free(debug_info_src->src_path);
@@ -175,11 +249,15 @@ void debug_info_source_destroy(struct debug_info_source *debug_info_src)
 static
 struct debug_info_source *debug_info_source_create_from_bin(
 		struct bin_info *bin, uint64_t ip,
+		struct symbol_cache *symbol_cache,
 		bt_self_component *self_comp)
 {
 	int ret;
 	struct debug_info_source *debug_info_src = NULL;
 	struct source_location *src_loc = NULL;
+	const struct symbol_cache_entry *cache_entry = NULL;
+	uint64_t cache_offset = 0;
+	bool use_symbol_cache;
 	bt_logging_level log_level;
 
 	BT_ASSERT(bin);
@@ -192,6 +270,38 @@ struct debug_info_source *debug_info_source_create_from_bin(
 		goto end;
 	}
 
+	/*
+	 * Only binaries of which the build ID matches the one recorded
+	 * in the trace can be cached: the build ID is the cache key.
+	 */
+	use_symbol_cache = symbol_cache && bin->build_id &&
+		bin->file_build_id_matches;
+	if (use_symbol_cache) {
+		cache_offset = bin->is_pic ? ip - bin->low_addr : ip;
+		cache_entry = symbol_cache_lookup(symbol_cache, bin->build_id,
+			bin->build_id_len, cache_offset);
+	}
+
+	if (cache_entry) {
+		debug_info_src->func = g_strdup(cache_entry->func);
+		debug_info_src->line_no = g_strdup(cache_entry->line_no);
+		debug_info_src->src_path = g_strdup(cache_entry->src_path);
+		if ((cache_entry->func && !debug_info_src->func) ||
+				(cache_entry->line_no &&
+					!debug_info_src->line_no) ||
+				(cache_entry->src_path &&
+					!debug_info_src->src_path)) {
+			goto error;
+		}
+
+		if (debug_info_src->src_path) {
+			debug_info_src->short_src_path = get_filename_from_path(
+				debug_info_src->src_path);
+		}
+
+		goto set_bin_path;
+	}
+
 	/* Lookup function name */
 	ret = bin_info_lookup_function_name(bin, ip, &debug_info_src->func);
 	if (ret) {
@@ -228,6 +338,21 @@ struct debug_info_source *debug_info_source_create_from_bin(
 		source_location_destroy(src_loc);
 	}
 
+	/*
+	 * Only cache what the DWARF information provides: ELF symbol
+	 * lookups are cheap.
+	 */
+	if (use_symbol_cache && !bin->is_elf_only) {
+		ret = symbol_cache_add(symbol_cache, bin->build_id,
+			bin->build_id_len, cache_offset, debug_info_src->func,
+			debug_info_src->line_no, debug_info_src->src_path);
+		if (ret) {
+			BT_COMP_LOGW("Failed to add symbol cache entry: "
+				"ip=%#" PRIx64, ip);
+		}
+	}
+
+set_bin_path:
 	if (bin->elf_path) {
 		debug_info_src->bin_path = g_strdup(bin->elf_path);
 		if (!debug_info_src->bin_path) {
@@ -450,6 +575,28 @@ bool event_has_payload_field(const bt_event *event,
 	return event_borrow_payload_field(event, field_name);
 }
 
+/*
+ * Evicts the least recently used entries of the IP caches of
+ * `debug_info` until there's room for a new one.
+ */
+static
+void ip_cache_make_room(struct debug_info *debug_info)
+{
+	while (g_queue_get_length(debug_info->ip_cache_lru) >=
+			debug_info->comp->arg_ip_cache_max_entries) {
+		struct debug_info_source *lru_src =
+			g_queue_peek_tail(debug_info->ip_cache_lru);
+		gboolean ret;
+
+		/* This removes the entry from the LRU queue too */
+		ret = g_hash_table_remove(
+			lru_src->proc_dbg_info_src->ip_to_debug_info_src,
+			&lru_src->ip);
+		BT_ASSERT(ret);
+		IP_CACHE_STATS_INC(debug_info, evictions);
+	}
+}
+
 static
 struct debug_info_source *proc_debug_info_sources_get_entry(
 		struct debug_info *debug_info,
@@ -470,9 +617,17 @@ struct debug_info_source *proc_debug_info_sources_get_entry(
 	debug_info_src = g_hash_table_lookup(
 		proc_dbg_info_src->ip_to_debug_info_src, key);
 	if (debug_info_src) {
+		/* Move to the front of the LRU queue */
+		g_queue_unlink(debug_info->ip_cache_lru,
+			debug_info_src->lru_link);
+		g_queue_push_head_link(debug_info->ip_cache_lru,
+			debug_info_src->lru_link);
+		IP_CACHE_STATS_INC(debug_info, hits);
 		goto end;
 	}
 
+	IP_CACHE_STATS_INC(debug_info, misses);
+
 	/* Check in all bin_infos. */
 	g_hash_table_iter_init(&iter, proc_dbg_info_src->baddr_to_bin_info);
 
@@ -487,18 +642,25 @@ struct debug_info_source *proc_debug_info_sources_get_entry(
 		/*
 		 * Found; add it to cache.
 		 *
-		 * FIXME: this should be bounded in size (and implement
-		 * a caching policy), and entries should be prunned when
-		 * libraries are unmapped.
+		 * FIXME: entries should be prunned when libraries are
+		 * unmapped.
 		 */
 		debug_info_src = debug_info_source_create_from_bin(bin, ip,
-			debug_info->self_comp);
+			debug_info->comp->symbol_cache, debug_info->self_comp);
 		if (debug_info_src) {
+			ip_cache_make_room(debug_info);
 			g_hash_table_insert(
 				proc_dbg_info_src->ip_to_debug_info_src, key,
 				debug_info_src);
 			/* Ownership passed to ht. */
 			key = NULL;
+			debug_info_src->proc_dbg_info_src = proc_dbg_info_src;
+			debug_info_src->ip = ip;
+			debug_info_src->lru = debug_info->ip_cache_lru;
+			g_queue_push_head(debug_info->ip_cache_lru,
+				debug_info_src);
+			debug_info_src->lru_link =
+				g_queue_peek_head_link(debug_info->ip_cache_lru);
 		}
 		break;
 	}
@@ -530,7 +692,8 @@ end:
 
 static
 struct debug_info *debug_info_create(struct debug_info_component *comp,
-		const bt_trace *trace, struct bt_fd_cache *fdc)
+		const bt_trace *trace, struct bt_fd_cache *fdc,
+		struct bin_info_loader *bin_info_loader)
 {
 	int ret;
 	struct debug_info *debug_info;
@@ -553,6 +716,11 @@ struct debug_info *debug_info_create(struct debug_info_component *comp,
 		goto error;
 	}
 
+	debug_info->ip_cache_lru = g_queue_new();
+	if (!debug_info->ip_cache_lru) {
+		goto error;
+	}
+
 	debug_info->comp = comp;
 	ret = debug_info_init(debug_info);
 	if (ret) {
@@ -561,10 +729,19 @@ struct debug_info *debug_info_create(struct debug_info_component *comp,
 
 	debug_info->input_trace = trace;
 	debug_info->fd_cache = fdc;
+	debug_info->bin_info_loader = bin_info_loader;
 
 end:
 	return debug_info;
 error:
+	if (debug_info->vpid_to_proc_dbg_info_src) {
+		g_hash_table_destroy(debug_info->vpid_to_proc_dbg_info_src);
+	}
+
+	if (debug_info->ip_cache_lru) {
+		g_queue_free(debug_info->ip_cache_lru);
+	}
+
 	g_free(debug_info);
 	return NULL;
 }
@@ -582,10 +759,24 @@ void debug_info_destroy(struct debug_info *debug_info)
 	log_level = debug_info->log_level;
 	self_comp = debug_info->self_comp;
 
+	BT_COMP_LOGD("Destroying debug info: ip-cache-hits=%" PRIu64 ", "
+		"ip-cache-misses=%" PRIu64 ", ip-cache-evictions=%" PRIu64,
+		debug_info->ip_cache_stats.hits,
+		debug_info->ip_cache_stats.misses,
+		debug_info->ip_cache_stats.evictions);
+	ip_cache_stats_add(&debug_info->comp->ip_cache_stats,
+		&debug_info->ip_cache_stats);
+
+	/* This empties the LRU queue */
 	if (debug_info->vpid_to_proc_dbg_info_src) {
 		g_hash_table_destroy(debug_info->vpid_to_proc_dbg_info_src);
 	}
 
+	if (debug_info->ip_cache_lru) {
+		BT_ASSERT(g_queue_is_empty(debug_info->ip_cache_lru));
+		g_queue_free(debug_info->ip_cache_lru);
+	}
+
 	remove_listener_status = bt_trace_remove_destruction_listener(
 		debug_info->input_trace,
 		debug_info->destruction_listener_id);
@@ -646,6 +837,10 @@ void handle_event_statedump_build_id(struct debug_info *debug_info,
 		goto end;
 	}
 
+	if (debug_info->bin_info_loader) {
+		(void) bin_info_loader_add(debug_info->bin_info_loader, bin);
+	}
+
 	/*
 	 * Reset the is_elf_only flag in case it had been set
 	 * previously, because we might find separate debug info using
@@ -700,7 +895,13 @@ void handle_event_statedump_debug_link(struct debug_info *debug_info,
 		goto end;
 	}
 
-	bin_info_set_debug_link(bin, filename, crc32);
+	if (bin_info_set_debug_link(bin, filename, crc32)) {
+		goto end;
+	}
+
+	if (debug_info->bin_info_loader) {
+		(void) bin_info_loader_add(debug_info->bin_info_loader, bin);
+	}
 
 end:
 	return;
@@ -870,8 +1071,12 @@ void trace_debug_info_remove_func(const bt_trace *in_trace, void *data)
 	}
 }
 
+/*
+ * Returns whether or not `event` describes a binary (base address,
+ * build ID, or debug link).
+ */
 static
-void handle_event_statedump(struct debug_info_msg_iter *debug_it,
+bool handle_event_statedump(struct debug_info_msg_iter *debug_it,
 		const bt_event *event)
 {
 	const bt_event_class *event_class;
@@ -879,6 +1084,7 @@ void handle_event_statedump(struct debug_info_msg_iter *debug_it,
 	GQuark q_event_name;
 	const bt_trace *trace;
 	struct debug_info *debug_info;
+	bool describes_bin = true;
 
 	BT_ASSERT(debug_it);
 	BT_ASSERT(event);
@@ -895,7 +1101,7 @@ void handle_event_statedump(struct debug_info_msg_iter *debug_it,
 		bt_trace_add_listener_status add_listener_status;
 
 		debug_info = debug_info_create(debug_it->debug_info_component,
-			trace, &debug_it->fd_cache);
+			trace, &debug_it->fd_cache, debug_it->bin_info_loader);
 		g_hash_table_insert(debug_it->debug_info_map, (gpointer) trace,
 			debug_info);
 		add_listener_status = bt_trace_add_destruction_listener(
@@ -924,6 +1130,7 @@ void handle_event_statedump(struct debug_info_msg_iter *debug_it,
 	} else if (q_event_name == debug_info->q_statedump_start) {
 		/* Start state dump */
 		handle_event_statedump_start(debug_info, event);
+		describes_bin = false;
 	} else if (q_event_name == debug_info->q_statedump_debug_link) {
 		/* Debug link info */
 		handle_event_statedump_debug_link(debug_info, event);
@@ -932,9 +1139,12 @@ void handle_event_statedump(struct debug_info_msg_iter *debug_it,
 		handle_event_statedump_build_id(debug_info, event);
 	} else if (q_event_name == debug_info-> q_lib_unload) {
 		handle_event_lib_unload(debug_info, event);
+		describes_bin = false;
+	} else {
+		describes_bin = false;
 	}
 
-	return;
+	return describes_bin;
 }
 
 static
@@ -947,6 +1157,12 @@ void destroy_debug_info_comp(struct debug_info_component *debug_info)
 	g_free(debug_info->arg_debug_dir);
 	g_free(debug_info->arg_debug_info_field_name);
 	g_free(debug_info->arg_target_prefix);
+
+	if (debug_info->symbol_cache) {
+		symbol_cache_save(debug_info->symbol_cache);
+		symbol_cache_destroy(debug_info->symbol_cache);
+	}
+
 	g_free(debug_info);
 }
 
@@ -1230,6 +1446,7 @@ void update_event_statedump_if_needed(struct debug_info_msg_iter *debug_it,
 	const bt_field *event_common_ctx;
 	const bt_field_class *event_common_ctx_fc;
 	const bt_event_class *in_event_class = bt_event_borrow_class_const(in_event);
+	bool describes_bin = false;
 
 	/*
 	 * If the event is an lttng_ust_statedump event AND has the right event
@@ -1248,10 +1465,19 @@ void update_event_statedump_if_needed(struct debug_info_msg_iter *debug_it,
 		if (strncmp(in_event_name, LTTNG_UST_STATEDUMP_PREFIX,
 				strlen(LTTNG_UST_STATEDUMP_PREFIX)) == 0) {
 			/* Handle statedump events. */
-			handle_event_statedump(debug_it, in_event);
+			describes_bin = handle_event_statedump(debug_it,
+				in_event);
 		}
 	}
 end:
+	if (debug_it->bin_info_loader && !describes_bin) {
+		/*
+		 * The binaries which the preceding events described are
+		 * complete: start loading them in the background.
+		 */
+		bin_info_loader_flush(debug_it->bin_info_loader);
+	}
+
 	return;
 }
 
@@ -1665,11 +1891,106 @@ error:
 	return out_message;
 }
 
+static
+const bt_stream *message_borrow_stream_const(const bt_message *msg)
+{
+	const bt_stream *stream = NULL;
+
+	switch (bt_message_get_type(msg)) {
+	case BT_MESSAGE_TYPE_EVENT:
+		stream = bt_event_borrow_stream_const(
+			bt_message_event_borrow_event_const(msg));
+		break;
+	case BT_MESSAGE_TYPE_PACKET_BEGINNING:
+		stream = bt_packet_borrow_stream_const(
+			bt_message_packet_beginning_borrow_packet_const(msg));
+		break;
+	case BT_MESSAGE_TYPE_PACKET_END:
+		stream = bt_packet_borrow_stream_const(
+			bt_message_packet_end_borrow_packet_const(msg));
+		break;
+	case BT_MESSAGE_TYPE_STREAM_BEGINNING:
+		stream = bt_message_stream_beginning_borrow_stream_const(msg);
+		break;
+	case BT_MESSAGE_TYPE_STREAM_END:
+		stream = bt_message_stream_end_borrow_stream_const(msg);
+		break;
+	case BT_MESSAGE_TYPE_DISCARDED_EVENTS:
+		stream = bt_message_discarded_events_borrow_stream_const(msg);
+		break;
+	case BT_MESSAGE_TYPE_DISCARDED_PACKETS:
+		stream = bt_message_discarded_packets_borrow_stream_const(msg);
+		break;
+	default:
+		break;
+	}
+
+	return stream;
+}
+
+static
+bt_message *handle_passed_through_message(struct debug_info_msg_iter *debug_it,
+		const bt_message *in_message, const bt_stream *in_stream)
+{
+	bt_logging_level log_level = debug_it->log_level;
+	bt_self_component *self_comp = debug_it->self_comp;
+
+	switch (bt_message_get_type(in_message)) {
+	case BT_MESSAGE_TYPE_EVENT:
+		if (debug_it->bin_info_loader) {
+			/*
+			 * Not a state dump event describing a binary: see
+			 * update_event_statedump_if_needed().
+			 */
+			bin_info_loader_flush(debug_it->bin_info_loader);
+		}
+		break;
+	case BT_MESSAGE_TYPE_STREAM_BEGINNING:
+	{
+		const bt_field_class *in_common_ctx_fc =
+			bt_stream_class_borrow_event_common_context_field_class_const(
+				bt_stream_borrow_class_const(in_stream));
+
+		if (in_common_ctx_fc && is_event_common_ctx_dbg_info_compatible(
+				in_common_ctx_fc,
+				debug_it->ir_maps->debug_info_field_class_name)) {
+			/*
+			 * This stream class was added to the trace class
+			 * after the trace was first seen: the other streams
+			 * of the trace are already forwarded as is.
+			 */
+			BT_COMP_LOGW("Forwarding stream without debugging information "
+				"as its trace is already forwarded as is: "
+				"stream-addr=%p, stream-id=%" PRIu64,
+				in_stream, bt_stream_get_id(in_stream));
+		}
+		break;
+	}
+	default:
+		break;
+	}
+
+	/*
+	 * None of the event classes of this trace get a debug info
+	 * field: forward the message itself instead of a copy.
+	 */
+	bt_message_get_ref(in_message);
+	return (bt_message *) in_message;
+}
+
 static
 const bt_message *handle_message(struct debug_info_msg_iter *debug_it,
 		const bt_message *in_message)
 {
 	bt_message *out_message = NULL;
+	const bt_stream *in_stream = message_borrow_stream_const(in_message);
+
+	if (in_stream && trace_ir_mapping_is_trace_passed_through(
+			debug_it->ir_maps, bt_stream_borrow_trace_const(in_stream))) {
+		out_message = handle_passed_through_message(debug_it,
+			in_message, in_stream);
+		goto end;
+	}
 
 	switch (bt_message_get_type(in_message)) {
 	case BT_MESSAGE_TYPE_EVENT:
@@ -1701,6 +2022,7 @@ const bt_message *handle_message(struct debug_info_msg_iter *debug_it,
 		break;
 	}
 
+end:
 	return out_message;
 }
 
@@ -1710,6 +2032,10 @@ struct bt_param_validation_map_value_entry_descr debug_info_params[] = {
 	{ "debug-info-dir", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_STRING } },
 	{ "target-prefix", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_STRING } },
 	{ "full-path", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_BOOL } },
+	{ "ip-cache-max-entries", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_UNSIGNED_INTEGER } },
+	{ "loader-thread-count", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_UNSIGNED_INTEGER } },
+	{ "pass-through-unenriched-traces", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_BOOL } },
+	{ "symbol-cache-dir", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_STRING } },
 	BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_END
 };
 
@@ -1772,6 +2098,64 @@ bt_component_class_initialize_method_status init_from_params(
 		debug_info_component->arg_full_path = BT_FALSE;
 	}
 
+	value = bt_value_map_borrow_entry_value_const(params,
+		"pass-through-unenriched-traces");
+	if (value) {
+		debug_info_component->arg_pass_through_unenriched_traces =
+			bt_value_bool_get(value);
+	} else {
+		debug_info_component->arg_pass_through_unenriched_traces =
+			BT_TRUE;
+	}
+
+	value = bt_value_map_borrow_entry_value_const(params,
+		"ip-cache-max-entries");
+	if (value) {
+		debug_info_component->arg_ip_cache_max_entries =
+			bt_value_integer_unsigned_get(value);
+		if (debug_info_component->arg_ip_cache_max_entries == 0) {
+			BT_COMP_LOGE_APPEND_CAUSE(
+				debug_info_component->self_comp,
+				"`ip-cache-max-entries` parameter must be greater than 0.");
+			status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_ERROR;
+			goto end;
+		}
+	} else {
+		debug_info_component->arg_ip_cache_max_entries =
+			DEFAULT_IP_CACHE_MAX_ENTRIES;
+	}
+
+	value = bt_value_map_borrow_entry_value_const(params,
+		"loader-thread-count");
+	if (value) {
+		debug_info_component->arg_loader_thread_count =
+			bt_value_integer_unsigned_get(value);
+		if (debug_info_component->arg_loader_thread_count > G_MAXINT) {
+			BT_COMP_LOGE_APPEND_CAUSE(
+				debug_info_component->self_comp,
+				"`loader-thread-count` parameter is too large: "
+				"value=%" PRIu64,
+				debug_info_component->arg_loader_thread_count);
+			status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_ERROR;
+			goto end;
+		}
+	}
+
+	value = bt_value_map_borrow_entry_value_const(params,
+		"symbol-cache-dir");
+	if (value) {
+		debug_info_component->symbol_cache = symbol_cache_create(
+			bt_value_string_get(value), log_level,
+			debug_info_component->self_comp);
+		if (!debug_info_component->symbol_cache) {
+			BT_COMP_LOGE_APPEND_CAUSE(
+				debug_info_component->self_comp,
+				"Failed to create symbol cache.");
+			status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+			goto end;
+		}
+	}
+
 	status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_OK;
 
 end:
@@ -1855,12 +2239,97 @@ void debug_info_comp_finalize(bt_self_component_filter *self_comp_flt)
 	bt_logging_level log_level = debug_info->log_level;
 	bt_self_component *self_comp = debug_info->self_comp;
 
-	BT_COMP_LOGI("Finalizing debug_info self_component: comp-addr=%p",
-		self_comp);
+	BT_COMP_LOGI("Finalizing debug_info self_component: comp-addr=%p, "
+		"ip-cache-hits=%" PRIu64 ", ip-cache-misses=%" PRIu64 ", "
+		"ip-cache-evictions=%" PRIu64, self_comp,
+		debug_info->ip_cache_stats.hits,
+		debug_info->ip_cache_stats.misses,
+		debug_info->ip_cache_stats.evictions);
 
 	destroy_debug_info_comp(debug_info);
 }
 
+static
+bt_component_class_query_method_status query_ip_cache_stats(
+		bt_self_component_class *self_comp_class,
+		bt_logging_level log_level, const bt_value **user_result)
+{
+	bt_component_class_query_method_status status =
+		BT_COMPONENT_CLASS_QUERY_METHOD_STATUS_OK;
+	bt_value_map_insert_entry_status insert_status;
+	const struct ip_cache_stats *stats = &global_ip_cache_stats;
+	bt_value *result;
+
+	/*
+	 * Components of this process can update the counters
+	 * concurrently: read each one atomically.
+	 */
+	result = bt_value_map_create();
+	if (!result) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"hits", __atomic_load_n(&stats->hits, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"misses", __atomic_load_n(&stats->misses, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	insert_status = bt_value_map_insert_unsigned_integer_entry(result,
+		"evictions", __atomic_load_n(&stats->evictions, __ATOMIC_RELAXED));
+	if (insert_status != BT_VALUE_MAP_INSERT_ENTRY_STATUS_OK) {
+		goto memory_error;
+	}
+
+	*user_result = result;
+	result = NULL;
+	goto end;
+
+memory_error:
+	BT_COMP_CLASS_LOGE_APPEND_CAUSE(self_comp_class,
+		"Failed to create the `ip-cache-stats` query result.");
+	status = BT_COMPONENT_CLASS_QUERY_METHOD_STATUS_MEMORY_ERROR;
+
+end:
+	BT_VALUE_PUT_REF_AND_RESET(result);
+	return status;
+}
+
+BT_HIDDEN
+bt_component_class_query_method_status debug_info_comp_query(
+		bt_self_component_class_filter *comp_class,
+		bt_private_query_executor *priv_query_exec,
+		const char *object,
+		__attribute__((unused)) const bt_value *params,
+		__attribute__((unused)) void *method_data,
+		const bt_value **result)
+{
+	bt_component_class_query_method_status status;
+	bt_self_component *self_comp = NULL;
+	bt_self_component_class *self_comp_class =
+		bt_self_component_class_filter_as_self_component_class(
+			comp_class);
+	bt_logging_level log_level = bt_query_executor_get_logging_level(
+		bt_private_query_executor_as_query_executor_const(
+			priv_query_exec));
+
+	if (strcmp(object, "ip-cache-stats") == 0) {
+		status = query_ip_cache_stats(self_comp_class, log_level,
+			result);
+	} else {
+		BT_COMP_LOGI("Unknown query object `%s`", object);
+		status = BT_COMPONENT_CLASS_QUERY_METHOD_STATUS_UNKNOWN_OBJECT;
+	}
+
+	return status;
+}
+
 BT_HIDDEN
 bt_component_class_message_iterator_next_method_status debug_info_msg_iter_next(
 		bt_self_message_iterator *self_msg_iter,
@@ -1967,10 +2436,12 @@ void debug_info_msg_iter_destroy(struct debug_info_msg_iter *debug_info_msg_iter
 		trace_ir_maps_destroy(debug_info_msg_iter->ir_maps);
 	}
 
+	/* This waits for or cancels the loading of the bin_info objects */
 	if (debug_info_msg_iter->debug_info_map) {
 		g_hash_table_destroy(debug_info_msg_iter->debug_info_map);
 	}
 
+	bin_info_loader_destroy(debug_info_msg_iter->bin_info_loader);
 	bt_fd_cache_fini(&debug_info_msg_iter->fd_cache);
 	g_free(debug_info_msg_iter);
 
@@ -2042,7 +2513,9 @@ bt_component_class_message_iterator_initialize_method_status debug_info_msg_iter
 		debug_info_msg_iter->debug_info_component->arg_debug_info_field_name;
 
 	debug_info_msg_iter->ir_maps = trace_ir_maps_create(self_comp,
-		debug_info_field_name, log_level);
+		debug_info_field_name,
+		debug_info_msg_iter->debug_info_component->arg_pass_through_unenriched_traces,
+		log_level);
 	if (!debug_info_msg_iter->ir_maps) {
 		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
 		goto error;
@@ -2054,6 +2527,16 @@ bt_component_class_message_iterator_initialize_method_status debug_info_msg_iter
 		goto error;
 	}
 
+	if (debug_info_msg_iter->debug_info_component->arg_loader_thread_count > 0) {
+		debug_info_msg_iter->bin_info_loader = bin_info_loader_create(
+			debug_info_msg_iter->debug_info_component->arg_loader_thread_count,
+			log_level, self_comp);
+		if (!debug_info_msg_iter->bin_info_loader) {
+			status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_INITIALIZE_METHOD_STATUS_ERROR;
+			goto error;
+		}
+	}
+
 	bt_self_message_iterator_configuration_set_can_seek_forward(config,
 		bt_self_component_port_input_message_iterator_can_seek_forward(
 			debug_info_msg_iter->msg_iter));
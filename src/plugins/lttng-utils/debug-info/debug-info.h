@@ -46,6 +46,13 @@ bt_component_class_initialize_method_status debug_info_comp_init(
 BT_HIDDEN
 void debug_info_comp_finalize(bt_self_component_filter *self_comp);
 
+BT_HIDDEN
+bt_component_class_query_method_status debug_info_comp_query(
+		bt_self_component_class_filter *comp_class,
+		bt_private_query_executor *priv_query_exec,
+		const char *object, const bt_value *params,
+		void *method_data, const bt_value **result);
+
 BT_HIDDEN
 bt_component_class_message_iterator_initialize_method_status debug_info_msg_iter_init(
 		bt_self_message_iterator *self_msg_iter,
@@ -0,0 +1,511 @@
+/*
+ * Babeltrace - Persistent symbol and source location cache
+ *
+ * Copyright (c) 2020 EfficiOS Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+#define BT_COMP_LOG_SELF_COMP (cache->self_comp)
+#define BT_LOG_OUTPUT_LEVEL (cache->log_level)
+#define BT_LOG_TAG "PLUGIN/FLT.LTTNG-UTILS.DEBUG-INFO/SYMBOL-CACHE"
+#include "logging/comp-logging.h"
+
+#include <errno.h>
+#include <inttypes.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <string.h>
+
+#include <glib.h>
+
+#include "common/assert.h"
+
+#include "symbol-cache.h"
+
+/* First line of a cache file; change the version when the format changes */
+#define SYMBOL_CACHE_FILE_HEADER	"babeltrace2-debug-info-symbol-cache 1\n"
+
+struct symbol_cache {
+	bt_logging_level log_level;
+
+	/* Used for logging; can be `NULL` */
+	bt_self_component *self_comp;
+
+	gchar *dir;
+
+	/*
+	 * Hash table: build ID string (owned) to
+	 * (struct symbol_cache_file *); owned by symbol_cache.
+	 */
+	GHashTable *files;
+};
+
+struct symbol_cache_file {
+	gchar *path;
+
+	/*
+	 * Hash table: offset (pointer to uint64_t) to
+	 * (struct symbol_cache_entry *); owned by symbol_cache_file.
+	 */
+	GHashTable *entries;
+
+	/* True if entries were added since the file was loaded */
+	bool dirty;
+};
+
+static
+void symbol_cache_entry_destroy(struct symbol_cache_entry *entry)
+{
+	if (!entry) {
+		return;
+	}
+
+	g_free(entry->func);
+	g_free(entry->line_no);
+	g_free(entry->src_path);
+	g_free(entry);
+}
+
+static
+void symbol_cache_file_destroy(struct symbol_cache_file *file)
+{
+	if (!file) {
+		return;
+	}
+
+	if (file->entries) {
+		g_hash_table_destroy(file->entries);
+	}
+
+	g_free(file->path);
+	g_free(file);
+}
+
+/*
+ * Returns a new string, or `NULL` if `str` is empty.
+ */
+static
+gchar *strdup_non_empty(const char *str)
+{
+	return str[0] == '\0' ? NULL : g_strdup(str);
+}
+
+static
+bool is_valid_line_no(const char *str)
+{
+	const char *ch;
+
+	for (ch = str; *ch != '\0'; ch++) {
+		if (*ch < '0' || *ch > '9') {
+			return false;
+		}
+	}
+
+	return true;
+}
+
+/*
+ * Adds the entry which the cache file line `line` describes to `file`.
+ * `line` is modified.
+ *
+ * Returns `false` if `line` is not a valid entry.
+ */
+static
+bool symbol_cache_file_add_line(struct symbol_cache_file *file, char *line)
+{
+	char *fields[4];
+	char *endptr;
+	unsigned int i;
+	uint64_t *key = NULL;
+	uint64_t offset;
+	struct symbol_cache_entry *entry = NULL;
+
+	fields[0] = line;
+
+	for (i = 1; i < G_N_ELEMENTS(fields); i++) {
+		char *tab = strchr(fields[i - 1], '\t');
+
+		if (!tab) {
+			goto error;
+		}
+
+		*tab = '\0';
+		fields[i] = tab + 1;
+	}
+
+	if (strchr(fields[3], '\t')) {
+		goto error;
+	}
+
+	errno = 0;
+	offset = g_ascii_strtoull(fields[0], &endptr, 16);
+	if (fields[0][0] == '\0' || *endptr != '\0' || errno != 0) {
+		goto error;
+	}
+
+	if (!is_valid_line_no(fields[2])) {
+		goto error;
+	}
+
+	entry = g_new0(struct symbol_cache_entry, 1);
+	key = g_new0(uint64_t, 1);
+	if (!entry || !key) {
+		goto error;
+	}
+
+	entry->func = strdup_non_empty(fields[1]);
+	entry->line_no = strdup_non_empty(fields[2]);
+	entry->src_path = strdup_non_empty(fields[3]);
+	*key = offset;
+	g_hash_table_insert(file->entries, key, entry);
+	return true;
+
+error:
+	symbol_cache_entry_destroy(entry);
+	g_free(key);
+	return false;
+}
+
+/*
+ * Loads the entries of the cache file `file->path`, if it exists.
+ */
+static
+void symbol_cache_file_load(struct symbol_cache *cache,
+		struct symbol_cache_file *file)
+{
+	gchar *contents = NULL;
+	gsize len;
+	GError *gerror = NULL;
+	char *line;
+	char *line_end;
+	uint64_t invalid_line_count = 0;
+
+	if (!g_file_get_contents(file->path, &contents, &len, &gerror)) {
+		if (gerror->code == G_FILE_ERROR_NOENT) {
+			BT_COMP_LOGD("No symbol cache file: path=\"%s\"",
+				file->path);
+		} else {
+			BT_COMP_LOGW("Cannot read symbol cache file: "
+				"path=\"%s\", error=\"%s\"", file->path,
+				gerror->message);
+		}
+
+		goto end;
+	}
+
+	if (!g_str_has_prefix(contents, SYMBOL_CACHE_FILE_HEADER)) {
+		BT_COMP_LOGI("Ignoring symbol cache file with unknown header: "
+			"path=\"%s\"", file->path);
+		goto end;
+	}
+
+	line = contents + strlen(SYMBOL_CACHE_FILE_HEADER);
+
+	/* A last line without a newline character is ignored */
+	while ((line_end = strchr(line, '\n'))) {
+		*line_end = '\0';
+
+		if (!symbol_cache_file_add_line(file, line)) {
+			invalid_line_count++;
+		}
+
+		line = line_end + 1;
+	}
+
+	if (invalid_line_count > 0) {
+		BT_COMP_LOGW("Ignored invalid symbol cache file lines: "
+			"path=\"%s\", count=%" PRIu64, file->path,
+			invalid_line_count);
+	}
+
+	BT_COMP_LOGI("Loaded symbol cache file: path=\"%s\", entry-count=%u",
+		file->path, g_hash_table_size(file->entries));
+
+end:
+	if (gerror) {
+		g_error_free(gerror);
+	}
+
+	g_free(contents);
+}
+
+/*
+ * Returns the cache file of the binary having the build ID `build_id`,
+ * loading it if not done yet.
+ */
+static
+struct symbol_cache_file *symbol_cache_borrow_file(struct symbol_cache *cache,
+		const uint8_t *build_id, size_t build_id_len)
+{
+	GString *build_id_str = NULL;
+	struct symbol_cache_file *file = NULL;
+	size_t i;
+
+	BT_ASSERT(build_id);
+	BT_ASSERT(build_id_len > 0);
+
+	build_id_str = g_string_sized_new(build_id_len * 2);
+	if (!build_id_str) {
+		goto error;
+	}
+
+	for (i = 0; i < build_id_len; i++) {
+		g_string_append_printf(build_id_str, "%02x", build_id[i]);
+	}
+
+	file = g_hash_table_lookup(cache->files, build_id_str->str);
+	if (file) {
+		goto end;
+	}
+
+	file = g_new0(struct symbol_cache_file, 1);
+	if (!file) {
+		goto error;
+	}
+
+	file->path = g_build_filename(cache->dir, build_id_str->str, NULL);
+	if (!file->path) {
+		goto error;
+	}
+
+	file->entries = g_hash_table_new_full(g_int64_hash, g_int64_equal,
+		(GDestroyNotify) g_free,
+		(GDestroyNotify) symbol_cache_entry_destroy);
+	if (!file->entries) {
+		goto error;
+	}
+
+	symbol_cache_file_load(cache, file);
+	g_hash_table_insert(cache->files, g_string_free(build_id_str, FALSE),
+		file);
+	build_id_str = NULL;
+	goto end;
+
+error:
+	symbol_cache_file_destroy(file);
+	file = NULL;
+
+end:
+	if (build_id_str) {
+		g_string_free(build_id_str, TRUE);
+	}
+
+	return file;
+}
+
+BT_HIDDEN
+struct symbol_cache *symbol_cache_create(const char *dir,
+		bt_logging_level log_level, bt_self_component *self_comp)
+{
+	struct symbol_cache *cache = g_new0(struct symbol_cache, 1);
+
+	if (!cache) {
+		goto error;
+	}
+
+	cache->log_level = log_level;
+	cache->self_comp = self_comp;
+	cache->dir = g_strdup(dir);
+	if (!cache->dir) {
+		goto error;
+	}
+
+	cache->files = g_hash_table_new_full(g_str_hash, g_str_equal,
+		(GDestroyNotify) g_free,
+		(GDestroyNotify) symbol_cache_file_destroy);
+	if (!cache->files) {
+		goto error;
+	}
+
+	goto end;
+
+error:
+	symbol_cache_destroy(cache);
+	cache = NULL;
+
+end:
+	return cache;
+}
+
+BT_HIDDEN
+void symbol_cache_destroy(struct symbol_cache *cache)
+{
+	if (!cache) {
+		return;
+	}
+
+	if (cache->files) {
+		g_hash_table_destroy(cache->files);
+	}
+
+	g_free(cache->dir);
+	g_free(cache);
+}
+
+BT_HIDDEN
+const struct symbol_cache_entry *symbol_cache_lookup(
+		struct symbol_cache *cache, const uint8_t *build_id,
+		size_t build_id_len, uint64_t offset)
+{
+	struct symbol_cache_file *file;
+	const struct symbol_cache_entry *entry = NULL;
+
+	file = symbol_cache_borrow_file(cache, build_id, build_id_len);
+	if (!file) {
+		goto end;
+	}
+
+	entry = g_hash_table_lookup(file->entries, &offset);
+
+end:
+	return entry;
+}
+
+static
+bool is_valid_field(const char *str)
+{
+	return !str || (!strchr(str, '\t') && !strchr(str, '\n'));
+}
+
+BT_HIDDEN
+int symbol_cache_add(struct symbol_cache *cache, const uint8_t *build_id,
+		size_t build_id_len, uint64_t offset, const char *func,
+		const char *line_no, const char *src_path)
+{
+	struct symbol_cache_file *file;
+	struct symbol_cache_entry *entry = NULL;
+	uint64_t *key = NULL;
+	int ret = 0;
+
+	if (!is_valid_field(func) || !is_valid_field(src_path) ||
+			(line_no && !is_valid_line_no(line_no))) {
+		/* Cannot be represented in a cache file: skip */
+		BT_COMP_LOGD("Not caching symbol with unsupported characters: "
+			"offset=%#" PRIx64, offset);
+		goto end;
+	}
+
+	file = symbol_cache_borrow_file(cache, build_id, build_id_len);
+	if (!file) {
+		goto error;
+	}
+
+	entry = g_new0(struct symbol_cache_entry, 1);
+	key = g_new0(uint64_t, 1);
+	if (!entry || !key) {
+		goto error;
+	}
+
+	entry->func = g_strdup(func);
+	entry->line_no = g_strdup(line_no);
+	entry->src_path = g_strdup(src_path);
+	*key = offset;
+	g_hash_table_insert(file->entries, key, entry);
+	file->dirty = true;
+	goto end;
+
+error:
+	symbol_cache_entry_destroy(entry);
+	g_free(key);
+	ret = -1;
+
+end:
+	return ret;
+}
+
+/*
+ * Writes `file` as a whole.
+ */
+static
+void symbol_cache_file_save(struct symbol_cache *cache,
+		struct symbol_cache_file *file)
+{
+	GString *contents = NULL;
+	GError *gerror = NULL;
+	GHashTableIter iter;
+	gpointer key, value;
+
+	if (g_mkdir_with_parents(cache->dir, 0755)) {
+		BT_COMP_LOGW_ERRNO("Cannot create symbol cache directory",
+			": path=\"%s\"", cache->dir);
+		goto end;
+	}
+
+	contents = g_string_new(SYMBOL_CACHE_FILE_HEADER);
+	if (!contents) {
+		BT_COMP_LOGW_STR("Failed to allocate a GString.");
+		goto end;
+	}
+
+	g_hash_table_iter_init(&iter, file->entries);
+
+	while (g_hash_table_iter_next(&iter, &key, &value)) {
+		const struct symbol_cache_entry *entry = value;
+
+		g_string_append_printf(contents, "%" PRIx64 "\t%s\t%s\t%s\n",
+			*((uint64_t *) key),
+			entry->func ? entry->func : "",
+			entry->line_no ? entry->line_no : "",
+			entry->src_path ? entry->src_path : "");
+	}
+
+	/*
+	 * g_file_set_contents() writes to a temporary file and then
+	 * renames it, so that concurrent readers never see a partial
+	 * cache file. With concurrent writers, the last one wins.
+	 */
+	if (!g_file_set_contents(file->path, contents->str, contents->len,
+			&gerror)) {
+		BT_COMP_LOGW("Cannot write symbol cache file: "
+			"path=\"%s\", error=\"%s\"", file->path,
+			gerror->message);
+		goto end;
+	}
+
+	file->dirty = false;
+	BT_COMP_LOGI("Saved symbol cache file: path=\"%s\", entry-count=%u",
+		file->path, g_hash_table_size(file->entries));
+
+end:
+	if (gerror) {
+		g_error_free(gerror);
+	}
+
+	if (contents) {
+		g_string_free(contents, TRUE);
+	}
+}
+
+BT_HIDDEN
+void symbol_cache_save(struct symbol_cache *cache)
+{
+	GHashTableIter iter;
+	gpointer value;
+
+	g_hash_table_iter_init(&iter, cache->files);
+
+	while (g_hash_table_iter_next(&iter, NULL, &value)) {
+		struct symbol_cache_file *file = value;
+
+		if (file->dirty) {
+			symbol_cache_file_save(cache, file);
+		}
+	}
+}
@@ -0,0 +1,116 @@
+#ifndef _BABELTRACE_DEBUG_INFO_SYMBOL_CACHE_H
+#define _BABELTRACE_DEBUG_INFO_SYMBOL_CACHE_H
+
+/*
+ * Babeltrace - Persistent symbol and source location cache
+ *
+ * Copyright (c) 2020 EfficiOS Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+#include <stdint.h>
+#include <stddef.h>
+#include <glib.h>
+#include <babeltrace2/babeltrace.h>
+#include "common/macros.h"
+
+/*
+ * A symbol cache keeps, on disk, the function names and source
+ * locations which the DWARF lookups of `bin-info.c` found, so that
+ * subsequent runs over the same binaries don't need to parse their
+ * DWARF information again.
+ *
+ * The cache directory contains one file per build ID, named after the
+ * lowercase hexadecimal representation of the build ID. Such a file
+ * starts with a version line and then contains one line per cached
+ * address:
+ *
+ *     OFFSET <TAB> FUNC <TAB> LINE-NO <TAB> SRC-PATH
+ *
+ * where OFFSET is the hexadecimal address relative to the binary's
+ * base address if it's position independent code, or the absolute
+ * address otherwise. An empty FUNC, LINE-NO, or SRC-PATH means
+ * "unknown".
+ *
+ * A cache file is loaded the first time an address of its binary is
+ * looked up, and rewritten as a whole by symbol_cache_save() if
+ * entries were added to it.
+ */
+struct symbol_cache;
+
+struct symbol_cache_entry {
+	/* All strings can be `NULL` (unknown) */
+	gchar *func;
+	gchar *line_no;
+	gchar *src_path;
+};
+
+/*
+ * Creates a symbol cache of which the files are in the directory `dir`.
+ *
+ * This function doesn't access the file system.
+ *
+ * @returns		Pointer to the new symbol cache on success,
+ *			NULL on failure.
+ */
+BT_HIDDEN
+struct symbol_cache *symbol_cache_create(const char *dir,
+		bt_logging_level log_level, bt_self_component *self_comp);
+
+/*
+ * Destroys `cache` without saving it.
+ */
+BT_HIDDEN
+void symbol_cache_destroy(struct symbol_cache *cache);
+
+/*
+ * Finds the cached entry of the address `offset` in the binary having
+ * the build ID `build_id`, loading the corresponding cache file if not
+ * done yet.
+ *
+ * @returns		Borrowed cache entry, or NULL if not found
+ */
+BT_HIDDEN
+const struct symbol_cache_entry *symbol_cache_lookup(
+		struct symbol_cache *cache, const uint8_t *build_id,
+		size_t build_id_len, uint64_t offset);
+
+/*
+ * Adds an entry for the address `offset` in the binary having the
+ * build ID `build_id`. `func`, `line_no`, and `src_path` can be `NULL`.
+ *
+ * @returns		0 on success, -1 on failure
+ */
+BT_HIDDEN
+int symbol_cache_add(struct symbol_cache *cache, const uint8_t *build_id,
+		size_t build_id_len, uint64_t offset, const char *func,
+		const char *line_no, const char *src_path);
+
+/*
+ * Writes the cache files to which entries were added since they were
+ * loaded.
+ *
+ * Failing to write a cache file is not an error: the next run simply
+ * looks up the missing entries again.
+ */
+BT_HIDDEN
+void symbol_cache_save(struct symbol_cache *cache);
+
+#endif	/* _BABELTRACE_DEBUG_INFO_SYMBOL_CACHE_H */
@@ -39,6 +39,7 @@
 #include "trace-ir-data-copy.h"
 #include "trace-ir-mapping.h"
 #include "trace-ir-metadata-copy.h"
+#include "utils.h"
 
 static
 bt_trace_class *create_new_mapped_trace_class(struct trace_ir_maps *ir_maps,
@@ -316,6 +317,16 @@ end:
 	return out_stream;
 }
 
+BT_HIDDEN
+bool trace_ir_mapping_is_trace_passed_through(struct trace_ir_maps *ir_maps,
+		const bt_trace *in_trace)
+{
+	BT_ASSERT_DBG(ir_maps);
+	BT_ASSERT_DBG(in_trace);
+
+	return borrow_data_maps_from_input_trace(ir_maps, in_trace)->pass_through;
+}
+
 BT_HIDDEN
 bt_stream *trace_ir_mapping_borrow_mapped_stream(struct trace_ir_maps *ir_maps,
 		const bt_stream *in_stream)
@@ -578,6 +589,14 @@ struct trace_ir_data_maps *trace_ir_data_maps_create(struct trace_ir_maps *ir_ma
 	d_maps->log_level = ir_maps->log_level;
 	d_maps->self_comp = ir_maps->self_comp;
 	d_maps->input_trace = in_trace;
+	d_maps->pass_through = ir_maps->pass_through_unenriched_traces &&
+		!is_trace_class_dbg_info_compatible(
+			bt_trace_borrow_class_const(in_trace),
+			ir_maps->debug_info_field_class_name);
+	if (d_maps->pass_through) {
+		BT_COMP_LOGD("Forwarding the messages of this trace as is: "
+			"in-t-addr=%p", in_trace);
+	}
 
 	/* Create the hashtables used to map data objects. */
 	d_maps->stream_map = g_hash_table_new_full(g_direct_hash,
@@ -755,7 +774,9 @@ void trace_ir_maps_destroy(struct trace_ir_maps *maps)
 
 BT_HIDDEN
 struct trace_ir_maps *trace_ir_maps_create(bt_self_component *self_comp,
-		const char *debug_info_field_name, bt_logging_level log_level)
+		const char *debug_info_field_name,
+		bool pass_through_unenriched_traces,
+		bt_logging_level log_level)
 {
 	struct trace_ir_maps *ir_maps = g_new0(struct trace_ir_maps, 1);
 	if (!ir_maps) {
@@ -775,6 +796,8 @@ struct trace_ir_maps *trace_ir_maps_create(bt_self_component *self_comp,
 		goto error;
 	}
 
+	ir_maps->pass_through_unenriched_traces =
+		pass_through_unenriched_traces;
 	ir_maps->self_comp = self_comp;
 
 	ir_maps->data_maps = g_hash_table_new_full(g_direct_hash,
@@ -22,6 +22,7 @@
  * SOFTWARE.
  */
 
+#include <stdbool.h>
 #include <glib.h>
 
 #include "common/assert.h"
@@ -111,6 +112,13 @@ struct trace_ir_data_maps {
 	 */
 	GHashTable *packet_map;
 
+	/*
+	 * True if no stream class of the input trace can get a debug info
+	 * field when the input trace is first seen: the messages of this
+	 * trace are then forwarded as is and `output_trace` stays `NULL`.
+	 */
+	bool pass_through;
+
 	bt_listener_id destruction_listener_id;
 };
 
@@ -133,12 +141,20 @@ struct trace_ir_maps {
 
 	char *debug_info_field_class_name;
 
+	/*
+	 * Whether or not to forward the input traces which cannot get a
+	 * debug info field as is instead of copying them.
+	 */
+	bool pass_through_unenriched_traces;
+
 	bt_self_component *self_comp;
 };
 
 BT_HIDDEN
 struct trace_ir_maps *trace_ir_maps_create(bt_self_component *self_comp,
-		const char *debug_info_field_name, bt_logging_level log_level);
+		const char *debug_info_field_name,
+		bool pass_through_unenriched_traces,
+		bt_logging_level log_level);
 
 BT_HIDDEN
 void trace_ir_maps_clear(struct trace_ir_maps *maps);
@@ -207,6 +223,11 @@ bt_packet *trace_ir_mapping_borrow_mapped_packet(
 		struct trace_ir_maps *ir_maps,
 		const bt_packet *in_packet);
 
+BT_HIDDEN
+bool trace_ir_mapping_is_trace_passed_through(
+		struct trace_ir_maps *ir_maps,
+		const bt_trace *in_trace);
+
 BT_HIDDEN
 void trace_ir_mapping_remove_mapped_packet(
 		struct trace_ir_maps *ir_maps,
@@ -112,3 +112,30 @@ bt_bool is_event_common_ctx_dbg_info_compatible(const bt_field_class *in_field_c
 end:
 	return match;
 }
+
+BT_HIDDEN
+bt_bool is_trace_class_dbg_info_compatible(
+		const bt_trace_class *in_trace_class,
+		const char *debug_info_field_class_name)
+{
+	uint64_t i;
+	bt_bool match = BT_FALSE;
+
+	for (i = 0; i < bt_trace_class_get_stream_class_count(in_trace_class);
+			i++) {
+		const bt_stream_class *in_stream_class =
+			bt_trace_class_borrow_stream_class_by_index_const(
+				in_trace_class, i);
+		const bt_field_class *in_common_ctx_fc =
+			bt_stream_class_borrow_event_common_context_field_class_const(
+				in_stream_class);
+
+		if (in_common_ctx_fc && is_event_common_ctx_dbg_info_compatible(
+				in_common_ctx_fc, debug_info_field_class_name)) {
+			match = BT_TRUE;
+			break;
+		}
+	}
+
+	return match;
+}
@@ -41,4 +41,14 @@ bt_bool is_event_common_ctx_dbg_info_compatible(
 		const bt_field_class *in_field_class,
 		const char *debug_info_field_class_name);
 
+/*
+ * Returns whether or not at least one stream class of `in_trace_class`
+ * has an event common context to which a debug info field can be
+ * added.
+ */
+BT_HIDDEN
+bt_bool is_trace_class_dbg_info_compatible(
+		const bt_trace_class *in_trace_class,
+		const char *debug_info_field_class_name);
+
 #endif	/* BABELTRACE_PLUGIN_DEBUG_INFO_UTILS_H */
@@ -49,6 +49,8 @@ BT_PLUGIN_FILTER_COMPONENT_CLASS_INITIALIZE_METHOD_WITH_ID(lttng_utils,
 	debug_info, debug_info_comp_init);
 BT_PLUGIN_FILTER_COMPONENT_CLASS_FINALIZE_METHOD_WITH_ID(lttng_utils,
 	debug_info, debug_info_comp_finalize);
+BT_PLUGIN_FILTER_COMPONENT_CLASS_QUERY_METHOD_WITH_ID(lttng_utils,
+	debug_info, debug_info_comp_query);
 BT_PLUGIN_FILTER_COMPONENT_CLASS_MESSAGE_ITERATOR_INITIALIZE_METHOD_WITH_ID(
 	lttng_utils, debug_info, debug_info_msg_iter_init);
 BT_PLUGIN_FILTER_COMPONENT_CLASS_MESSAGE_ITERATOR_SEEK_BEGINNING_METHODS_WITH_ID(
@@ -0,0 +1,1253 @@
+/*
+ * Copyright 2020 EfficiOS Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+#define BT_COMP_LOG_SELF_COMP (aggregator->self_comp)
+#define BT_LOG_OUTPUT_LEVEL (aggregator->log_level)
+#define BT_LOG_TAG "PLUGIN/SINK.UTILS.AGGREGATOR"
+#include "logging/comp-logging.h"
+
+#include <babeltrace2/babeltrace.h>
+#include "common/macros.h"
+#include "common/common.h"
+#include "common/assert.h"
+#include <inttypes.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <string.h>
+#include "plugins/common/param-validation/param-validation.h"
+
+#include "aggregator.h"
+
+static
+const char * const in_port_name = "in";
+
+/* Key of the single group when grouping by nothing */
+static
+const char * const all_group_key = "all";
+
+static
+void destroy_group(struct aggregator_group *group)
+{
+	if (!group) {
+		return;
+	}
+
+	if (group->histogram) {
+		g_hash_table_destroy(group->histogram);
+	}
+
+	g_free(group);
+}
+
+static
+void fini_field_path(struct aggregator_field_path *path)
+{
+	if (path->member_names) {
+		g_ptr_array_free(path->member_names, TRUE);
+		path->member_names = NULL;
+	}
+}
+
+static
+void destroy_aggregator_data(struct aggregator *aggregator)
+{
+	if (!aggregator) {
+		return;
+	}
+
+	bt_self_component_port_input_message_iterator_put_ref(
+		aggregator->msg_iter);
+	fini_field_path(&aggregator->group_by_field);
+	fini_field_path(&aggregator->value_field);
+
+	if (aggregator->groups) {
+		g_hash_table_destroy(aggregator->groups);
+	}
+
+	if (aggregator->key_buf) {
+		g_string_free(aggregator->key_buf, TRUE);
+	}
+
+	bt_value_put_ref(aggregator->results);
+	g_free(aggregator);
+}
+
+/*
+ * Parses a field path parameter value of the form `SCOPE/NAME[/NAME]...`
+ * into `path`.
+ */
+static
+int parse_field_path(struct aggregator *aggregator, const char *param_name,
+		const char *str, struct aggregator_field_path *path)
+{
+	int ret = 0;
+	gchar **parts = NULL;
+	guint i;
+
+	parts = g_strsplit(str, "/", 0);
+	if (!parts) {
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"Failed to split string.");
+		goto error;
+	}
+
+	if (g_strv_length(parts) < 2) {
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"Invalid `%s` parameter: expecting `SCOPE/NAME[/NAME]...`: "
+			"value=\"%s\"", param_name, str);
+		goto error;
+	}
+
+	if (strcmp(parts[0], "packet-context") == 0) {
+		path->scope = AGGREGATOR_SCOPE_PACKET_CONTEXT;
+	} else if (strcmp(parts[0], "common-context") == 0) {
+		path->scope = AGGREGATOR_SCOPE_EVENT_COMMON_CONTEXT;
+	} else if (strcmp(parts[0], "specific-context") == 0) {
+		path->scope = AGGREGATOR_SCOPE_EVENT_SPECIFIC_CONTEXT;
+	} else if (strcmp(parts[0], "payload") == 0) {
+		path->scope = AGGREGATOR_SCOPE_EVENT_PAYLOAD;
+	} else {
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"Invalid `%s` parameter: unknown scope: "
+			"value=\"%s\", scope=\"%s\"", param_name, str, parts[0]);
+		goto error;
+	}
+
+	path->member_names = g_ptr_array_new_with_free_func(g_free);
+	if (!path->member_names) {
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"Failed to allocate a GPtrArray.");
+		goto error;
+	}
+
+	for (i = 1; parts[i]; i++) {
+		if (strlen(parts[i]) == 0) {
+			BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+				"Invalid `%s` parameter: empty member name: "
+				"value=\"%s\"", param_name, str);
+			goto error;
+		}
+
+		g_ptr_array_add(path->member_names, g_strdup(parts[i]));
+	}
+
+	goto end;
+
+error:
+	ret = -1;
+	fini_field_path(path);
+
+end:
+	g_strfreev(parts);
+	return ret;
+}
+
+/*
+ * Returns the field of `event` located at `path`, or `NULL` if the
+ * event has no such field.
+ */
+static
+const bt_field *borrow_field_from_path(const bt_event *event,
+		const struct aggregator_field_path *path)
+{
+	const bt_field *field = NULL;
+	guint i;
+
+	switch (path->scope) {
+	case AGGREGATOR_SCOPE_PACKET_CONTEXT:
+	{
+		const bt_packet *packet = bt_event_borrow_packet_const(event);
+
+		if (packet) {
+			field = bt_packet_borrow_context_field_const(packet);
+		}
+
+		break;
+	}
+	case AGGREGATOR_SCOPE_EVENT_COMMON_CONTEXT:
+		field = bt_event_borrow_common_context_field_const(event);
+		break;
+	case AGGREGATOR_SCOPE_EVENT_SPECIFIC_CONTEXT:
+		field = bt_event_borrow_specific_context_field_const(event);
+		break;
+	case AGGREGATOR_SCOPE_EVENT_PAYLOAD:
+		field = bt_event_borrow_payload_field_const(event);
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	for (i = 0; field && i < path->member_names->len; i++) {
+		if (bt_field_get_class_type(field) !=
+				BT_FIELD_CLASS_TYPE_STRUCTURE) {
+			field = NULL;
+			break;
+		}
+
+		field = bt_field_structure_borrow_member_field_by_name_const(
+			field, path->member_names->pdata[i]);
+	}
+
+	return field;
+}
+
+/*
+ * Reads the numeric value of `field` into `value`, returning its kind,
+ * or `AGGREGATOR_VALUE_KIND_NONE` if `field` is not numeric.
+ */
+static
+enum aggregator_value_kind read_field_value(const bt_field *field,
+		union aggregator_value *value)
+{
+	const bt_field_class_type fc_type = bt_field_get_class_type(field);
+	enum aggregator_value_kind kind;
+
+	if (bt_field_class_type_is(fc_type,
+			BT_FIELD_CLASS_TYPE_UNSIGNED_INTEGER)) {
+		value->u = bt_field_integer_unsigned_get_value(field);
+		kind = AGGREGATOR_VALUE_KIND_UNSIGNED;
+	} else if (bt_field_class_type_is(fc_type,
+			BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+		value->i = bt_field_integer_signed_get_value(field);
+		kind = AGGREGATOR_VALUE_KIND_SIGNED;
+	} else if (fc_type == BT_FIELD_CLASS_TYPE_SINGLE_PRECISION_REAL) {
+		value->d = (double) bt_field_real_single_precision_get_value(field);
+		kind = AGGREGATOR_VALUE_KIND_REAL;
+	} else if (fc_type == BT_FIELD_CLASS_TYPE_DOUBLE_PRECISION_REAL) {
+		value->d = bt_field_real_double_precision_get_value(field);
+		kind = AGGREGATOR_VALUE_KIND_REAL;
+	} else if (fc_type == BT_FIELD_CLASS_TYPE_BOOL) {
+		value->u = (uint64_t) bt_field_bool_get_value(field);
+		kind = AGGREGATOR_VALUE_KIND_UNSIGNED;
+	} else {
+		kind = AGGREGATOR_VALUE_KIND_NONE;
+	}
+
+	return kind;
+}
+
+/*
+ * Returns whether or not the value `value` of kind `from` has a
+ * representation as a value of kind `to`, which is not narrower than
+ * `from`.
+ */
+static
+bool value_fits(union aggregator_value value,
+		enum aggregator_value_kind from, enum aggregator_value_kind to)
+{
+	BT_ASSERT(to >= from);
+	return from != AGGREGATOR_VALUE_KIND_UNSIGNED ||
+		to != AGGREGATOR_VALUE_KIND_SIGNED ||
+		value.u <= (uint64_t) INT64_MAX;
+}
+
+/*
+ * Converts the value `value` of kind `from` to a value of kind `to`,
+ * which is not narrower than `from`, and into which `value` fits (see
+ * value_fits()).
+ */
+static
+union aggregator_value convert_value(union aggregator_value value,
+		enum aggregator_value_kind from, enum aggregator_value_kind to)
+{
+	union aggregator_value converted;
+
+	BT_ASSERT(value_fits(value, from, to));
+
+	if (from == to) {
+		return value;
+	}
+
+	switch (to) {
+	case AGGREGATOR_VALUE_KIND_SIGNED:
+		converted.i = (int64_t) value.u;
+		break;
+	case AGGREGATOR_VALUE_KIND_REAL:
+		converted.d = from == AGGREGATOR_VALUE_KIND_UNSIGNED ?
+			(double) value.u : (double) value.i;
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	return converted;
+}
+
+static
+int64_t value_as_int64(union aggregator_value value,
+		enum aggregator_value_kind kind)
+{
+	int64_t ret;
+
+	switch (kind) {
+	case AGGREGATOR_VALUE_KIND_UNSIGNED:
+		ret = value.u > (uint64_t) INT64_MAX ? INT64_MAX :
+			(int64_t) value.u;
+		break;
+	case AGGREGATOR_VALUE_KIND_SIGNED:
+		ret = value.i;
+		break;
+	case AGGREGATOR_VALUE_KIND_REAL:
+		if (value.d >= (double) INT64_MAX) {
+			ret = INT64_MAX;
+		} else if (value.d <= (double) INT64_MIN) {
+			ret = INT64_MIN;
+		} else {
+			/* Floor */
+			ret = (int64_t) value.d;
+
+			if ((double) ret > value.d) {
+				ret--;
+			}
+		}
+
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	return ret;
+}
+
+/*
+ * Adds `value`, of kind `group->sum_kind`, to the sum of `group`. If the
+ * integer sum would overflow, makes it a real sum instead.
+ */
+static
+void add_to_group_sum(struct aggregator_group *group,
+		union aggregator_value value)
+{
+	switch (group->sum_kind) {
+	case AGGREGATOR_VALUE_KIND_UNSIGNED:
+		if (group->sum.u > UINT64_MAX - value.u) {
+			group->sum.d = (double) group->sum.u + (double) value.u;
+			group->sum_kind = AGGREGATOR_VALUE_KIND_REAL;
+		} else {
+			group->sum.u += value.u;
+		}
+
+		break;
+	case AGGREGATOR_VALUE_KIND_SIGNED:
+		if ((value.i > 0 && group->sum.i > INT64_MAX - value.i) ||
+				(value.i < 0 && group->sum.i < INT64_MIN - value.i)) {
+			group->sum.d = (double) group->sum.i + (double) value.i;
+			group->sum_kind = AGGREGATOR_VALUE_KIND_REAL;
+		} else {
+			group->sum.i += value.i;
+		}
+
+		break;
+	case AGGREGATOR_VALUE_KIND_REAL:
+		group->sum.d += value.d;
+		break;
+	default:
+		bt_common_abort();
+	}
+}
+
+/*
+ * Returns the narrowest kind, not narrower than `kind_a` and `kind_b`,
+ * into which both `value_a` (of kind `kind_a`) and `value_b` (of kind
+ * `kind_b`) fit.
+ */
+static
+enum aggregator_value_kind common_value_kind(
+		union aggregator_value value_a, enum aggregator_value_kind kind_a,
+		union aggregator_value value_b, enum aggregator_value_kind kind_b)
+{
+	enum aggregator_value_kind kind = MAX(kind_a, kind_b);
+
+	if (!value_fits(value_a, kind_a, kind) ||
+			!value_fits(value_b, kind_b, kind)) {
+		kind = AGGREGATOR_VALUE_KIND_REAL;
+	}
+
+	return kind;
+}
+
+static
+void update_group_value(struct aggregator_group *group,
+		union aggregator_value value, enum aggregator_value_kind kind)
+{
+	enum aggregator_value_kind new_kind;
+
+	if (group->value_count == 0) {
+		group->value_kind = kind;
+		group->sum_kind = kind;
+		group->sum = value;
+		group->min = value;
+		group->max = value;
+		goto end;
+	}
+
+	/*
+	 * Widen the minimum and maximum, and the value, to a common
+	 * kind: the maximum fits if and only if the minimum fits.
+	 */
+	new_kind = common_value_kind(group->max, group->value_kind,
+		value, kind);
+	group->min = convert_value(group->min, group->value_kind, new_kind);
+	group->max = convert_value(group->max, group->value_kind, new_kind);
+	group->value_kind = new_kind;
+	value = convert_value(value, kind, new_kind);
+
+	switch (new_kind) {
+	case AGGREGATOR_VALUE_KIND_UNSIGNED:
+		group->min.u = MIN(group->min.u, value.u);
+		group->max.u = MAX(group->max.u, value.u);
+		break;
+	case AGGREGATOR_VALUE_KIND_SIGNED:
+		group->min.i = MIN(group->min.i, value.i);
+		group->max.i = MAX(group->max.i, value.i);
+		break;
+	case AGGREGATOR_VALUE_KIND_REAL:
+		group->min.d = MIN(group->min.d, value.d);
+		group->max.d = MAX(group->max.d, value.d);
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	/* Same for the sum */
+	new_kind = common_value_kind(group->sum, group->sum_kind,
+		value, new_kind);
+	group->sum = convert_value(group->sum, group->sum_kind, new_kind);
+	value = convert_value(value, group->value_kind, new_kind);
+	group->sum_kind = new_kind;
+	add_to_group_sum(group, value);
+
+end:
+	group->value_count++;
+}
+
+static
+int update_group_histogram(struct aggregator *aggregator,
+		struct aggregator_group *group, int64_t value)
+{
+	int ret = 0;
+	const int64_t width = (int64_t) aggregator->histogram_bucket_width;
+	int64_t lower_bound;
+	int64_t rem;
+	struct aggregator_histogram_bucket *bucket;
+
+	/* Floor `value` to a multiple of the bucket width */
+	rem = value % width;
+	if (rem < 0) {
+		rem += width;
+	}
+
+	if (value < INT64_MIN + rem) {
+		/*
+		 * The floored value isn't a signed 64-bit integer: clamp
+		 * the lower bound of this (narrower) bucket.
+		 */
+		lower_bound = INT64_MIN;
+	} else {
+		lower_bound = value - rem;
+	}
+
+	bucket = g_hash_table_lookup(group->histogram, &lower_bound);
+	if (!bucket) {
+		bucket = g_new0(struct aggregator_histogram_bucket, 1);
+		if (!bucket) {
+			BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+				"Failed to allocate a histogram bucket.");
+			ret = -1;
+			goto end;
+		}
+
+		bucket->lower_bound = lower_bound;
+		g_hash_table_insert(group->histogram, &bucket->lower_bound,
+			bucket);
+	}
+
+	bucket->count++;
+
+end:
+	return ret;
+}
+
+/*
+ * Formats the group key of `event` into the key buffer.
+ *
+ * Returns `false` if the event doesn't belong to any group.
+ */
+static
+bool format_group_key(struct aggregator *aggregator, const bt_event *event)
+{
+	GString *key_buf = aggregator->key_buf;
+	bool grouped = true;
+
+	g_string_truncate(key_buf, 0);
+
+	switch (aggregator->group_by) {
+	case AGGREGATOR_GROUP_BY_NONE:
+		g_string_append(key_buf, all_group_key);
+		break;
+	case AGGREGATOR_GROUP_BY_EVENT_CLASS_NAME:
+	{
+		const char *name = bt_event_class_get_name(
+			bt_event_borrow_class_const(event));
+
+		if (name) {
+			g_string_append(key_buf, name);
+		}
+
+		break;
+	}
+	case AGGREGATOR_GROUP_BY_STREAM:
+	{
+		const bt_stream *stream = bt_event_borrow_stream_const(event);
+		const char *trace_name = bt_trace_get_name(
+			bt_stream_borrow_trace_const(stream));
+
+		g_string_append_printf(key_buf, "%s/%" PRIu64,
+			trace_name ? trace_name : "", bt_stream_get_id(stream));
+		break;
+	}
+	case AGGREGATOR_GROUP_BY_FIELD:
+	{
+		const bt_field *field = borrow_field_from_path(event,
+			&aggregator->group_by_field);
+		bt_field_class_type fc_type;
+
+		if (!field) {
+			grouped = false;
+			break;
+		}
+
+		fc_type = bt_field_get_class_type(field);
+		if (bt_field_class_type_is(fc_type,
+				BT_FIELD_CLASS_TYPE_UNSIGNED_INTEGER)) {
+			g_string_append_printf(key_buf, "%" PRIu64,
+				bt_field_integer_unsigned_get_value(field));
+		} else if (bt_field_class_type_is(fc_type,
+				BT_FIELD_CLASS_TYPE_SIGNED_INTEGER)) {
+			g_string_append_printf(key_buf, "%" PRId64,
+				bt_field_integer_signed_get_value(field));
+		} else if (fc_type == BT_FIELD_CLASS_TYPE_STRING) {
+			g_string_append(key_buf,
+				bt_field_string_get_value(field));
+		} else if (fc_type == BT_FIELD_CLASS_TYPE_BOOL) {
+			g_string_append(key_buf,
+				bt_field_bool_get_value(field) ? "true" : "false");
+		} else {
+			grouped = false;
+		}
+
+		break;
+	}
+	default:
+		bt_common_abort();
+	}
+
+	return grouped;
+}
+
+static
+struct aggregator_group *borrow_or_create_group(
+		struct aggregator *aggregator)
+{
+	struct aggregator_group *group;
+
+	group = g_hash_table_lookup(aggregator->groups,
+		aggregator->key_buf->str);
+	if (G_LIKELY(group)) {
+		goto end;
+	}
+
+	group = g_new0(struct aggregator_group, 1);
+	if (!group) {
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"Failed to allocate a group.");
+		goto end;
+	}
+
+	if (aggregator->histogram_bucket_width > 0) {
+		group->histogram = g_hash_table_new_full(g_int64_hash,
+			g_int64_equal, NULL, g_free);
+		if (!group->histogram) {
+			BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+				"Failed to allocate a GHashTable.");
+			destroy_group(group);
+			group = NULL;
+			goto end;
+		}
+	}
+
+	BT_COMP_LOGD("Creating group: key=\"%s\"", aggregator->key_buf->str);
+	g_hash_table_insert(aggregator->groups,
+		g_strdup(aggregator->key_buf->str), group);
+
+end:
+	return group;
+}
+
+static
+int aggregate_event_msg(struct aggregator *aggregator, const bt_message *msg)
+{
+	int ret = 0;
+	const bt_event *event = bt_message_event_borrow_event_const(msg);
+	struct aggregator_group *group;
+	union aggregator_value value = { 0 };
+	enum aggregator_value_kind value_kind = AGGREGATOR_VALUE_KIND_NONE;
+
+	aggregator->event_count++;
+
+	if (!format_group_key(aggregator, event)) {
+		aggregator->ungrouped_event_count++;
+		goto end;
+	}
+
+	group = borrow_or_create_group(aggregator);
+	if (!group) {
+		ret = -1;
+		goto end;
+	}
+
+	group->count++;
+
+	if (aggregator->value_field.member_names) {
+		const bt_field *field = borrow_field_from_path(event,
+			&aggregator->value_field);
+
+		if (field) {
+			value_kind = read_field_value(field, &value);
+		}
+
+		if (value_kind != AGGREGATOR_VALUE_KIND_NONE) {
+			update_group_value(group, value, value_kind);
+		}
+	}
+
+	if (!group->histogram) {
+		goto end;
+	}
+
+	if (aggregator->value_field.member_names) {
+		/* Histogram of the value field */
+		if (value_kind == AGGREGATOR_VALUE_KIND_NONE) {
+			goto end;
+		}
+
+		ret = update_group_histogram(aggregator, group,
+			value_as_int64(value, value_kind));
+	} else {
+		/* Histogram of the event times */
+		const bt_clock_snapshot *cs;
+		int64_t ns_from_origin;
+
+		if (!bt_message_event_borrow_stream_class_default_clock_class_const(
+				msg)) {
+			goto end;
+		}
+
+		cs = bt_message_event_borrow_default_clock_snapshot_const(msg);
+		if (bt_clock_snapshot_get_ns_from_origin(cs, &ns_from_origin) !=
+				BT_CLOCK_SNAPSHOT_GET_NS_FROM_ORIGIN_STATUS_OK) {
+			BT_COMP_LOGW("Cannot get nanoseconds from origin of event's clock snapshot: "
+				"skipping event for histogram: cs-value=%" PRIu64,
+				bt_clock_snapshot_get_value(cs));
+			goto end;
+		}
+
+		ret = update_group_histogram(aggregator, group,
+			ns_from_origin);
+	}
+
+end:
+	return ret;
+}
+
+static
+gint compare_strings(gconstpointer a, gconstpointer b)
+{
+	return strcmp(a, b);
+}
+
+static
+gint compare_buckets(gconstpointer a, gconstpointer b)
+{
+	const struct aggregator_histogram_bucket *bucket_a = a;
+	const struct aggregator_histogram_bucket *bucket_b = b;
+
+	if (bucket_a->lower_bound < bucket_b->lower_bound) {
+		return -1;
+	} else if (bucket_a->lower_bound > bucket_b->lower_bound) {
+		return 1;
+	}
+
+	return 0;
+}
+
+static
+void print_value(const char *what, union aggregator_value value,
+		enum aggregator_value_kind kind)
+{
+	switch (kind) {
+	case AGGREGATOR_VALUE_KIND_UNSIGNED:
+		printf("%s: %" PRIu64, what, value.u);
+		break;
+	case AGGREGATOR_VALUE_KIND_SIGNED:
+		printf("%s: %" PRId64, what, value.i);
+		break;
+	case AGGREGATOR_VALUE_KIND_REAL:
+		printf("%s: %f", what, value.d);
+		break;
+	default:
+		bt_common_abort();
+	}
+}
+
+static
+void print_group(struct aggregator *aggregator, const char *key,
+		const struct aggregator_group *group)
+{
+	printf("%15" PRIu64 " event%s: %s", group->count,
+		group->count == 1 ? "" : "s", key);
+
+	if (group->value_count > 0) {
+		printf(" (");
+		print_value("sum", group->sum, group->sum_kind);
+		printf(", ");
+		print_value("min", group->min, group->value_kind);
+		printf(", ");
+		print_value("max", group->max, group->value_kind);
+		printf(")");
+	}
+
+	putchar('\n');
+
+	if (group->histogram) {
+		GList *buckets = g_list_sort(
+			g_hash_table_get_values(group->histogram),
+			compare_buckets);
+		GList *node;
+
+		for (node = buckets; node; node = g_list_next(node)) {
+			const struct aggregator_histogram_bucket *bucket =
+				node->data;
+
+			printf("%15s [%" PRId64 ", +%" PRIu64 "): %" PRIu64 "\n",
+				"", bucket->lower_bound,
+				aggregator->histogram_bucket_width,
+				bucket->count);
+		}
+
+		g_list_free(buckets);
+	}
+}
+
+static
+void print_results(struct aggregator *aggregator)
+{
+	GList *keys = g_list_sort(g_hash_table_get_keys(aggregator->groups),
+		compare_strings);
+	GList *node;
+
+	for (node = keys; node; node = g_list_next(node)) {
+		print_group(aggregator, node->data,
+			g_hash_table_lookup(aggregator->groups, node->data));
+	}
+
+	g_list_free(keys);
+
+	if (aggregator->ungrouped_event_count > 0) {
+		printf("%15" PRIu64 " event%s (UNGROUPED)\n",
+			aggregator->ungrouped_event_count,
+			aggregator->ungrouped_event_count == 1 ? "" : "s");
+	}
+
+	printf("%s%15" PRIu64 " event%s (TOTAL)%s\n",
+		bt_common_color_bold(), aggregator->event_count,
+		aggregator->event_count == 1 ? "" : "s",
+		bt_common_color_reset());
+}
+
+static
+bt_value_map_insert_entry_status insert_value_entry(bt_value *map,
+		const char *key, union aggregator_value value,
+		enum aggregator_value_kind kind)
+{
+	bt_value_map_insert_entry_status status;
+
+	switch (kind) {
+	case AGGREGATOR_VALUE_KIND_UNSIGNED:
+		status = bt_value_map_insert_unsigned_integer_entry(map, key,
+			value.u);
+		break;
+	case AGGREGATOR_VALUE_KIND_SIGNED:
+		status = bt_value_map_insert_signed_integer_entry(map, key,
+			value.i);
+		break;
+	case AGGREGATOR_VALUE_KIND_REAL:
+		status = bt_value_map_insert_real_entry(map, key, value.d);
+		break;
+	default:
+		bt_common_abort();
+	}
+
+	return status;
+}
+
+static
+int fill_group_results(struct aggregator *aggregator, bt_value *group_map,
+		const struct aggregator_group *group)
+{
+	int ret = 0;
+	GString *bucket_key = NULL;
+
+	if (bt_value_map_insert_unsigned_integer_entry(group_map, "count",
+			group->count)) {
+		goto error;
+	}
+
+	if (aggregator->value_field.member_names) {
+		if (bt_value_map_insert_unsigned_integer_entry(group_map,
+				"value-count", group->value_count)) {
+			goto error;
+		}
+
+		if (group->value_count > 0) {
+			if (insert_value_entry(group_map, "sum", group->sum,
+					group->sum_kind) ||
+					insert_value_entry(group_map, "min",
+						group->min, group->value_kind) ||
+					insert_value_entry(group_map, "max",
+						group->max, group->value_kind)) {
+				goto error;
+			}
+		}
+	}
+
+	if (group->histogram) {
+		bt_value *histogram_map;
+		GHashTableIter iter;
+		gpointer bucket_ptr;
+
+		if (bt_value_map_insert_empty_map_entry(group_map, "histogram",
+				&histogram_map)) {
+			goto error;
+		}
+
+		bucket_key = g_string_new(NULL);
+		if (!bucket_key) {
+			goto error;
+		}
+
+		g_hash_table_iter_init(&iter, group->histogram);
+
+		while (g_hash_table_iter_next(&iter, NULL, &bucket_ptr)) {
+			const struct aggregator_histogram_bucket *bucket =
+				bucket_ptr;
+
+			g_string_printf(bucket_key, "%" PRId64,
+				bucket->lower_bound);
+
+			if (bt_value_map_insert_unsigned_integer_entry(
+					histogram_map, bucket_key->str,
+					bucket->count)) {
+				goto error;
+			}
+		}
+	}
+
+	goto end;
+
+error:
+	ret = -1;
+
+end:
+	if (bucket_key) {
+		g_string_free(bucket_key, TRUE);
+	}
+
+	return ret;
+}
+
+/*
+ * Fills the user's result map value with the current results.
+ */
+static
+int fill_results(struct aggregator *aggregator)
+{
+	int ret = 0;
+	bt_value *groups_map;
+	GHashTableIter iter;
+	gpointer key, group;
+
+	BT_ASSERT(aggregator->results);
+
+	if (bt_value_map_insert_unsigned_integer_entry(aggregator->results,
+			"event-count", aggregator->event_count) ||
+			bt_value_map_insert_unsigned_integer_entry(
+				aggregator->results, "ungrouped-event-count",
+				aggregator->ungrouped_event_count)) {
+		goto error;
+	}
+
+	if (bt_value_map_insert_empty_map_entry(aggregator->results, "groups",
+			&groups_map)) {
+		goto error;
+	}
+
+	g_hash_table_iter_init(&iter, aggregator->groups);
+
+	while (g_hash_table_iter_next(&iter, &key, &group)) {
+		bt_value *group_map;
+
+		if (bt_value_map_insert_empty_map_entry(groups_map, key,
+				&group_map)) {
+			goto error;
+		}
+
+		if (fill_group_results(aggregator, group_map, group)) {
+			goto error;
+		}
+	}
+
+	goto end;
+
+error:
+	BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+		"Failed to fill result map value.");
+	ret = -1;
+
+end:
+	return ret;
+}
+
+static
+int publish_results(struct aggregator *aggregator)
+{
+	int ret = 0;
+
+	if (aggregator->results_published) {
+		goto end;
+	}
+
+	aggregator->results_published = true;
+
+	if (aggregator->results) {
+		ret = fill_results(aggregator);
+	} else {
+		print_results(aggregator);
+	}
+
+end:
+	return ret;
+}
+
+BT_HIDDEN
+void aggregator_finalize(bt_self_component_sink *comp)
+{
+	struct aggregator *aggregator;
+
+	BT_ASSERT(comp);
+	aggregator = bt_self_component_get_data(
+			bt_self_component_sink_as_self_component(comp));
+	BT_ASSERT(aggregator);
+
+	/*
+	 * Publish what we have if the graph didn't run to completion
+	 * (interrupted or failed).
+	 */
+	(void) publish_results(aggregator);
+	destroy_aggregator_data(aggregator);
+}
+
+static const char *group_by_choices[] = {
+	"none", "event-class-name", "stream", "field", NULL
+};
+
+static
+struct bt_param_validation_map_value_entry_descr aggregator_params[] = {
+	{ "group-by", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { BT_VALUE_TYPE_STRING, .string = {
+		.choices = group_by_choices,
+	} } },
+	{ "group-by-field", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_STRING } },
+	{ "value-field", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_STRING } },
+	{ "histogram-bucket-width", BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_OPTIONAL, { .type = BT_VALUE_TYPE_UNSIGNED_INTEGER } },
+	BT_PARAM_VALIDATION_MAP_VALUE_ENTRY_END
+};
+
+static
+int apply_params(struct aggregator *aggregator, const bt_value *params)
+{
+	int ret = 0;
+	const bt_value *value;
+
+	aggregator->group_by = AGGREGATOR_GROUP_BY_EVENT_CLASS_NAME;
+	value = bt_value_map_borrow_entry_value_const(params, "group-by");
+	if (value) {
+		const char *str = bt_value_string_get(value);
+
+		if (strcmp(str, "none") == 0) {
+			aggregator->group_by = AGGREGATOR_GROUP_BY_NONE;
+		} else if (strcmp(str, "stream") == 0) {
+			aggregator->group_by = AGGREGATOR_GROUP_BY_STREAM;
+		} else if (strcmp(str, "field") == 0) {
+			aggregator->group_by = AGGREGATOR_GROUP_BY_FIELD;
+		} else {
+			BT_ASSERT(strcmp(str, "event-class-name") == 0);
+		}
+	}
+
+	value = bt_value_map_borrow_entry_value_const(params,
+		"group-by-field");
+	if (aggregator->group_by == AGGREGATOR_GROUP_BY_FIELD) {
+		if (!value) {
+			BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+				"Missing `group-by-field` parameter (`group-by` is `field`).");
+			goto error;
+		}
+
+		if (parse_field_path(aggregator, "group-by-field",
+				bt_value_string_get(value),
+				&aggregator->group_by_field)) {
+			goto error;
+		}
+	} else if (value) {
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"`group-by-field` parameter is only valid when `group-by` is `field`.");
+		goto error;
+	}
+
+	value = bt_value_map_borrow_entry_value_const(params, "value-field");
+	if (value) {
+		if (parse_field_path(aggregator, "value-field",
+				bt_value_string_get(value),
+				&aggregator->value_field)) {
+			goto error;
+		}
+	}
+
+	value = bt_value_map_borrow_entry_value_const(params,
+		"histogram-bucket-width");
+	if (value) {
+		aggregator->histogram_bucket_width =
+			bt_value_integer_unsigned_get(value);
+
+		if (aggregator->histogram_bucket_width == 0 ||
+				aggregator->histogram_bucket_width >
+					(uint64_t) INT64_MAX) {
+			BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+				"Invalid `histogram-bucket-width` parameter: "
+				"expecting a value in the [1, %" PRId64 "] range: "
+				"value=%" PRIu64, INT64_MAX,
+				aggregator->histogram_bucket_width);
+			goto error;
+		}
+	}
+
+	goto end;
+
+error:
+	ret = -1;
+
+end:
+	return ret;
+}
+
+BT_HIDDEN
+bt_component_class_initialize_method_status aggregator_init(
+		bt_self_component_sink *component,
+		__attribute__((unused)) bt_self_component_sink_configuration *config,
+		const bt_value *params, void *init_method_data)
+{
+	bt_component_class_initialize_method_status status;
+	bt_self_component_add_port_status add_port_status;
+	struct aggregator *aggregator = g_new0(struct aggregator, 1);
+	enum bt_param_validation_status validation_status;
+	gchar *validate_error = NULL;
+
+	if (!aggregator) {
+		status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+		goto error;
+	}
+
+	aggregator->self_comp =
+		bt_self_component_sink_as_self_component(component);
+	aggregator->log_level = bt_component_get_logging_level(
+		bt_self_component_as_component(aggregator->self_comp));
+	add_port_status = bt_self_component_sink_add_input_port(component,
+		in_port_name, NULL, NULL);
+	if (add_port_status != BT_SELF_COMPONENT_ADD_PORT_STATUS_OK) {
+		status = (int) add_port_status;
+		goto error;
+	}
+
+	validation_status = bt_param_validation_validate(params,
+		aggregator_params, &validate_error);
+	if (validation_status == BT_PARAM_VALIDATION_STATUS_MEMORY_ERROR) {
+		status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+		goto error;
+	} else if (validation_status == BT_PARAM_VALIDATION_STATUS_VALIDATION_ERROR) {
+		status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_ERROR;
+		BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+			"%s", validate_error);
+		goto error;
+	}
+
+	if (apply_params(aggregator, params)) {
+		status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_ERROR;
+		goto error;
+	}
+
+	/*
+	 * If the user passed a map value as the initialization method
+	 * data, fill it with the results instead of printing them.
+	 */
+	if (init_method_data) {
+		bt_value *results = init_method_data;
+
+		if (!bt_value_is_map(results)) {
+			BT_COMP_LOGE_APPEND_CAUSE(aggregator->self_comp,
+				"Initialization method data is not a map value: "
+				"type=%s", bt_common_value_type_string(
+					bt_value_get_type(results)));
+			status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_ERROR;
+			goto error;
+		}
+
+		aggregator->results = results;
+		bt_value_get_ref(aggregator->results);
+	}
+
+	aggregator->groups = g_hash_table_new_full(g_str_hash, g_str_equal,
+		g_free, (GDestroyNotify) destroy_group);
+	if (!aggregator->groups) {
+		status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+		goto error;
+	}
+
+	aggregator->key_buf = g_string_new(NULL);
+	if (!aggregator->key_buf) {
+		status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+		goto error;
+	}
+
+	bt_self_component_set_data(
+		bt_self_component_sink_as_self_component(component),
+		aggregator);
+
+	status = BT_COMPONENT_CLASS_INITIALIZE_METHOD_STATUS_OK;
+	goto end;
+
+error:
+	destroy_aggregator_data(aggregator);
+
+end:
+	g_free(validate_error);
+	return status;
+}
+
+BT_HIDDEN
+bt_component_class_sink_graph_is_configured_method_status
+aggregator_graph_is_configured(
+		bt_self_component_sink *comp)
+{
+	bt_component_class_sink_graph_is_configured_method_status status;
+	bt_self_component_port_input_message_iterator_create_from_sink_component_status
+		msg_iter_status;
+	struct aggregator *aggregator;
+	bt_self_component_port_input_message_iterator *iterator;
+
+	aggregator = bt_self_component_get_data(
+		bt_self_component_sink_as_self_component(comp));
+	BT_ASSERT(aggregator);
+
+	msg_iter_status = bt_self_component_port_input_message_iterator_create_from_sink_component(
+		comp, bt_self_component_sink_borrow_input_port_by_name(comp,
+			in_port_name), &iterator);
+	if (msg_iter_status != BT_SELF_COMPONENT_PORT_INPUT_MESSAGE_ITERATOR_CREATE_FROM_SINK_COMPONENT_STATUS_OK) {
+		status = (int) msg_iter_status;
+		goto end;
+	}
+
+	BT_SELF_COMPONENT_PORT_INPUT_MESSAGE_ITERATOR_MOVE_REF(
+		aggregator->msg_iter, iterator);
+
+	status = BT_COMPONENT_CLASS_SINK_GRAPH_IS_CONFIGURED_METHOD_STATUS_OK;
+end:
+	return status;
+}
+
+BT_HIDDEN
+bt_component_class_sink_consume_method_status aggregator_consume(
+		bt_self_component_sink *comp)
+{
+	bt_component_class_sink_consume_method_status status =
+		BT_COMPONENT_CLASS_SINK_CONSUME_METHOD_STATUS_OK;
+	struct aggregator *aggregator;
+	bt_message_iterator_next_status next_status;
+	uint64_t msg_count;
+	bt_message_array_const msgs;
+	uint64_t i;
+
+	aggregator = bt_self_component_get_data(
+			bt_self_component_sink_as_self_component(comp));
+	BT_ASSERT_DBG(aggregator);
+	BT_ASSERT_DBG(aggregator->msg_iter);
+
+	/* Consume messages */
+	next_status = bt_self_component_port_input_message_iterator_next(
+		aggregator->msg_iter, &msgs, &msg_count);
+	switch (next_status) {
+	case BT_MESSAGE_ITERATOR_NEXT_STATUS_OK:
+		break;
+	case BT_MESSAGE_ITERATOR_NEXT_STATUS_AGAIN:
+		status = BT_COMPONENT_CLASS_SINK_CONSUME_METHOD_STATUS_AGAIN;
+		goto end;
+	case BT_MESSAGE_ITERATOR_NEXT_STATUS_END:
+		if (publish_results(aggregator)) {
+			status = BT_COMPONENT_CLASS_SINK_CONSUME_METHOD_STATUS_ERROR;
+		} else {
+			status = BT_COMPONENT_CLASS_SINK_CONSUME_METHOD_STATUS_END;
+		}
+
+		goto end;
+	default:
+		status = (int) next_status;
+		goto end;
+	}
+
+	for (i = 0; i < msg_count; i++) {
+		const bt_message *msg = msgs[i];
+
+		BT_ASSERT_DBG(msg);
+
+		if (status == BT_COMPONENT_CLASS_SINK_CONSUME_METHOD_STATUS_OK &&
+				bt_message_get_type(msg) ==
+					BT_MESSAGE_TYPE_EVENT) {
+			if (aggregate_event_msg(aggregator, msg)) {
+				status = BT_COMPONENT_CLASS_SINK_CONSUME_METHOD_STATUS_ERROR;
+			}
+		}
+
+		/* Always put the reference, even after an error */
+		bt_message_put_ref(msg);
+	}
+
+end:
+	return status;
+}
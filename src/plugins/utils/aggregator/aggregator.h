@@ -0,0 +1,154 @@
+#ifndef BABELTRACE_PLUGINS_UTILS_AGGREGATOR_H
+#define BABELTRACE_PLUGINS_UTILS_AGGREGATOR_H
+
+/*
+ * Copyright 2020 EfficiOS Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ */
+
+#include <glib.h>
+#include <babeltrace2/babeltrace.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include "common/macros.h"
+
+enum aggregator_group_by {
+	AGGREGATOR_GROUP_BY_NONE,
+	AGGREGATOR_GROUP_BY_EVENT_CLASS_NAME,
+	AGGREGATOR_GROUP_BY_STREAM,
+	AGGREGATOR_GROUP_BY_FIELD,
+};
+
+enum aggregator_scope {
+	AGGREGATOR_SCOPE_PACKET_CONTEXT,
+	AGGREGATOR_SCOPE_EVENT_COMMON_CONTEXT,
+	AGGREGATOR_SCOPE_EVENT_SPECIFIC_CONTEXT,
+	AGGREGATOR_SCOPE_EVENT_PAYLOAD,
+};
+
+/* Ordered from the narrowest to the widest kind */
+enum aggregator_value_kind {
+	AGGREGATOR_VALUE_KIND_NONE,
+	AGGREGATOR_VALUE_KIND_UNSIGNED,
+	AGGREGATOR_VALUE_KIND_SIGNED,
+	AGGREGATOR_VALUE_KIND_REAL,
+};
+
+union aggregator_value {
+	uint64_t u;
+	int64_t i;
+	double d;
+};
+
+struct aggregator_field_path {
+	enum aggregator_scope scope;
+
+	/*
+	 * Array of `gchar *` (owned by this): structure member names to
+	 * follow from the scope field; `NULL` if this path is not used.
+	 */
+	GPtrArray *member_names;
+};
+
+struct aggregator_histogram_bucket {
+	/* Must be the first member: used as the hash table key */
+	int64_t lower_bound;
+	uint64_t count;
+};
+
+struct aggregator_group {
+	/* Number of events in this group */
+	uint64_t count;
+
+	/* Number of events of this group which have a value field */
+	uint64_t value_count;
+
+	/*
+	 * Kind of `min` and `max`: the widest kind of the value fields
+	 * so far, or real if unsigned values which don't fit a signed
+	 * integer mix with signed values.
+	 */
+	enum aggregator_value_kind value_kind;
+	union aggregator_value min;
+	union aggregator_value max;
+
+	/*
+	 * Kind of `sum`: `value_kind`, or real if the integer sum would
+	 * overflow.
+	 */
+	enum aggregator_value_kind sum_kind;
+	union aggregator_value sum;
+
+	/*
+	 * `int64_t *` (lower bound) -> `struct aggregator_histogram_bucket *`
+	 * (owned by this); `NULL` without a histogram.
+	 */
+	GHashTable *histogram;
+};
+
+struct aggregator {
+	bt_self_component_port_input_message_iterator *msg_iter;
+	enum aggregator_group_by group_by;
+	struct aggregator_field_path group_by_field;
+	struct aggregator_field_path value_field;
+
+	/* 0 means no histogram */
+	uint64_t histogram_bucket_width;
+
+	/* `gchar *` (owned by this) -> `struct aggregator_group *` (owned by this) */
+	GHashTable *groups;
+
+	/* Scratch buffer to format group keys */
+	GString *key_buf;
+
+	uint64_t event_count;
+
+	/* Events which don't have the group-by field */
+	uint64_t ungrouped_event_count;
+
+	/*
+	 * Map value (owned by this) to fill with the results when the
+	 * component ends, or `NULL` to print them to the standard
+	 * output instead.
+	 */
+	bt_value *results;
+	bool results_published;
+	bt_logging_level log_level;
+	bt_self_component *self_comp;
+};
+
+BT_HIDDEN
+bt_component_class_initialize_method_status aggregator_init(
+		bt_self_component_sink *component,
+		bt_self_component_sink_configuration *config,
+		const bt_value *params, void *init_method_data);
+
+BT_HIDDEN
+void aggregator_finalize(bt_self_component_sink *component);
+
+BT_HIDDEN
+bt_component_class_sink_graph_is_configured_method_status aggregator_graph_is_configured(
+		bt_self_component_sink *component);
+
+BT_HIDDEN
+bt_component_class_sink_consume_method_status aggregator_consume(
+		bt_self_component_sink *component);
+
+#endif /* BABELTRACE_PLUGINS_UTILS_AGGREGATOR_H */
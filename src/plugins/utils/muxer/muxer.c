@@ -36,6 +36,7 @@
 #include <stdlib.h>
 #include <string.h>
 
+#include "lib/prio-heap/prio-heap.h"
 #include "plugins/common/muxing/muxing.h"
 #include "plugins/common/param-validation/param-validation.h"
 
@@ -60,6 +61,20 @@ struct muxer_upstream_msg_iter {
 
 	/* Contains `const bt_message *`, owned by this */
 	GQueue *msgs;
+
+	/*
+	 * Timestamp (ns from origin) of the message at the head of
+	 * `msgs`: only valid when this upstream message iterator is part
+	 * of its muxer message iterator's heap.
+	 */
+	int64_t head_ts_ns;
+
+	/*
+	 * True if the message at the head of `msgs` has no timestamp of
+	 * its own, that is, `head_ts_ns` is the muxer message iterator's
+	 * last returned timestamp.
+	 */
+	bool head_ts_is_last_returned;
 };
 
 enum muxer_msg_iter_clock_class_expectation {
@@ -79,13 +94,48 @@ struct muxer_msg_iter {
 	/*
 	 * Array of struct muxer_upstream_msg_iter * (owned by this).
 	 *
-	 * NOTE: This array is searched in linearly to find the youngest
-	 * current message. Keep this until benchmarks confirm that
-	 * another data structure is faster than this for our typical
-	 * use cases.
+	 * Each of those is either in `heap`, in
+	 * `pending_muxer_upstream_msg_iters`, or is
+	 * `cur_muxer_upstream_msg_iter`.
 	 */
 	GPtrArray *active_muxer_upstream_msg_iters;
 
+	/*
+	 * Heap of struct muxer_upstream_msg_iter * (weak).
+	 *
+	 * Contains the active upstream message iterators of which the
+	 * queue is not empty, ordered so that the maximum is the one
+	 * having the youngest head message (see
+	 * muxer_upstream_msg_iter_heap_gt()).
+	 */
+	struct ptr_heap heap;
+
+	/*
+	 * Number of upstream message iterators in `heap` of which the
+	 * `head_ts_is_last_returned` member is true.
+	 */
+	uint64_t heap_last_returned_ts_count;
+
+	/*
+	 * Array of struct muxer_upstream_msg_iter * (weak).
+	 *
+	 * Active upstream message iterators which are not in `heap`
+	 * because we need to get their next messages and/or validate
+	 * their head message first.
+	 */
+	GPtrArray *pending_muxer_upstream_msg_iters;
+
+	/*
+	 * Active upstream message iterator (weak) from which we returned
+	 * the last message, or `NULL`.
+	 *
+	 * This one is not in `heap`: the next time we look for the
+	 * youngest message, we first compare its head message to the
+	 * maximum of `heap` so as to return runs of messages from the
+	 * same upstream message iterator without any heap operation.
+	 */
+	struct muxer_upstream_msg_iter *cur_muxer_upstream_msg_iter;
+
 	/*
 	 * Array of struct muxer_upstream_msg_iter * (owned by this).
 	 *
@@ -179,6 +229,8 @@ int muxer_msg_iter_add_upstream_msg_iter(struct muxer_msg_iter *muxer_msg_iter,
 
 	g_ptr_array_add(muxer_msg_iter->active_muxer_upstream_msg_iters,
 		muxer_upstream_msg_iter);
+	g_ptr_array_add(muxer_msg_iter->pending_muxer_upstream_msg_iters,
+		muxer_upstream_msg_iter);
 	BT_COMP_LOGD("Added muxer's upstream message iterator wrapper: "
 		"addr=%p, muxer-msg-iter-addr=%p, msg-iter-addr=%p",
 		muxer_upstream_msg_iter, muxer_msg_iter,
@@ -470,7 +522,7 @@ static
 int get_msg_ts_ns(struct muxer_comp *muxer_comp,
 		struct muxer_msg_iter *muxer_msg_iter,
 		const bt_message *msg, int64_t last_returned_ts_ns,
-		int64_t *ts_ns)
+		int64_t *ts_ns, bool *is_last_returned_ts)
 {
 	const bt_clock_snapshot *clock_snapshot = NULL;
 	int ret = 0;
@@ -479,6 +531,7 @@ int get_msg_ts_ns(struct muxer_comp *muxer_comp,
 
 	BT_ASSERT_DBG(msg);
 	BT_ASSERT_DBG(ts_ns);
+	BT_ASSERT_DBG(is_last_returned_ts);
 	BT_COMP_LOGD("Getting message's timestamp: "
 		"muxer-msg-iter-addr=%p, msg-addr=%p, "
 		"last-returned-ts=%" PRId64,
@@ -487,6 +540,7 @@ int get_msg_ts_ns(struct muxer_comp *muxer_comp,
 	if (G_UNLIKELY(muxer_msg_iter->clock_class_expectation ==
 			MUXER_MSG_ITER_CLOCK_CLASS_EXPECTATION_NONE)) {
 		*ts_ns = last_returned_ts_ns;
+		*is_last_returned_ts = true;
 		goto end;
 	}
 
@@ -587,6 +641,7 @@ int get_msg_ts_ns(struct muxer_comp *muxer_comp,
 		/* All the other messages have a higher priority */
 		BT_COMP_LOGD_STR("Message has no timestamp: using the last returned timestamp.");
 		*ts_ns = last_returned_ts_ns;
+		*is_last_returned_ts = true;
 		goto end;
 	}
 
@@ -597,12 +652,14 @@ int get_msg_ts_ns(struct muxer_comp *muxer_comp,
 		goto error;
 	}
 
+	*is_last_returned_ts = false;
 	goto end;
 
 no_clock_snapshot:
 	BT_COMP_LOGD_STR("Message's default clock snapshot is missing: "
 		"using the last returned timestamp.");
 	*ts_ns = last_returned_ts_ns;
+	*is_last_returned_ts = true;
 	goto end;
 
 error:
@@ -779,253 +836,445 @@ end:
 }
 
 /*
- * This function finds the youngest available message amongst the
- * non-ended upstream message iterators and returns the upstream
- * message iterator which has it, or
- * BT_MESSAGE_ITERATOR_STATUS_END if there's no available
- * message.
- *
- * This function does NOT:
- *
- * * Update any upstream message iterator.
- * * Check the upstream message iterators to retry.
- *
- * On sucess, this function sets *muxer_upstream_msg_iter to the
- * upstream message iterator of which the current message is
- * the youngest, and sets *ts_ns to its time.
+ * Heap comparison function: returns true if the head message of the
+ * upstream message iterator `a` must be returned before the head
+ * message of the upstream message iterator `b`.
+ */
+static
+int muxer_upstream_msg_iter_heap_gt(void *a, void *b)
+{
+	struct muxer_upstream_msg_iter *muxer_upstream_msg_iter_a = a;
+	struct muxer_upstream_msg_iter *muxer_upstream_msg_iter_b = b;
+	struct muxer_comp *muxer_comp = muxer_upstream_msg_iter_a->muxer_comp;
+	int ret;
+
+	if (muxer_upstream_msg_iter_a->head_ts_ns !=
+			muxer_upstream_msg_iter_b->head_ts_ns) {
+		ret = muxer_upstream_msg_iter_a->head_ts_ns <
+			muxer_upstream_msg_iter_b->head_ts_ns;
+		goto end;
+	}
+
+	/*
+	 * Both head messages have the exact same timestamp. We must
+	 * break the tie in a predictable manner: order the messages in
+	 * an arbitrary but deterministic way.
+	 */
+	ret = common_muxing_compare_messages(
+		g_queue_peek_head(muxer_upstream_msg_iter_a->msgs),
+		g_queue_peek_head(muxer_upstream_msg_iter_b->msgs));
+	if (G_UNLIKELY(ret == 0)) {
+		/* Unable to pick which one should go first. */
+		BT_COMP_LOGW("Cannot deterministically pick next upstream message iterator because they have identical next messages: "
+			"muxer-upstream-msg-iter-wrap-a-addr=%p, "
+			"muxer-upstream-msg-iter-wrap-b-addr=%p",
+			muxer_upstream_msg_iter_a, muxer_upstream_msg_iter_b);
+	}
+
+	ret = ret < 0;
+
+end:
+	return ret;
+}
+
+/*
+ * Validates the head message of `muxer_upstream_msg_iter`, of which the
+ * queue must not be empty, and computes its timestamp.
  */
 static
 bt_component_class_message_iterator_next_method_status
-muxer_msg_iter_youngest_upstream_msg_iter(
+muxer_upstream_msg_iter_update_head_ts(
 		struct muxer_comp *muxer_comp,
 		struct muxer_msg_iter *muxer_msg_iter,
-		struct muxer_upstream_msg_iter **muxer_upstream_msg_iter,
-		int64_t *ts_ns)
+		struct muxer_upstream_msg_iter *muxer_upstream_msg_iter)
 {
-	size_t i;
+	const bt_message *msg;
 	int ret;
-	int64_t youngest_ts_ns = INT64_MAX;
 	bt_component_class_message_iterator_next_method_status status =
 		BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK;
 
-	BT_ASSERT_DBG(muxer_comp);
-	BT_ASSERT_DBG(muxer_msg_iter);
-	BT_ASSERT_DBG(muxer_upstream_msg_iter);
-	*muxer_upstream_msg_iter = NULL;
-
-	for (i = 0; i < muxer_msg_iter->active_muxer_upstream_msg_iters->len;
-			i++) {
-		const bt_message *msg;
-		struct muxer_upstream_msg_iter *cur_muxer_upstream_msg_iter =
-			g_ptr_array_index(
-				muxer_msg_iter->active_muxer_upstream_msg_iters,
-				i);
-		int64_t msg_ts_ns;
-
-		if (!cur_muxer_upstream_msg_iter->msg_iter) {
-			/* This upstream message iterator is ended */
-			BT_COMP_LOGT("Skipping ended upstream message iterator: "
-				"muxer-upstream-msg-iter-wrap-addr=%p",
-				cur_muxer_upstream_msg_iter);
-			continue;
-		}
-
-		BT_ASSERT_DBG(cur_muxer_upstream_msg_iter->msgs->length > 0);
-		msg = g_queue_peek_head(cur_muxer_upstream_msg_iter->msgs);
-		BT_ASSERT_DBG(msg);
-
-		if (G_UNLIKELY(bt_message_get_type(msg) ==
-				BT_MESSAGE_TYPE_STREAM_BEGINNING)) {
-			ret = validate_new_stream_clock_class(
-				muxer_msg_iter, muxer_comp,
-				bt_message_stream_beginning_borrow_stream_const(
-					msg));
-			if (ret) {
-				/*
-				 * validate_new_stream_clock_class() logs
-				 * errors.
-				 */
-				status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_ERROR;
-				goto end;
-			}
-		} else if (G_UNLIKELY(bt_message_get_type(msg) ==
-				BT_MESSAGE_TYPE_MESSAGE_ITERATOR_INACTIVITY)) {
-			const bt_clock_snapshot *cs;
+	BT_ASSERT_DBG(muxer_upstream_msg_iter->msgs->length > 0);
+	msg = g_queue_peek_head(muxer_upstream_msg_iter->msgs);
+	BT_ASSERT_DBG(msg);
 
-			cs = bt_message_message_iterator_inactivity_borrow_default_clock_snapshot_const(
-				msg);
-			ret = validate_clock_class(muxer_msg_iter, muxer_comp,
-				bt_clock_snapshot_borrow_clock_class_const(cs));
-			if (ret) {
-				/* validate_clock_class() logs errors */
-				status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_ERROR;
-				goto end;
-			}
+	if (G_UNLIKELY(bt_message_get_type(msg) ==
+			BT_MESSAGE_TYPE_STREAM_BEGINNING)) {
+		ret = validate_new_stream_clock_class(
+			muxer_msg_iter, muxer_comp,
+			bt_message_stream_beginning_borrow_stream_const(
+				msg));
+		if (ret) {
+			/*
+			 * validate_new_stream_clock_class() logs
+			 * errors.
+			 */
+			status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_ERROR;
+			goto end;
 		}
+	} else if (G_UNLIKELY(bt_message_get_type(msg) ==
+			BT_MESSAGE_TYPE_MESSAGE_ITERATOR_INACTIVITY)) {
+		const bt_clock_snapshot *cs;
 
-		ret = get_msg_ts_ns(muxer_comp, muxer_msg_iter, msg,
-			muxer_msg_iter->last_returned_ts_ns, &msg_ts_ns);
+		cs = bt_message_message_iterator_inactivity_borrow_default_clock_snapshot_const(
+			msg);
+		ret = validate_clock_class(muxer_msg_iter, muxer_comp,
+			bt_clock_snapshot_borrow_clock_class_const(cs));
 		if (ret) {
-			/* get_msg_ts_ns() logs errors */
-			*muxer_upstream_msg_iter = NULL;
+			/* validate_clock_class() logs errors */
 			status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_ERROR;
 			goto end;
 		}
+	}
 
-		/*
-		 * Update the current message iterator if it has not been set
-		 * yet, or if its current message has a timestamp smaller than
-		 * the previously selected youngest message.
-		 */
-		if (G_UNLIKELY(*muxer_upstream_msg_iter == NULL) ||
-				msg_ts_ns < youngest_ts_ns) {
-			*muxer_upstream_msg_iter =
-				cur_muxer_upstream_msg_iter;
-			youngest_ts_ns = msg_ts_ns;
-			*ts_ns = youngest_ts_ns;
-		} else if (msg_ts_ns == youngest_ts_ns) {
-			/*
-			 * The currently selected message to be sent downstream
-			 * next has the exact same timestamp that of the
-			 * current candidate message. We must break the tie
-			 * in a predictable manner.
-			 */
-			const bt_message *selected_msg = g_queue_peek_head(
-				(*muxer_upstream_msg_iter)->msgs);
-			BT_COMP_LOGD_STR("Two of the next message candidates have the same timestamps, pick one deterministically.");
+	ret = get_msg_ts_ns(muxer_comp, muxer_msg_iter, msg,
+		muxer_msg_iter->last_returned_ts_ns,
+		&muxer_upstream_msg_iter->head_ts_ns,
+		&muxer_upstream_msg_iter->head_ts_is_last_returned);
+	if (ret) {
+		/* get_msg_ts_ns() logs errors */
+		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_ERROR;
+		goto end;
+	}
 
-			/*
-			 * Order the messages in an arbitrary but determinitic
-			 * way.
-			 */
-			ret = common_muxing_compare_messages(msg, selected_msg);
-			if (ret < 0) {
-				/*
-				 * The `msg` should go first. Update the next
-				 * iterator and the current timestamp.
-				 */
-				*muxer_upstream_msg_iter =
-					cur_muxer_upstream_msg_iter;
-				youngest_ts_ns = msg_ts_ns;
-				*ts_ns = youngest_ts_ns;
-			} else if (ret == 0) {
-				/* Unable to pick which one should go first. */
-				BT_COMP_LOGW("Cannot deterministically pick next upstream message iterator because they have identical next messages: "
-					"muxer-upstream-msg-iter-wrap-addr=%p"
-					"cur-muxer-upstream-msg-iter-wrap-addr=%p",
-					*muxer_upstream_msg_iter,
-					cur_muxer_upstream_msg_iter);
-			}
-		}
+end:
+	return status;
+}
+
+/*
+ * Inserts `muxer_upstream_msg_iter`, of which the head timestamp is up
+ * to date, into the heap of `muxer_msg_iter`.
+ */
+static
+bt_component_class_message_iterator_next_method_status
+muxer_msg_iter_heap_insert_upstream_msg_iter(
+		struct muxer_comp *muxer_comp,
+		struct muxer_msg_iter *muxer_msg_iter,
+		struct muxer_upstream_msg_iter *muxer_upstream_msg_iter)
+{
+	bt_component_class_message_iterator_next_method_status status =
+		BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK;
+
+	if (bt_heap_insert(&muxer_msg_iter->heap, muxer_upstream_msg_iter)) {
+		BT_COMP_LOGE_APPEND_CAUSE(muxer_comp->self_comp,
+			"Cannot insert muxer's upstream message iterator wrapper into heap: "
+			"muxer-msg-iter-addr=%p, "
+			"muxer-upstream-msg-iter-wrap-addr=%p",
+			muxer_msg_iter, muxer_upstream_msg_iter);
+		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_MEMORY_ERROR;
+		goto end;
 	}
 
-	if (!*muxer_upstream_msg_iter) {
-		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_END;
-		*ts_ns = INT64_MIN;
+	if (muxer_upstream_msg_iter->head_ts_is_last_returned) {
+		muxer_msg_iter->heap_last_returned_ts_count++;
 	}
 
 end:
 	return status;
 }
 
+/*
+ * Updates the head timestamps of the upstream message iterators in the
+ * heap of `muxer_msg_iter` which are the last returned timestamp after
+ * this last returned timestamp changed, and then restores the heap
+ * property.
+ *
+ * Messages without a timestamp of their own are rare (for example,
+ * stream beginning messages without a default clock snapshot), so
+ * this is not a hot path.
+ */
+static
+void muxer_msg_iter_heap_update_last_returned_ts(
+		struct muxer_msg_iter *muxer_msg_iter)
+{
+	struct ptr_heap *heap = &muxer_msg_iter->heap;
+	size_t len = heap->len;
+	size_t i;
+	int ret;
+
+	for (i = 0; i < len; i++) {
+		struct muxer_upstream_msg_iter *muxer_upstream_msg_iter =
+			heap->ptrs[i];
+
+		if (muxer_upstream_msg_iter->head_ts_is_last_returned) {
+			muxer_upstream_msg_iter->head_ts_ns =
+				muxer_msg_iter->last_returned_ts_ns;
+		}
+	}
+
+	/*
+	 * Rebuild the heap in place: inserting the element at index
+	 * `i` only moves elements within [0, i], and the heap never
+	 * needs to grow here.
+	 */
+	heap->len = 0;
+
+	for (i = 0; i < len; i++) {
+		ret = bt_heap_insert(heap, heap->ptrs[i]);
+		BT_ASSERT_DBG(ret == 0);
+	}
+}
+
+/*
+ * Gets the next messages of `muxer_upstream_msg_iter` if its queue is
+ * empty. If it's ended, moves it from the array of active upstream
+ * message iterators to the array of ended ones and sets `*is_ended`.
+ */
 static
 bt_component_class_message_iterator_next_method_status
 validate_muxer_upstream_msg_iter(
-	struct muxer_upstream_msg_iter *muxer_upstream_msg_iter,
-	bool *is_ended)
+		struct muxer_msg_iter *muxer_msg_iter,
+		struct muxer_upstream_msg_iter *muxer_upstream_msg_iter,
+		bool *is_ended)
 {
-	struct muxer_comp *muxer_comp = muxer_upstream_msg_iter->muxer_comp;
-	bt_component_class_message_iterator_next_method_status status;
+	struct muxer_comp *muxer_comp = muxer_msg_iter->muxer_comp;
+	bt_component_class_message_iterator_next_method_status status =
+		BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK;
+	GPtrArray *active = muxer_msg_iter->active_muxer_upstream_msg_iters;
+	guint i;
 
 	BT_COMP_LOGD("Validating muxer's upstream message iterator wrapper: "
 		"muxer-upstream-msg-iter-wrap-addr=%p",
 		muxer_upstream_msg_iter);
 
-	if (muxer_upstream_msg_iter->msgs->length > 0 ||
-			!muxer_upstream_msg_iter->msg_iter) {
-		BT_COMP_LOGD("Already valid or not considered: "
-			"queue-len=%u, upstream-msg-iter-addr=%p",
-			muxer_upstream_msg_iter->msgs->length,
-			muxer_upstream_msg_iter->msg_iter);
-		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK;
+	if (muxer_upstream_msg_iter->msgs->length > 0) {
+		BT_COMP_LOGD("Already valid: queue-len=%u",
+			muxer_upstream_msg_iter->msgs->length);
 		goto end;
 	}
 
 	/* muxer_upstream_msg_iter_next() logs details/errors */
 	status = muxer_upstream_msg_iter_next(muxer_upstream_msg_iter,
 		is_ended);
+	if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+		if (status < 0) {
+			BT_COMP_LOGE_APPEND_CAUSE(muxer_comp->self_comp,
+				"Cannot validate muxer's upstream message iterator wrapper: "
+				"muxer-msg-iter-addr=%p, "
+				"muxer-upstream-msg-iter-wrap-addr=%p",
+				muxer_msg_iter,
+				muxer_upstream_msg_iter);
+		} else {
+			BT_COMP_LOGD("Cannot validate muxer's upstream message iterator wrapper: "
+				"muxer-msg-iter-addr=%p, "
+				"muxer-upstream-msg-iter-wrap-addr=%p",
+				muxer_msg_iter,
+				muxer_upstream_msg_iter);
+		}
+
+		goto end;
+	}
+
+	if (G_LIKELY(!*is_ended)) {
+		goto end;
+	}
+
+	/*
+	 * Move this muxer upstream message iterator to the array of
+	 * ended iterators.
+	 */
+	BT_COMP_LOGD("Muxer's upstream message iterator wrapper: ended or canceled: "
+		"muxer-msg-iter-addr=%p, "
+		"muxer-upstream-msg-iter-wrap-addr=%p",
+		muxer_msg_iter, muxer_upstream_msg_iter);
+	g_ptr_array_add(muxer_msg_iter->ended_muxer_upstream_msg_iters,
+		muxer_upstream_msg_iter);
+
+	for (i = 0; i < active->len; i++) {
+		if (active->pdata[i] == muxer_upstream_msg_iter) {
+			break;
+		}
+	}
+
+	BT_ASSERT_DBG(i < active->len);
+	active->pdata[i] = NULL;
+
+	/*
+	 * Use g_ptr_array_remove_fast() because the order of those
+	 * elements is not important.
+	 */
+	g_ptr_array_remove_index_fast(active, i);
 
 end:
 	return status;
 }
 
+/*
+ * Validates the pending upstream message iterators of `muxer_msg_iter`
+ * and inserts the non-ended ones into the heap.
+ *
+ * On success, there's no more pending upstream message iterator.
+ */
 static
 bt_component_class_message_iterator_next_method_status
 validate_muxer_upstream_msg_iters(
 		struct muxer_msg_iter *muxer_msg_iter)
 {
 	struct muxer_comp *muxer_comp = muxer_msg_iter->muxer_comp;
-	bt_component_class_message_iterator_next_method_status status;
+	bt_component_class_message_iterator_next_method_status status =
+		BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK;
+	GPtrArray *pending = muxer_msg_iter->pending_muxer_upstream_msg_iters;
 	size_t i;
 
+	if (G_LIKELY(pending->len == 0)) {
+		goto end;
+	}
+
 	BT_COMP_LOGD("Validating muxer's upstream message iterator wrappers: "
-		"muxer-msg-iter-addr=%p", muxer_msg_iter);
+		"muxer-msg-iter-addr=%p, pending-count=%u",
+		muxer_msg_iter, pending->len);
 
-	for (i = 0; i < muxer_msg_iter->active_muxer_upstream_msg_iters->len;
-			i++) {
+	for (i = 0; i < pending->len; i++) {
 		bool is_ended = false;
 		struct muxer_upstream_msg_iter *muxer_upstream_msg_iter =
-			g_ptr_array_index(
-				muxer_msg_iter->active_muxer_upstream_msg_iters,
-				i);
+			g_ptr_array_index(pending, i);
 
-		status = validate_muxer_upstream_msg_iter(
+		/* validate_muxer_upstream_msg_iter() logs details/errors */
+		status = validate_muxer_upstream_msg_iter(muxer_msg_iter,
 			muxer_upstream_msg_iter, &is_ended);
 		if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
-			if (status < 0) {
-				BT_COMP_LOGE_APPEND_CAUSE(muxer_comp->self_comp,
-					"Cannot validate muxer's upstream message iterator wrapper: "
-					"muxer-msg-iter-addr=%p, "
-					"muxer-upstream-msg-iter-wrap-addr=%p",
-					muxer_msg_iter,
-					muxer_upstream_msg_iter);
-			} else {
-				BT_COMP_LOGD("Cannot validate muxer's upstream message iterator wrapper: "
-					"muxer-msg-iter-addr=%p, "
-					"muxer-upstream-msg-iter-wrap-addr=%p",
-					muxer_msg_iter,
-					muxer_upstream_msg_iter);
-			}
+			break;
+		}
 
-			goto end;
+		if (G_UNLIKELY(is_ended)) {
+			continue;
 		}
 
 		/*
-		 * Move this muxer upstream message iterator to the
-		 * array of ended iterators if it's ended.
+		 * muxer_upstream_msg_iter_update_head_ts() and
+		 * muxer_msg_iter_heap_insert_upstream_msg_iter() log
+		 * errors.
 		 */
+		status = muxer_upstream_msg_iter_update_head_ts(muxer_comp,
+			muxer_msg_iter, muxer_upstream_msg_iter);
+		if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+			break;
+		}
+
+		status = muxer_msg_iter_heap_insert_upstream_msg_iter(
+			muxer_comp, muxer_msg_iter, muxer_upstream_msg_iter);
+		if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+			break;
+		}
+	}
+
+	/*
+	 * Remove the handled upstream message iterators from the
+	 * pending array, keeping the current one (if any) so as to
+	 * retry it next time.
+	 *
+	 * GLib < 2.48.0 asserts when g_ptr_array_remove_range() is
+	 * called on an empty array.
+	 */
+	if (i > 0) {
+		g_ptr_array_remove_range(pending, 0, i);
+	}
+
+end:
+	return status;
+}
+
+/*
+ * Finds the upstream message iterator of `muxer_msg_iter` of which the
+ * head message is the youngest, removing it from the heap if it's in
+ * there.
+ *
+ * The upstream message iterator from which we returned the last
+ * message (`cur_muxer_upstream_msg_iter`) is not in the heap: if its
+ * new head message is still younger than the youngest head message of
+ * the heap (the next-oldest upstream head), this function returns it
+ * without any heap operation. This makes runs of messages from the
+ * same upstream message iterator, which are common (sparse streams,
+ * per-CPU buffers), cost one comparison per message.
+ *
+ * On success, this function sets `*muxer_upstream_msg_iter` to the
+ * selected upstream message iterator, or returns
+ * BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_END if
+ * there's no available message.
+ */
+static
+bt_component_class_message_iterator_next_method_status
+muxer_msg_iter_youngest_upstream_msg_iter(
+		struct muxer_comp *muxer_comp,
+		struct muxer_msg_iter *muxer_msg_iter,
+		struct muxer_upstream_msg_iter **muxer_upstream_msg_iter)
+{
+	struct muxer_upstream_msg_iter *cur_muxer_upstream_msg_iter =
+		muxer_msg_iter->cur_muxer_upstream_msg_iter;
+	struct muxer_upstream_msg_iter *heap_max;
+	bt_component_class_message_iterator_next_method_status status;
+
+	/* validate_muxer_upstream_msg_iters() logs details/errors */
+	status = validate_muxer_upstream_msg_iters(muxer_msg_iter);
+	if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+		goto end;
+	}
+
+	if (cur_muxer_upstream_msg_iter) {
+		bool is_ended = false;
+
+		/* validate_muxer_upstream_msg_iter() logs details/errors */
+		status = validate_muxer_upstream_msg_iter(muxer_msg_iter,
+			cur_muxer_upstream_msg_iter, &is_ended);
+		if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+			goto end;
+		}
+
 		if (G_UNLIKELY(is_ended)) {
-			BT_COMP_LOGD("Muxer's upstream message iterator wrapper: ended or canceled: "
-				"muxer-msg-iter-addr=%p, "
-				"muxer-upstream-msg-iter-wrap-addr=%p",
-				muxer_msg_iter, muxer_upstream_msg_iter);
-			g_ptr_array_add(
-				muxer_msg_iter->ended_muxer_upstream_msg_iters,
-				muxer_upstream_msg_iter);
-			muxer_msg_iter->active_muxer_upstream_msg_iters->pdata[i] = NULL;
+			muxer_msg_iter->cur_muxer_upstream_msg_iter = NULL;
+			goto select_heap_max;
+		}
+
+		/* muxer_upstream_msg_iter_update_head_ts() logs errors */
+		status = muxer_upstream_msg_iter_update_head_ts(muxer_comp,
+			muxer_msg_iter, cur_muxer_upstream_msg_iter);
+		if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+			goto end;
+		}
+
+		heap_max = bt_heap_maximum(&muxer_msg_iter->heap);
+		if (!heap_max || muxer_upstream_msg_iter_heap_gt(
+				cur_muxer_upstream_msg_iter, heap_max)) {
+			/* Fast path: same upstream message iterator */
+			*muxer_upstream_msg_iter = cur_muxer_upstream_msg_iter;
+			goto end;
+		}
 
+		/*
+		 * Another upstream message iterator has a younger
+		 * message: end of run.
+		 */
+		status = muxer_msg_iter_heap_insert_upstream_msg_iter(
+			muxer_comp, muxer_msg_iter,
+			cur_muxer_upstream_msg_iter);
+		if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
 			/*
-			 * Use g_ptr_array_remove_fast() because the
-			 * order of those elements is not important.
+			 * muxer_msg_iter_heap_insert_upstream_msg_iter()
+			 * logs errors.
 			 */
-			g_ptr_array_remove_index_fast(
-				muxer_msg_iter->active_muxer_upstream_msg_iters,
-				i);
-			i--;
+			goto end;
 		}
+
+		muxer_msg_iter->cur_muxer_upstream_msg_iter = NULL;
+	}
+
+select_heap_max:
+	*muxer_upstream_msg_iter = bt_heap_remove(&muxer_msg_iter->heap);
+	if (!*muxer_upstream_msg_iter) {
+		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_END;
+		goto end;
 	}
 
-	status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK;
+	if ((*muxer_upstream_msg_iter)->head_ts_is_last_returned) {
+		BT_ASSERT_DBG(muxer_msg_iter->heap_last_returned_ts_count > 0);
+		muxer_msg_iter->heap_last_returned_ts_count--;
+	}
+
+	/*
+	 * This upstream message iterator is not in the heap anymore:
+	 * the next call checks whether or not it still has the youngest
+	 * message.
+	 */
+	muxer_msg_iter->cur_muxer_upstream_msg_iter = *muxer_upstream_msg_iter;
 
 end:
 	return status;
@@ -1041,21 +1290,8 @@ bt_component_class_message_iterator_next_method_status muxer_msg_iter_do_next_on
 	struct muxer_upstream_msg_iter *muxer_upstream_msg_iter = NULL;
 	int64_t next_return_ts;
 
-	status = validate_muxer_upstream_msg_iters(muxer_msg_iter);
-	if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
-		/* validate_muxer_upstream_msg_iters() logs details */
-		goto end;
-	}
-
-	/*
-	 * At this point we know that all the existing upstream
-	 * message iterators are valid. We can find the one,
-	 * amongst those, of which the current message is the
-	 * youngest.
-	 */
 	status = muxer_msg_iter_youngest_upstream_msg_iter(muxer_comp,
-			muxer_msg_iter, &muxer_upstream_msg_iter,
-			&next_return_ts);
+			muxer_msg_iter, &muxer_upstream_msg_iter);
 	if (status < 0 || status == BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_END) {
 		if (status < 0) {
 			BT_COMP_LOGE_APPEND_CAUSE(muxer_comp->self_comp,
@@ -1071,6 +1307,13 @@ bt_component_class_message_iterator_next_method_status muxer_msg_iter_do_next_on
 		goto end;
 	}
 
+	if (status != BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK) {
+		/* Try again later */
+		goto end;
+	}
+
+	BT_ASSERT_DBG(muxer_upstream_msg_iter);
+	next_return_ts = muxer_upstream_msg_iter->head_ts_ns;
 	if (next_return_ts < muxer_msg_iter->last_returned_ts_ns) {
 		BT_COMP_LOGE_APPEND_CAUSE(muxer_comp->self_comp,
 			"Youngest upstream message iterator wrapper's timestamp is less than muxer's message iterator's last returned timestamp: "
@@ -1087,9 +1330,6 @@ bt_component_class_message_iterator_next_method_status muxer_msg_iter_do_next_on
 		"muxer-upstream-msg-iter-wrap-addr=%p, "
 		"ts=%" PRId64,
 		muxer_msg_iter, muxer_upstream_msg_iter, next_return_ts);
-	BT_ASSERT_DBG(status ==
-		BT_COMPONENT_CLASS_MESSAGE_ITERATOR_NEXT_METHOD_STATUS_OK);
-	BT_ASSERT_DBG(muxer_upstream_msg_iter);
 
 	/*
 	 * Consume from the queue's head: other side
@@ -1097,7 +1337,15 @@ bt_component_class_message_iterator_next_method_status muxer_msg_iter_do_next_on
 	 */
 	*msg = g_queue_pop_head(muxer_upstream_msg_iter->msgs);
 	BT_ASSERT_DBG(*msg);
-	muxer_msg_iter->last_returned_ts_ns = next_return_ts;
+
+	if (next_return_ts != muxer_msg_iter->last_returned_ts_ns) {
+		muxer_msg_iter->last_returned_ts_ns = next_return_ts;
+
+		if (G_UNLIKELY(muxer_msg_iter->heap_last_returned_ts_count > 0)) {
+			muxer_msg_iter_heap_update_last_returned_ts(
+				muxer_msg_iter);
+		}
+	}
 
 end:
 	return status;
@@ -1190,6 +1438,12 @@ void destroy_muxer_msg_iter(struct muxer_msg_iter *muxer_msg_iter)
 			muxer_msg_iter->ended_muxer_upstream_msg_iters, TRUE);
 	}
 
+	if (muxer_msg_iter->pending_muxer_upstream_msg_iters) {
+		g_ptr_array_free(
+			muxer_msg_iter->pending_muxer_upstream_msg_iters, TRUE);
+	}
+
+	bt_heap_free(&muxer_msg_iter->heap);
 	g_free(muxer_msg_iter);
 }
 
@@ -1332,6 +1586,23 @@ bt_component_class_message_iterator_initialize_method_status muxer_msg_iter_init
 		goto error;
 	}
 
+	muxer_msg_iter->pending_muxer_upstream_msg_iters = g_ptr_array_new();
+	if (!muxer_msg_iter->pending_muxer_upstream_msg_iters) {
+		BT_COMP_LOGE_STR("Failed to allocate a GPtrArray.");
+		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+		goto error;
+	}
+
+	if (bt_heap_init(&muxer_msg_iter->heap,
+			bt_component_filter_get_input_port_count(
+				bt_self_component_filter_as_component_filter(
+					self_comp)),
+			muxer_upstream_msg_iter_heap_gt)) {
+		BT_COMP_LOGE_STR("Failed to allocate a priority heap.");
+		status = BT_COMPONENT_CLASS_MESSAGE_ITERATOR_INITIALIZE_METHOD_STATUS_MEMORY_ERROR;
+		goto error;
+	}
+
 	status = muxer_msg_iter_init_upstream_iterators(muxer_comp,
 		muxer_msg_iter, config);
 	if (status) {
@@ -1570,6 +1841,22 @@ bt_component_class_message_iterator_seek_beginning_method_status muxer_msg_iter_
 		g_ptr_array_remove_range(muxer_msg_iter->ended_muxer_upstream_msg_iters,
 			0, muxer_msg_iter->ended_muxer_upstream_msg_iters->len);
 	}
+
+	/* All the active upstream iterators are now pending */
+	while (bt_heap_remove(&muxer_msg_iter->heap)) {
+		;
+	}
+
+	muxer_msg_iter->heap_last_returned_ts_count = 0;
+	muxer_msg_iter->cur_muxer_upstream_msg_iter = NULL;
+	g_ptr_array_set_size(muxer_msg_iter->pending_muxer_upstream_msg_iters, 0);
+
+	for (i = 0; i < muxer_msg_iter->active_muxer_upstream_msg_iters->len;
+			i++) {
+		g_ptr_array_add(muxer_msg_iter->pending_muxer_upstream_msg_iters,
+			muxer_msg_iter->active_muxer_upstream_msg_iters->pdata[i]);
+	}
+
 	muxer_msg_iter->last_returned_ts_ns = INT64_MIN;
 	muxer_msg_iter->clock_class_expectation =
 		MUXER_MSG_ITER_CLOCK_CLASS_EXPECTATION_ANY;
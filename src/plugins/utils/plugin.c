@@ -23,6 +23,7 @@
 #include <babeltrace2/babeltrace.h>
 #include "dummy/dummy.h"
 #include "counter/counter.h"
+#include "aggregator/aggregator.h"
 #include "muxer/muxer.h"
 #include "trimmer/trimmer.h"
 
@@ -57,6 +58,17 @@ BT_PLUGIN_SINK_COMPONENT_CLASS_DESCRIPTION(counter,
 BT_PLUGIN_SINK_COMPONENT_CLASS_HELP(counter,
 	"See the babeltrace2-sink.utils.counter(7) manual page.");
 
+/* sink.utils.aggregator */
+BT_PLUGIN_SINK_COMPONENT_CLASS(aggregator, aggregator_consume);
+BT_PLUGIN_SINK_COMPONENT_CLASS_INITIALIZE_METHOD(aggregator, aggregator_init);
+BT_PLUGIN_SINK_COMPONENT_CLASS_FINALIZE_METHOD(aggregator, aggregator_finalize);
+BT_PLUGIN_SINK_COMPONENT_CLASS_GRAPH_IS_CONFIGURED_METHOD(aggregator,
+	aggregator_graph_is_configured);
+BT_PLUGIN_SINK_COMPONENT_CLASS_DESCRIPTION(aggregator,
+	"Count and aggregate events by group and report the results.");
+BT_PLUGIN_SINK_COMPONENT_CLASS_HELP(aggregator,
+	"See the babeltrace2-sink.utils.aggregator(7) manual page.");
+
 /* flt.utils.trimmer */
 BT_PLUGIN_FILTER_COMPONENT_CLASS(trimmer, trimmer_msg_iter_next);
 BT_PLUGIN_FILTER_COMPONENT_CLASS_DESCRIPTION(trimmer,
@@ -0,0 +1,778 @@
+# Copyright (C) 2020 EfficiOS Inc.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; only version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+# Benchmark suite for the hot paths of the `bt2` Python package.
+#
+# Run it through `run_bt2_benchmark` (in this directory) so that the
+# build's `bt2` package and plugins are used:
+#
+#     $ ./tests/benchmark/bt2/run_bt2_benchmark --output new.json
+#
+# Each benchmark sets up its state once, runs a few warmup iterations,
+# and then times a fixed number of iterations. An iteration processes a
+# fixed, deterministic number of items (messages, field accesses,
+# values, graphs), so that the results of two runs are comparable.
+#
+# The results are written as JSON. Compare two result files with
+# `--compare`, for example to check a change or a release against a
+# baseline:
+#
+#     $ ./tests/benchmark/bt2/run_bt2_benchmark --output new.json \
+#           --compare old.json
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import struct
+import sys
+import tempfile
+import time
+
+import bt2
+
+
+# Version of the JSON result format
+_RESULT_FORMAT_VERSION = 1
+
+_DEFAULT_RUNS = 10
+_DEFAULT_WARMUPS = 2
+_DEFAULT_THRESHOLD = 0.1
+
+
+def _ctf_traces_path():
+    path = os.environ.get('BT_CTF_TRACES_PATH')
+
+    if path is None:
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'ctf-traces'
+        )
+
+    return path
+
+
+# Registered benchmarks: list of `_Benchmark`
+_benchmarks = []
+
+
+class _Benchmark:
+    def __init__(self, name, unit, setup):
+        self.name = name
+        self.unit = unit
+        self.setup = setup
+
+
+# Registers the decorated function as a benchmark named `name`.
+#
+# The decorated function receives the benchmark parameters (`quick`)
+# and does any setup which must not be measured: it returns a callable
+# which runs one iteration and returns the number of processed items
+# (of kind `unit`).
+def _benchmark(name, unit):
+    def decorator(setup):
+        _benchmarks.append(_Benchmark(name, unit, setup))
+        return setup
+
+    return decorator
+
+
+# Synthetic trace source
+#
+# Each output port emits one stream of event messages, each event having
+# a payload with integer, real, string, and array members. The message
+# iterator creates the messages in __next__() so that a benchmark
+# consuming them also measures their creation.
+
+
+class _SyntheticIter(bt2._UserMessageIterator):
+    def __init__(self, config, self_output_port):
+        data = self_output_port.user_data
+        self._ec = data['event_class']
+        self._stream = data['stream']
+        self._packet = data['packet']
+        self._event_count = data['event_count']
+        self._with_payload = data['with_payload']
+        self._at = 0
+        self._state = 0
+
+    def __next__(self):
+        if self._state == 0:
+            self._state = 1
+            return self._create_stream_beginning_message(self._stream)
+        elif self._state == 1:
+            self._state = 2
+            return self._create_packet_beginning_message(self._packet)
+        elif self._state == 2:
+            if self._at < self._event_count:
+                msg = self._create_event_message(self._ec, self._packet, self._at)
+
+                if self._with_payload:
+                    payload = msg.event.payload_field
+                    payload['u64'] = self._at
+                    payload['s32'] = -self._at
+                    payload['dbl'] = self._at * 0.5
+                    payload['str'] = 'event'
+                    payload['arr'] = [self._at, self._at + 1, self._at + 2]
+
+                self._at += 1
+                return msg
+
+            self._state = 3
+            return self._create_packet_end_message(self._packet)
+        elif self._state == 3:
+            self._state = 4
+            return self._create_stream_end_message(self._stream)
+
+        raise bt2.Stop
+
+
+class _SyntheticSource(bt2._UserSourceComponent, message_iterator_class=_SyntheticIter):
+    def __init__(self, config, params, obj):
+        tc = self._create_trace_class()
+        cc = self._create_clock_class(frequency=1000000000)
+        sc = tc.create_stream_class(
+            default_clock_class=cc,
+            supports_packets=True,
+            packets_have_beginning_default_clock_snapshot=False,
+            packets_have_end_default_clock_snapshot=False,
+        )
+        payload_fc = tc.create_structure_field_class()
+        payload_fc += [
+            ('u64', tc.create_unsigned_integer_field_class(64)),
+            ('s32', tc.create_signed_integer_field_class(32)),
+            ('dbl', tc.create_double_precision_real_field_class()),
+            ('str', tc.create_string_field_class()),
+            (
+                'arr',
+                tc.create_dynamic_array_field_class(
+                    tc.create_unsigned_integer_field_class(64)
+                ),
+            ),
+        ]
+        ec = sc.create_event_class(name='synthetic', payload_field_class=payload_fc)
+        trace = tc()
+
+        for i in range(int(params.get('stream-count', 1))):
+            stream = trace.create_stream(sc)
+            self._add_output_port(
+                'out{}'.format(i),
+                {
+                    'event_class': ec,
+                    'stream': stream,
+                    'packet': stream.create_packet(),
+                    'event_count': int(params['event-count']),
+                    'with_payload': bool(params.get('with-payload', True)),
+                },
+            )
+
+
+def _synthetic_spec(event_count, stream_count=1, with_payload=True):
+    return bt2.ComponentSpec(
+        _SyntheticSource,
+        {
+            'event-count': event_count,
+            'stream-count': stream_count,
+            'with-payload': with_payload,
+        },
+    )
+
+
+def _collect_event_msgs(event_count):
+    # Keep the messages so that their fields remain valid
+    return [
+        msg
+        for msg in bt2.TraceCollectionMessageIterator(_synthetic_spec(event_count))
+        if isinstance(msg, bt2._EventMessageConst)
+    ]
+
+
+def _count_msgs(msg_iter):
+    count = 0
+
+    for _ in msg_iter:
+        count += 1
+
+    return count
+
+
+# Benchmarks
+
+
+@_benchmark('tcmi-synthetic', 'messages')
+def _bench_tcmi_synthetic(quick):
+    event_count = 2000 if quick else 20000
+
+    def run():
+        return _count_msgs(
+            bt2.TraceCollectionMessageIterator(
+                _synthetic_spec(event_count // 4, stream_count=4)
+            )
+        )
+
+    return run
+
+
+@_benchmark('tcmi-ctf-trace', 'messages')
+def _bench_tcmi_ctf_trace(quick):
+    path = os.path.join(_ctf_traces_path(), 'succeed', 'lttng-tracefile-rotation')
+    repeat = 1 if quick else 5
+
+    def run():
+        count = 0
+
+        for _ in range(repeat):
+            count += _count_msgs(bt2.TraceCollectionMessageIterator(path))
+
+        return count
+
+    return run
+
+
+@_benchmark('structure-field-access', 'field accesses')
+def _bench_structure_field_access(quick):
+    msgs = _collect_event_msgs(500 if quick else 5000)
+    names = ['u64', 's32', 'dbl', 'str', 'arr']
+
+    def run():
+        for msg in msgs:
+            payload = msg.event.payload_field
+
+            for name in names:
+                payload[name]
+
+        return len(msgs) * len(names)
+
+    return run
+
+
+@_benchmark('structure-field-iteration', 'members')
+def _bench_structure_field_iteration(quick):
+    msgs = _collect_event_msgs(500 if quick else 5000)
+
+    def run():
+        count = 0
+
+        for msg in msgs:
+            for _ in msg.event.payload_field.values():
+                count += 1
+
+        return count
+
+    return run
+
+
+@_benchmark('event-getitem', 'field lookups')
+def _bench_event_getitem(quick):
+    msgs = _collect_event_msgs(500 if quick else 5000)
+    names = ['u64', 's32', 'dbl', 'str', 'arr']
+
+    def run():
+        for msg in msgs:
+            event = msg.event
+
+            for name in names:
+                event[name]
+
+        return len(msgs) * len(names)
+
+    return run
+
+
+@_benchmark('array-field-access', 'element accesses')
+def _bench_array_field_access(quick):
+    arrays = [
+        msg.event.payload_field['arr']
+        for msg in _collect_event_msgs(500 if quick else 5000)
+    ]
+
+    def run():
+        count = 0
+
+        for array in arrays:
+            for i in range(len(array)):
+                array[i]
+                count += 1
+
+        return count
+
+    return run
+
+
+@_benchmark('array-field-iteration', 'elements')
+def _bench_array_field_iteration(quick):
+    arrays = [
+        msg.event.payload_field['arr']
+        for msg in _collect_event_msgs(500 if quick else 5000)
+    ]
+
+    def run():
+        count = 0
+
+        for array in arrays:
+            for _ in array:
+                count += 1
+
+        return count
+
+    return run
+
+
+def _create_event_msgs_graph(event_count, with_payload):
+    graph = bt2.Graph()
+    src = graph.add_component(
+        _SyntheticSource,
+        'src',
+        {'event-count': event_count, 'with-payload': with_payload},
+    )
+    sink = graph.add_component(
+        bt2.find_plugin('utils').sink_component_classes['dummy'], 'sink'
+    )
+    graph.connect_ports(src.output_ports['out0'], sink.input_ports['in'])
+    return graph
+
+
+@_benchmark('create-event-message', 'messages')
+def _bench_create_event_message(quick):
+    event_count = 2000 if quick else 20000
+
+    # The (native) dummy sink consumes the messages so that this
+    # measures their creation, not their consumption.
+    def run():
+        _create_event_msgs_graph(event_count, False).run()
+        return event_count
+
+    return run
+
+
+@_benchmark('create-event-message-with-payload', 'messages')
+def _bench_create_event_message_with_payload(quick):
+    event_count = 2000 if quick else 20000
+
+    def run():
+        _create_event_msgs_graph(event_count, True).run()
+        return event_count
+
+    return run
+
+
+@_benchmark('create-value', 'values')
+def _bench_create_value(quick):
+    count = 200 if quick else 2000
+    obj = {
+        'name': 'benchmark',
+        'enabled': True,
+        'ratio': 0.75,
+        'count': 42,
+        'inputs': ['/path/to/trace-{}'.format(i) for i in range(8)],
+        'nested': {'a': [1, 2, 3], 'b': {'c': None, 'd': -1}},
+    }
+
+    # Number of values which one `obj` conversion creates
+    def value_count(o):
+        if isinstance(o, dict):
+            return 1 + sum(value_count(v) for v in o.values())
+        elif isinstance(o, list):
+            return 1 + sum(value_count(v) for v in o)
+
+        return 1
+
+    obj_value_count = value_count(obj)
+
+    def run():
+        for _ in range(count):
+            bt2.create_value(obj)
+
+        return count * obj_value_count
+
+    return run
+
+
+@_benchmark('graph-setup', 'graphs')
+def _bench_graph_setup(quick):
+    count = 20 if quick else 200
+    path = os.path.join(_ctf_traces_path(), 'intersection', '3eventsintersect')
+    utils = bt2.find_plugin('utils')
+    fs_cc = bt2.find_plugin('ctf').source_component_classes['fs']
+    muxer_cc = utils.filter_component_classes['muxer']
+    dummy_cc = utils.sink_component_classes['dummy']
+
+    def run():
+        for _ in range(count):
+            graph = bt2.Graph()
+            src = graph.add_component(fs_cc, 'src', {'inputs': [path]})
+            muxer = graph.add_component(muxer_cc, 'muxer')
+            sink = graph.add_component(dummy_cc, 'sink')
+
+            for i, port in enumerate(src.output_ports.values()):
+                graph.connect_ports(port, muxer.input_ports['in{}'.format(i)])
+
+            graph.connect_ports(muxer.output_ports['out'], sink.input_ports['in'])
+
+        return count
+
+    return run
+
+
+# Metadata of the traces which _write_muxer_ctf_trace() writes
+_MUXER_CTF_TRACE_METADATA = '''/* CTF 1.8 */
+
+typealias integer { size = 32; align = 8; signed = false; } := uint32_t;
+typealias integer { size = 64; align = 8; signed = false; } := uint64_t;
+
+trace {
+    major = 1;
+    minor = 8;
+    byte_order = le;
+    packet.header := struct {
+        uint32_t magic;
+        uint32_t stream_id;
+    };
+};
+
+clock {
+    name = bench_clock;
+    freq = 1000000000;
+    offset_s = 0;
+};
+
+typealias integer {
+    size = 64; align = 8; signed = false;
+    map = clock.bench_clock.value;
+} := clock_uint64_t;
+
+stream {
+    id = 0;
+    packet.context := struct {
+        clock_uint64_t timestamp_begin;
+        clock_uint64_t timestamp_end;
+        uint64_t content_size;
+        uint64_t packet_size;
+    };
+    event.header := struct {
+        uint32_t id;
+        clock_uint64_t timestamp;
+    };
+};
+
+event {
+    name = bench_event;
+    id = 0;
+    stream_id = 0;
+    fields := struct {
+        uint32_t value;
+    };
+};
+'''
+
+
+# Writes a CTF trace having `stream_count` data streams to the directory
+# `path`, each data stream containing a single packet of
+# `events_per_stream` events.
+#
+# The event timestamps of the different data streams are interleaved
+# by runs of `run_length` events: with a run length of 1, consecutive
+# muxed messages always come from different upstream message
+# iterators.
+def _write_muxer_ctf_trace(path, stream_count, events_per_stream, run_length):
+    with open(os.path.join(path, 'metadata'), 'w') as f:
+        f.write(_MUXER_CTF_TRACE_METADATA)
+
+    def event_ts(stream_index, i):
+        run_index, pos = divmod(i, run_length)
+        return (run_index * stream_count + stream_index) * run_length + pos
+
+    # Packet header (8 bytes), packet context (32 bytes), and events
+    # (16 bytes each)
+    packet_size = (40 + 16 * events_per_stream) * 8
+
+    for stream_index in range(stream_count):
+        ts_begin = event_ts(stream_index, 0)
+        ts_end = event_ts(stream_index, events_per_stream - 1)
+        data = bytearray(
+            struct.pack(
+                '<IIQQQQ', 0xC1FC1FC1, 0, ts_begin, ts_end, packet_size, packet_size,
+            )
+        )
+
+        for i in range(events_per_stream):
+            data += struct.pack('<IQI', 0, event_ts(stream_index, i), i)
+
+        with open(os.path.join(path, 'stream{}'.format(stream_index)), 'wb') as f:
+            f.write(data)
+
+
+# Registers a benchmark named `name` of a `flt.utils.muxer` component
+# muxing `port_count` upstream message iterators, the event timestamps
+# of their data streams being interleaved by runs of `run_length`
+# events.
+#
+# The total number of events is the same whatever `port_count`, so that
+# the throughputs of those benchmarks are directly comparable: ideally,
+# they don't depend on the number of ports.
+def _register_muxer_benchmark(name, port_count, run_length):
+    @_benchmark(name, 'messages')
+    def bench(quick):
+        events_per_stream = (12800 if quick else 128000) // port_count
+        trace_dir = tempfile.TemporaryDirectory()
+        _write_muxer_ctf_trace(
+            trace_dir.name, port_count, events_per_stream, run_length
+        )
+        utils = bt2.find_plugin('utils')
+        fs_cc = bt2.find_plugin('ctf').source_component_classes['fs']
+        muxer_cc = utils.filter_component_classes['muxer']
+        dummy_cc = utils.sink_component_classes['dummy']
+
+        # Stream beginning, packet beginning, packet end, and stream
+        # end messages for each data stream
+        msg_count = port_count * (events_per_stream + 4)
+
+        def run():
+            graph = bt2.Graph()
+            src = graph.add_component(fs_cc, 'src', {'inputs': [trace_dir.name]})
+            muxer = graph.add_component(muxer_cc, 'muxer')
+            sink = graph.add_component(dummy_cc, 'sink')
+            assert len(src.output_ports) == port_count
+
+            for i, port in enumerate(src.output_ports.values()):
+                graph.connect_ports(port, muxer.input_ports['in{}'.format(i)])
+
+            graph.connect_ports(muxer.output_ports['out'], sink.input_ports['in'])
+            graph.run()
+            return msg_count
+
+        return run
+
+    return bench
+
+
+for _port_count in (4, 64, 256):
+    _register_muxer_benchmark('muxer-ports-{}'.format(_port_count), _port_count, 1)
+
+# Long runs of messages from the same upstream message iterator, like
+# with sparse streams or per-CPU buffers
+for _port_count in (4, 64):
+    _register_muxer_benchmark('muxer-runs-{}'.format(_port_count), _port_count, 200)
+
+
+# Harness
+
+
+def _run_benchmark(benchmark, runs, warmups, quick):
+    run = benchmark.setup(quick)
+
+    for _ in range(warmups):
+        run()
+
+    times = []
+    items = None
+
+    for _ in range(runs):
+        # Avoid measuring a collection of the previous run's garbage
+        gc.collect()
+        begin = time.perf_counter()
+        run_items = run()
+        times.append(time.perf_counter() - begin)
+
+        # Every iteration must process the same number of items
+        assert items is None or run_items == items
+        items = run_items
+
+    median = statistics.median(times)
+    return {
+        'unit': benchmark.unit,
+        'items': items,
+        'runs-s': times,
+        'mean-s': statistics.mean(times),
+        'median-s': median,
+        'stdev-s': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'min-s': min(times),
+        'items-per-s': items / median if median > 0 else None,
+    }
+
+
+def _metadata(args):
+    return {
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'bt2-version': bt2.__version__,
+        'python-version': platform.python_version(),
+        'python-implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'runs': args.runs,
+        'warmups': args.warmups,
+        'quick': args.quick,
+    }
+
+
+# Prints a comparison of `results` against the `baseline` results to
+# `out` and returns the names of the benchmarks which regressed by more
+# than `threshold` (a ratio).
+def _compare(baseline, results, threshold, out):
+    regressions = []
+    base_benchmarks = baseline['benchmarks']
+    row_fmt = '{:<36} {:>14} {:>14} {:>9}{}'
+    print(
+        row_fmt.format('benchmark', 'baseline/s', 'current/s', 'change', ''), file=out
+    )
+
+    for name, result in results['benchmarks'].items():
+        base = base_benchmarks.get(name)
+        current_rate = '{:.0f}'.format(result['items-per-s'])
+
+        if base is None or base['items'] != result['items']:
+            # Not comparable
+            print(row_fmt.format(name, '-', current_rate, '-', ''), file=out)
+            continue
+
+        # Positive change: slower
+        change = result['median-s'] / base['median-s'] - 1
+        marker = ''
+
+        if change > threshold:
+            marker = ' (REGRESSION)'
+            regressions.append(name)
+
+        print(
+            row_fmt.format(
+                name,
+                '{:.0f}'.format(base['items-per-s']),
+                current_rate,
+                '{:+.1f}%'.format(change * 100),
+                marker,
+            ),
+            file=out,
+        )
+
+    return regressions
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description='Run the bt2 Python package benchmarks and output the results as JSON.'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='write the JSON results to this file instead of the standard output',
+    )
+    parser.add_argument(
+        '-f',
+        '--filter',
+        help='only run the benchmarks of which the name matches this regex',
+    )
+    parser.add_argument(
+        '-r',
+        '--runs',
+        type=int,
+        default=_DEFAULT_RUNS,
+        help='number of timed iterations (default: %(default)s)',
+    )
+    parser.add_argument(
+        '-w',
+        '--warmups',
+        type=int,
+        default=_DEFAULT_WARMUPS,
+        help='number of warmup iterations (default: %(default)s)',
+    )
+    parser.add_argument(
+        '-q',
+        '--quick',
+        action='store_true',
+        help='use smaller workloads (results are not comparable to full runs)',
+    )
+    parser.add_argument(
+        '-c',
+        '--compare',
+        metavar='BASELINE',
+        help='compare the results to the JSON results in this file',
+    )
+    parser.add_argument(
+        '-t',
+        '--threshold',
+        type=float,
+        default=_DEFAULT_THRESHOLD,
+        help='with --compare, fail when a benchmark is slower than this ratio (default: %(default)s)',
+    )
+    parser.add_argument(
+        '-l', '--list', action='store_true', help='list the benchmarks and exit'
+    )
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        parser.error('--runs must be at least 1')
+
+    if args.warmups < 0:
+        parser.error('--warmups must be positive')
+
+    return args
+
+
+def main():
+    args = _parse_args()
+    benchmarks = _benchmarks
+
+    if args.filter is not None:
+        benchmarks = [b for b in benchmarks if re.search(args.filter, b.name)]
+
+    if args.list:
+        for benchmark in benchmarks:
+            print(benchmark.name)
+
+        return 0
+
+    results = {
+        'format-version': _RESULT_FORMAT_VERSION,
+        'metadata': _metadata(args),
+        'benchmarks': {},
+    }
+
+    for benchmark in benchmarks:
+        print('Running `{}`...'.format(benchmark.name), file=sys.stderr)
+        results['benchmarks'][benchmark.name] = _run_benchmark(
+            benchmark, args.runs, args.warmups, args.quick
+        )
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if baseline.get('format-version') != _RESULT_FORMAT_VERSION:
+            print('Unsupported baseline result format version.', file=sys.stderr)
+            return 2
+
+        # Keep the standard output for the JSON results if needed
+        out = sys.stderr if args.output is None else sys.stdout
+
+        if _compare(baseline, results, args.threshold, out):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
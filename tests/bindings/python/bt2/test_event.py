@@ -21,6 +21,7 @@ import bt2
 import utils
 from utils import TestOutputPortMessageIterator
 
+from bt2 import event as bt2_event
 from bt2 import field as bt2_field
 from bt2 import stream as bt2_stream
 from bt2 import event_class as bt2_event_class
@@ -331,6 +332,63 @@ class EventTestCase(unittest.TestCase):
         with self.assertRaises(KeyError):
             ev['yes']
 
+    def test_const_getitem_no_packet(self):
+        def event_fields_config(event):
+            event.payload_field['giraffe'] = 1
+            event.payload_field['gnu'] = 23
+            event.payload_field['mosquito'] = 42
+
+        msg = self._create_test_const_event_message(
+            event_fields_config=event_fields_config, with_ep=True
+        )
+        ev = msg.event
+        self.assertEqual(ev['gnu'], 23)
+
+        with self.assertRaises(KeyError):
+            ev['something']
+
+    def test_const_getitem_name_lookup_table(self):
+        def event_fields_config(event):
+            event.payload_field['giraffe'] = 1
+            event.payload_field['gnu'] = 23
+            event.payload_field['mosquito'] = 42
+            event.common_context_field['cpu_id'] = 1
+            event.common_context_field['stuff'] = 13.194
+
+        msg = self._create_test_const_event_message(
+            event_fields_config=event_fields_config, with_cc=True, with_ep=True
+        )
+        ev = msg.event
+        self.assertEqual(ev['mosquito'], 42)
+        table = bt2_event._name_lookup_tables[ev.cls.addr]
+        self.assertEqual(
+            table,
+            {
+                'cpu_id': (bt2_event._SCOPE_COMMON_CONTEXT, 0),
+                'stuff': (bt2_event._SCOPE_COMMON_CONTEXT, 1),
+                'giraffe': (bt2_event._SCOPE_PAYLOAD, 0),
+                'gnu': (bt2_event._SCOPE_PAYLOAD, 1),
+                'mosquito': (bt2_event._SCOPE_PAYLOAD, 2),
+            },
+        )
+
+        # Same table for the next lookups
+        self.assertEqual(ev['stuff'], 13.194)
+        self.assertIs(bt2_event._name_lookup_tables[ev.cls.addr], table)
+
+    def test_const_event_cached(self):
+        msg = self._create_test_const_event_message(with_ep=True)
+        self.assertIs(msg.event, msg.event)
+
+    def test_const_scope_fields_cached(self):
+        msg = self._create_test_const_event_message(
+            with_cc=True, with_sc=True, with_ep=True, with_packet=True
+        )
+        ev = msg.event
+        self.assertIs(ev.payload_field, ev.payload_field)
+        self.assertIs(ev.specific_context_field, ev.specific_context_field)
+        self.assertIs(ev.common_context_field, ev.common_context_field)
+
     def test_getitem(self):
         msg = utils.get_event_message()
         ev = msg.event
@@ -23,6 +23,7 @@ import math
 import copy
 import itertools
 import collections
+import array
 import bt2
 from utils import get_default_trace_class, create_const_field
 
@@ -1814,6 +1815,56 @@ class _TestArrayFieldCommon:
         expected_string = '[{}]'.format(', '.join([repr(v) for v in self._def_value]))
         self.assertEqual(expected_string, s)
 
+    def test_to_array(self):
+        values = self._def.to_array()
+        self.assertIs(type(values), array.array)
+        self.assertEqual(values.typecode, 'i')
+        self.assertEqual(values.tolist(), self._def_value)
+
+    def test_const_to_array(self):
+        self.assertEqual(self._def_const.to_array().tolist(), self._def_value)
+
+    def test_to_array_non_basic_field(self):
+        array_field = _create_struct_array_field(self._tc, 2)
+
+        with self.assertRaises(TypeError):
+            array_field.to_array()
+
+    def test_to_bytes(self):
+        self.assertEqual(
+            self._def.to_bytes(), array.array('i', self._def_value).tobytes()
+        )
+
+    def test_from_buffer(self):
+        self._def.from_buffer(array.array('i', [-1, 0, 2147483647]))
+        self.assertEqual(self._def, [-1, 0, 2147483647])
+
+    def test_from_buffer_memoryview(self):
+        self._def.from_buffer(memoryview(array.array('h', [7, 8, 9])))
+        self.assertEqual(self._def, [7, 8, 9])
+
+    def test_from_buffer_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self._def.from_buffer(array.array('q', [1, 2 ** 40, 3]))
+
+    def test_from_buffer_real_items(self):
+        with self.assertRaises(TypeError):
+            self._def.from_buffer(array.array('d', [1.0, 2.0, 3.0]))
+
+    def test_from_buffer_not_buffer(self):
+        with self.assertRaises(TypeError):
+            self._def.from_buffer([1, 2, 3])
+
+    def test_from_buffer_non_basic_field(self):
+        array_field = _create_struct_array_field(self._tc, 2)
+
+        with self.assertRaises(TypeError):
+            array_field.from_buffer(bytes(2))
+
+    def test_const_from_buffer(self):
+        with self.assertRaises(AttributeError):
+            self._def_const.from_buffer(array.array('i', [1, 2, 3]))
+
 
 class StaticArrayFieldTestCase(_TestArrayFieldCommon, unittest.TestCase):
     @staticmethod
@@ -1840,6 +1891,12 @@ class StaticArrayFieldTestCase(_TestArrayFieldCommon, unittest.TestCase):
         with self.assertRaises(ValueError):
             self._def.value = values
 
+    def test_from_buffer_wrong_len(self):
+        with self.assertRaises(ValueError):
+            self._def.from_buffer(array.array('i', [45, 1847]))
+
+        self.assertEqual(self._def, self._def_value)
+
 
 class DynamicArrayFieldTestCase(_TestArrayFieldCommon, unittest.TestCase):
     @staticmethod
@@ -1880,6 +1937,53 @@ class DynamicArrayFieldTestCase(_TestArrayFieldCommon, unittest.TestCase):
         with self.assertRaises(TypeError):
             self._def.length = 'cheval'
 
+    def test_from_buffer_resize(self):
+        self._def.from_buffer(array.array('i', [1, 2, 3, 4, 5]))
+        self.assertEqual(self._def, [1, 2, 3, 4, 5])
+
+    def test_from_buffer_out_of_range_keep_value(self):
+        with self.assertRaises(ValueError):
+            self._def.from_buffer(array.array('q', [1, 2, 3, 4, 2 ** 40]))
+
+        self.assertEqual(self._def, self._def_value)
+
+    def test_from_buffer_real_items_keep_length(self):
+        with self.assertRaises(TypeError):
+            self._def.from_buffer(array.array('d', [1.0]))
+
+        self.assertEqual(len(self._def), 3)
+
+    def test_bytes_round_trip(self):
+        fc = self._tc.create_dynamic_array_field_class(
+            self._tc.create_unsigned_integer_field_class(8)
+        )
+        field = _create_field(self._tc, fc)
+        field.from_buffer(b'\x00\x17meow\xff')
+        self.assertEqual(field, [0, 0x17, 109, 101, 111, 119, 255])
+        self.assertEqual(field.to_array().typecode, 'B')
+        self.assertEqual(field.to_bytes(), b'\x00\x17meow\xff')
+
+    def test_real_elements(self):
+        fc = self._tc.create_dynamic_array_field_class(
+            self._tc.create_double_precision_real_field_class()
+        )
+        field = _create_field(self._tc, fc)
+        field.from_buffer(array.array('i', [1, -2]))
+        self.assertEqual(field, [1.0, -2.0])
+        field.from_buffer(array.array('d', [1.5, -2.25, 3.0]))
+        values = field.to_array()
+        self.assertEqual(values.typecode, 'd')
+        self.assertEqual(values.tolist(), [1.5, -2.25, 3.0])
+
+    def test_bool_elements(self):
+        fc = self._tc.create_dynamic_array_field_class(
+            self._tc.create_bool_field_class()
+        )
+        field = _create_field(self._tc, fc)
+        field.from_buffer(bytes([1, 0, 1]))
+        self.assertEqual(field, [True, False, True])
+        self.assertEqual(field.to_array().tolist(), [1, 0, 1])
+
 
 class StructureFieldTestCase(unittest.TestCase):
     @staticmethod
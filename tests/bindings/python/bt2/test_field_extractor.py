@@ -0,0 +1,119 @@
+#
+# Copyright (C) 2020 EfficiOS Inc.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; only version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import unittest
+import array
+import bt2
+import utils
+
+
+class FieldExtractorTestCase(unittest.TestCase):
+    def setUp(self):
+        _, self._msgs = utils._get_all_message_types()
+        self._event_msg = [
+            msg for msg in self._msgs if type(msg) is bt2._EventMessageConst
+        ][0]
+        self._event_class = self._event_msg.event.cls
+
+    def test_create(self):
+        extractor = bt2.FieldExtractor(
+            self._event_class, ['payload/giraffe', 'common_context/cpu_id']
+        )
+        self.assertEqual(extractor.event_class.addr, self._event_class.addr)
+        self.assertEqual(extractor.paths, ['payload/giraffe', 'common_context/cpu_id'])
+        self.assertEqual(extractor.typecodes, ['q', 'q'])
+
+    def test_create_single_path(self):
+        extractor = bt2.FieldExtractor(self._event_class, 'packet_context/something')
+        self.assertEqual(extractor.paths, ['packet_context/something'])
+        self.assertEqual(extractor.typecodes, ['Q'])
+
+    def test_create_wrong_event_class_type(self):
+        with self.assertRaises(TypeError):
+            bt2.FieldExtractor(23, ['payload/giraffe'])
+
+    def test_create_wrong_path_type(self):
+        with self.assertRaises(TypeError):
+            bt2.FieldExtractor(self._event_class, [23])
+
+    def test_create_no_paths(self):
+        with self.assertRaises(ValueError):
+            bt2.FieldExtractor(self._event_class, [])
+
+    def test_create_unknown_scope(self):
+        with self.assertRaisesRegex(ValueError, "unknown root scope 'meow'"):
+            bt2.FieldExtractor(self._event_class, ['meow/giraffe'])
+
+    def test_create_no_member(self):
+        with self.assertRaises(ValueError):
+            bt2.FieldExtractor(self._event_class, ['payload'])
+
+    def test_create_unknown_member(self):
+        with self.assertRaisesRegex(ValueError, "no member named 'zebra'"):
+            bt2.FieldExtractor(self._event_class, ['payload/zebra'])
+
+    def test_create_member_of_scalar(self):
+        with self.assertRaisesRegex(ValueError, 'is not a member of a structure'):
+            bt2.FieldExtractor(self._event_class, ['payload/giraffe/neck'])
+
+    def test_extract(self):
+        extractor = bt2.FieldExtractor(
+            self._event_class,
+            [
+                'payload/giraffe',
+                'specific_context/ant',
+                'common_context/cpu_id',
+                'packet_context/something',
+            ],
+        )
+        res = extractor.extract(self._msgs)
+        self.assertEqual(
+            list(res.keys()),
+            [
+                'payload/giraffe',
+                'specific_context/ant',
+                'common_context/cpu_id',
+                'packet_context/something',
+            ],
+        )
+        self.assertEqual(res['payload/giraffe'], array.array('q', [1]))
+        self.assertEqual(res['specific_context/ant'], array.array('q', [-1]))
+        self.assertEqual(res['common_context/cpu_id'], array.array('q', [1]))
+        self.assertEqual(res['packet_context/something'], array.array('Q', [154]))
+
+    def test_extract_skips_other_messages(self):
+        extractor = bt2.FieldExtractor(self._event_class, ['payload/giraffe'])
+        msgs = [msg for msg in self._msgs if type(msg) is not bt2._EventMessageConst]
+        res = extractor.extract(msgs)
+        self.assertEqual(len(res['payload/giraffe']), 0)
+
+    def test_extract_many(self):
+        extractor = bt2.FieldExtractor(self._event_class, ['specific_context/ant'])
+        res = extractor.extract(self._msgs * 3)
+        self.assertEqual(res['specific_context/ant'], array.array('q', [-1, -1, -1]))
+
+    def test_extract_append_to_columns(self):
+        extractor = bt2.FieldExtractor(self._event_class, ['payload/giraffe'])
+        res = extractor.extract(self._msgs)
+        res2 = extractor.extract(self._msgs, res)
+        self.assertIs(res2, res)
+        self.assertEqual(res['payload/giraffe'], array.array('q', [1, 1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
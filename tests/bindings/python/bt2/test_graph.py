@@ -143,6 +143,20 @@ class GraphTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self._graph.add_component(cc, 'salut', obj=57)
 
+    def test_add_component_obj_value_non_python_sink_comp_cls(self):
+        plugin = bt2.find_plugin('text', find_in_user_dir=False, find_in_sys_dir=False)
+        assert plugin is not None
+        cc = plugin.sink_component_classes['pretty']
+        assert cc is not None
+
+        # a value object must be explicitly wrapped
+        with self.assertRaises(ValueError):
+            self._graph.add_component(cc, 'salut', obj=bt2.MapValue())
+
+    def test_add_component_native_sink_value_data_wrong_type(self):
+        with self.assertRaises(TypeError):
+            bt2.NativeSinkValueData({})
+
     def test_add_component_invalid_cls_type(self):
         with self.assertRaises(TypeError):
             self._graph.add_component(int, 'salut')
@@ -333,6 +333,136 @@ class UserMessageIteratorTestCase(unittest.TestCase):
         self.assertIs(type(msg_ev2), bt2._EventMessageConst)
         self.assertEqual(msg_ev1.addr, msg_ev2.addr)
 
+    # Test that _UserMessageIterator.__next__ can return many messages at
+    # once, and that they are received in order.
+    def test_next_returns_many_messages(self):
+        class MyIter(bt2._UserMessageIterator):
+            def __init__(self, config, port):
+                tc, sc, ec = port.user_data
+                trace = tc()
+                stream = trace.create_stream(sc)
+                packet = stream.create_packet()
+                self._batches = [
+                    [
+                        self._create_stream_beginning_message(stream),
+                        self._create_packet_beginning_message(packet),
+                    ],
+                    (),
+                    tuple(self._create_event_message(ec, packet) for i in range(100)),
+                    self._create_packet_end_message(packet),
+                ]
+
+            def __next__(self):
+                if len(self._batches) == 0:
+                    raise StopIteration
+
+                return self._batches.pop(0)
+
+        class MySource(bt2._UserSourceComponent, message_iterator_class=MyIter):
+            def __init__(self, config, params, obj):
+                tc = self._create_trace_class()
+                sc = tc.create_stream_class(supports_packets=True)
+                ec = sc.create_event_class()
+                self._add_output_port('out', (tc, sc, ec))
+
+        graph = bt2.Graph()
+        src = graph.add_component(MySource, 'src')
+        it = TestOutputPortMessageIterator(graph, src.output_ports['out'])
+
+        self.assertIs(type(next(it)), bt2._StreamBeginningMessageConst)
+        self.assertIs(type(next(it)), bt2._PacketBeginningMessageConst)
+
+        # an empty batch means "try again"
+        with self.assertRaises(bt2.TryAgain):
+            next(it)
+
+        ev_addrs = set()
+
+        for i in range(100):
+            msg = next(it)
+            self.assertIs(type(msg), bt2._EventMessageConst)
+            ev_addrs.add(msg.addr)
+
+        self.assertEqual(len(ev_addrs), 100)
+        self.assertIs(type(next(it)), bt2._PacketEndMessageConst)
+
+        with self.assertRaises(bt2.Stop):
+            next(it)
+
+    # Test that changing the list which __next__ returned doesn't change
+    # the messages which the native part didn't get yet.
+    def test_next_returns_many_messages_list_reused(self):
+        msgs = []
+
+        class MyIter(bt2._UserMessageIterator):
+            def __init__(self, config, port):
+                tc, sc, ec = port.user_data
+                trace = tc()
+                stream = trace.create_stream(sc)
+                self._msgs = [self._create_stream_beginning_message(stream)]
+                self._msgs += [
+                    self._create_event_message(ec, stream) for i in range(100)
+                ]
+                self._msgs.append(self._create_stream_end_message(stream))
+
+            def __next__(self):
+                if len(self._msgs) == 0:
+                    raise StopIteration
+
+                msgs.clear()
+                msgs.extend(self._msgs)
+                self._msgs = []
+                return msgs
+
+        class MySource(bt2._UserSourceComponent, message_iterator_class=MyIter):
+            def __init__(self, config, params, obj):
+                tc = self._create_trace_class()
+                sc = tc.create_stream_class()
+                ec = sc.create_event_class()
+                self._add_output_port('out', (tc, sc, ec))
+
+        graph = bt2.Graph()
+        src = graph.add_component(MySource, 'src')
+        it = TestOutputPortMessageIterator(graph, src.output_ports['out'])
+        self.assertIs(type(next(it)), bt2._StreamBeginningMessageConst)
+
+        # the user iterator reuses its list
+        msgs.clear()
+
+        for i in range(100):
+            self.assertIs(type(next(it)), bt2._EventMessageConst)
+
+        self.assertIs(type(next(it)), bt2._StreamEndMessageConst)
+
+        with self.assertRaises(bt2.Stop):
+            next(it)
+
+    # Test that __next__ returning a list which contains something else
+    # than a message is an error.
+    def test_next_returns_many_messages_wrong_type(self):
+        class MyIter(bt2._UserMessageIterator):
+            def __init__(self, config, port):
+                tc, sc = port.user_data
+                trace = tc()
+                stream = trace.create_stream(sc)
+                self._msgs = [self._create_stream_beginning_message(stream), 23]
+
+            def __next__(self):
+                return self._msgs
+
+        class MySource(bt2._UserSourceComponent, message_iterator_class=MyIter):
+            def __init__(self, config, params, obj):
+                tc = self._create_trace_class()
+                sc = tc.create_stream_class()
+                self._add_output_port('out', (tc, sc))
+
+        graph = bt2.Graph()
+        src = graph.add_component(MySource, 'src')
+        it = TestOutputPortMessageIterator(graph, src.output_ports['out'])
+
+        with self.assertRaises(bt2._Error):
+            next(it)
+
     # Try consuming many times from an iterator that always returns TryAgain.
     # This verifies that we are not missing an incref of Py_None, making the
     # refcount of Py_None reach 0.
@@ -1039,5 +1169,186 @@ class UserMessageIteratorSeekNsFromOriginTestCase(unittest.TestCase):
         self.assertEqual(actual_ns_from_origin, 17)
 
 
+class UserMessageIteratorEventMessageBuilderTestCase(unittest.TestCase):
+    # Calls `fn` with a user message iterator, an event class of which
+    # the payload field class has one member of each supported type, and
+    # a stream of this event class, during the initialization of the
+    # message iterator.
+    @staticmethod
+    def _run_in_msg_iter(fn, with_clock_class=False, payload_fc_creator=None):
+        class MyIter(bt2._UserMessageIterator):
+            def __init__(self, config, port):
+                ec = port.user_data
+                trace = ec.stream_class.trace_class()
+                stream = trace.create_stream(ec.stream_class)
+                fn(self, ec, stream)
+
+        class MySource(bt2._UserSourceComponent, message_iterator_class=MyIter):
+            def __init__(self, config, params, obj):
+                tc = self._create_trace_class()
+                cc = self._create_clock_class() if with_clock_class else None
+                sc = tc.create_stream_class(default_clock_class=cc)
+
+                if payload_fc_creator is None:
+                    payload_fc = tc.create_structure_field_class()
+                    payload_fc += [
+                        ('u8', tc.create_unsigned_integer_field_class(8)),
+                        ('s8', tc.create_signed_integer_field_class(8)),
+                        ('dbl', tc.create_double_precision_real_field_class()),
+                        ('flag', tc.create_bool_field_class()),
+                        ('bits', tc.create_bit_array_field_class(16)),
+                        ('str', tc.create_string_field_class()),
+                    ]
+                else:
+                    payload_fc = payload_fc_creator(tc)
+
+                ec = sc.create_event_class(payload_field_class=payload_fc)
+                self._add_output_port('out', ec)
+
+        graph = _create_graph(MySource, SimpleSink)
+        graph.run()
+
+    def test_create(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+            self.assertEqual(builder.event_class.addr, ec.addr)
+            self.assertEqual(builder.parent.addr, stream.addr)
+            msg = builder.create((23, -17, 2.5, True, 0xBEEF, 'salut'))
+            self.assertIs(type(msg), bt2._EventMessage)
+            self.assertEqual(msg.event.cls.addr, ec.addr)
+            self.assertEqual(msg.event.stream.addr, stream.addr)
+            payload = msg.event.payload_field
+            self.assertEqual(payload['u8'], 23)
+            self.assertEqual(payload['s8'], -17)
+            self.assertEqual(payload['dbl'], 2.5)
+            self.assertEqual(payload['flag'], True)
+            self.assertEqual(payload['bits'], 0xBEEF)
+            self.assertEqual(payload['str'], 'salut')
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_many(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+            rows = [(i, -i, i / 2, i % 2 == 0, i, str(i)) for i in range(50)]
+            msgs = builder.create_many(iter(rows))
+            self.assertEqual(len(msgs), 50)
+
+            for i, msg in enumerate(msgs):
+                payload = msg.event.payload_field
+                self.assertEqual(payload['u8'], i)
+                self.assertEqual(payload['s8'], -i)
+                self.assertEqual(payload['dbl'], i / 2)
+                self.assertEqual(payload['flag'], i % 2 == 0)
+                self.assertEqual(payload['bits'], i)
+                self.assertEqual(payload['str'], str(i))
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_many_empty(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+            self.assertEqual(builder.create_many([]), [])
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_with_default_clock_snapshot(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+            msgs = builder.create_many(
+                [(1, 2, 3.0, False, 4, 'a'), (5, 6, 7.0, True, 8, 'b')], [100, 200]
+            )
+            self.assertEqual(msgs[0].default_clock_snapshot.value, 100)
+            self.assertEqual(msgs[1].default_clock_snapshot.value, 200)
+
+            msg = builder.create((1, 2, 3.0, False, 4, 'a'), 300)
+            self.assertEqual(msg.default_clock_snapshot.value, 300)
+
+            with self.assertRaisesRegex(
+                ValueError, 'must have a default clock snapshot'
+            ):
+                builder.create((1, 2, 3.0, False, 4, 'a'))
+
+            with self.assertRaisesRegex(
+                ValueError, 'expecting 2 default clock snapshots'
+            ):
+                builder.create_many(
+                    [(1, 2, 3.0, False, 4, 'a'), (5, 6, 7.0, True, 8, 'b')], [100]
+                )
+
+        self._run_in_msg_iter(fn, with_clock_class=True)
+
+    def test_create_unexpected_default_clock_snapshot(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+
+            with self.assertRaisesRegex(
+                ValueError, 'must not have a default clock snapshot'
+            ):
+                builder.create((1, 2, 3.0, False, 4, 'a'), 100)
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_wrong_value_count(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+
+            with self.assertRaisesRegex(ValueError, 'expecting 6 values, got 2'):
+                builder.create((1, 2))
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_wrong_value_type(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+
+            with self.assertRaises(TypeError):
+                builder.create(('1', 2, 3.0, False, 4, 'a'))
+
+            with self.assertRaises(TypeError):
+                builder.create((1, 2, 3.0, 1, 4, 'a'))
+
+            with self.assertRaises(TypeError):
+                builder.create((1, 2, 3.0, False, 4, 5))
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_value_out_of_range(self):
+        def fn(msg_iter, ec, stream):
+            builder = msg_iter._create_event_message_builder(ec, stream)
+
+            with self.assertRaisesRegex(ValueError, 'outside valid range'):
+                builder.create((256, 2, 3.0, False, 4, 'a'))
+
+            with self.assertRaisesRegex(ValueError, 'outside valid range'):
+                builder.create((-1, 2, 3.0, False, 4, 'a'))
+
+            with self.assertRaisesRegex(ValueError, 'outside valid range'):
+                builder.create((1, -129, 3.0, False, 4, 'a'))
+
+        self._run_in_msg_iter(fn)
+
+    def test_create_unsupported_member(self):
+        def create_payload_fc(tc):
+            payload_fc = tc.create_structure_field_class()
+            payload_fc.append_member('inner', tc.create_structure_field_class())
+            return payload_fc
+
+        def fn(msg_iter, ec, stream):
+            with self.assertRaisesRegex(
+                ValueError, "unsupported field class for payload member 'inner'"
+            ):
+                msg_iter._create_event_message_builder(ec, stream)
+
+        self._run_in_msg_iter(fn, payload_fc_creator=create_payload_fc)
+
+    def test_create_wrong_parent_type(self):
+        def fn(msg_iter, ec, stream):
+            with self.assertRaises(TypeError):
+                msg_iter._create_event_message_builder(ec, 23)
+
+        self._run_in_msg_iter(fn)
+
+
 if __name__ == '__main__':
     unittest.main()
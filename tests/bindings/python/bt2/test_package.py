@@ -173,6 +173,7 @@ _public_names = [
     'ComponentSpec',
     'create_value',
     'EventClassLogLevel',
+    'FieldExtractor',
     'FieldPathScope',
     'find_plugin',
     'find_plugins',
@@ -184,6 +185,9 @@ _public_names = [
     'Interrupter',
     'LoggingLevel',
     'MapValue',
+    'NativeSinkValueData',
+    'parallel_map',
+    'ParallelTraceCollectionIterator',
     'plugin_component_class',
     'QueryExecutor',
     'RealValue',
@@ -0,0 +1,298 @@
+#
+# Copyright (C) 2020 EfficiOS Inc.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; only version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import unittest
+import bt2
+import os
+import os.path
+import shutil
+import tempfile
+
+
+_BT_CTF_TRACES_PATH = os.environ['BT_CTF_TRACES_PATH']
+_BT_TESTS_DATADIR = os.environ['BT_TESTS_DATADIR']
+_3EVENTS_INTERSECT_TRACE_PATH = os.path.join(
+    _BT_CTF_TRACES_PATH, 'intersection', '3eventsintersect'
+)
+_3EVENTS_INTERSECT_REVERSE_TRACE_PATH = os.path.join(
+    _BT_CTF_TRACES_PATH, 'intersection', '3eventsintersectreverse'
+)
+_NOINTERSECT_TRACE_PATH = os.path.join(
+    _BT_CTF_TRACES_PATH, 'intersection', 'nointersect'
+)
+_SEQUENCE_TRACE_PATH = os.path.join(_BT_CTF_TRACES_PATH, 'succeed', 'sequence')
+_AUTO_SOURCE_DISCOVERY_PARAMS_LOG_LEVEL_PATH = os.path.join(
+    _BT_TESTS_DATADIR, 'auto-source-discovery', 'params-log-level'
+)
+
+
+# Those functions are sent to worker processes: they must be module-level
+# functions.
+def _msg_to_record(msg):
+    if type(msg) is bt2._EventMessageConst:
+        return (msg.event.name, msg.default_clock_snapshot.ns_from_origin)
+
+    return (type(msg).__name__, None)
+
+
+def _event_to_record(msg):
+    if type(msg) is bt2._EventMessageConst:
+        return msg.default_clock_snapshot.ns_from_origin
+
+
+def _msg_stream(msg):
+    if type(msg) is bt2._EventMessageConst:
+        return msg.event.stream
+
+    if type(msg) in (bt2._PacketBeginningMessageConst, bt2._PacketEndMessageConst):
+        return msg.packet.stream
+
+    return msg.stream
+
+
+def _msg_to_stream_record(msg):
+    stream = _msg_stream(msg)
+    return (type(msg).__name__, str(stream.trace.uuid), stream.id)
+
+
+def _event_to_stream_record(msg):
+    if type(msg) is bt2._EventMessageConst:
+        return _msg_to_stream_record(msg)
+
+
+def _fail(msg):
+    raise ValueError('oops')
+
+
+def _count_events(msg_iter):
+    return sum(1 for msg in msg_iter if type(msg) is bt2._EventMessageConst)
+
+
+def _event_times(msg_iter):
+    return [
+        msg.default_clock_snapshot.ns_from_origin
+        for msg in msg_iter
+        if type(msg) is bt2._EventMessageConst
+    ]
+
+
+def _add(a, b):
+    return a + b
+
+
+def _stream_names(msg_iter):
+    return [
+        msg.stream.name
+        for msg in msg_iter
+        if type(msg) is bt2._StreamBeginningMessageConst
+    ]
+
+
+class ParallelTraceCollectionIteratorTestCase(unittest.TestCase):
+    def test_create_wrong_fn_type(self):
+        with self.assertRaises(TypeError):
+            bt2.ParallelTraceCollectionIterator(_3EVENTS_INTERSECT_TRACE_PATH, 23)
+
+    def test_create_wrong_input_type(self):
+        with self.assertRaises(TypeError):
+            bt2.ParallelTraceCollectionIterator([23], _msg_to_record)
+
+    def test_create_no_inputs(self):
+        with self.assertRaises(ValueError):
+            bt2.ParallelTraceCollectionIterator([], _msg_to_record)
+
+    def test_create_zero_jobs(self):
+        with self.assertRaises(ValueError):
+            bt2.ParallelTraceCollectionIterator(
+                _3EVENTS_INTERSECT_TRACE_PATH, _msg_to_record, jobs=0
+            )
+
+    def test_create_wrong_begin_type(self):
+        with self.assertRaises(TypeError):
+            bt2.ParallelTraceCollectionIterator(
+                _3EVENTS_INTERSECT_TRACE_PATH, _msg_to_record, begin='hi'
+            )
+
+    def test_iter_single_input(self):
+        serial = [
+            _msg_to_record(msg)
+            for msg in bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+        ]
+
+        with bt2.ParallelTraceCollectionIterator(
+            _3EVENTS_INTERSECT_TRACE_PATH, _msg_to_record
+        ) as it:
+            records = list(it)
+
+        self.assertEqual(records, serial)
+
+    def test_iter_multiple_inputs(self):
+        inputs = [
+            _3EVENTS_INTERSECT_TRACE_PATH,
+            _NOINTERSECT_TRACE_PATH,
+            bt2.AutoSourceComponentSpec(_SEQUENCE_TRACE_PATH),
+        ]
+        serial = [
+            _event_to_record(msg)
+            for msg in bt2.TraceCollectionMessageIterator(inputs)
+            if type(msg) is bt2._EventMessageConst
+        ]
+
+        with bt2.ParallelTraceCollectionIterator(
+            inputs, _event_to_record, jobs=3, chunk_size=2
+        ) as it:
+            records = list(it)
+
+        self.assertEqual(len(records), 24)
+        self.assertEqual(records, serial)
+
+    def test_iter_fewer_jobs_than_inputs(self):
+        inputs = [_3EVENTS_INTERSECT_TRACE_PATH, _NOINTERSECT_TRACE_PATH]
+
+        with bt2.ParallelTraceCollectionIterator(
+            inputs, _event_to_record, jobs=1
+        ) as it:
+            records = list(it)
+
+        self.assertEqual(len(records), 16)
+        self.assertEqual(records, sorted(records))
+
+    # Copy traces of which the events have the same times in a single
+    # directory: the automatic source discovery mechanism finds one
+    # source component per trace within it.
+    def _create_trace_collection_dir(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+
+        for trace_path in (
+            _3EVENTS_INTERSECT_TRACE_PATH,
+            _3EVENTS_INTERSECT_REVERSE_TRACE_PATH,
+            _NOINTERSECT_TRACE_PATH,
+        ):
+            shutil.copytree(
+                trace_path, os.path.join(tmp_dir.name, os.path.basename(trace_path))
+            )
+
+        return tmp_dir
+
+    def test_iter_single_input_many_traces(self):
+        with self._create_trace_collection_dir() as tmp_dir_path:
+            serial = [
+                _msg_to_stream_record(msg)
+                for msg in bt2.TraceCollectionMessageIterator(tmp_dir_path)
+            ]
+
+            with bt2.ParallelTraceCollectionIterator(
+                tmp_dir_path, _msg_to_stream_record, jobs=3, chunk_size=3
+            ) as it:
+                # one worker per trace
+                self.assertEqual(len(it._processes), 3)
+                records = list(it)
+
+        self.assertEqual(records, serial)
+
+    def test_iter_single_input_many_traces_some_records(self):
+        with self._create_trace_collection_dir() as tmp_dir_path:
+            serial = [
+                _event_to_stream_record(msg)
+                for msg in bt2.TraceCollectionMessageIterator(tmp_dir_path)
+                if type(msg) is bt2._EventMessageConst
+            ]
+
+            with bt2.ParallelTraceCollectionIterator(
+                tmp_dir_path, _event_to_stream_record, jobs=2
+            ) as it:
+                records = list(it)
+
+        self.assertEqual(len(records), 24)
+        self.assertEqual(records, serial)
+
+    def test_iter_begin_end(self):
+        with bt2.ParallelTraceCollectionIterator(
+            _3EVENTS_INTERSECT_TRACE_PATH,
+            _event_to_record,
+            begin=13515309.000000023,
+            end=13515309.000000075,
+        ) as it:
+            records = list(it)
+
+        self.assertEqual(len(records), 3)
+
+    def test_iter_fn_raises(self):
+        it = bt2.ParallelTraceCollectionIterator(_3EVENTS_INTERSECT_TRACE_PATH, _fail)
+
+        with self.assertRaisesRegex(RuntimeError, 'oops'):
+            list(it)
+
+
+class ParallelMapTestCase(unittest.TestCase):
+    def test_wrong_fn_type(self):
+        with self.assertRaises(TypeError):
+            bt2.parallel_map(_3EVENTS_INTERSECT_TRACE_PATH, 23)
+
+    def test_wrong_reducer_type(self):
+        with self.assertRaises(TypeError):
+            bt2.parallel_map(_3EVENTS_INTERSECT_TRACE_PATH, _count_events, 23)
+
+    def test_zero_shards(self):
+        with self.assertRaises(ValueError):
+            bt2.parallel_map(_3EVENTS_INTERSECT_TRACE_PATH, _count_events, shards=0)
+
+    def test_zero_jobs(self):
+        with self.assertRaises(ValueError):
+            bt2.parallel_map(_3EVENTS_INTERSECT_TRACE_PATH, _count_events, jobs=0)
+
+    def test_no_reducer(self):
+        res = bt2.parallel_map(_3EVENTS_INTERSECT_TRACE_PATH, _count_events, shards=3)
+        self.assertEqual(len(res), 3)
+        self.assertEqual(sum(res), 8)
+
+    def test_reducer(self):
+        res = bt2.parallel_map(
+            _3EVENTS_INTERSECT_TRACE_PATH, _count_events, _add, shards=4, jobs=2
+        )
+        self.assertEqual(res, 8)
+
+    def test_shards_partition_events(self):
+        inputs = [_3EVENTS_INTERSECT_TRACE_PATH, _NOINTERSECT_TRACE_PATH]
+        serial = _event_times(bt2.TraceCollectionMessageIterator(inputs))
+        res = bt2.parallel_map(inputs, _event_times, _add, shards=5)
+        self.assertEqual(res, serial)
+
+    def test_no_trace_infos_query(self):
+        # The source component classes of this plugin don't support the
+        # `babeltrace.trace-infos` query: expect a single shard.
+        saved_plugin_path = os.environ['BABELTRACE_PLUGIN_PATH']
+        os.environ['BABELTRACE_PLUGIN_PATH'] += (
+            os.pathsep + _AUTO_SOURCE_DISCOVERY_PARAMS_LOG_LEVEL_PATH
+        )
+
+        try:
+            spec = bt2.AutoSourceComponentSpec(
+                os.path.join(_AUTO_SOURCE_DISCOVERY_PARAMS_LOG_LEVEL_PATH, 'dir-ab'),
+                {'what': 'python-obj'},
+            )
+            res = bt2.parallel_map(spec, _stream_names, shards=4)
+        finally:
+            os.environ['BABELTRACE_PLUGIN_PATH'] = saved_plugin_path
+
+        self.assertEqual(len(res), 1)
+        self.assertEqual(sorted(res[0]), ['TestSourceA: None', 'TestSourceB: None'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,7 @@
 
 import unittest
 import datetime
+import fractions
 import bt2
 import os
 import os.path
@@ -358,6 +359,20 @@ class TraceCollectionMessageIteratorTestCase(unittest.TestCase):
         hist = _count_msgs_by_type(msg_iter)
         self.assertEqual(hist[bt2._EventMessageConst], 5)
 
+    def test_iter_no_intersection_begin_end_fraction(self):
+        specs = [
+            bt2.ComponentSpec.from_named_plugin_and_component_class(
+                'ctf', 'fs', _3EVENTS_INTERSECT_TRACE_PATH
+            )
+        ]
+        msg_iter = bt2.TraceCollectionMessageIterator(
+            specs,
+            begin=fractions.Fraction(13515309000000023, 1000000000),
+            end=fractions.Fraction(13515309000000075, 1000000000),
+        )
+        hist = _count_msgs_by_type(msg_iter)
+        self.assertEqual(hist[bt2._EventMessageConst], 3)
+
     def test_iter_auto_source_component_spec(self):
         specs = [bt2.AutoSourceComponentSpec(_3EVENTS_INTERSECT_TRACE_PATH)]
         msg_iter = bt2.TraceCollectionMessageIterator(specs)
@@ -395,6 +410,97 @@ class TraceCollectionMessageIteratorTestCase(unittest.TestCase):
         hist = _count_msgs_by_type(msgs)
         self.assertEqual(hist[bt2._EventMessageConst], 24)
 
+    def test_iter_event_class_names_match(self):
+        specs = [
+            bt2.ComponentSpec.from_named_plugin_and_component_class(
+                'ctf',
+                'fs',
+                _3EVENTS_INTERSECT_TRACE_PATH,
+                {'event-class-names': ['dummy_*']},
+            )
+        ]
+        msgs = list(bt2.TraceCollectionMessageIterator(specs))
+        self.assertEqual(len(msgs), 28)
+        hist = _count_msgs_by_type(msgs)
+        self.assertEqual(hist[bt2._EventMessageConst], 8)
+
+    def test_iter_event_class_names_no_match(self):
+        specs = [
+            bt2.ComponentSpec.from_named_plugin_and_component_class(
+                'ctf',
+                'fs',
+                _3EVENTS_INTERSECT_TRACE_PATH,
+                {'event-class-names': ['other_event', 'dummy']},
+            )
+        ]
+        msgs = list(bt2.TraceCollectionMessageIterator(specs))
+        self.assertEqual(len(msgs), 20)
+        hist = _count_msgs_by_type(msgs)
+        self.assertEqual(hist[bt2._EventMessageConst], 0)
+
+    def test_iter_event_class_names_auto_source_component_spec(self):
+        specs = [
+            bt2.AutoSourceComponentSpec(
+                _3EVENTS_INTERSECT_TRACE_PATH, {'event-class-names': []}
+            )
+        ]
+        msgs = list(bt2.TraceCollectionMessageIterator(specs))
+        self.assertEqual(len(msgs), 20)
+        hist = _count_msgs_by_type(msgs)
+        self.assertEqual(hist[bt2._EventMessageConst], 0)
+
+    def test_iter_batches(self):
+        msg_iter = bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+        batches = list(msg_iter.iter_batches())
+        self.assertGreater(len(batches), 0)
+
+        for batch in batches:
+            self.assertIs(type(batch), list)
+            self.assertGreater(len(batch), 0)
+
+        msgs = [msg for batch in batches for msg in batch]
+        self.assertEqual(len(msgs), 28)
+        hist = _count_msgs_by_type(msgs)
+        self.assertEqual(hist[bt2._EventMessageConst], 8)
+
+    def test_iter_batches_max_messages(self):
+        msg_iter = bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+        batches = list(msg_iter.iter_batches(max_messages=3))
+
+        for batch in batches:
+            self.assertGreater(len(batch), 0)
+            self.assertLessEqual(len(batch), 3)
+
+        msgs = [msg for batch in batches for msg in batch]
+        self.assertEqual(len(msgs), 28)
+
+    def test_iter_batches_same_order(self):
+        msgs = list(bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH))
+        msg_iter = bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+        batched_msgs = [
+            msg for batch in msg_iter.iter_batches(max_messages=1) for msg in batch
+        ]
+        self.assertEqual([type(m) for m in msgs], [type(m) for m in batched_msgs])
+
+    def test_iter_batches_mixed_with_next(self):
+        msg_iter = bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+        first_msg = next(msg_iter)
+        self.assertIs(type(first_msg), bt2._StreamBeginningMessageConst)
+        msgs = [msg for batch in msg_iter.iter_batches() for msg in batch]
+        self.assertEqual(len(msgs), 27)
+
+    def test_iter_batches_wrong_max_messages_type(self):
+        msg_iter = bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+
+        with self.assertRaises(TypeError):
+            next(msg_iter.iter_batches(max_messages='lol'))
+
+    def test_iter_batches_zero_max_messages(self):
+        msg_iter = bt2.TraceCollectionMessageIterator(_3EVENTS_INTERSECT_TRACE_PATH)
+
+        with self.assertRaises(ValueError):
+            next(msg_iter.iter_batches(max_messages=0))
+
     def test_auto_source_component_non_existent(self):
         with self.assertRaisesRegex(
             RuntimeError,
@@ -0,0 +1,130 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 EfficiOS Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+# Checks the "get next data stream index entry" commands which a
+# `source.ctf.lttng-live` message iterator sent to `lttng_live_server.py`
+# (see its `--index-request-log` option) while the relay daemon had
+# nothing new for some data streams.
+#
+# For each data stream, a run is a sequence of consecutive `RETRY`
+# replies, followed by the next command. Within a run, the delay before
+# the command which follows the k-th `RETRY` reply (k starting at 1)
+# must be at least the back-off interval, that is, the initial interval
+# times 2^(k - 1), capped at the maximum interval.
+#
+# There's no upper bound on those delays: a loaded machine can always
+# delay the next command.
+#
+# Within each run but the first one, the delay after the first `RETRY`
+# reply must also be a lot smaller than the longest delay of the run,
+# which shows that a reply with something new resets the back-off
+# interval. This comparison is relative so that it still holds when the
+# machine slows down all the commands.
+
+import argparse
+import collections
+import sys
+
+
+def _parse_log(path):
+    requests = collections.defaultdict(list)
+
+    with open(path) as f:
+        for line in f:
+            req_time, stream_id, status = line.split()
+            requests[int(stream_id)].append((float(req_time), status))
+
+    return requests
+
+
+def _runs(stream_requests):
+    # Yields the delays of each run of `RETRY` replies
+    delays = []
+
+    for (req_time, status), (next_req_time, _) in zip(
+        stream_requests, stream_requests[1:]
+    ):
+        if status == 'RETRY':
+            delays.append(next_req_time - req_time)
+        elif delays:
+            yield delays
+            delays = []
+
+    if delays:
+        yield delays
+
+
+def _check(requests, initial_interval, max_interval):
+    errors = []
+    run_count = 0
+
+    for stream_id, stream_requests in sorted(requests.items()):
+        for run_index, delays in enumerate(_runs(stream_requests)):
+            run_count += 1
+
+            for k, delay in enumerate(delays):
+                interval = min(initial_interval * 2 ** k, max_interval)
+
+                if delay < 0.9 * interval:
+                    errors.append(
+                        'stream {}, run {}: delay #{} is {:.6f} s, expecting at least {:.6f} s'.format(
+                            stream_id, run_index, k, delay, interval
+                        )
+                    )
+
+            if run_index > 0 and delays[0] > 0.5 * max(delays):
+                errors.append(
+                    'stream {}, run {}: first delay is {:.6f} s, longest is {:.6f} s: back-off interval was not reset'.format(
+                        stream_id, run_index, delays[0], max(delays)
+                    )
+                )
+
+    if run_count < 2:
+        errors.append('Expecting at least two runs of `RETRY` replies')
+
+    return errors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Check the back-off of idle data stream polls'
+    )
+    parser.add_argument(
+        'log', help='The index request log file of `lttng_live_server.py`'
+    )
+    parser.add_argument(
+        'initial_interval',
+        type=float,
+        help='The expected initial back-off interval (seconds)',
+    )
+    parser.add_argument(
+        'max_interval',
+        type=float,
+        help='The expected maximum back-off interval (seconds)',
+    )
+    args = parser.parse_args()
+    errors = _check(_parse_log(args.log), args.initial_interval, args.max_interval)
+
+    for error in errors:
+        print(error, file=sys.stderr)
+
+    sys.exit(1 if errors else 0)
@@ -21,6 +21,7 @@
 # THE SOFTWARE.
 
 import argparse
+import asyncio
 import collections.abc
 import logging
 import os
@@ -30,6 +31,7 @@ import socket
 import struct
 import sys
 import tempfile
+import time
 
 
 class UnexpectedInput(RuntimeError):
@@ -424,6 +426,14 @@ class _LttngLiveViewerProtocolCodec:
             fmt, data, _LttngLiveViewerProtocolCodec._COMMAND_HEADER_SIZE_BYTES
         )
 
+    # Returns the size of the command of which `data` starts with the
+    # complete header.
+    def command_size(self, data):
+        payload_size, cmd_type, version = self._unpack(
+            self._COMMAND_HEADER_STRUCT_FMT, data
+        )
+        return self._COMMAND_HEADER_SIZE_BYTES + payload_size
+
     def decode(self, data):
         if len(data) < self._COMMAND_HEADER_SIZE_BYTES:
             # Not enough data to read the command header
@@ -848,6 +858,10 @@ class _LttngLiveViewerSessionDataStreamState:
 
         return self._data_stream.index[self._cur_index_entry_index]
 
+    @property
+    def cur_index_entry_index(self):
+        return self._cur_index_entry_index
+
     def goto_next_index_entry(self):
         self._cur_index_entry_index += 1
 
@@ -928,6 +942,7 @@ class _LttngLiveViewerSessionTracingSessionState:
             stream_id += 1
 
         self._is_attached = False
+        self._attach_time = None
         fmt = 'Built tracing session state: id={}, name="{}"'
         logging.info(fmt.format(tc_descr.info.tracing_session_id, tc_descr.info.name))
 
@@ -959,6 +974,15 @@ class _LttngLiveViewerSessionTracingSessionState:
     def is_attached(self, value):
         self._is_attached = value
 
+        if value:
+            self._attach_time = time.monotonic()
+
+    # Monotonic time of the last attachment of the viewer (`None` if
+    # never attached).
+    @property
+    def attach_time(self):
+        return self._attach_time
+
 
 # An LTTng live viewer session manages a view on tracing sessions
 # and replies to commands accordingly.
@@ -968,11 +992,15 @@ class _LttngLiveViewerSession:
         viewer_session_id,
         tracing_session_descriptors,
         max_query_data_response_size,
+        index_entry_period=None,
+        index_requests=None,
     ):
         self._viewer_session_id = viewer_session_id
         self._ts_states = {}
         self._stream_states = {}
         self._max_query_data_response_size = max_query_data_response_size
+        self._index_entry_period = index_entry_period
+        self._index_requests = index_requests
         total_stream_infos = 0
 
         for ts_descr in tracing_session_descriptors:
@@ -1029,7 +1057,15 @@ class _LttngLiveViewerSession:
                 'Unexpected command: cmd-cls-name={}'.format(cmd.__class__.__name__)
             )
 
-        return self._command_handlers[cmd_type](cmd)
+        reply = self._command_handlers[cmd_type](cmd)
+
+        if (
+            self._index_requests is not None
+            and cmd_type is _LttngLiveViewerGetNextDataStreamIndexEntryCommand
+        ):
+            self._index_requests.append((time.monotonic(), cmd.stream_id, reply.status))
+
+        return reply
 
     def _handle_attach_to_tracing_session_command(self, cmd):
         fmt = 'Handling "attach to tracing session" command: ts-id={}, offset={}, seek-type={}'
@@ -1089,6 +1125,27 @@ class _LttngLiveViewerSession:
                 status, index_entry, False, False
             )
 
+        if self._index_entry_period is not None:
+            # Simulate a tracing session which is being recorded: the
+            # index entry #N of a data stream only exists N periods
+            # after the viewer attached to its tracing session.
+            ts_state = stream_state.tracing_session_state
+            avail_time = (
+                ts_state.attach_time
+                + stream_state.cur_index_entry_index * self._index_entry_period
+            )
+
+            if time.monotonic() < avail_time:
+                status = _LttngLiveViewerGetNextDataStreamIndexEntryReply.Status.RETRY
+
+                # Dummy data stream index entry to use with the `RETRY`
+                # status (the reply needs one, but the viewer ignores it)
+                index_entry = _LttngDataStreamIndexEntry(0, 0, 0, 0, 0, 0, 0)
+
+                return _LttngLiveViewerGetNextDataStreamIndexEntryReply(
+                    status, index_entry, False, False
+                )
+
         # The viewer only checks the `has_new_metadata` flag if the
         # reply's status is `OK`, so we need to provide an index here
         has_new_metadata = stream_state.tracing_session_state.has_new_metadata
@@ -1179,119 +1236,101 @@ class _LttngLiveViewerSession:
         return _LttngLiveViewerCreateViewerSessionReply(status)
 
 
-# An LTTng live TCP server.
-#
-# On creation, it binds to `localhost` with an OS-assigned TCP port. It writes
-# the decimal TCP port number to a temporary port file.  It renames the
-# temporary port file to `port_filename`.
-#
-# `tracing_session_descriptors` is a list of tracing session descriptors
-# (`LttngTracingSessionDescriptor`) to serve.
-#
-# This server accepts a single viewer (client).
+# A connection with an LTTng live viewer.
 #
-# When the viewer closes the connection, the server's constructor
-# returns.
-class LttngLiveServer:
+# handle() receives the viewer's commands and sends the replies of its
+# own viewer session until the viewer closes the connection.
+class _LttngLiveViewerConnection:
     def __init__(
-        self, port_filename, tracing_session_descriptors, max_query_data_response_size
+        self,
+        reader,
+        writer,
+        viewer_session_id,
+        tracing_session_descriptors,
+        max_query_data_response_size,
+        latency,
+        bandwidth,
+        index_entry_period,
+        index_requests,
     ):
-        logging.info('Server configuration:')
-
-        logging.info('  Port file name: `{}`'.format(port_filename))
-
-        if max_query_data_response_size is not None:
-            logging.info(
-                '  Maximum response data query size: `{}`'.format(
-                    max_query_data_response_size
-                )
-            )
-
-        for ts_descr in tracing_session_descriptors:
-            info = ts_descr.info
-            fmt = '  TS descriptor: name="{}", id={}, hostname="{}", live-timer-freq={}, client-count={}, stream-count={}:'
-            logging.info(
-                fmt.format(
-                    info.name,
-                    info.tracing_session_id,
-                    info.hostname,
-                    info.live_timer_freq,
-                    info.client_count,
-                    info.stream_count,
-                )
-            )
-
-            for trace in ts_descr.traces:
-                logging.info('    Trace: path="{}"'.format(trace.path))
-
+        self._reader = reader
+        self._writer = writer
+        self._viewer_session_id = viewer_session_id
         self._ts_descriptors = tracing_session_descriptors
         self._max_query_data_response_size = max_query_data_response_size
-        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._latency = latency
+        self._bandwidth = bandwidth
+        self._index_entry_period = index_entry_period
+        self._index_requests = index_requests
+        self._buf = bytes()
         self._codec = _LttngLiveViewerProtocolCodec()
 
-        # Port 0: OS assigns an unused port
-        serv_addr = ('localhost', 0)
-        self._sock.bind(serv_addr)
-        self._write_port_to_file(port_filename)
+    async def _recv_command(self):
+        # The viewer can send many commands before receiving the reply
+        # of the first one (pipelining): `self._buf` contains the bytes
+        # of the received commands which are not handled yet.
+        #
+        # If it's empty, then the viewer had to wait for all the
+        # previous replies before sending this command: simulate the
+        # network round trip, if needed.
+        is_new_round_trip = not self._buf
 
-        try:
-            self._listen()
-        finally:
-            self._sock.close()
-            logging.info('Closed connection and socket.')
+        while True:
+            try:
+                cmd = self._codec.decode(self._buf)
+            except struct.error as exc:
+                raise UnexpectedInput('Malformed command: {}'.format(exc)) from exc
 
-    @property
-    def _server_port(self):
-        return self._sock.getsockname()[1]
+            if cmd is not None:
+                cmd_size = self._codec.command_size(self._buf)
+                self._buf = self._buf[cmd_size:]
+                logging.info(
+                    'Received command from viewer: cmd-cls-name={}'.format(
+                        cmd.__class__.__name__
+                    )
+                )
 
-    def _recv_command(self):
-        data = bytes()
+                if is_new_round_trip and self._latency is not None:
+                    await asyncio.sleep(self._latency)
+
+                return cmd
 
-        while True:
             logging.info('Waiting for viewer command.')
-            buf = self._conn.recv(128)
+            buf = await self._reader.read(4096)
 
             if not buf:
                 logging.info('Client closed connection.')
 
-                if data:
+                if self._buf:
                     raise UnexpectedInput(
                         'Client closed connection after having sent {} command bytes.'.format(
-                            len(data)
+                            len(self._buf)
                         )
                     )
 
                 return
 
             logging.info('Received data from viewer: length={}'.format(len(buf)))
+            self._buf += buf
 
-            data += buf
-
-            try:
-                cmd = self._codec.decode(data)
-            except struct.error as exc:
-                raise UnexpectedInput('Malformed command: {}'.format(exc)) from exc
-
-            if cmd is not None:
-                logging.info(
-                    'Received command from viewer: cmd-cls-name={}'.format(
-                        cmd.__class__.__name__
-                    )
-                )
-                return cmd
-
-    def _send_reply(self, reply):
+    async def _send_reply(self, reply):
         data = self._codec.encode(reply)
         logging.info(
             'Sending reply to viewer: reply-cls-name={}, length={}'.format(
                 reply.__class__.__name__, len(data)
             )
         )
-        self._conn.sendall(data)
 
-    def _handle_connection(self):
+        if self._bandwidth is not None:
+            # Simulate the transmission time of the reply
+            await asyncio.sleep(len(data) / self._bandwidth)
+
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def handle(self):
         # First command must be "connect"
-        cmd = self._recv_command()
+        cmd = await self._recv_command()
 
         if type(cmd) is not _LttngLiveViewerConnectCommand:
             raise UnexpectedInput(
@@ -1300,44 +1339,224 @@ class LttngLiveServer:
                 )
             )
 
-        # Create viewer session (arbitrary ID 23)
+        # Create viewer session
         logging.info(
             'LTTng live viewer connected: version={}.{}'.format(cmd.major, cmd.minor)
         )
         viewer_session = _LttngLiveViewerSession(
-            23, self._ts_descriptors, self._max_query_data_response_size
+            self._viewer_session_id,
+            self._ts_descriptors,
+            self._max_query_data_response_size,
+            self._index_entry_period,
+            self._index_requests,
         )
 
         # Send "connect" reply
-        self._send_reply(
+        await self._send_reply(
             _LttngLiveViewerConnectReply(viewer_session.viewer_session_id, 2, 10)
         )
 
         # Make the viewer session handle the remaining commands
         while True:
-            cmd = self._recv_command()
+            cmd = await self._recv_command()
 
             if cmd is None:
                 # Connection closed (at an expected location within the
                 # conversation)
                 return
 
-            self._send_reply(viewer_session.handle_command(cmd))
+            await self._send_reply(viewer_session.handle_command(cmd))
 
-    def _listen(self):
-        logging.info('Listening: port={}'.format(self._server_port))
-        # Backlog must be present for Python version < 3.5.
-        # 128 is an arbitrary number since we expect only 1 connection anyway.
-        self._sock.listen(128)
-        self._conn, viewer_addr = self._sock.accept()
+
+# An LTTng live TCP server.
+#
+# On creation, it binds to `localhost` with an OS-assigned TCP port. It writes
+# the decimal TCP port number to a temporary port file.  It renames the
+# temporary port file to `port_filename`.
+#
+# `tracing_session_descriptors` is a list of tracing session descriptors
+# (`LttngTracingSessionDescriptor`) to serve.
+#
+# This server handles many concurrent viewers (clients) with an asyncio
+# event loop. Each viewer gets its own viewer session, which means its
+# own position within the data streams.
+#
+# `latency` is the delay (seconds) before handling a command which the
+# viewer sent after having received all the previous replies,
+# `bandwidth` is the maximum number of reply bytes to send per second to
+# each viewer, and `index_entry_period` is the delay (seconds) between
+# the availability of two consecutive index entries of a data stream.
+# They are all optional.
+#
+# If `index_request_log_filename` is set, then the server writes, when
+# its constructor returns, one line per "get next data stream index
+# entry" command to this file: the time (monotonic, seconds) when it
+# handled the command, the data stream ID, and the reply's status, in
+# this order, separated with a space.
+#
+# When `viewer_count` viewers closed their connection, the server's
+# constructor returns. If `viewer_count` is 0, it never returns.
+class LttngLiveServer:
+    def __init__(
+        self,
+        port_filename,
+        tracing_session_descriptors,
+        max_query_data_response_size,
+        latency=None,
+        bandwidth=None,
+        index_entry_period=None,
+        viewer_count=1,
+        index_request_log_filename=None,
+    ):
+        logging.info('Server configuration:')
+
+        logging.info('  Port file name: `{}`'.format(port_filename))
+
+        if max_query_data_response_size is not None:
+            logging.info(
+                '  Maximum response data query size: `{}`'.format(
+                    max_query_data_response_size
+                )
+            )
+
+        if latency is not None:
+            logging.info('  Latency: `{}` s'.format(latency))
+
+        if bandwidth is not None:
+            logging.info('  Bandwidth: `{}` B/s'.format(bandwidth))
+
+        if index_entry_period is not None:
+            logging.info('  Index entry period: `{}` s'.format(index_entry_period))
+
+        logging.info('  Viewer count: `{}`'.format(viewer_count))
+
+        if index_request_log_filename is not None:
+            logging.info(
+                '  Index request log file name: `{}`'.format(index_request_log_filename)
+            )
+
+        for ts_descr in tracing_session_descriptors:
+            info = ts_descr.info
+            fmt = '  TS descriptor: name="{}", id={}, hostname="{}", live-timer-freq={}, client-count={}, stream-count={}:'
+            logging.info(
+                fmt.format(
+                    info.name,
+                    info.tracing_session_id,
+                    info.hostname,
+                    info.live_timer_freq,
+                    info.client_count,
+                    info.stream_count,
+                )
+            )
+
+            for trace in ts_descr.traces:
+                logging.info('    Trace: path="{}"'.format(trace.path))
+
+        self._ts_descriptors = tracing_session_descriptors
+        self._max_query_data_response_size = max_query_data_response_size
+        self._latency = latency
+        self._bandwidth = bandwidth
+        self._index_entry_period = index_entry_period
+        self._viewer_count = viewer_count
+        self._closed_viewer_count = 0
+        self._index_requests = None
+
+        if index_request_log_filename is not None:
+            self._index_requests = []
+
+        # Arbitrary ID of the first viewer session
+        self._next_viewer_session_id = 23
+
+        # First exception which a connection handler raised
+        self._exc = None
+
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._done = self._loop.create_future()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+        try:
+            # Port 0: OS assigns an unused port
+            serv_addr = ('localhost', 0)
+            self._sock.bind(serv_addr)
+            self._loop.run_until_complete(self._listen(port_filename))
+        finally:
+            self._sock.close()
+            self._loop.close()
+            logging.info('Closed connections and socket.')
+
+        if index_request_log_filename is not None:
+            self._write_index_request_log(index_request_log_filename)
+
+        if self._exc is not None:
+            raise self._exc
+
+    @property
+    def _server_port(self):
+        return self._sock.getsockname()[1]
+
+    async def _handle_connection(self, reader, writer):
+        viewer_addr = writer.get_extra_info('peername')
         logging.info(
             'Accepted viewer: addr={}:{}'.format(viewer_addr[0], viewer_addr[1])
         )
+        conn = _LttngLiveViewerConnection(
+            reader,
+            writer,
+            self._next_viewer_session_id,
+            self._ts_descriptors,
+            self._max_query_data_response_size,
+            self._latency,
+            self._bandwidth,
+            self._index_entry_period,
+            self._index_requests,
+        )
+        self._next_viewer_session_id += 1
 
         try:
-            self._handle_connection()
+            await conn.handle()
+        except Exception as exc:
+            # Stop serving: the constructor raises this exception
+            if self._exc is None:
+                self._exc = exc
+
+            if not self._done.done():
+                self._done.set_result(None)
         finally:
-            self._conn.close()
+            writer.close()
+
+        self._closed_viewer_count += 1
+
+        if self._closed_viewer_count == self._viewer_count:
+            if not self._done.done():
+                self._done.set_result(None)
+
+    async def _listen(self, port_filename):
+        # 128 is an arbitrary backlog.
+        server = await asyncio.start_server(
+            self._handle_connection, sock=self._sock, backlog=128
+        )
+        self._write_port_to_file(port_filename)
+        logging.info('Listening: port={}'.format(self._server_port))
+
+        try:
+            await self._done
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    def _write_index_request_log(self, index_request_log_filename):
+        status_names = {
+            getattr(_LttngLiveViewerGetNextDataStreamIndexEntryReply.Status, name): name
+            for name in ('OK', 'RETRY', 'HUP', 'ERROR', 'INACTIVE', 'EOF')
+        }
+
+        with open(index_request_log_filename, 'w') as f:
+            for req_time, stream_id, status in self._index_requests:
+                print(
+                    '{:.6f} {} {}'.format(req_time, stream_id, status_names[status]),
+                    file=f,
+                )
 
     def _write_port_to_file(self, port_filename):
         # Write the port number to a temporary file.
@@ -1401,6 +1620,33 @@ def _tracing_session_descriptors_from_arg(string):
     )
 
 
+# Returns `tracing_session_descriptors` followed with `count` - 1 copies
+# of each of them having new tracing session IDs.
+#
+# The copies share the LTTng traces (`LttngTrace` objects) of the
+# original descriptors.
+def _copy_tracing_session_descriptors(tracing_session_descriptors, count):
+    copies = list(tracing_session_descriptors)
+    next_id = max([d.info.tracing_session_id for d in copies], default=-1) + 1
+
+    for _ in range(count - 1):
+        for ts_descr in tracing_session_descriptors:
+            info = ts_descr.info
+            copies.append(
+                LttngTracingSessionDescriptor(
+                    info.name,
+                    next_id,
+                    info.hostname,
+                    info.live_timer_freq,
+                    info.client_count,
+                    ts_descr.traces,
+                )
+            )
+            next_id += 1
+
+    return copies
+
+
 def _loglevel_parser(string):
     loglevels = {'info': logging.INFO, 'warning': logging.WARNING}
     if string not in loglevels:
@@ -1434,6 +1680,37 @@ if __name__ == '__main__':
         type=int,
         help='The maximum size of control data response in bytes',
     )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        help='The delay, in seconds, before handling a command which the viewer sent after having received all the previous replies (simulates the round-trip time of a network)',
+    )
+    parser.add_argument(
+        '--bandwidth',
+        type=float,
+        help='The maximum number of reply bytes per second to send to each viewer (simulates the bandwidth of a network)',
+    )
+    parser.add_argument(
+        '--index-entry-period',
+        type=float,
+        help='The delay, in seconds, between the availability of two consecutive index entries of a data stream, starting when the viewer attaches to its tracing session (simulates a tracing session which is being recorded)',
+    )
+    parser.add_argument(
+        '--session-copies',
+        type=int,
+        default=1,
+        help='The number of times to serve each session, each copy having a distinct tracing session ID (simulates many tracing sessions)',
+    )
+    parser.add_argument(
+        '--viewer-count',
+        type=int,
+        default=1,
+        help='The number of viewers to serve before exiting (0: never exit)',
+    )
+    parser.add_argument(
+        '--index-request-log',
+        help='The file to which to write, before exiting, the time, data stream ID, and reply status of each "get next data stream index entry" command',
+    )
     parser.add_argument(
         'sessions',
         nargs="+",
@@ -1450,9 +1727,18 @@ if __name__ == '__main__':
     )
 
     args = parser.parse_args(args=remaining_args)
+    sessions = _copy_tracing_session_descriptors(args.sessions, args.session_copies)
+
     try:
         LttngLiveServer(
-            args.port_filename, args.sessions, args.max_query_data_response_size
+            args.port_filename,
+            sessions,
+            args.max_query_data_response_size,
+            args.latency,
+            args.bandwidth,
+            args.index_entry_period,
+            args.viewer_count,
+            args.index_request_log,
         )
     except UnexpectedInput as exc:
         logging.error(str(exc))
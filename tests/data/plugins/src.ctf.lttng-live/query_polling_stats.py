@@ -0,0 +1,116 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 EfficiOS Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+# Consumes the messages of a `source.ctf.lttng-live` component and
+# checks that its `polling-stats` query object returns up-to-date
+# counters while the graph runs, not only once the message iterator is
+# finalized.
+
+import argparse
+import sys
+import time
+
+import bt2
+
+
+class _Sink(bt2._UserSinkComponent):
+    def __init__(self, config, params, obj):
+        self._state = obj
+        self._add_input_port('in')
+
+    def _user_graph_is_configured(self):
+        self._msg_iter = self._create_input_port_message_iterator(
+            self._input_ports['in']
+        )
+
+    def _user_consume(self):
+        msg = next(self._msg_iter)
+
+        if type(msg) is bt2._EventMessageConst:
+            self._state['event-count'] += 1
+
+
+def _query_polling_stats(comp_cls):
+    return bt2.QueryExecutor(comp_cls, 'polling-stats').query()
+
+
+def _run(url):
+    comp_cls = bt2.find_plugin('ctf').source_component_classes['lttng-live']
+    errors = []
+
+    # No message iterator of this process sent anything yet
+    stats = _query_polling_stats(comp_cls)
+
+    if stats['index-requests'] != 0:
+        errors.append('Expecting no index request before running the graph')
+
+    state = {'event-count': 0}
+    graph = bt2.Graph()
+    src = graph.add_component(comp_cls, 'src', {'inputs': [url]})
+    sink = graph.add_component(_Sink, 'sink', obj=state)
+    graph.connect_ports(src.output_ports['out'], sink.input_ports['in'])
+    running_stats = None
+
+    while True:
+        try:
+            graph.run_once()
+        except bt2.TryAgain:
+            time.sleep(0.01)
+            continue
+        except bt2.Stop:
+            break
+
+        if running_stats is None and state['event-count'] > 0:
+            # The message iterator needed the next index entry of a
+            # data stream to get this event
+            running_stats = _query_polling_stats(comp_cls)
+
+    if running_stats is None:
+        errors.append('Expecting at least one event')
+    else:
+        if running_stats['index-requests'] == 0:
+            errors.append('Expecting index requests while the graph runs')
+
+        if running_stats['index-round-trips'] == 0:
+            errors.append('Expecting index round trips while the graph runs')
+
+        stats = _query_polling_stats(comp_cls)
+
+        for name in running_stats:
+            if stats[name] < running_stats[name]:
+                errors.append('Counter `{}` decreased'.format(name))
+
+    return errors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Check the `polling-stats` query object of `source.ctf.lttng-live`'
+    )
+    parser.add_argument('url', help='The LTTng live URL of the tracing session')
+    args = parser.parse_args()
+    errors = _run(args.url)
+
+    for error in errors:
+        print(error, file=sys.stderr)
+
+    sys.exit(1 if errors else 0)
@@ -20,11 +20,13 @@
 #include <string.h>
 #include <stdio.h>
 #include "common/assert.h"
+#include "compat/stdlib.h"
 #include <glib.h>
+#include <glib/gstdio.h>
 #include "tap/tap.h"
 #include "common.h"
 
-#define NR_TESTS 		38
+#define NR_TESTS 		40
 #define NON_EXISTING_PATH	"/this/hopefully/does/not/exist/5bc75f8d-0dba-4043-a509-d7984b97e42b.so"
 
 /* Those symbols are written to by some test plugins */
@@ -247,7 +249,11 @@ static void test_find(const char *plugin_dir)
 {
 	int ret;
 	const bt_plugin *plugin;
+	const bt_plugin *other_plugin = NULL;
 	char *plugin_path;
+	gchar *manifest_dir;
+	gchar *manifest_path;
+	gchar *manifest = NULL;
 	bt_plugin_find_status status;
 
 	ok(bt_plugin_find(NON_EXISTING_PATH, BT_TRUE, BT_FALSE, BT_FALSE,
@@ -270,7 +276,36 @@ static void test_find(const char *plugin_dir)
 	ok(plugin, "bt_plugin_find() returns a plugin object");
 	ok(strcmp(bt_plugin_get_author(plugin), "Janine Sutto") == 0,
 		"bt_plugin_find() finds the correct plugin for a given name");
+	status = bt_plugin_find("test_minimal", BT_TRUE, BT_FALSE, BT_FALSE,
+		BT_FALSE, BT_FALSE, &other_plugin);
+	ok(status == BT_PLUGIN_FIND_STATUS_OK && other_plugin == plugin,
+		"bt_plugin_find() reuses the plugins it previously found");
+	BT_PLUGIN_PUT_REF_AND_RESET(other_plugin);
+	BT_PLUGIN_PUT_REF_AND_RESET(plugin);
+
+	/* Find with a plugin manifest */
+	manifest_dir = g_build_filename(g_get_tmp_dir(), "test-plugin-XXXXXX",
+		NULL);
+	BT_ASSERT(manifest_dir);
+	if (!bt_mkdtemp(manifest_dir)) {
+		perror("# perror");
+	}
+
+	manifest_path = g_build_filename(manifest_dir, "manifest", NULL);
+	g_setenv("LIBBABELTRACE2_PLUGIN_MANIFEST_PATH", manifest_path, 1);
+	status = bt_plugin_find("test_minimal", BT_TRUE, BT_FALSE, BT_FALSE,
+		BT_FALSE, BT_FALSE, &plugin);
+	g_unsetenv("LIBBABELTRACE2_PLUGIN_MANIFEST_PATH");
+	ok(status == BT_PLUGIN_FIND_STATUS_OK &&
+		g_file_get_contents(manifest_path, &manifest, NULL, NULL) &&
+		strstr(manifest, "plugins=test_minimal;"),
+		"bt_plugin_find() records the plugins it loads in the plugin manifest");
 	BT_PLUGIN_PUT_REF_AND_RESET(plugin);
+	g_free(manifest);
+	(void) g_unlink(manifest_path);
+	(void) g_rmdir(manifest_dir);
+	g_free(manifest_path);
+	g_free(manifest_dir);
 	free(plugin_path);
 }
 
@@ -0,0 +1,133 @@
+# Copyright (C) 2020 EfficiOS Inc.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; only version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+
+import unittest
+import bt2
+import os
+
+
+_trace_path = os.path.join(os.environ['BT_CTF_TRACES_PATH'], 'succeed', 'debug-info')
+_target_prefix = os.path.join(
+    os.environ['BT_TESTS_DATADIR'],
+    'plugins',
+    'flt.lttng-utils.debug-info',
+    'x86_64-linux-gnu',
+    'dwarf_full',
+)
+
+# Events of `_trace_path` of which the instruction pointer leads to a
+# function of `libhello_so`
+_tracepoint_event_count = 2
+
+
+class QueryIpCacheStatsTestCase(unittest.TestCase):
+    def setUp(self):
+        self._debug_info_cc = bt2.find_plugin('lttng-utils').filter_component_classes[
+            'debug-info'
+        ]
+        self._fs_cc = bt2.find_plugin('ctf').source_component_classes['fs']
+
+    def _query(self):
+        return bt2.QueryExecutor(self._debug_info_cc, 'ip-cache-stats').query()
+
+    # Returns the statistics of the query result `stats` minus the ones
+    # of `base_stats`.
+    @staticmethod
+    def _stats_delta(stats, base_stats):
+        return {name: stats[name] - base_stats[name] for name in stats}
+
+    # Runs a graph which adds debugging information to the events of
+    # `_trace_path`, querying the statistics when the sink gets the
+    # first tracepoint event.
+    #
+    # Returns the statistics at this moment and after running the
+    # graph, relative to the statistics before running it.
+    def _run(self, ip_cache_max_entries=None):
+        test = self
+        base_stats = self._query()
+        running_stats = []
+
+        class MySink(bt2._UserSinkComponent):
+            def __init__(self, config, params, obj):
+                self._add_input_port('in')
+
+            def _user_graph_is_configured(self):
+                self._msg_iter = self._create_input_port_message_iterator(
+                    self._input_ports['in']
+                )
+
+            def _user_consume(self):
+                msg = next(self._msg_iter)
+
+                if (
+                    type(msg) is bt2._EventMessageConst
+                    and msg.event.name.startswith('my_provider:')
+                    and not running_stats
+                ):
+                    running_stats.append(test._stats_delta(test._query(), base_stats))
+
+        params = {'target-prefix': _target_prefix}
+
+        if ip_cache_max_entries is not None:
+            params['ip-cache-max-entries'] = bt2.UnsignedIntegerValue(
+                ip_cache_max_entries
+            )
+
+        graph = bt2.Graph()
+        src = graph.add_component(self._fs_cc, 'src', {'inputs': [_trace_path]})
+        debug_info = graph.add_component(self._debug_info_cc, 'debug-info', params)
+        sink = graph.add_component(MySink, 'sink')
+        (src_port,) = src.output_ports.values()
+        graph.connect_ports(src_port, debug_info.input_ports['in'])
+        graph.connect_ports(debug_info.output_ports['out'], sink.input_ports['in'])
+        graph.run()
+        self.assertEqual(len(running_stats), 1)
+        return running_stats[0], self._stats_delta(self._query(), base_stats)
+
+    def test_result(self):
+        stats = self._query()
+        self.assertEqual(sorted(stats.keys()), ['evictions', 'hits', 'misses'])
+
+        for value in stats.values():
+            self.assertIs(type(value), bt2.UnsignedIntegerValue)
+
+    def test_live_misses(self):
+        # The component must count the miss of the first tracepoint
+        # event before it's finalized.
+        running_stats, stats = self._run()
+        self.assertGreaterEqual(running_stats['misses'], 1)
+        self.assertGreaterEqual(stats['misses'], _tracepoint_event_count)
+        self.assertGreaterEqual(stats['misses'], running_stats['misses'])
+        self.assertEqual(stats['evictions'], 0)
+
+    def test_evictions(self):
+        # With a single entry, each new instruction pointer evicts the
+        # previous one.
+        _, stats = self._run(ip_cache_max_entries=1)
+        self.assertGreaterEqual(stats['misses'], _tracepoint_event_count)
+        self.assertGreaterEqual(stats['evictions'], _tracepoint_event_count - 1)
+
+    def test_cache_per_component(self):
+        # A second component which gets the same instruction pointers
+        # has its own cache: it doesn't hit the cache of the first one.
+        _, first_stats = self._run()
+        _, second_stats = self._run()
+        self.assertEqual(first_stats, second_stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,296 @@
+# Copyright (C) 2020 EfficiOS Inc.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; only version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+import unittest
+import bt2
+import os
+
+
+test_ctf_traces_path = os.environ['BT_CTF_TRACES_PATH']
+
+# Events of this trace (`payload/dummy_value`, `payload/tracefile_id`,
+# timestamp):
+#
+#     0, 0, 10       3, 1, 71
+#     1, 0, 21       6, 1, 101
+#     2, 0, 42       7, 1, 112
+#     4, 0, 72
+#     5, 0, 82
+_3eventsintersect_path = os.path.join(
+    test_ctf_traces_path, 'intersection', '3eventsintersect'
+)
+
+# Offset of the trace's clock class (ns)
+_clock_offset_ns = 13515309000000000
+
+
+# Iterator of `_ValuesSource` which emits one event message per value of
+# the `values` list of its output port's user data
+class _ValuesIter(bt2._UserMessageIterator):
+    def __init__(self, config, self_output_port):
+        stream, event_classes, values = self_output_port.user_data
+        self._msgs = [self._create_stream_beginning_message(stream)]
+
+        for kind, value in values:
+            msg = self._create_event_message(event_classes[kind], stream)
+            msg.event.payload_field['value'] = value
+            self._msgs.append(msg)
+
+        self._msgs.append(self._create_stream_end_message(stream))
+        self._msgs.reverse()
+
+    def __next__(self):
+        if not self._msgs:
+            raise bt2.Stop
+
+        return self._msgs.pop()
+
+
+# Source of event messages which contain a `payload/value` field. Its
+# `obj` is a list of (kind, value) pairs where the kind, `u`, `s`, or
+# `r`, selects the type of the field (unsigned integer, signed integer,
+# or real).
+class _ValuesSource(bt2._UserSourceComponent, message_iterator_class=_ValuesIter):
+    def __init__(self, config, params, obj):
+        tc = self._create_trace_class()
+        sc = tc.create_stream_class()
+        event_classes = {}
+
+        for kind, fc in (
+            ('u', tc.create_unsigned_integer_field_class(64)),
+            ('s', tc.create_signed_integer_field_class(64)),
+            ('r', tc.create_double_precision_real_field_class()),
+        ):
+            payload_fc = tc.create_structure_field_class()
+            payload_fc.append_member('value', fc)
+            event_classes[kind] = sc.create_event_class(
+                name=kind, payload_field_class=payload_fc
+            )
+
+        stream = tc().create_stream(sc)
+        self._add_output_port('out', (stream, event_classes, obj))
+
+
+class AggregatorTestCase(unittest.TestCase):
+    def setUp(self):
+        utils = bt2.find_plugin('utils')
+        self._aggregator_cc = utils.sink_component_classes['aggregator']
+        self._muxer_cc = utils.filter_component_classes['muxer']
+        self._fs_cc = bt2.find_plugin('ctf').source_component_classes['fs']
+
+    def _aggregate(self, params=None, results=None):
+        if results is None:
+            results = bt2.MapValue()
+
+        graph = bt2.Graph()
+        src = graph.add_component(
+            self._fs_cc, 'src', {'inputs': [_3eventsintersect_path]}
+        )
+        muxer = graph.add_component(self._muxer_cc, 'muxer')
+        sink = graph.add_component(
+            self._aggregator_cc, 'sink', params, obj=bt2.NativeSinkValueData(results)
+        )
+
+        for i, port in enumerate(src.output_ports.values()):
+            graph.connect_ports(port, muxer.input_ports['in{}'.format(i)])
+
+        graph.connect_ports(muxer.output_ports['out'], sink.input_ports['in'])
+        graph.run()
+        return results
+
+    def _aggregate_values(self, values, params=None):
+        results = bt2.MapValue()
+        graph = bt2.Graph()
+        src = graph.add_component(_ValuesSource, 'src', obj=values)
+        sink_params = {'group-by': 'none', 'value-field': 'payload/value'}
+
+        if params is not None:
+            sink_params.update(params)
+
+        sink = graph.add_component(
+            self._aggregator_cc,
+            'sink',
+            sink_params,
+            obj=bt2.NativeSinkValueData(results),
+        )
+        graph.connect_ports(src.output_ports['out'], sink.input_ports['in'])
+        graph.run()
+        return results['groups']['all']
+
+    def test_group_by_event_class_name(self):
+        results = self._aggregate()
+        self.assertEqual(results['event-count'], 8)
+        self.assertEqual(results['ungrouped-event-count'], 0)
+        self.assertEqual(len(results['groups']), 1)
+        self.assertEqual(results['groups']['dummy_event']['count'], 8)
+        self.assertNotIn('sum', results['groups']['dummy_event'])
+        self.assertNotIn('histogram', results['groups']['dummy_event'])
+
+    def test_group_by_none(self):
+        results = self._aggregate({'group-by': 'none'})
+        self.assertEqual(len(results['groups']), 1)
+        self.assertEqual(results['groups']['all']['count'], 8)
+
+    def test_group_by_stream(self):
+        results = self._aggregate({'group-by': 'stream'})
+        counts = sorted(group['count'] for group in results['groups'].values())
+        self.assertEqual(counts, [3, 5])
+
+    def test_group_by_field(self):
+        results = self._aggregate(
+            {
+                'group-by': 'field',
+                'group-by-field': 'payload/tracefile_id',
+                'value-field': 'payload/dummy_value',
+            }
+        )
+        groups = results['groups']
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(groups['0']['count'], 5)
+        self.assertEqual(groups['0']['sum'], 12)
+        self.assertEqual(groups['1']['count'], 3)
+        self.assertEqual(groups['1']['sum'], 16)
+
+    def test_group_by_missing_field(self):
+        results = self._aggregate(
+            {'group-by': 'field', 'group-by-field': 'payload/nope'}
+        )
+        self.assertEqual(results['event-count'], 8)
+        self.assertEqual(results['ungrouped-event-count'], 8)
+        self.assertEqual(len(results['groups']), 0)
+
+    def test_value_field(self):
+        results = self._aggregate({'value-field': 'payload/dummy_value'})
+        group = results['groups']['dummy_event']
+        self.assertEqual(group['value-count'], 8)
+        self.assertEqual(group['sum'], 28)
+        self.assertEqual(group['min'], 0)
+        self.assertEqual(group['max'], 7)
+        self.assertIs(type(group['sum']), bt2.UnsignedIntegerValue)
+
+    def test_value_field_unsigned_then_signed(self):
+        group = self._aggregate_values([('u', 5), ('s', -7), ('u', 3)])
+        self.assertEqual(group['value-count'], 3)
+        self.assertIs(type(group['sum']), bt2.SignedIntegerValue)
+        self.assertEqual(group['sum'], 1)
+        self.assertIs(type(group['min']), bt2.SignedIntegerValue)
+        self.assertEqual(group['min'], -7)
+        self.assertEqual(group['max'], 5)
+
+    def test_value_field_signed_then_real(self):
+        group = self._aggregate_values([('s', -2), ('r', 0.5)])
+        self.assertIs(type(group['sum']), bt2.RealValue)
+        self.assertEqual(group['sum'], -1.5)
+        self.assertIs(type(group['min']), bt2.RealValue)
+        self.assertEqual(group['min'], -2.0)
+        self.assertEqual(group['max'], 0.5)
+
+    def test_value_field_signed_then_large_unsigned(self):
+        group = self._aggregate_values([('s', -1), ('u', 2 ** 63)])
+        self.assertIs(type(group['min']), bt2.RealValue)
+        self.assertEqual(group['min'], -1.0)
+        self.assertEqual(group['max'], float(2 ** 63))
+        self.assertIs(type(group['sum']), bt2.RealValue)
+
+    def test_value_field_unsigned_sum_overflow(self):
+        group = self._aggregate_values([('u', 2 ** 64 - 1), ('u', 2)])
+        self.assertIs(type(group['min']), bt2.UnsignedIntegerValue)
+        self.assertEqual(group['max'], 2 ** 64 - 1)
+        self.assertIs(type(group['sum']), bt2.RealValue)
+        self.assertEqual(group['sum'], float(2 ** 64 - 1) + 2.0)
+
+    def test_value_field_signed_sum_overflow(self):
+        group = self._aggregate_values([('s', -(2 ** 63)), ('s', -1)])
+        self.assertIs(type(group['min']), bt2.SignedIntegerValue)
+        self.assertEqual(group['min'], -(2 ** 63))
+        self.assertIs(type(group['sum']), bt2.RealValue)
+        self.assertEqual(group['sum'], -float(2 ** 63) - 1.0)
+
+    def test_missing_value_field(self):
+        results = self._aggregate({'value-field': 'payload/nope'})
+        group = results['groups']['dummy_event']
+        self.assertEqual(group['count'], 8)
+        self.assertEqual(group['value-count'], 0)
+        self.assertNotIn('sum', group)
+
+    def test_value_histogram(self):
+        results = self._aggregate(
+            {
+                'value-field': 'payload/dummy_value',
+                'histogram-bucket-width': bt2.UnsignedIntegerValue(4),
+            }
+        )
+        histogram = results['groups']['dummy_event']['histogram']
+        self.assertEqual(histogram, {'0': 4, '4': 4})
+
+    def test_value_histogram_lowest_bucket(self):
+        group = self._aggregate_values(
+            [('s', -(2 ** 63)), ('s', -(2 ** 63) + 7), ('s', -(2 ** 63) + 8)],
+            {'histogram-bucket-width': bt2.UnsignedIntegerValue(10)},
+        )
+        self.assertEqual(
+            group['histogram'], {str(-(2 ** 63)): 2, str(-(2 ** 63) + 8): 1},
+        )
+
+    def test_time_histogram(self):
+        results = self._aggregate(
+            {'histogram-bucket-width': bt2.UnsignedIntegerValue(50)}
+        )
+        histogram = results['groups']['dummy_event']['histogram']
+        self.assertEqual(
+            histogram,
+            {
+                str(_clock_offset_ns): 3,
+                str(_clock_offset_ns + 50): 3,
+                str(_clock_offset_ns + 100): 2,
+            },
+        )
+
+    def test_group_by_field_without_field(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate({'group-by': 'field'})
+
+    def test_group_by_field_with_other_group_by(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate({'group-by-field': 'payload/tracefile_id'})
+
+    def test_invalid_group_by(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate({'group-by': 'meow'})
+
+    def test_invalid_field_path_scope(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate({'value-field': 'header/dummy_value'})
+
+    def test_invalid_field_path_no_member(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate({'value-field': 'payload'})
+
+    def test_invalid_histogram_bucket_width(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate({'histogram-bucket-width': bt2.UnsignedIntegerValue(0)})
+
+    def test_results_not_a_map(self):
+        with self.assertRaises(bt2._Error):
+            self._aggregate(results=bt2.ArrayValue())
+
+    def test_results_not_a_value(self):
+        with self.assertRaises(TypeError):
+            self._aggregate(results=23)
+
+
+if __name__ == '__main__':
+    unittest.main()
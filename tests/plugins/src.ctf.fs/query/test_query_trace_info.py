@@ -18,6 +18,9 @@ import unittest
 import bt2
 import os
 import re
+import shutil
+import struct
+import tempfile
 
 
 test_ctf_traces_path = os.environ['BT_CTF_TRACES_PATH']
@@ -126,6 +129,118 @@ class QueryTraceInfoClockOffsetTestCase(unittest.TestCase):
             ).query()
 
 
+class QueryTraceInfoIndexCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        ctf = bt2.find_plugin('ctf')
+        self._fs = ctf.source_component_classes['fs']
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self._inputs = [
+            os.path.join(test_ctf_traces_path, 'intersection', '3eventsintersect')
+        ]
+
+    def tearDown(self):
+        self._cache_dir.cleanup()
+
+    def _query(self, **params):
+        params['inputs'] = self._inputs
+        params['index-cache-dir'] = self._cache_dir.name
+        res = bt2.QueryExecutor(self._fs, 'babeltrace.trace-infos', params).query()
+        self.assertEqual(len(res), 1)
+        return sorted(res[0]['stream-infos'], key=sort_predictably)
+
+    def _ranges(self, streams):
+        return [
+            (int(s['range-ns']['begin']), int(s['range-ns']['end'])) for s in streams
+        ]
+
+    def test_creates_cache_files(self):
+        self._query()
+        self.assertEqual(len(os.listdir(self._cache_dir.name)), 2)
+
+    def test_cached_ranges(self):
+        ranges = self._ranges(self._query())
+        self.assertEqual(self._ranges(self._query()), ranges)
+
+    def test_cached_ranges_clock_class_offset(self):
+        # The cache must not retain the clock class offset of the
+        # component which created it.
+        ranges = self._ranges(self._query())
+        offset_ranges = self._ranges(self._query(**{'clock-class-offset-ns': 2}))
+        self.assertEqual(offset_ranges, [(b + 2, e + 2) for b, e in ranges])
+
+    # Adds `delta` to the raw beginning timestamp of the first entry of
+    # each cache file.
+    def _shift_cached_first_packet_begin(self, delta):
+        # Offset of `timestamp_begin` within the first entry: 32-byte
+        # header, then `offset` and `packet_size`.
+        field_offset = 32 + 16
+
+        for name in os.listdir(self._cache_dir.name):
+            with open(os.path.join(self._cache_dir.name, name), 'r+b') as f:
+                f.seek(field_offset)
+                (ts,) = struct.unpack('<Q', f.read(8))
+                f.seek(field_offset)
+                f.write(struct.pack('<Q', ts + delta))
+
+    def test_uses_cache_files(self):
+        # The component must read the packet index from the cache files
+        # instead of the data stream files: change the cached beginning
+        # timestamps and check that the query result reflects this.
+        ranges = self._ranges(self._query())
+        self._shift_cached_first_packet_begin(1)
+        self.assertEqual(self._ranges(self._query()), [(b + 1, e) for b, e in ranges])
+
+    def test_stale_cache_file_mtime_ns(self):
+        # Work on a copy of the trace to change the modification times
+        # of its data stream files.
+        with tempfile.TemporaryDirectory() as trace_dir:
+            stream_paths = []
+
+            for name in os.listdir(self._inputs[0]):
+                path = os.path.join(trace_dir, name)
+                shutil.copy(os.path.join(self._inputs[0], name), path)
+
+                if name.startswith('test_stream'):
+                    stream_paths.append(path)
+
+            def set_mtime_ns(mtime_ns):
+                for path in stream_paths:
+                    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+                    if os.stat(path).st_mtime_ns != mtime_ns:
+                        self.skipTest(
+                            'file system does not keep nanosecond modification times'
+                        )
+
+            self._inputs = [trace_dir]
+            base_mtime_ns = 1500000000 * 10 ** 9
+            set_mtime_ns(base_mtime_ns + 100)
+            ranges = self._ranges(self._query())
+            self._shift_cached_first_packet_begin(1)
+
+            # Same size and same modification time in seconds: only the
+            # nanosecond part shows that the cache files are stale.
+            set_mtime_ns(base_mtime_ns + 200)
+            self.assertEqual(self._ranges(self._query()), ranges)
+
+    def test_corrupted_cache_file(self):
+        ranges = self._ranges(self._query())
+
+        for name in os.listdir(self._cache_dir.name):
+            with open(os.path.join(self._cache_dir.name, name), 'wb') as f:
+                f.write(b'garbage')
+
+        self.assertEqual(self._ranges(self._query()), ranges)
+
+    def test_index_cache_dir_wrong_type(self):
+        with self.assertRaises(bt2._Error):
+            bt2.QueryExecutor(
+                self._fs,
+                'babeltrace.trace-infos',
+                {'inputs': self._inputs, 'index-cache-dir': 23},
+            ).query()
+
+
 class QueryTraceInfoPortNameTestCase(unittest.TestCase):
     def setUp(self):
         ctf = bt2.find_plugin("ctf")
@@ -0,0 +1,64 @@
+#
+# Copyright (C) 2020 EfficiOS Inc.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; only version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import bt2
+import os
+
+
+bt_plugin_manifest = {
+    'name': 'fizzy',
+    'author': 'Philippe Proulx',
+    'description': 'A lazy plugin.',
+    'version': (4, 5, 6),
+    'license': 'MIT',
+    'component_classes': [
+        {
+            'type': 'source',
+            'name': 'MySource',
+            'description': 'A lazy source.',
+            'help': 'Creates no messages.',
+            'query_objects': ['answer'],
+        },
+        {'type': 'sink', 'name': 'MySink'},
+    ],
+}
+
+# the test checks that the provider doesn't import this module until
+# it needs to
+os.environ['BT_TEST_LAZY_PYTHON_PLUGIN_IMPORTED'] = '1'
+
+
+class MyIter(bt2._UserMessageIterator):
+    def __next__(self):
+        raise StopIteration
+
+
+@bt2.plugin_component_class
+class MySource(bt2._UserSourceComponent, message_iterator_class=MyIter):
+    def __init__(self, config, params, obj):
+        self._add_output_port('out')
+
+    @staticmethod
+    def _user_query(priv_query_executor, obj, params, method_obj):
+        return 42
+
+
+@bt2.plugin_component_class
+class MySink(bt2._UserSinkComponent):
+    def _user_consume(self):
+        pass
@@ -41,3 +41,45 @@ class PythonPluginProviderTestCase(unittest.TestCase):
         self.assertEqual(plugin.source_component_classes['MySource'].name, 'MySource')
         self.assertEqual(plugin.filter_component_classes['MyFilter'].name, 'MyFilter')
         self.assertEqual(plugin.sink_component_classes['MySink'].name, 'MySink')
+
+
+class LazyPythonPluginProviderTestCase(unittest.TestCase):
+    def _assert_not_imported(self):
+        self.assertNotIn('BT_TEST_LAZY_PYTHON_PLUGIN_IMPORTED', os.environ)
+
+    def test_lazy_python_plugin_provider(self):
+        path = os.environ['PYTHON_PLUGIN_PROVIDER_LAZY_TEST_PLUGIN_PATH']
+        pset = bt2.find_plugins_in_path(path)
+        self.assertEqual(len(pset), 1)
+        plugin = pset[0]
+        self.assertEqual(plugin.name, 'fizzy')
+        self.assertEqual(plugin.author, 'Philippe Proulx')
+        self.assertEqual(plugin.description, 'A lazy plugin.')
+        self.assertEqual(plugin.version.major, 4)
+        self.assertEqual(plugin.version.minor, 5)
+        self.assertEqual(plugin.version.patch, 6)
+        self.assertEqual(plugin.license, 'MIT')
+        self.assertEqual(len(plugin.source_component_classes), 1)
+        self.assertEqual(len(plugin.filter_component_classes), 0)
+        self.assertEqual(len(plugin.sink_component_classes), 1)
+        src_comp_cls = plugin.source_component_classes['MySource']
+        self.assertEqual(src_comp_cls.description, 'A lazy source.')
+        self.assertEqual(src_comp_cls.help, 'Creates no messages.')
+        self._assert_not_imported()
+
+        # not declared in the manifest: doesn't import the module
+        with self.assertRaises(bt2.UnknownObject):
+            bt2.QueryExecutor(src_comp_cls, 'question').query()
+
+        self._assert_not_imported()
+
+        # declared in the manifest: imports the module
+        self.assertEqual(bt2.QueryExecutor(src_comp_cls, 'answer').query(), 42)
+        self.assertEqual(os.environ['BT_TEST_LAZY_PYTHON_PLUGIN_IMPORTED'], '1')
+
+        graph = bt2.Graph()
+        src = graph.add_component(src_comp_cls, 'src')
+        sink = graph.add_component(plugin.sink_component_classes['MySink'], 'sink')
+        self.assertEqual(src.cls.name, 'MySource')
+        self.assertEqual(len(src.output_ports), 1)
+        self.assertEqual(sink.cls.name, 'MySink')